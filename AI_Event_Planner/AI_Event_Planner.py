@@ -2,7 +2,11 @@ import reflex as rx
 from enum import Enum
 import asyncio
 import os
+import time
+import hmac
 import bcrypt
+import hashlib
+import secrets
 import requests
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -10,7 +14,8 @@ from pymongo import MongoClient
 from bson.binary import UuidRepresentation
 from datetime import datetime, timedelta
 import uuid
-from database import UserManager, EventManager 
+from database import UserManager, EventManager, get_event_manager, get_user_manager
+from passwords import PasswordPoolBusy
 from agents import create_requirements_crew, create_budget_crew
 from utils import parse_services_and_budget, extract_text_from_crew_output
 import json
@@ -23,6 +28,13 @@ from agents import (
     create_vendor_search_crew,
 )
 from utils import extract_text_from_crew_output
+from http_client import breaker_states, open_breakers
+from email_outbox import start_outbox_workers_async
+from event_metrics import service_metrics, days_until, provider_fields
+from metering import metering_scope, record_crew_usage
+from metrics import CACHE_REQUESTS, CREW_KICKOFF_SECONDS, SEARCHES_IN_FLIGHT, CONTENT_TYPE, render_metrics
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 # For newer versions of Reflex
 import logging
 
@@ -30,6 +42,26 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Stream invitation text into the preview as it is generated
+STREAM_INVITATIONS = os.environ.get("EVENTWISE_STREAM_INVITATIONS", "1") == "1"
+INVITATION_STREAM_PUSH_SECONDS = float(os.environ.get("EVENTWISE_STREAM_PUSH_SECONDS", 0.1))
+
+# Seconds a session reuses its loaded event before the next page visit refetches it
+EVENT_CACHE_TTL_SECONDS = float(os.environ.get("EVENTWISE_EVENT_CACHE_TTL", 30))
+
+# Backend address for files served by ops_api (the frontend runs on another port)
+API_URL = rx.config.get_config().api_url
+# Download links from ops_api are signed for the signed-in user and expire; set the
+# secret when several backend workers serve the app, or each signs with its own
+DOWNLOAD_LINK_SECRET = (os.environ.get("EVENTWISE_DOWNLOAD_SECRET") or secrets.token_hex(32)).encode()
+DOWNLOAD_LINK_TTL_SECONDS = int(os.environ.get("EVENTWISE_DOWNLOAD_LINK_TTL", 300))
+
+
+def download_signature(uid: str, event_id: str, invitation_id: str, expires: int) -> str:
+    """HMAC over who may download which event's invitation files, and until when"""
+    message = f"{uid}:{event_id}:{invitation_id}:{expires}".encode()
+    return hmac.new(DOWNLOAD_LINK_SECRET, message, hashlib.sha256).hexdigest()
+
 # Define the color scheme
 COLORS = {
     "background": "#FFFDE7",
@@ -721,15 +753,29 @@ class VendorResult(rx.Base):
     source: Optional[str] = None  # Add field for source link
     map_link: Optional[str] = None  # Add field for map link
 
+def typed_service(service: dict) -> EventService:
+    """EventService for a service stored on an event document"""
+    provider = None
+    if service.get("selected_provider"):
+        provider = ServiceProvider(
+            name=service["selected_provider"].get("name", ""),
+            address=service["selected_provider"].get("address"),
+            contact=service["selected_provider"].get("contact"),
+            price=service["selected_provider"].get("price")
+        )
+    return EventService(
+        service=service.get("service", ""),
+        budget=service.get("budget", 0),
+        status=service.get("status", "pending"),
+        selected_provider=provider
+    )
+
 class State(rx.State):
-    """The app state."""
-    
-    # Animation states (your existing code)
-    active_button: str = ""
-    active_card: int = -1
-    scroll_position: int = 0
-    previous_scroll_position: int = 0
-    navbar_visible: bool = True  # Add this line
+    """
+    State shared by every page: who is signed in and which event is open.
+    Each page keeps its own fields in a substate below, so an event only
+    loads, diffs and sends the slice of state its page uses.
+    """
     
     # Auth data
     user_id: str = ""
@@ -737,135 +783,55 @@ class State(rx.State):
     user_email: str = ""
     is_authenticated: bool = False
     
-    # Auth form fields
-    email: str = ""
-    password: str = ""
-    confirm_password: str = ""
-    name: str = ""
-    
-    # Modal states
-    show_login_modal: bool = False
-    show_register_modal: bool = False
-    
     # Loading and error states
     is_loading: bool = False
     error_message: str = ""
     success_message: str = ""
     
-    # Events data
-    user_events: list[dict] = []
+    # Event picked on the dashboard, used until the route names one
+    selected_event_id: str = ""
 
-    # Event creation form fields
-    event_name: str = ""
-    event_type: str = ""
-    event_type_other: str = ""
-    show_other_input: bool = False
-    event_date: str = ""
-    num_guests: str = ""
-    budget: str = ""
-    location: str = ""
-    
-    # Service management states
-    generated_services: list[dict] = []
-    revision_input: str = ""
-    show_services: bool = False
-    is_generating_services: bool = False
-    show_success_popup: bool = False
-    created_event_id: str = ""
-    
-    # Event type options
-    event_types: list[str] = ["Birthday", "Wedding", "Corporate", "Anniversary", "Other"]
+    async def logout(self):
+        """Logout user"""
+        self.user_id = ""
+        self.user_name = ""
+        self.user_email = ""
+        self.is_authenticated = False
+        dashboard = await self.get_state(DashboardState)
+        dashboard.user_events = []
+        return rx.redirect("/")
     
-    # Animation states for services
-    active_service_card: int = -1
-
-    # Event detail specific state
-    current_event_id: str = ""
-    #current_event: dict = {}
-    #selected_service: str = ""
-    search_results: list = []
-    #is_searching: bool = False
-    service_details: dict = {}
-    #is_loading_event: bool = True
-    #error_message: str = ""
-    success_message: str = ""
+    def navigate_to_event_detail(self, event_id: str):
+        """Navigate to event detail page with explicit event ID setting"""
+        print(f"Navigating to event: {event_id}")
+        self.selected_event_id = event_id  # Set the ID before navigation
+        return rx.redirect(f"/event/{event_id}")
     
-    provider_name: str = ""
-    provider_contact: str = ""
-    provider_address: str = ""
-    provider_price: str = ""
-    provider_rating: str = ""
-
-    selected_event_id: str = ""
-    current_event: dict = {}
-    event_services: List[EventService] = []
-    selected_service: str = ""
-    is_loading_event: bool = True
-    error_message: str = ""
-    vendor_search_results: List[VendorResult] = []
-    is_searching: bool = False
-
-    # Provider selection tracking
-    # Provider selection tracking
-    is_venue_selected: bool = False
-    is_service_provider_selected: bool = False
-    selected_venue_name: str = ""
-    selected_venue_address: str = ""
-    selected_venue_contact: str = ""
-    selected_venue_price: str = ""
-    selected_provider_name: str = ""
-    selected_provider_contact: str = ""
-    selected_provider_price: str = ""
-
-    venue_type: str = ""
-    venue_type_other: str = ""
-    show_venue_type_other: bool = False
-    venue_types: list[str] = ["Banquet Hall", "Hotel", "Resort", "Restaurant", "Outdoor Garden", "Convention Center", "Farm House", "Beach Venue", "Other"]
-
-    # Add these state variables to your State class
-    # Invitation form fields
-    invitation_venue_name: str = ""
-    invitation_venue_address: str = ""
-    invitation_time: str = ""
-    host_name: str = ""
-    rsvp_contact: str = ""
-    style_preference: str = ""
-    special_instructions: str = ""
-
-    # Invitation generation state
-    is_generating_invitation: bool = False
-    is_regenerating_text: bool = False
-    invitation_text: str = ""
-    invitation_id: str = ""
-    color_options: list[dict] = []  # Use typed lists for foreach
-    font_options: list[dict] = []
-    border_options: list[dict] = []
-    background_options: list[dict] = []
-    selected_color_scheme: str = "elegant"
-    selected_font_style: str = "times"
-    selected_border_style: str = "simple"
-    selected_background: str = "cream"
-    invitation_background: str = "#FFF8E1"  # Default background color (cream)
-
-    # Highlight state for visual cues
-    highlight_styling: bool = False
-    highlight_email: bool = False
+    def navigate_to_create_event(self):
+        """Navigate to event creation page"""
+        return rx.redirect("/event/create")
 
-    # PDF generation state
-    is_generating_pdf: bool = False
-    pdf_path: str = ""
-    download_url: str = ""
 
-    # Email state
-    email_subject: str = ""
-    email_addresses: str = ""
-    cc_addresses: str = ""
-    sender_name: str = ""
-    additional_message: str = ""
-    is_sending_email: bool = False
-    email_success: bool = False
-    email_error: str = ""
+class AuthState(State):
+    """Landing page: login and register modals and hover animations"""
+    
+    # Animation states (your existing code)
+    active_button: str = ""
+    active_card: int = -1
+    scroll_position: int = 0
+    previous_scroll_position: int = 0
+    navbar_visible: bool = True  # Add this line
+    
+    # Auth form fields
+    email: str = ""
+    password: str = ""
+    confirm_password: str = ""
+    name: str = ""
     
+    # Modal states
+    show_login_modal: bool = False
+    show_register_modal: bool = False
+
     # Auth methods
 
     def toggle_login_modal(self):
@@ -886,8 +852,7 @@ class State(rx.State):
         self.error_message = ""
         
         try:
-            user_manager = UserManager()
-            result = user_manager.login_user(self.email, self.password)
+            result = await get_user_manager().login_user_async(self.email, self.password)
             
             if result["success"]:
                 self.user_id = result["uid"]
@@ -904,6 +869,8 @@ class State(rx.State):
                 return rx.redirect("/dashboard")
             else:
                 self.error_message = result["message"]
+        except PasswordPoolBusy:
+            self.error_message = "Too many sign-ins right now, please try again in a moment"
         except Exception as e:
             self.error_message = f"Login failed: {str(e)}"
         finally:
@@ -952,8 +919,7 @@ class State(rx.State):
             return
         
         try:
-            user_manager = UserManager()
-            result = user_manager.register_user(self.email, self.password, self.name)
+            result = await get_user_manager().register_user_async(self.email, self.password, self.name)
             
             if result["success"]:
                 self.user_id = result["uid"]
@@ -972,11 +938,37 @@ class State(rx.State):
                 return rx.redirect("/dashboard")
             else:
                 self.error_message = result["message"]
+        except PasswordPoolBusy:
+            self.error_message = "Too many sign-ups right now, please try again in a moment"
         except Exception as e:
             self.error_message = f"Registration failed: {str(e)}"
         finally:
             self.is_loading = False
     
+    # Animation methods from your original code
+    def set_active_button(self, button_id: str):
+        """Set the active button for hover effects."""
+        self.active_button = button_id
+    
+    def clear_active_button(self):
+        """Clear the active button state."""
+        self.active_button = ""
+    
+    def set_active_card(self, card_id: int):
+        """Set the active card for hover effects."""
+        self.active_card = card_id
+    
+    def clear_active_card(self):
+        """Clear the active card state."""
+        self.active_card = -1
+
+
+class DashboardState(State):
+    """Dashboard: the signed-in user's events"""
+    
+    # Events data
+    user_events: list[dict] = []
+
     # Event methods
     async def fetch_user_events(self):
         """Fetch all events for the logged-in user"""
@@ -985,49 +977,41 @@ class State(rx.State):
         
         self.is_loading = True
         try:
-            event_manager = EventManager()
+            event_manager = get_event_manager()
             events = event_manager.get_user_events(self.user_id)
             self.user_events = events
         except Exception as e:
             self.error_message = f"Failed to fetch events: {str(e)}"
         finally:
             self.is_loading = False
+
+
+class CreateEventState(State):
+    """Create event page: the event form and the generated service budget"""
+
+    # Event creation form fields
+    event_name: str = ""
+    event_type: str = ""
+    event_type_other: str = ""
+    show_other_input: bool = False
+    event_date: str = ""
+    num_guests: str = ""
+    budget: str = ""
+    location: str = ""
     
-    def logout(self):
-        """Logout user"""
-        self.user_id = ""
-        self.user_name = ""
-        self.user_email = ""
-        self.is_authenticated = False
-        self.user_events = []
-        return rx.redirect("/")
-    
-    def navigate_to_event_detail(self, event_id: str):
-        """Navigate to event detail page with explicit event ID setting"""
-        print(f"Navigating to event: {event_id}")
-        self.selected_event_id = event_id  # Set the ID before navigation
-        return rx.redirect(f"/event/{event_id}")
-    
-    def navigate_to_create_event(self):
-        """Navigate to event creation page"""
-        return rx.redirect("/event/create")
-    
-    # Animation methods from your original code
-    def set_active_button(self, button_id: str):
-        """Set the active button for hover effects."""
-        self.active_button = button_id
-    
-    def clear_active_button(self):
-        """Clear the active button state."""
-        self.active_button = ""
+    # Service management states
+    generated_services: list[dict] = []
+    revision_input: str = ""
+    show_services: bool = False
+    is_generating_services: bool = False
+    show_success_popup: bool = False
+    created_event_id: str = ""
     
-    def set_active_card(self, card_id: int):
-        """Set the active card for hover effects."""
-        self.active_card = card_id
+    # Event type options
+    event_types: list[str] = ["Birthday", "Wedding", "Corporate", "Anniversary", "Other"]
     
-    def clear_active_card(self):
-        """Clear the active card state."""
-        self.active_card = -1
+    # Animation states for services
+    active_service_card: int = -1
 
     def set_event_type(self, value: str):
         """Handle event type selection"""
@@ -1054,7 +1038,7 @@ class State(rx.State):
             }
             
             # Store event in database
-            event_manager = EventManager()
+            event_manager = get_event_manager()
             result = event_manager.create_event(self.user_id, event_details)
             
             if result["success"]:
@@ -1081,7 +1065,10 @@ class State(rx.State):
             
             # Step 1: Generate requirements using CrewAI
             requirements_crew = create_requirements_crew()
-            requirement_output = requirements_crew.kickoff(inputs=event_details)
+            with metering_scope(self.created_event_id, "requirements"):
+                with CREW_KICKOFF_SECONDS.time(stage="requirements"):
+                    requirement_output = requirements_crew.kickoff(inputs=event_details)
+                record_crew_usage(requirement_output)
             requirement_results = extract_text_from_crew_output(requirement_output)
             
             # Process requirement results
@@ -1119,7 +1106,10 @@ class State(rx.State):
             
             # Step 2: Allocate budget using CrewAI
             budget_crew = create_budget_crew()
-            budget_output = budget_crew.kickoff(inputs=event_details)
+            with metering_scope(self.created_event_id, "budget"):
+                with CREW_KICKOFF_SECONDS.time(stage="budget"):
+                    budget_output = budget_crew.kickoff(inputs=event_details)
+                record_crew_usage(budget_output)
             budget_results = extract_text_from_crew_output(budget_output)
             
             # Parse the services and budget
@@ -1165,7 +1155,10 @@ class State(rx.State):
             
             # Use service revision agent
             revision_crew = create_service_revision_crew()
-            revision_output = revision_crew.kickoff(inputs=revision_inputs)
+            with metering_scope(self.created_event_id, "revision"):
+                with CREW_KICKOFF_SECONDS.time(stage="revision"):
+                    revision_output = revision_crew.kickoff(inputs=revision_inputs)
+                record_crew_usage(revision_output)
             revision_results = extract_text_from_crew_output(revision_output)
             
             # Update services based on revision
@@ -1256,7 +1249,7 @@ class State(rx.State):
         return rx.redirect(f"/event/{self.created_event_id}")
     
     # In the State class, add this:
-    @rx.var
+    @rx.var(cache=True, deps=["generated_services"])
     def total_budget_display(self) -> str:
         """Computed var for total budget display"""
         if not self.generated_services:
@@ -1264,92 +1257,86 @@ class State(rx.State):
         total = sum(service.get("budget", 0) for service in self.generated_services)
         return f"Total Budget Allocated: ₹{total:,}"
 
-    @rx.var
+
+class EventDetailState(State):
+    """Event detail page: the loaded event, its services and vendor search"""
+
+    # Event detail specific state
+    search_results: list = []
+    service_details: dict = {}
+    
+    provider_name: str = ""
+    provider_contact: str = ""
+    provider_address: str = ""
+    provider_price: str = ""
+    provider_rating: str = ""
+
+    current_event: dict = {}
+    # When current_event was fetched; it is reused for EVENT_CACHE_TTL_SECONDS
+    _event_loaded_at: float = 0.0
+    event_services: List[EventService] = []
+    selected_service: str = ""
+    is_loading_event: bool = True
+    vendor_search_results: List[VendorResult] = []
+    is_searching: bool = False
+
+    # Provider selection tracking
+    is_venue_selected: bool = False
+    is_service_provider_selected: bool = False
+    selected_venue_name: str = ""
+    selected_venue_address: str = ""
+    selected_venue_contact: str = ""
+    selected_venue_price: str = ""
+    selected_provider_name: str = ""
+    selected_provider_contact: str = ""
+    selected_provider_price: str = ""
+
+    venue_type: str = ""
+    venue_type_other: str = ""
+    show_venue_type_other: bool = False
+    venue_types: list[str] = ["Banquet Hall", "Hotel", "Resort", "Restaurant", "Outdoor Garden", "Convention Center", "Farm House", "Beach Venue", "Other"]
+
+    @rx.var(cache=True, deps=["current_event", "event_services"])
+    def _service_metrics(self) -> dict:
+        """Progress and budget aggregates, computed in one pass when the services change"""
+        return service_metrics(self.current_event, self.event_services)
+
+    @rx.var(cache=True, deps=["_service_metrics"])
     def event_progress(self) -> float:
         """Calculate percentage of completed services"""
-        if not self.current_event or "services" not in self.current_event:
-            return 0
-            
-        services = self.current_event.get("services", [])
-        if not services:
-            return 0
-            
-        completed = sum(1 for service in services if service.get("status") == "completed")
-        return (completed / len(services)) * 100
+        return self._service_metrics["event_progress"]
     
-    @rx.var
+    @rx.var(cache=True, deps=["current_event"])
     def days_until_event(self) -> int:
         """Calculate days until event"""
-        if not self.current_event or "event_date" not in self.current_event:
-            return 0
-        try:
-            event_date = datetime.strptime(self.current_event["event_date"], "%Y-%m-%d")
-            today = datetime.now()
-            return (event_date - today).days
-        except:
-            return 0
-    @rx.var
+        return days_until((self.current_event or {}).get("event_date"))
+
+    @rx.var(cache=True, deps=["_service_metrics"])
     def overall_progress(self) -> str:
         """Calculate overall progress"""
-        if not self.event_services:
-            return "0/0 services completed"
-        completed = sum(1 for s in self.event_services if s.status == "completed")
-        total = len(self.event_services)
-        return f"{completed}/{total} services completed"
+        return self._service_metrics["overall_progress"]
     
-    @rx.var
+    @rx.var(cache=True, deps=["_service_metrics"])
     def budget_used(self) -> float:
         """Calculate percentage of budget used"""
-        if not self.current_event:
-            return 0
-            
-        total_budget = self.current_event.get("budget", 0)
-        if total_budget == 0:
-            return 0
-            
-        # Calculate used budget based on services with selected providers
-        used_budget = 0
-        for service in self.current_event.get("services", []):
-            if service.get("status") == "completed" and service.get("selected_provider"):
-                used_budget += service.get("budget", 0)
-                
-        return (used_budget / total_budget) * 100
+        return self._service_metrics["budget_used"]
     
-    @rx.var
+    @rx.var(cache=True, deps=["_service_metrics"])
     def completed_services(self) -> list:
         """Get list of completed services"""
-        if not self.current_event:
-            return []
-            
-        return [
-            service for service in self.current_event.get("services", [])
-            if service.get("status") == "completed"
-        ]
+        return self._service_metrics["completed_services"]
     
-    @rx.var
+    @rx.var(cache=True, deps=["_service_metrics"])
     def pending_services(self) -> list:
         """Get list of pending services"""
-        if not self.current_event:
-            return []
-            
-        return [
-            service for service in self.current_event.get("services", [])
-            if service.get("status") != "completed"
-        ]
-    # Add this method to the State class to calculate the progress percentage
-    @rx.var
+        return self._service_metrics["pending_services"]
+
+    @rx.var(cache=True, deps=["_service_metrics"])
     def progress_percentage(self) -> str:
         """Calculate progress percentage for progress bar width"""
-        if not self.event_services:
-            return "0%"
-        completed = sum(1 for s in self.event_services if s.status == "completed")
-        total = len(self.event_services)
-        if total == 0:
-            return "0%"
-        percentage = (completed / total) * 100
-        return f"{percentage}%"
+        return self._service_metrics["progress_percentage"]
     
-    @rx.var
+    @rx.var(cache=True, deps=["service_details"])
     def has_selected_provider(self) -> bool:
         """Check if a provider is selected for the current service"""
         return (
@@ -1357,77 +1344,34 @@ class State(rx.State):
             "status" in self.service_details and 
             self.service_details.get("status") == "completed"
         )
-    @rx.var
-    def event_category_display(self) -> str:
-        """Get event category with proper capitalization"""
-        if not self.current_event or "event_category" not in self.current_event:
-            return ""
-        
-        category = self.current_event.get("event_category", "")
-        # Manually capitalize first letter of each word
-        if category:
-            words = category.split()
-            capitalized_words = [word[0].upper() + word[1:] if word else "" for word in words]
-            return " ".join(capitalized_words)
-        return ""
-    # Update this method in your State class
     async def load_event_details(self):
-        """Load event details from URL path or selected_event_id with improved synchronization"""
+        """Load the event named in the route, reusing this session's copy while it is fresh"""
+        event_id = self.router.page.params.get("event_id") or self.selected_event_id
+        if event_id == "[event_id]":  # This is a template, not a real ID
+            event_id = self.selected_event_id
+        if not event_id:
+            self.error_message = "No valid event ID found"
+            self.is_loading_event = False
+            return
+        
+        # The invitation page shares this state, so moving between the two pages doesn't refetch
+        if (self.current_event.get("event_id") == event_id
+                and time.time() - self._event_loaded_at < EVENT_CACHE_TTL_SECONDS):
+            CACHE_REQUESTS.inc(cache="event_page", result="hit")
+            self.is_loading_event = False
+            return
+        CACHE_REQUESTS.inc(cache="event_page", result="miss")
+        
         self.is_loading_event = True
         self.error_message = ""
-        
         try:
-            # STEP 1: Extract event ID from URL path
-            current_path = self.router.page.path
-            print(f"Current page path: {current_path}")
-            
-            # Use regex to extract the event_id from the URL path
-            import re
-            path_match = re.search(r'/event/([^/]+)', current_path)
-            url_event_id = None
-            
-            if path_match:
-                url_event_id = path_match.group(1)
-                if url_event_id == "[event_id]":  # This is a template, not a real ID
-                    url_event_id = None
-                else:
-                    print(f"Event ID from URL: {url_event_id}")
-            
-            # STEP 2: Determine which event ID to use
-            event_id = url_event_id or self.selected_event_id
-            print(f"Using event_id for loading: {event_id}")
-            
-            if not event_id:
-                self.error_message = "No valid event ID found"
-                print("No valid event ID could be determined")
-                return
-                
-            # STEP 3: Load the event data
-            event_manager = EventManager()
-            event = event_manager.get_event_by_id(event_id)
-            
-            if event:
-                print(f"Successfully loaded event: {event['event_name']} (ID: {event['event_id']})")
-                
-                # STEP 4: Check if this is a different event than currently loaded
-                if self.current_event and self.current_event.get('event_id') != event['event_id']:
-                    print(f"Switching from event {self.current_event.get('event_id')} to {event['event_id']}")
-                
-                # STEP 5: Update state variables
-                self.current_event = event
-                self.selected_event_id = event['event_id']  # Ensure selected_event_id matches loaded event
-                self.set_default_host_name()
-                # STEP 6: Fetch services for this event
-                await self.fetch_event_services()
-                
-            else:
+            loop = asyncio.get_running_loop()
+            event = await loop.run_in_executor(None, get_event_manager().get_event_page_data, event_id)
+            if not event:
                 self.error_message = f"Event with ID {event_id} not found"
-                print(f"Failed to find event with ID: {event_id}")
-                
-                # Debug: List all events in the database
-                all_events = list(event_manager.event_collection.find({}, {"event_id": 1, "event_name": 1}))
-                event_ids = [e["event_id"] for e in all_events]
-                print(f"Available event IDs: {event_ids}")
+                logger.warning(f"Event {event_id} not found")
+                return
+            self._set_current_event(event)
         except Exception as e:
             import traceback
             print(f"Error loading event: {str(e)}")
@@ -1436,84 +1380,49 @@ class State(rx.State):
         finally:
             self.is_loading_event = False
 
-    def set_default_host_name(self):
-        """Explicitly set the host name from user name"""
-        # Check if host_name is empty
-        if not self.host_name:
-            # Try to set it from user_name
-            if self.user_name:
-                self.host_name = self.user_name
-                print(f"Setting host name to user name: {self.user_name}")
-            # If still empty, try name
-            elif hasattr(self, 'name') and self.name:
-                self.host_name = self.name
-                print(f"Setting host name to name: {self.name}")
-
-    async def fetch_event_services(self):
-        """Fetch services for the current event"""
-        if not self.current_event:
-            return
-            
-        services_data = self.current_event.get("services", [])
-        # Convert to typed objects
-        typed_services = []
-        for service in services_data:
-            provider = None
-            if service.get("selected_provider"):
-                provider = ServiceProvider(
-                    name=service["selected_provider"].get("name", ""),
-                    address=service["selected_provider"].get("address"),
-                    contact=service["selected_provider"].get("contact"),
-                    price=service["selected_provider"].get("price")
-                )
-            
-            typed_services.append(EventService(
-                service=service.get("service", ""),
-                budget=service.get("budget", 0),
-                status=service.get("status", "pending"),
-                selected_provider=provider
-            ))
-        
-        self.event_services = typed_services
+    def _set_current_event(self, event: dict):
+        """Install a freshly loaded event and its typed services"""
+        if self.current_event.get("event_id") != event["event_id"]:
+            self.selected_service = ""
+            self.service_details = {}
+            self.search_results = []
+            self.vendor_search_results = []
+        self.current_event = event
+        self.selected_event_id = event["event_id"]
+        self._event_loaded_at = time.time()
+        self.event_services = [typed_service(service) for service in event.get("services", [])]
         
         # If no service is selected and we have services, select the first one
         if not self.selected_service and self.event_services:
             self.selected_service = self.event_services[0].service
 
+    def _store_provider_locally(self, service_name: str, provider: Optional[dict]):
+        """Keep the session's copy of the event in step with a provider saved to the database"""
+        for service in self.current_event.get("services", []):
+            if service["service"].lower() == service_name.lower():
+                service["selected_provider"] = provider
+                service["status"] = "completed" if provider else "pending"
+                break
 
     def select_service(self, service_name):
-        """Select a service to view details with improved MongoDB integration"""
+        """Select a service to view its details"""
         # If already selected, deselect it
         if self.selected_service == service_name:
             self.selected_service = ""
             self.service_details = {}
             return
-            
-        # Set the selected service
-        self.selected_service = service_name
-        
-        # Create a new event manager instance to fetch fresh data
-        event_manager = EventManager()
-        
-        # Get the event ID from current state
-        event_id = self.current_event.get("event_id", self.selected_event_id)
-        
-        if not event_id:
-            self.error_message = "Missing event ID"
-            return
-        
-        # Fetch the latest event data directly from MongoDB
-        event = event_manager.get_event_by_id(event_id)
+            
+        # Set the selected service
+        self.selected_service = service_name
         
-        if not event:
-            self.error_message = f"Event with ID {event_id} not found"
+        if not self.current_event:
+            self.error_message = "Missing event ID"
             return
         
-        # Find service details in the freshly fetched event data
-        for service in event.get("services", []):
+        # Find service details in the loaded event; provider changes are written to it as they are saved
+        for service in self.current_event.get("services", []):
             if service["service"] == service_name:
-                # Update service_details with the latest data from MongoDB
-                self.service_details = service
+                self.service_details = dict(service)
                 
                 # Clear any previous search results when changing services
                 self.search_results = []
@@ -1685,9 +1594,12 @@ class State(rx.State):
                 import asyncio
                 from utils import extract_text_from_crew_output
                 
-                service_output = await asyncio.to_thread(
-                    venue_crew.kickoff, inputs=venue_inputs
-                )
+                with metering_scope(self.current_event.get("event_id"), "venue_search"):
+                    with SEARCHES_IN_FLIGHT.track_inprogress(kind="venue"), CREW_KICKOFF_SECONDS.time(stage="venue_search"):
+                        service_output = await asyncio.to_thread(
+                            venue_crew.kickoff, inputs=venue_inputs
+                        )
+                    record_crew_usage(service_output)
                 
                 service_results = extract_text_from_crew_output(service_output)
             else:
@@ -1699,9 +1611,12 @@ class State(rx.State):
                 import asyncio
                 from utils import extract_text_from_crew_output
                 
-                service_output = await asyncio.to_thread(
-                    vendor_crew.kickoff, inputs=search_inputs
-                )
+                with metering_scope(self.current_event.get("event_id"), "vendor_search"):
+                    with SEARCHES_IN_FLIGHT.track_inprogress(kind="vendor"), CREW_KICKOFF_SECONDS.time(stage="vendor_search"):
+                        service_output = await asyncio.to_thread(
+                            vendor_crew.kickoff, inputs=search_inputs
+                        )
+                    record_crew_usage(service_output)
                 
                 service_results = extract_text_from_crew_output(service_output)
             
@@ -1766,11 +1681,8 @@ class State(rx.State):
                 self.error_message = "Missing event ID"
                 return
             
-            # Create a new event manager instance
-            event_manager = EventManager()
-            
             # Update the service with selected vendor
-            result = event_manager.update_service_provider(
+            result = get_event_manager().update_service_provider(
                 event_id,
                 self.selected_service,
                 vendor_dict
@@ -1778,6 +1690,7 @@ class State(rx.State):
             
             if result["success"]:
                 # Update local state
+                self._store_provider_locally(self.selected_service, vendor_dict)
                 for service in self.event_services:
                     if service.service == self.selected_service:
                         # Create a provider object
@@ -1840,11 +1753,8 @@ class State(rx.State):
                 self.error_message = "Missing event ID"
                 return
             
-            # Create a new event manager instance
-            event_manager = EventManager()
-            
             # Update the service with null provider
-            result = event_manager.update_service_provider(
+            result = get_event_manager().update_service_provider(
                 event_id,
                 self.selected_service,
                 None  # Set to None to clear the provider
@@ -1853,6 +1763,7 @@ class State(rx.State):
             if result["success"]:
                 print("Provider cleared successfully")
                 # Update local state
+                self._store_provider_locally(self.selected_service, None)
                 for service in self.event_services:
                     if service.service == self.selected_service:
                         service.selected_provider = None
@@ -1907,7 +1818,7 @@ class State(rx.State):
         return None
     
     # Add this method to the State class to fix the title issue
-    @rx.var
+    @rx.var(cache=True, deps=["current_event"])
     def event_category_display(self) -> str:
         """Get event category with proper capitalization"""
         if not self.current_event or "event_category" not in self.current_event:
@@ -1922,247 +1833,53 @@ class State(rx.State):
         return ""
         
      
-    @rx.var
+    @rx.var(cache=True, deps=["current_event"])
     def services_list(self) -> list:
         """Get list of services for foreach"""
         if not self.current_event or "services" not in self.current_event:
             return []
         return self.current_event.get("services", [])
-    def load_event_from_route(self):
-        """Load event details from the route's event_id parameter"""
-        self.is_loading_event = True
-        self.error_message = ""
-        
-        try:
-            print("Starting load_event_from_route...")
-            # Get the current path
-            path = self.router.page.path
-            print(f"URL path: {path}")
-            
-            # Extract event_id from path like "/event/{event_id}"
-            parts = path.split("/")
-            print(f"Path parts: {parts}")
-            
-            if len(parts) >= 3 and parts[1] == "event":
-                event_id = parts[2]
-                print(f"Found event_id: {event_id}")
-                self.current_event_id = event_id
-                
-                # Create a simple stub event for testing
-                stub_event = {
-                    "event_id": event_id,
-                    "event_name": "Test Event",
-                    "event_category": "birthday",
-                    "event_date": "2025-06-01",
-                    "location": "Test Location",
-                    "num_guests": 50,
-                    "budget": 50000,
-                    "services": [
-                        {
-                            "service": "Venue",
-                            "budget": 20000,
-                            "status": "pending",
-                            "selected_provider": None
-                        },
-                        {
-                            "service": "Catering",
-                            "budget": 15000,
-                            "status": "pending",
-                            "selected_provider": None
-                        },
-                        {
-                            "service": "Decoration",
-                            "budget": 10000,
-                            "status": "pending",
-                            "selected_provider": None
-                        }
-                    ]
-                }
-                
-                # Update state with event details
-                self.current_event = stub_event
-                print("Set stub event data")
-                
-                # Initialize service data
-                typed_services = []
-                for service in stub_event.get("services", []):
-                    provider = None
-                    if service.get("selected_provider"):
-                        provider = ServiceProvider(
-                            name=service["selected_provider"].get("name", ""),
-                            address=service["selected_provider"].get("address"),
-                            contact=service["selected_provider"].get("contact"),
-                            price=service["selected_provider"].get("price")
-                        )
-                    
-                    typed_services.append(EventService(
-                        service=service.get("service", ""),
-                        budget=service.get("budget", 0),
-                        status=service.get("status", "pending"),
-                        selected_provider=provider
-                    ))
-                
-                self.event_services = typed_services
-                print(f"Created {len(typed_services)} typed service objects")
-                
-                # Select first service by default
-                if self.event_services:
-                    first_service = self.event_services[0].service
-                    self.selected_service = first_service
-                    print(f"Selected first service: {first_service}")
-                    
-                    # Set service details for selected service
-                    for service in stub_event.get("services", []):
-                        if service["service"] == first_service:
-                            self.service_details = service
-                            print(f"Set service details for {first_service}")
-                            break
-                            
-            else:
-                self.error_message = f"Invalid route format. Expected: /event/{{event_id}}, got: {path}"
-                print(f"Invalid route format: {path}")
-                
-        except Exception as e:
-            import traceback
-            print(f"Error in load_event_from_route: {str(e)}")
-            print(traceback.format_exc())
-            self.error_message = f"Error loading event: {str(e)}"
-        finally:
-            self.is_loading_event = False
-            print("Finished load_event_from_route")
-    
-    # Add these computed properties to the State class
-    # Add these computed properties to the State class
-    @rx.var
+    # Provider card fields, normalized once per service_details change
+    @rx.var(cache=True, deps=["service_details"])
+    def _selected_provider(self) -> dict:
+        """Display fields of the provider chosen for the selected service"""
+        return provider_fields(self.service_details)
+
+    @rx.var(cache=True, deps=["_selected_provider"])
     def current_provider_name(self) -> str:
         """Get the name of the selected provider for the current service"""
-        try:
-            if not self.service_details:
-                return "Unknown"
-            if "selected_provider" not in self.service_details:
-                return "Unknown"
-            provider = self.service_details.get("selected_provider")
-            if provider is None:
-                return "Unknown"
-            if isinstance(provider, dict) and "name" in provider:
-                return provider["name"]
-            if isinstance(provider, dict) and "Name" in provider:
-                return provider["Name"]
-            return "Unknown"
-        except:
-            return "Unknown"
-
-    @rx.var
+        return self._selected_provider["name"]
+
+    @rx.var(cache=True, deps=["_selected_provider"])
     def current_provider_contact(self) -> str:
         """Get the contact of the selected provider for the current service"""
-        try:
-            if not self.service_details:
-                return "N/A"
-            if "selected_provider" not in self.service_details:
-                return "N/A"
-            provider = self.service_details.get("selected_provider")
-            if provider is None:
-                return "N/A"
-            if isinstance(provider, dict) and "contact" in provider:
-                return provider["contact"]
-            if isinstance(provider, dict) and "Contact" in provider:
-                return provider["Contact"]
-            return "N/A"
-        except:
-            return "N/A"
-
-    @rx.var
+        return self._selected_provider["contact"]
+
+    @rx.var(cache=True, deps=["_selected_provider"])
     def current_provider_price(self) -> str:
         """Get the price of the selected provider for the current service"""
-        try:
-            if not self.service_details:
-                return "N/A"
-            if "selected_provider" not in self.service_details:
-                return "N/A"
-            provider = self.service_details.get("selected_provider")
-            if provider is None:
-                return "N/A"
-            if isinstance(provider, dict) and "price" in provider:
-                return provider["price"]
-            if isinstance(provider, dict) and "Price" in provider:
-                return provider["Price"]
-            return "N/A"
-        except:
-            return "N/A"
-
-    @rx.var
+        return self._selected_provider["price"]
+
+    @rx.var(cache=True, deps=["_selected_provider"])
     def current_provider_address(self) -> str:
         """Get the address of the selected provider for the current service"""
-        try:
-            if not self.service_details:
-                return "N/A"
-            if "selected_provider" not in self.service_details:
-                return "N/A"
-            provider = self.service_details.get("selected_provider")
-            if provider is None:
-                return "N/A"
-            if isinstance(provider, dict) and "address" in provider:
-                return provider["address"]
-            if isinstance(provider, dict) and "Address" in provider:
-                return provider["Address"]
-            return "N/A"
-        except:
-            return "N/A"
-        
-    @rx.var
+        return self._selected_provider["address"]
+
+    @rx.var(cache=True, deps=["_selected_provider"])
     def current_provider_rating(self) -> str:
         """Get the rating of the selected provider for the current service"""
-        try:
-            if not self.service_details:
-                return "N/A"
-            if "selected_provider" not in self.service_details:
-                return "N/A"
-            provider = self.service_details.get("selected_provider")
-            if provider is None:
-                return "N/A"
-            # Check for rating field
-            if isinstance(provider, dict) and "rating" in provider and provider["rating"] not in [None, ""]:
-                return str(provider["rating"])
-            if isinstance(provider, dict) and "Rating" in provider and provider["Rating"] not in [None, ""]:
-                return str(provider["Rating"])
-            return "N/A"
-        except:
-            return "N/A"
-
-    @rx.var
+        return self._selected_provider["rating"]
+
+    @rx.var(cache=True, deps=["_selected_provider"])
     def current_provider_source(self) -> str:
         """Get the source link of the selected provider"""
-        try:
-            if not self.service_details:
-                return "N/A"
-            if "selected_provider" not in self.service_details:
-                return "N/A"
-            provider = self.service_details.get("selected_provider")
-            if provider is None:
-                return "N/A"
-            if isinstance(provider, dict) and "source" in provider and provider["source"] not in [None, ""]:
-                return provider["source"]
-            return "N/A"
-        except:
-            return "N/A"
-
-    @rx.var
+        return self._selected_provider["source"]
+
+    @rx.var(cache=True, deps=["_selected_provider"])
     def current_provider_map_link(self) -> str:
         """Get the map link of the selected provider"""
-        try:
-            if not self.service_details:
-                return "N/A"
-            if "selected_provider" not in self.service_details:
-                return "N/A"
-            provider = self.service_details.get("selected_provider")
-            if provider is None:
-                return "N/A"
-            if isinstance(provider, dict) and "map_link" in provider and provider["map_link"] not in [None, ""]:
-                return provider["map_link"]
-            return "N/A"
-        except:
-            return "N/A"
-        
+        return self._selected_provider["map_link"]
+
     def set_venue_type(self, value: str):
         """Handle venue type selection"""
         self.venue_type = value
@@ -2224,9 +1941,12 @@ class State(rx.State):
                 venue_crew = create_venue_search_crew()
                 
                 # Execute venue search using asyncio to avoid blocking
-                service_output = await asyncio.to_thread(
-                    venue_crew.kickoff, inputs=venue_inputs
-                )
+                with metering_scope(self.current_event.get("event_id"), "venue_search"):
+                    with SEARCHES_IN_FLIGHT.track_inprogress(kind="venue"), CREW_KICKOFF_SECONDS.time(stage="venue_search"):
+                        service_output = await asyncio.to_thread(
+                            venue_crew.kickoff, inputs=venue_inputs
+                        )
+                    record_crew_usage(service_output)
                 
                 # Process results
                 from utils import extract_text_from_crew_output
@@ -2257,9 +1977,12 @@ class State(rx.State):
                 vendor_crew = create_vendor_search_crew()
                 
                 # Execute vendor search
-                service_output = await asyncio.to_thread(
-                    vendor_crew.kickoff, inputs=vendor_inputs
-                )
+                with metering_scope(self.current_event.get("event_id"), "vendor_search"):
+                    with SEARCHES_IN_FLIGHT.track_inprogress(kind="vendor"), CREW_KICKOFF_SECONDS.time(stage="vendor_search"):
+                        service_output = await asyncio.to_thread(
+                            vendor_crew.kickoff, inputs=vendor_inputs
+                        )
+                    record_crew_usage(service_output)
                 
                 # Process results
                 from utils import extract_text_from_crew_output
@@ -2301,6 +2024,73 @@ class State(rx.State):
             return f"/event/{self.current_event['event_id']}"
         return "/dashboard"
 
+
+class InvitationState(EventDetailState):
+    """
+    Invitation page. It lives under EventDetailState because it works on the
+    event loaded there (current_event, event_services).
+    """
+
+    # Invitation form fields
+    invitation_venue_name: str = ""
+    invitation_venue_address: str = ""
+    invitation_time: str = ""
+    host_name: str = ""
+    rsvp_contact: str = ""
+    style_preference: str = ""
+    special_instructions: str = ""
+
+    # Invitation generation state
+    is_generating_invitation: bool = False
+    is_regenerating_text: bool = False
+    invitation_text: str = ""
+    invitation_id: str = ""
+    color_options: list[dict] = []  # Use typed lists for foreach
+    font_options: list[dict] = []
+    border_options: list[dict] = []
+    background_options: list[dict] = []
+    selected_color_scheme: str = "elegant"
+    selected_font_style: str = "times"
+    selected_border_style: str = "simple"
+    selected_background: str = "cream"
+    invitation_background: str = "#FFF8E1"  # Default background color (cream)
+
+    # Highlight state for visual cues
+    highlight_styling: bool = False
+    highlight_email: bool = False
+
+    # PDF generation state
+    is_generating_pdf: bool = False
+    pdf_path: str = ""
+    download_url: str = ""
+
+    # Email state
+    email_subject: str = ""
+    email_addresses: str = ""
+    cc_addresses: str = ""
+    sender_name: str = ""
+    additional_message: str = ""
+    is_sending_email: bool = False
+    email_success: bool = False
+    email_error: str = ""
+    email_status_message: str = ""
+
+    # Guest list import state (the list itself stays on the backend)
+    _guest_list: list[dict] = []
+    is_importing_guests: bool = False
+    guest_list_message: str = ""
+    guest_list_problems: list[str] = []
+    use_guest_list: bool = False
+
+    def set_default_host_name(self):
+        """Explicitly set the host name from user name"""
+        # Check if host_name is empty
+        if not self.host_name:
+            # Try to set it from user_name
+            if self.user_name:
+                self.host_name = self.user_name
+                print(f"Setting host name to user name: {self.user_name}")
+
     # Form field setters
     def set_invitation_venue_name(self, value: str):
         """Set invitation venue name"""
@@ -2351,6 +2141,9 @@ class State(rx.State):
 
     def set_selected_background(self, value: str):
         """Set selected background color"""
+        self._apply_background(value)
+
+    def _apply_background(self, value: str):
         self.selected_background = value
         
         # Also update the invitation preview background color
@@ -2419,6 +2212,9 @@ class State(rx.State):
         self.email_error = ""
         self.highlight_styling = False
         self.highlight_email = False
+        self._guest_list = []
+        self.guest_list_message = ""
+        self.guest_list_problems = []
         
         # Find venue in services if available
         venue_name = ""
@@ -2452,6 +2248,66 @@ class State(rx.State):
         """Set email addresses"""
         self.email_addresses = value
 
+    def set_use_guest_list(self, value: bool):
+        """Send personalized PDFs to the imported guest list instead of the typed addresses"""
+        self.use_guest_list = value
+
+    def _event_guest_list(self) -> list:
+        if not self._guest_list and self.current_event.get("guest_list_source"):
+            self._guest_list = get_event_manager().get_guest_list(self.current_event["event_id"])
+        return self._guest_list
+
+    async def handle_guest_list_upload(self, files: list[rx.UploadFile]):
+        """Import a CSV or XLSX guest list and store it on the event"""
+        if not files:
+            return
+        
+        self.is_importing_guests = True
+        self.email_error = ""
+        self.guest_list_message = ""
+        self.guest_list_problems = []
+        
+        try:
+            from guest_list import parse_guest_list, guest_list_summary
+            from database import store_guest_list
+            upload = files[0]
+            data = await upload.read()
+            guests, problems = parse_guest_list(data, upload.filename)
+            
+            event_id = self.current_event.get("event_id", "")
+            if event_id:
+                store_guest_list(event_id, guests, upload.filename)
+            self._guest_list = guests
+            
+            summary = guest_list_summary(guests)
+            self.guest_list_message = (
+                f"Imported {summary['guests']} guests ({summary['attendees']} attending, "
+                f"{summary['with_email']} with email)"
+            )
+            self.guest_list_problems = problems[:20]
+            self.use_guest_list = summary["with_email"] > 0
+        except ValueError as e:
+            self.email_error = str(e)
+        except Exception as e:
+            import traceback
+            print(f"Error importing guest list: {str(e)}")
+            print(traceback.format_exc())
+            self.email_error = f"Error: {str(e)}"
+        finally:
+            self.is_importing_guests = False
+
+    def download_guest_pdfs(self):
+        """Start the guest PDF zip download through a link signed now, so it is valid whenever the click comes"""
+        event_id = self.current_event.get("event_id", "")
+        if not self.invitation_id or not self.user_id or not event_id:
+            self.email_error = "Generate and style the invitation first"
+            return
+        expires = int(time.time()) + DOWNLOAD_LINK_TTL_SECONDS
+        signature = download_signature(self.user_id, event_id, self.invitation_id, expires)
+        # The response is an attachment, so the browser downloads it and stays on the page
+        return rx.redirect(f"{API_URL}/invitations/{self.invitation_id}/guests.zip?event_id={event_id}"
+                           f"&uid={self.user_id}&expires={expires}&signature={signature}")
+
     def set_cc_addresses(self, value: str):
         """Set CC addresses"""
         self.cc_addresses = value
@@ -2467,37 +2323,19 @@ class State(rx.State):
     # Core invitation functionality - NO JavaScript scrolling
     async def generate_invitation(self):
         """Generate invitation text using backend tools with error handling"""
-        # Validate required fields
-        if not self.invitation_venue_name:
-            self.error_message = "Please enter a venue name"
-            return
-            
-        if not self.invitation_time:
-            self.error_message = "Please enter an event time"
-            return
-            
-        if not self.host_name:
-            self.error_message = "Please enter a host name"
+        await self._generate_invitation_text(variation=False)
+
+    async def _generate_invitation_text(self, variation: bool):
+        error = self._invitation_form_error()
+        if error:
+            self.error_message = error
             return
         
         self.is_generating_invitation = True
         self.error_message = ""
         
         try:
-            # Prepare event details for invitation
-            event_details = {
-                "event_name": self.current_event.get("event_name", ""),
-                "event_type": self.current_event.get("event_category", ""),
-                "event_date": self.current_event.get("event_date", ""),
-                "event_time": self.invitation_time,
-                "venue_name": self.invitation_venue_name,
-                "venue_address": self.invitation_venue_address,
-                "host_name": self.host_name,
-                "guest_count": self.current_event.get("num_guests", 30),
-                "special_instructions": self.special_instructions,
-                "rsvp_contact": self.rsvp_contact,
-                "style_preference": self.style_preference
-            }
+            event_details = self._invitation_event_details(variation)
             
             # Create invitation tool instance
             from tools import InvitationCreatorTool
@@ -2505,7 +2343,8 @@ class State(rx.State):
             
             # Try to generate with API
             try:
-                result = invitation_tool._run(**event_details)
+                with metering_scope(self.current_event.get("event_id"), "invitation_text"):
+                    result = invitation_tool._run(**event_details)
             except Exception as api_error:
                 # Fallback to template if API fails
                 print(f"API error: {str(api_error)}. Using fallback template.")
@@ -2558,23 +2397,114 @@ class State(rx.State):
             self.is_generating_invitation = False
 
     async def regenerate_invitation_text(self):
-        """Regenerate invitation text with slightly modified style preference"""
+        """Show another variation of the invitation text, prefetched when possible"""
         self.is_regenerating_text = True
         
-        # Store original style preference
-        original_style = self.style_preference
-        
-        # Slightly modify style preference to get a new variation
-        self.style_preference = f"{original_style} - please create a new variation"
-        
         try:
-            # Call generate_invitation but don't use its return value
-            await self.generate_invitation()
+            await self._generate_invitation_text(variation=True)
         finally:
-            # Restore original style preference
-            self.style_preference = original_style
             self.is_regenerating_text = False
 
+    def _invitation_form_error(self) -> str:
+        """Validation message for the invitation form, or "" when it is complete"""
+        if not self.invitation_venue_name:
+            return "Please enter a venue name"
+        if not self.invitation_time:
+            return "Please enter an event time"
+        if not self.host_name:
+            return "Please enter a host name"
+        return ""
+
+    def _invitation_event_details(self, variation: bool = False) -> dict:
+        """Event details passed to the invitation creator"""
+        return {
+            "event_name": self.current_event.get("event_name", ""),
+            "event_type": self.current_event.get("event_category", ""),
+            "event_date": self.current_event.get("event_date", ""),
+            "event_time": self.invitation_time,
+            "venue_name": self.invitation_venue_name,
+            "venue_address": self.invitation_venue_address,
+            "host_name": self.host_name,
+            "guest_count": self.current_event.get("num_guests", 30),
+            "special_instructions": self.special_instructions,
+            "rsvp_contact": self.rsvp_contact,
+            "style_preference": self.style_preference,
+            "variation": variation,
+            "event_id": self.current_event.get("event_id")
+        }
+
+    @rx.event(background=True)
+    async def stream_invitation(self):
+        """Generate invitation text, showing it in the preview as the model writes it"""
+        await self._stream_invitation_text(variation=False)
+
+    @rx.event(background=True)
+    async def stream_invitation_variation(self):
+        """Stream a fresh variation of the invitation text"""
+        await self._stream_invitation_text(variation=True)
+
+    async def _stream_invitation_text(self, variation: bool):
+        async with self:
+            error = self._invitation_form_error()
+            if error:
+                self.error_message = error
+                return
+            if self.is_generating_invitation:
+                return
+            self.is_generating_invitation = True
+            self.is_regenerating_text = variation
+            self.error_message = ""
+            # Keep showing the previous text until the first tokens of the new one arrive
+            self.invitation_id = ""
+            event_details = self._invitation_event_details(variation)
+            event_id = self.current_event.get("event_id")
+
+        # The Mistral stream is read on a worker thread and handed over through a queue
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def produce():
+            try:
+                from tools import InvitationCreatorTool
+                with metering_scope(event_id, "invitation_text"):
+                    for item in InvitationCreatorTool().stream(**event_details):
+                        loop.call_soon_threadsafe(queue.put_nowait, item)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, {"result": {"error": f"Error: {str(e)}"}})
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        producer = loop.run_in_executor(None, produce)
+        streamed = ""
+        last_push = 0.0
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if "delta" in item:
+                    streamed += item["delta"]
+                    # Batch tokens so the client gets a few updates per second, not one per token
+                    now = loop.time()
+                    if now - last_push >= INVITATION_STREAM_PUSH_SECONDS:
+                        last_push = now
+                        async with self:
+                            self.invitation_text = streamed
+                    continue
+                result = item["result"]
+                async with self:
+                    if "error" in result:
+                        self.error_message = result["error"]
+                    else:
+                        self.invitation_text = result["invitation_text"]
+                        self.invitation_id = result["invitation_id"]
+                        self.set_default_host_name()
+        finally:
+            await producer
+            async with self:
+                self.is_generating_invitation = False
+                self.is_regenerating_text = False
+
     async def generate_invitation_pdf(self):
         """Generate PDF invitation with selected styles"""
         if not self.invitation_id or not self.invitation_text:
@@ -2629,24 +2559,27 @@ class State(rx.State):
             self.is_generating_pdf = False
 
     async def send_invitation_emails(self):
-        """Send invitation emails to specified addresses"""
+        """Queue invitation emails in the outbox; delivery happens in the background"""
         if not self.invitation_id or not self.pdf_path:
             self.email_error = "Please generate a PDF invitation first"
             return
             
-        if not self.email_addresses:
+        # The guest list is read from MongoDB on a thread the first time, not on the event loop
+        guests = await asyncio.to_thread(self._event_guest_list) if self.use_guest_list else []
+        if not self.email_addresses and not guests:
             self.email_error = "Please enter at least one email address"
             return
         
         self.is_sending_email = True
         self.email_error = ""
         self.email_success = False
+        self.email_status_message = ""
         
         try:
             # Parse email addresses
             email_list = [email.strip() for email in self.email_addresses.split(",") if email.strip()]
             
-            if not email_list:
+            if not email_list and not guests:
                 self.email_error = "Please enter valid email addresses"
                 return
             
@@ -2659,15 +2592,21 @@ class State(rx.State):
             from tools import EmailInvitationTool
             email_tool = EmailInvitationTool()
             
-            # Send the emails
-            result = email_tool._run(
+            event_id = self.current_event.get("event_id", "")
+            
+            # Enqueue the emails off the event loop; the outbox workers send them
+            # and render each guest's personalized PDF as they go
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, lambda: email_tool._queue(
                 invitation_id=self.invitation_id,
+                event_id=event_id,
                 email_subject=self.email_subject,
                 email_addresses=email_list,
                 sender_name=self.sender_name,
                 additional_message=self.additional_message,
-                cc_addresses=cc_list
-            )
+                cc_addresses=cc_list,
+                guests=guests or None
+            ))
             
             if "error" in result:
                 self.email_error = result["error"]
@@ -2675,10 +2614,10 @@ class State(rx.State):
             
             # Set success flag
             self.email_success = True
+            self.email_status_message = result["message"]
             
             # Store invitation in MongoDB
             from datetime import datetime
-            event_id = self.current_event.get("event_id", "")
             if event_id:
                 from database import store_invitation
                 invitation_data = {
@@ -2686,28 +2625,101 @@ class State(rx.State):
                     "pdf_path": self.pdf_path,
                     "download_url": self.download_url,
                     "created_at": datetime.now().isoformat(),
-                    "sent_to": email_list
+                    "queued_for": result.get("recipients", email_list),
+                    "outbox_job_id": result.get("job_id")
                 }
-                store_invitation(event_id, invitation_data)
+                await asyncio.to_thread(store_invitation, event_id, invitation_data)
                 
         except Exception as e:
             import traceback
-            print(f"Error sending emails: {str(e)}")
+            print(f"Error queueing emails: {str(e)}")
             print(traceback.format_exc())
             self.email_error = f"Error: {str(e)}"
         finally:
             self.is_sending_email = False
+
+    def refresh_email_status(self):
+        """Show how far the outbox has got with this invitation"""
+        if not self.invitation_id:
+            return
+        try:
+            from email_outbox import get_outbox
+            counts = get_outbox().status_counts(invitation_id=self.invitation_id)
+            self.email_status_message = (
+                f"{counts['sent']} sent, {counts['queued'] + counts['sending']} waiting, "
+                f"{counts['failed']} failed"
+            )
+        except Exception as e:
+            print(f"Error reading outbox status: {str(e)}")
+            self.email_error = f"Could not read delivery status: {str(e)}"
+
+
+class StylePreviewState(InvitationState):
+    """
+    Style preview grid on the invitation page. The thumbnails are the largest
+    thing the page holds, so they sit in their own substate and editing the
+    invitation form doesn't load or save them.
+    """
+
+    style_previews: list[dict] = []
+    is_rendering_previews: bool = False
+
+    async def generate_style_previews(self):
+        """Render a thumbnail for every color scheme and border with the current font and background"""
+        if not self.invitation_text:
+            self.error_message = "Please generate invitation text first"
+            return
+        
+        self.is_rendering_previews = True
+        self.error_message = ""
+        
+        try:
+            from invitation_previews import render_previews
+            font = next((f for f in self._get_font_options() if f["id"] == self.selected_font_style),
+                        self._get_font_options()[0])
+            background = next((bg for bg in self._get_background_options() if bg["id"] == self.selected_background),
+                              self._get_background_options()[0])
+            combos = [
+                {"color": color, "font": font, "border": border, "background": background}
+                for color in self._get_color_options()
+                for border in self._get_border_options()
+            ]
+            invitation = {
+                "text": self.invitation_text,
+                "event_name": self.current_event.get("event_name", ""),
+                "venue_name": self.invitation_venue_name,
+            }
+            
+            # Rendering happens in the preview process pool; don't block the event loop on it
+            loop = asyncio.get_running_loop()
+            self.style_previews = await loop.run_in_executor(None, render_previews, invitation, combos)
+        except Exception as e:
+            import traceback
+            print(f"Error rendering style previews: {str(e)}")
+            print(traceback.format_exc())
+            self.error_message = f"Error: {str(e)}"
+        finally:
+            self.is_rendering_previews = False
+
+    def apply_style_preview(self, preview: dict):
+        """Select the style combination shown in a preview thumbnail"""
+        self.selected_color_scheme = preview["color"]
+        self.selected_font_style = preview["font"]
+        self.selected_border_style = preview["border"]
+        self._apply_background(preview["background"])
+
+
 # UI Components - Fixed modals
 def login_modal():
     """Login modal component"""
     return rx.cond(
-        State.show_login_modal,
+        AuthState.show_login_modal,
         rx.center(
             rx.box(
                 rx.box(
                     rx.text("×", 
                         style=styles["modal_close"],
-                        on_click=State.toggle_login_modal,
+                        on_click=AuthState.toggle_login_modal,
                     ),
                     rx.heading("Login", size="3", margin_bottom="1.5rem"),
                     
@@ -2718,8 +2730,8 @@ def login_modal():
                                 rx.input(
                                     placeholder="Enter your email",
                                     type="email",
-                                    value=State.email,
-                                    on_change=State.set_email,
+                                    value=AuthState.email,
+                                    on_change=AuthState.set_email,
                                     style=styles["form_input"],
                                     required=True,
                                 ),
@@ -2730,8 +2742,8 @@ def login_modal():
                                 rx.input(
                                     placeholder="Enter your password",
                                     type="password",
-                                    value=State.password,
-                                    on_change=State.set_password,
+                                    value=AuthState.password,
+                                    on_change=AuthState.set_password,
                                     style=styles["form_input"],
                                     required=True,
                                 ),
@@ -2762,7 +2774,7 @@ def login_modal():
                             spacing="4",
                             width="100%",  # Make vstack full width
                         ),
-                        on_submit=State.handle_login,
+                        on_submit=AuthState.handle_login,
                         reset_on_submit=False,
                         width="100%",  # Make form full width
                     ),
@@ -2771,20 +2783,20 @@ def login_modal():
                 on_click=rx.stop_propagation,
             ),
             style=styles["modal_overlay"],
-            on_click=State.toggle_login_modal,
+            on_click=AuthState.toggle_login_modal,
         ),
     )
 
 def register_modal():
     """Register modal component"""
     return rx.cond(
-        State.show_register_modal,
+        AuthState.show_register_modal,
         rx.center(
             rx.box(
                 rx.box(
                     rx.text("×", 
                         style=styles["modal_close"],
-                        on_click=State.toggle_register_modal,
+                        on_click=AuthState.toggle_register_modal,
                     ),
                     rx.heading("Create Account", size="3", margin_bottom="1.5rem"),
                     
@@ -2794,8 +2806,8 @@ def register_modal():
                                 rx.text("Full Name", style=styles["form_label"]),
                                 rx.input(
                                     placeholder="Enter your name",
-                                    value=State.name,
-                                    on_change=State.set_name,
+                                    value=AuthState.name,
+                                    on_change=AuthState.set_name,
                                     style=styles["form_input"],
                                     required=True,
                                 ),
@@ -2806,8 +2818,8 @@ def register_modal():
                                 rx.input(
                                     placeholder="Enter your email",
                                     type="email",
-                                    value=State.email,
-                                    on_change=State.set_email,
+                                    value=AuthState.email,
+                                    on_change=AuthState.set_email,
                                     style=styles["form_input"],
                                     required=True,
                                 ),
@@ -2818,8 +2830,8 @@ def register_modal():
                                 rx.input(
                                     placeholder="Enter your password",
                                     type="password",
-                                    value=State.password,
-                                    on_change=State.set_password,
+                                    value=AuthState.password,
+                                    on_change=AuthState.set_password,
                                     style=styles["form_input"],
                                     required=True,
                                 ),
@@ -2838,8 +2850,8 @@ def register_modal():
                                 rx.input(
                                     placeholder="Confirm your password",
                                     type="password",
-                                    value=State.confirm_password,
-                                    on_change=State.set_confirm_password,
+                                    value=AuthState.confirm_password,
+                                    on_change=AuthState.set_confirm_password,
                                     style=styles["form_input"],
                                     required=True,
                                 ),
@@ -2870,7 +2882,7 @@ def register_modal():
                             spacing="4",
                             width="100%",  # Make vstack full width
                         ),
-                        on_submit=State.handle_register,
+                        on_submit=AuthState.handle_register,
                         reset_on_submit=False,
                         width="100%",  # Make form full width
                     ),
@@ -2879,7 +2891,7 @@ def register_modal():
                 on_click=rx.stop_propagation,
             ),
             style=styles["modal_overlay"],
-            on_click=State.toggle_register_modal,
+            on_click=AuthState.toggle_register_modal,
         ),
     )
 # Updated navbar function (with State instead of AuthState)
@@ -2897,12 +2909,12 @@ def navbar():
                 rx.button(
                     "Login",
                     style=styles["btn_login"],
-                    on_click=State.toggle_login_modal,
+                    on_click=AuthState.toggle_login_modal,
                 ),
                 rx.button(
                     "Get started for free",
                     style=styles["btn_primary_large"],
-                    on_click=State.toggle_register_modal,
+                    on_click=AuthState.toggle_register_modal,
                 ),
                 spacing="4",
             ),
@@ -2932,21 +2944,21 @@ def hero_section():
                 rx.button(
                     "Get started for free", 
                     style=styles["btn_primary_large"],
-                    on_click=State.toggle_register_modal,  # Changed this line
-                    on_mouse_enter=lambda: State.set_active_button("hero_get_started"),
-                    on_mouse_leave=State.clear_active_button,
+                    on_click=AuthState.toggle_register_modal,  # Changed this line
+                    on_mouse_enter=lambda: AuthState.set_active_button("hero_get_started"),
+                    on_mouse_leave=AuthState.clear_active_button,
                     transform=rx.cond(
-                        State.active_button == "hero_get_started",
+                        AuthState.active_button == "hero_get_started",
                         "translateY(-2px)",
                         "translateY(0)"
                     ),
                     box_shadow=rx.cond(
-                        State.active_button == "hero_get_started",
+                        AuthState.active_button == "hero_get_started",
                         "0 5px 15px rgba(0, 0, 0, 0.1)",
                         "none"
                     ),
                     background=rx.cond(
-                        State.active_button == "hero_get_started",
+                        AuthState.active_button == "hero_get_started",
                         COLORS["button_hover"],
                         COLORS["button_bg"]
                     ),
@@ -3115,15 +3127,15 @@ def feature_card(icon_emoji: str, title: str, description: str, card_id: int):
             align_items="flex-start",
             spacing="4",
         ),
-        on_mouse_enter=lambda: State.set_active_card(card_id),
-        on_mouse_leave=State.clear_active_card,
+        on_mouse_enter=lambda: AuthState.set_active_card(card_id),
+        on_mouse_leave=AuthState.clear_active_card,
         transform=rx.cond(
-            State.active_card == card_id,
+            AuthState.active_card == card_id,
             "translateY(-5px)",
             "translateY(0)"
         ),
         box_shadow=rx.cond(
-            State.active_card == card_id,
+            AuthState.active_card == card_id,
             "0 10px 25px rgba(0, 0, 0, 0.1)",
             "none"
         ),
@@ -3163,15 +3175,15 @@ def features_section():
                         align_items="flex-start",
                         spacing="4",
                     ),
-                    on_mouse_enter=lambda: State.set_active_card(0),
-                    on_mouse_leave=State.clear_active_card,
+                    on_mouse_enter=lambda: AuthState.set_active_card(0),
+                    on_mouse_leave=AuthState.clear_active_card,
                     transform=rx.cond(
-                        State.active_card == 0,
+                        AuthState.active_card == 0,
                         "translateY(-5px)",
                         "translateY(0)"
                     ),
                     box_shadow=rx.cond(
-                        State.active_card == 0,
+                        AuthState.active_card == 0,
                         "0 10px 25px rgba(0, 0, 0, 0.1)",
                         "none"
                     ),
@@ -3199,15 +3211,15 @@ def features_section():
                         align_items="flex-start",
                         spacing="4",
                     ),
-                    on_mouse_enter=lambda: State.set_active_card(1),
-                    on_mouse_leave=State.clear_active_card,
+                    on_mouse_enter=lambda: AuthState.set_active_card(1),
+                    on_mouse_leave=AuthState.clear_active_card,
                     transform=rx.cond(
-                        State.active_card == 1,
+                        AuthState.active_card == 1,
                         "translateY(-5px)",
                         "translateY(0)"
                     ),
                     box_shadow=rx.cond(
-                        State.active_card == 1,
+                        AuthState.active_card == 1,
                         "0 10px 25px rgba(0, 0, 0, 0.1)",
                         "none"
                     ),
@@ -3241,15 +3253,15 @@ def features_section():
                         align_items="flex-start",
                         spacing="4",
                     ),
-                    on_mouse_enter=lambda: State.set_active_card(2),
-                    on_mouse_leave=State.clear_active_card,
+                    on_mouse_enter=lambda: AuthState.set_active_card(2),
+                    on_mouse_leave=AuthState.clear_active_card,
                     transform=rx.cond(
-                        State.active_card == 2,
+                        AuthState.active_card == 2,
                         "translateY(-5px)",
                         "translateY(0)"
                     ),
                     box_shadow=rx.cond(
-                        State.active_card == 2,
+                        AuthState.active_card == 2,
                         "0 10px 25px rgba(0, 0, 0, 0.1)",
                         "none"
                     ),
@@ -3277,15 +3289,15 @@ def features_section():
                         align_items="flex-start",
                         spacing="4",
                     ),
-                    on_mouse_enter=lambda: State.set_active_card(3),
-                    on_mouse_leave=State.clear_active_card,
+                    on_mouse_enter=lambda: AuthState.set_active_card(3),
+                    on_mouse_leave=AuthState.clear_active_card,
                     transform=rx.cond(
-                        State.active_card == 3,
+                        AuthState.active_card == 3,
                         "translateY(-5px)",
                         "translateY(0)"
                     ),
                     box_shadow=rx.cond(
-                        State.active_card == 3,
+                        AuthState.active_card == 3,
                         "0 10px 25px rgba(0, 0, 0, 0.1)",
                         "none"
                     ),
@@ -3319,15 +3331,15 @@ def features_section():
                         align_items="flex-start",
                         spacing="4",
                     ),
-                    on_mouse_enter=lambda: State.set_active_card(4),
-                    on_mouse_leave=State.clear_active_card,
+                    on_mouse_enter=lambda: AuthState.set_active_card(4),
+                    on_mouse_leave=AuthState.clear_active_card,
                     transform=rx.cond(
-                        State.active_card == 4,
+                        AuthState.active_card == 4,
                         "translateY(-5px)",
                         "translateY(0)"
                     ),
                     box_shadow=rx.cond(
-                        State.active_card == 4,
+                        AuthState.active_card == 4,
                         "0 10px 25px rgba(0, 0, 0, 0.1)",
                         "none"
                     ),
@@ -3355,15 +3367,15 @@ def features_section():
                         align_items="flex-start",
                         spacing="4",
                     ),
-                    on_mouse_enter=lambda: State.set_active_card(5),
-                    on_mouse_leave=State.clear_active_card,
+                    on_mouse_enter=lambda: AuthState.set_active_card(5),
+                    on_mouse_leave=AuthState.clear_active_card,
                     transform=rx.cond(
-                        State.active_card == 5,
+                        AuthState.active_card == 5,
                         "translateY(-5px)",
                         "translateY(0)"
                     ),
                     box_shadow=rx.cond(
-                        State.active_card == 5,
+                        AuthState.active_card == 5,
                         "0 10px 25px rgba(0, 0, 0, 0.1)",
                         "none"
                     ),
@@ -3506,7 +3518,7 @@ def dashboard_content():
                     padding="4rem",
                 ),
                 rx.cond(
-                    State.user_events.length() > 0,
+                    DashboardState.user_events.length() > 0,
                     rx.box(
                         rx.heading(
                             f"Welcome back, {State.user_name}!",
@@ -3518,7 +3530,7 @@ def dashboard_content():
                         ),
                         rx.box(
                             rx.foreach(
-                                State.user_events,
+                                DashboardState.user_events,
                                 event_card,
                             ),
                             style=styles["events_grid"],
@@ -3534,7 +3546,7 @@ def dashboard_content():
             ),
             style=styles["dashboard_container"],
         ),
-        on_mount=State.fetch_user_events,
+        on_mount=DashboardState.fetch_user_events,
     )
 
 def event_card(event: dict):
@@ -3614,10 +3626,10 @@ def service_card(service: dict, index: int):
                 "background": "#FFF0F0",
             },
         },
-        on_mouse_enter=lambda: State.set_active_service_card(index),
-        on_mouse_leave=lambda: State.set_active_service_card(-1),
+        on_mouse_enter=lambda: CreateEventState.set_active_service_card(index),
+        on_mouse_leave=lambda: CreateEventState.set_active_service_card(-1),
         transform=rx.cond(
-            State.active_service_card == index,
+            CreateEventState.active_service_card == index,
             "translateY(-5px)",
             "translateY(0)"
         ),
@@ -3652,14 +3664,14 @@ def success_popup_content():
             rx.text("🎉", font_size="5rem"),
             rx.heading("Event Created Successfully!", size="3", margin="1rem 0"),
             rx.text(
-                f"Your event '{State.event_name}' has been created and is ready for planning!",
+                f"Your event '{CreateEventState.event_name}' has been created and is ready for planning!",
                 text_align="center",
                 margin_bottom="2rem",
                 font_size="1.1rem",
             ),
             rx.button(
                 "Continue Planning →",
-                on_click=State.continue_to_event_detail,
+                on_click=CreateEventState.continue_to_event_detail,
                 style={
                     **styles["btn_primary_large"],
                     "width": "100%",
@@ -3705,8 +3717,8 @@ def create_event_page():
                                 rx.text("Event Name", style=styles["create_form_label"]),
                                 rx.input(
                                     # placeholder="Give your event a magical name",
-                                    value=State.event_name,
-                                    on_change=State.set_event_name,
+                                    value=CreateEventState.event_name,
+                                    on_change=CreateEventState.set_event_name,
                                     style=styles["create_form_input"],
                                     required=True,
                                 ),
@@ -3716,19 +3728,19 @@ def create_event_page():
                             rx.box(
                                 rx.text("Event Type", style=styles["create_form_label"]),
                                 rx.select(
-                                    State.event_types,
+                                    CreateEventState.event_types,
                                     placeholder="What are we celebrating?",
-                                    on_change=State.set_event_type,
-                                    value=State.event_type,
+                                    on_change=CreateEventState.set_event_type,
+                                    value=CreateEventState.event_type,
                                     style={**styles["create_form_input"], "cursor": "pointer"},
                                     required=True,
                                 ),
                                 rx.cond(
-                                    State.show_other_input,
+                                    CreateEventState.show_other_input,
                                     rx.input(
                                         placeholder="Tell us more about your event",
-                                        value=State.event_type_other,
-                                        on_change=State.set_event_type_other,
+                                        value=CreateEventState.event_type_other,
+                                        on_change=CreateEventState.set_event_type_other,
                                         style={**styles["create_form_input"], "margin_top": "0.5rem"},
                                         required=True,
                                     ),
@@ -3740,8 +3752,8 @@ def create_event_page():
                                 rx.text("Event Date", style=styles["create_form_label"]),
                                 rx.input(
                                     type="date",
-                                    value=State.event_date,
-                                    on_change=State.set_event_date,
+                                    value=CreateEventState.event_date,
+                                    on_change=CreateEventState.set_event_date,
                                     style=styles["create_form_input"],
                                     required=True,
                                 ),
@@ -3753,8 +3765,8 @@ def create_event_page():
                                 rx.input(
                                     type="number",
                                     # placeholder="How many amazing people?",
-                                    value=State.num_guests,
-                                    on_change=State.set_num_guests,
+                                    value=CreateEventState.num_guests,
+                                    on_change=CreateEventState.set_num_guests,
                                     style=styles["create_form_input"],
                                     placeholder_color="#B8B370",
                                     required=True,
@@ -3766,8 +3778,8 @@ def create_event_page():
                                 rx.text("Budget (₹)", style=styles["create_form_label"]),
                                 rx.input(
                                     # placeholder="Your investment in memories",
-                                    value=State.budget,
-                                    on_change=State.set_budget,
+                                    value=CreateEventState.budget,
+                                    on_change=CreateEventState.set_budget,
                                     style=styles["create_form_input"],
                                     required=True,
                                 ),
@@ -3778,8 +3790,8 @@ def create_event_page():
                                 rx.text("Location (City)", style=styles["create_form_label"]),
                                 rx.input(
                                     # placeholder="Where the magic happens",
-                                    value=State.location,
-                                    on_change=State.set_location,
+                                    value=CreateEventState.location,
+                                    on_change=CreateEventState.set_location,
                                     style=styles["create_form_input"],
                                     required=True,
                                 ),
@@ -3791,23 +3803,23 @@ def create_event_page():
                     # Replace the submit button section (around line 1287-1301)
                     rx.button(
                         rx.cond(
-                            State.is_generating_services,
+                            CreateEventState.is_generating_services,
                             "AI Agents Working Their Magic... ✨",
                             "Let's Plan This Event! 🚀"
                         ),
                         type="submit",
                         style=styles["create_submit_button"],
-                        disabled=State.is_generating_services,
+                        disabled=CreateEventState.is_generating_services,
                     ),
 
-                    on_submit=State.create_event,
+                    on_submit=CreateEventState.create_event,
                     ),
                     style=styles["create_form_section"],
                     ),
 
                     # Loading animation should appear after form submission
                     rx.cond(
-                        State.is_generating_services,
+                        CreateEventState.is_generating_services,
                         rx.box(
                             loading_animation(),
                             margin_top="2rem",
@@ -3819,7 +3831,7 @@ def create_event_page():
                 
                 # Services Section
                 rx.cond(
-                    State.show_services,
+                    CreateEventState.show_services,
                     rx.box(
                         rx.heading(
                             "Your Event Services", 
@@ -3832,7 +3844,7 @@ def create_event_page():
                         # Total Budget Display
                         # Replace the total budget box with this:
                         rx.text(
-                            State.total_budget_display,
+                            CreateEventState.total_budget_display,
                             font_size="1.4rem",
                             font_weight="800",
                             text_align="center", 
@@ -3843,7 +3855,7 @@ def create_event_page():
                         # Service Cards Grid
                         rx.box(
                             rx.foreach(
-                                State.generated_services,
+                                CreateEventState.generated_services,
                                 lambda service, index: service_card(service, index)
                             ),
                             display="grid",
@@ -3867,10 +3879,10 @@ def create_event_page():
                                 margin_bottom="1rem"
                             ),
                             rx.box(
-                                rx.text("Remove band", style=styles["example_chip"], on_click=lambda: State.set_revision_input("Remove band")),
-                                rx.text("Increase catering budget", style=styles["example_chip"], on_click=lambda: State.set_revision_input("Increase catering budget")),
-                                rx.text("Add DJ service", style=styles["example_chip"], on_click=lambda: State.set_revision_input("Add DJ service")),
-                                rx.text("Reduce decoration cost", style=styles["example_chip"], on_click=lambda: State.set_revision_input("Reduce decoration cost")),
+                                rx.text("Remove band", style=styles["example_chip"], on_click=lambda: CreateEventState.set_revision_input("Remove band")),
+                                rx.text("Increase catering budget", style=styles["example_chip"], on_click=lambda: CreateEventState.set_revision_input("Increase catering budget")),
+                                rx.text("Add DJ service", style=styles["example_chip"], on_click=lambda: CreateEventState.set_revision_input("Add DJ service")),
+                                rx.text("Reduce decoration cost", style=styles["example_chip"], on_click=lambda: CreateEventState.set_revision_input("Reduce decoration cost")),
                                 margin="1rem 0",
                                 display="flex",
                                 flex_wrap="wrap",
@@ -3879,17 +3891,17 @@ def create_event_page():
                             rx.hstack(
                                 rx.input(
                                     placeholder="Type your magical changes here...",
-                                    value=State.revision_input,
-                                    on_change=State.set_revision_input,
+                                    value=CreateEventState.revision_input,
+                                    on_change=CreateEventState.set_revision_input,
                                     style={**styles["create_form_input"], "margin_bottom": "0"},
                                 ),
                                 rx.button(
                                     rx.cond(
-                                        State.is_generating_services,
+                                        CreateEventState.is_generating_services,
                                         "Updating...",
                                         "Apply Changes"
                                     ),
-                                    on_click=State.revise_services,
+                                    on_click=CreateEventState.revise_services,
                                     style={
                                         **styles["btn_primary_large"],
                                         "background": "#fda8e9",
@@ -3898,13 +3910,13 @@ def create_event_page():
                                             "background": "#FF8A80",
                                         },
                                     },
-                                    disabled=State.is_generating_services,
+                                    disabled=CreateEventState.is_generating_services,
                                 ),
                                 spacing="4",
                                 width="100%",
                             ),
                             rx.cond(
-                                State.is_generating_services,
+                                CreateEventState.is_generating_services,
                                 rx.box(
                                     loading_animation(),
                                     margin_top="1rem",
@@ -3923,7 +3935,7 @@ def create_event_page():
                         # Approve Button
                         rx.button(
                             "I'm Happy with These Services ✅",
-                            on_click=State.approve_services,
+                            on_click=CreateEventState.approve_services,
                             style={
                                 **styles["btn_primary_large"],
                                 "width": "100%",
@@ -3938,7 +3950,7 @@ def create_event_page():
                 
                 # Success Popup
                 rx.cond(
-                    State.show_success_popup,
+                    CreateEventState.show_success_popup,
                     rx.box(
                         success_popup_content(),
                         position="fixed",
@@ -4001,9 +4013,9 @@ def event_header():
             # Left side - Event info
             rx.vstack(
                 # Event title and type
-                rx.heading(State.current_event.get("event_name", ""), size="3", color="#000000"),
+                rx.heading(EventDetailState.current_event.get("event_name", ""), size="3", color="#000000"),
                 rx.text(
-                    f"Type: {State.event_category_display}",
+                    f"Type: {EventDetailState.event_category_display}",
                     font_size="1.2rem",
                     margin_bottom="1rem",
                     color="#000000",
@@ -4011,9 +4023,9 @@ def event_header():
                 
                 # Event details row
                 rx.hstack(
-                    rx.text(f"📆 {State.current_event.get('event_date', '')}", color="#000000"),
-                    rx.text(f"📍 {State.current_event.get('location', '')}", color="#000000"),
-                    rx.text(f"👥 {State.current_event.get('num_guests', '')} Guests", color="#000000"),
+                    rx.text(f"📆 {EventDetailState.current_event.get('event_date', '')}", color="#000000"),
+                    rx.text(f"📍 {EventDetailState.current_event.get('location', '')}", color="#000000"),
+                    rx.text(f"👥 {EventDetailState.current_event.get('num_guests', '')} Guests", color="#000000"),
                     spacing="5",
                     wrap="wrap",
                     margin_bottom="1rem",
@@ -4022,7 +4034,7 @@ def event_header():
                 # Progress bar
                 rx.box(
                     rx.box(
-                        width=State.progress_percentage,
+                        width=EventDetailState.progress_percentage,
                         height="100%",
                         background="#fda8e9",
                         border_radius="0.5rem",
@@ -4040,7 +4052,7 @@ def event_header():
                     # Days until event
                     rx.box(
                         rx.text("DAYS REMAINING", font_size="0.9rem", color="#444444", margin_bottom="0.25rem"),
-                        rx.text(State.days_until_event, font_size="1.5rem", font_weight="700", color="#000000"),
+                        rx.text(EventDetailState.days_until_event, font_size="1.5rem", font_weight="700", color="#000000"),
                         background="#FFFFFF",
                         padding="1rem",
                         border_radius="0.5rem",
@@ -4053,7 +4065,7 @@ def event_header():
                     rx.box(
                         rx.text("SERVICES COMPLETED", font_size="0.9rem", color="#444444", margin_bottom="0.25rem"),
                         rx.text(
-                            State.overall_progress,
+                            EventDetailState.overall_progress,
                             font_size="1.5rem",
                             font_weight="700",
                             color="#000000",
@@ -4086,7 +4098,7 @@ def event_header():
                 # Use a vertical flex container for the pills
                 rx.vstack(
                     rx.foreach(
-                        State.event_services.to(list[EventService]),
+                        EventDetailState.event_services.to(list[EventService]),
                         lambda service, index: rx.box(
                             rx.hstack(
                                 # Service name
@@ -4106,7 +4118,7 @@ def event_header():
                                 (service.status == "completed"),
                                 "#E6F6EE",
                                 rx.cond(
-                                    (State.selected_service == service.service),
+                                    (EventDetailState.selected_service == service.service),
                                     "#ffeaf8",
                                     "#FFF5F9"
                                 )
@@ -4118,7 +4130,7 @@ def event_header():
                                 (service.status == "completed"),
                                 "2px solid #00A854",
                                 rx.cond(
-                                    (State.selected_service == service.service),
+                                    (EventDetailState.selected_service == service.service),
                                     "2px solid #fda8e9",
                                     "2px solid #DDDDDD"
                                 )
@@ -4133,7 +4145,7 @@ def event_header():
                                 "border_color": "#fda8e9",
                             },
                             width="100%",
-                            on_click=lambda s=service: State.select_service(s.service),
+                            on_click=lambda s=service: EventDetailState.select_service(s.service),
                         )
                     ),
                     width="100%",
@@ -4180,12 +4192,12 @@ def service_tab(service: EventService, index: int):
         border_radius="1rem",
         cursor="pointer",
         background=rx.cond(
-            State.selected_service == service.service,
+            EventDetailState.selected_service == service.service,
             "#fda8e9",
             "#f0f0f0"
         ),
         color=rx.cond(
-            State.selected_service == service.service,
+            EventDetailState.selected_service == service.service,
             "white",
             "#333333"
         ),
@@ -4194,7 +4206,7 @@ def service_tab(service: EventService, index: int):
             "1px solid #28a745",
             "1px solid transparent"
         ),
-        on_click=lambda service=service: State.select_service_for_vendor(service.service),
+        on_click=lambda service=service: EventDetailState.select_service_for_vendor(service.service),
         _hover={
             "transform": "translateY(-2px)",
             "box_shadow": "0 4px 6px rgba(0, 0, 0, 0.1)",
@@ -4234,7 +4246,7 @@ def vendor_result_card(vendor: VendorResult):
             ),
             rx.button(
                 "Select This Provider",
-                on_click=lambda v=vendor: State.select_vendor(v),
+                on_click=lambda v=vendor: EventDetailState.select_vendor(v),
                 style={
                     **styles["btn_primary_large"],
                     "width": "100%",
@@ -4292,9 +4304,9 @@ def active_service_section():
             # Service info header
             rx.hstack(
                 rx.cond(
-                    State.selected_service != "",
+                    EventDetailState.selected_service != "",
                     rx.heading(
-                        State.selected_service,
+                        EventDetailState.selected_service,
                         size="4",
                         color="#000000",
                     ),
@@ -4302,9 +4314,9 @@ def active_service_section():
                 ),
                 rx.spacer(),
                 rx.cond(
-                    State.event_services.length() > 0,
+                    EventDetailState.event_services.length() > 0,
                     rx.text(
-                        lambda: f"Budget: ₹{next((s.budget for s in State.event_services if s.service == State.selected_service), 0):,}",
+                        lambda: f"Budget: ₹{next((s.budget for s in EventDetailState.event_services if s.service == EventDetailState.selected_service), 0):,}",
                         font_weight="600",
                         color="#FF5252",
                     ),
@@ -4318,8 +4330,8 @@ def active_service_section():
             # Service content - selected provider or search
             rx.cond(
                 # Check if service has provider
-                State.event_services.length() > 0 & rx.cond(
-                    lambda: any(s.status == "completed" for s in State.event_services if s.service == State.selected_service),
+                EventDetailState.event_services.length() > 0 & rx.cond(
+                    lambda: any(s.status == "completed" for s in EventDetailState.event_services if s.service == EventDetailState.selected_service),
                     True,
                     False
                 ),
@@ -4330,25 +4342,25 @@ def active_service_section():
                         rx.box(
                             rx.vstack(
                                 rx.heading(
-                                    lambda: next((s.selected_provider.name for s in State.event_services if s.service == State.selected_service and s.selected_provider), "Unknown"),
+                                    lambda: next((s.selected_provider.name for s in EventDetailState.event_services if s.service == EventDetailState.selected_service and s.selected_provider), "Unknown"),
                                     size="4",
                                 ),
                                 rx.text(
-                                    lambda: next((s.selected_provider.contact for s in State.event_services if s.service == State.selected_service and s.selected_provider), ""),
+                                    lambda: next((s.selected_provider.contact for s in EventDetailState.event_services if s.service == EventDetailState.selected_service and s.selected_provider), ""),
                                     color="#666666",
                                 ),
                                 rx.text(
-                                    lambda: next((s.selected_provider.address for s in State.event_services if s.service == State.selected_service and s.selected_provider), ""),
+                                    lambda: next((s.selected_provider.address for s in EventDetailState.event_services if s.service == EventDetailState.selected_service and s.selected_provider), ""),
                                     color="#666666",
                                 ),
                                 rx.text(
-                                    lambda: next((s.selected_provider.price for s in State.event_services if s.service == State.selected_service and s.selected_provider), ""),
+                                    lambda: next((s.selected_provider.price for s in EventDetailState.event_services if s.service == EventDetailState.selected_service and s.selected_provider), ""),
                                     color="#FF5252",
                                     font_weight="600",
                                 ),
                                 rx.button(
                                     "Change Provider",
-                                    on_click=lambda: State.start_vendor_search(State.selected_service),
+                                    on_click=lambda: EventDetailState.start_vendor_search(EventDetailState.selected_service),
                                     style=styles["btn_login"],
                                     margin_top="1rem",
                                 ),
@@ -4370,19 +4382,19 @@ def active_service_section():
                 # Search interface view
                 rx.vstack(
                     rx.cond(
-                        State.is_searching,
+                        EventDetailState.is_searching,
                         loading_animation(),
                         rx.cond(
-                            State.vendor_search_results.length() > 0,
+                            EventDetailState.vendor_search_results.length() > 0,
                             rx.vstack(
                                 rx.text(
-                                    f"Select a {State.selected_service} provider:",
+                                    f"Select a {EventDetailState.selected_service} provider:",
                                     font_weight="600",
                                     margin_bottom="1rem",
                                 ),
                                 rx.grid(
                                     rx.foreach(
-                                        State.vendor_search_results.to(list[VendorResult]),
+                                        EventDetailState.vendor_search_results.to(list[VendorResult]),
                                         vendor_result_card,
                                     ),
                                     template_columns="repeat(auto-fill, minmax(300px, 1fr))",
@@ -4398,8 +4410,8 @@ def active_service_section():
                                     margin_bottom="1rem",
                                 ),
                                 rx.button(
-                                    f"Search for {State.selected_service} Providers",
-                                    on_click=lambda: State.start_vendor_search(State.selected_service),
+                                    f"Search for {EventDetailState.selected_service} Providers",
+                                    on_click=lambda: EventDetailState.start_vendor_search(EventDetailState.selected_service),
                                     style=styles["btn_primary_large"],
                                 ),
                                 align_items="center",
@@ -4462,7 +4474,7 @@ def floating_invitation_button():
         bottom="2rem",
         right="2rem",
         z_index="100",
-        on_click=State.navigate_to_invitation,
+        on_click=EventDetailState.navigate_to_invitation,
     )
 
 def error_notification():
@@ -4493,19 +4505,19 @@ def error_notification():
 def service_detail():
     """Service detail component with centered alignment and deeper colors"""
     return rx.cond(
-        State.selected_service != "",
+        EventDetailState.selected_service != "",
         rx.box(
             rx.vstack(
                 # Service header
                 rx.hstack(
                     rx.heading(
-                        State.selected_service,
+                        EventDetailState.selected_service,
                         size="3",
                         color="#000000",  # Deeper black
                     ),
                     rx.spacer(),
                     rx.text(
-                        f"Budget: ₹{State.service_details.get('budget', 0):,}",
+                        f"Budget: ₹{EventDetailState.service_details.get('budget', 0):,}",
                         font_weight="600",
                         color="#E91E63",  # Deeper pink/red
                     ),
@@ -4518,7 +4530,7 @@ def service_detail():
                 # Service status and actions - Centered
                 rx.center(
                     rx.cond(
-                        State.service_details.get("status") == "completed",
+                        EventDetailState.service_details.get("status") == "completed",
                         # SELECTED PROVIDER VIEW
                         rx.vstack(
                             rx.text(
@@ -4548,7 +4560,7 @@ def service_detail():
                                     
                                     # Provider name
                                     rx.heading(
-                                        State.current_provider_name,
+                                        EventDetailState.current_provider_name,
                                         size="4",
                                         margin_bottom="0.75rem",
                                         color="#1A237E",  # Deep blue for name
@@ -4556,9 +4568,9 @@ def service_detail():
                                     
                                     # Provider contact if available
                                     rx.cond(
-                                        State.current_provider_contact != "N/A",
+                                        EventDetailState.current_provider_contact != "N/A",
                                         rx.text(
-                                            f"📞 {State.current_provider_contact}",
+                                            f"📞 {EventDetailState.current_provider_contact}",
                                             margin_bottom="0.75rem",
                                             color="#424242",  # Deeper text color
                                             font_weight="500",
@@ -4567,9 +4579,9 @@ def service_detail():
                                     
                                     # Provider address if available
                                     rx.cond(
-                                        State.current_provider_address != "N/A",
+                                        EventDetailState.current_provider_address != "N/A",
                                         rx.text(
-                                            f"📍 {State.current_provider_address}",
+                                            f"📍 {EventDetailState.current_provider_address}",
                                             margin_bottom="0.75rem",
                                             color="#424242",  # Deeper text color
                                             font_weight="500",
@@ -4578,9 +4590,9 @@ def service_detail():
                                     
                                     # Provider price if available
                                     rx.cond(
-                                        State.current_provider_price != "N/A",
+                                        EventDetailState.current_provider_price != "N/A",
                                         rx.text(
-                                            f"💰 {State.current_provider_price}",
+                                            f"💰 {EventDetailState.current_provider_price}",
                                             color="#C2185B",  # Deeper pink for price
                                             font_weight="600",
                                             margin_bottom="0.75rem",
@@ -4589,9 +4601,9 @@ def service_detail():
                                     
                                     # Provider rating if available
                                     rx.cond(
-                                        State.current_provider_rating != "N/A",
+                                        EventDetailState.current_provider_rating != "N/A",
                                         rx.text(
-                                            f"⭐ Rating: {State.current_provider_rating}",
+                                            f"⭐ Rating: {EventDetailState.current_provider_rating}",
                                             color="#FF8F00",  # Deep amber for rating
                                             font_weight="600",
                                             margin_bottom="0.75rem",
@@ -4600,10 +4612,10 @@ def service_detail():
                                     
                                     # Source if available
                                     rx.cond(
-                                        State.current_provider_source != "N/A",
+                                        EventDetailState.current_provider_source != "N/A",
                                         rx.link(
                                             f"🔗 Visit Website",
-                                            href=State.current_provider_source,
+                                            href=EventDetailState.current_provider_source,
                                             is_external=True,
                                             color="#0277BD",  # Deep blue for links
                                             margin_bottom="0.75rem",
@@ -4618,10 +4630,10 @@ def service_detail():
                                     
                                     # Map link if available
                                     rx.cond(
-                                        State.current_provider_map_link != "N/A",
+                                        EventDetailState.current_provider_map_link != "N/A",
                                         rx.link(
                                             "📍 View on Map",
-                                            href=State.current_provider_map_link,
+                                            href=EventDetailState.current_provider_map_link,
                                             is_external=True,
                                             color="#0277BD",  # Deep blue for links
                                             margin_bottom="0.75rem",
@@ -4641,7 +4653,7 @@ def service_detail():
                                             rx.text("Change Provider"),
                                             spacing="2",
                                         ),
-                                        on_click=State.clear_selected_vendor,
+                                        on_click=EventDetailState.clear_selected_vendor,
                                         style={
                                             "padding": "0.75rem 1.5rem",
                                             "background": "#263238",  # Deeper background
@@ -4678,7 +4690,7 @@ def service_detail():
                         
                         # SEARCH STATE - Show search button or loading
                         rx.cond(
-                            State.is_searching,
+                            EventDetailState.is_searching,
                             # LOADING STATE
                             rx.box(
                                 rx.vstack(
@@ -4708,7 +4720,7 @@ def service_detail():
                                         margin_top="1.5rem",
                                     ),
                                     rx.text(
-                                        f"Finding the best {State.selected_service} providers for your event",
+                                        f"Finding the best {EventDetailState.selected_service} providers for your event",
                                         color="#555555",
                                         font_size="1.1rem",
                                     ),
@@ -4741,7 +4753,7 @@ def service_detail():
                                 
                                 # Add venue type selector only for Venue service
                                 rx.cond(
-                                    State.selected_service == "Venue",
+                                    EventDetailState.selected_service == "Venue",
                                     rx.vstack(
                                         rx.text(
                                             "What type of venue are you looking for?",
@@ -4751,10 +4763,10 @@ def service_detail():
                                         ),
                                         # Venue type dropdown
                                         rx.select(
-                                            State.venue_types,
+                                            EventDetailState.venue_types,
                                             placeholder="Select venue type",
-                                            on_change=State.set_venue_type,
-                                            value=State.venue_type,
+                                            on_change=EventDetailState.set_venue_type,
+                                            value=EventDetailState.venue_type,
                                             color="#000000",
                                             border="1px solid #000000",
                                             background="#FFFFFF",
@@ -4763,11 +4775,11 @@ def service_detail():
                                         ),
                                         # Show text input for "Other" option
                                         rx.cond(
-                                            State.show_venue_type_other,
+                                            EventDetailState.show_venue_type_other,
                                             rx.input(
                                                 placeholder="Please specify venue type",
-                                                value=State.venue_type_other,
-                                                on_change=State.set_venue_type_other,
+                                                value=EventDetailState.venue_type_other,
+                                                on_change=EventDetailState.set_venue_type_other,
                                                 border="1px solid #000000",
                                                 color="#000000",
                                                 width="100%",
@@ -4783,10 +4795,10 @@ def service_detail():
                                 rx.button(
                                     rx.hstack(
                                         rx.icon("search"),
-                                        rx.text(f"Find {State.selected_service} Providers"),
+                                        rx.text(f"Find {EventDetailState.selected_service} Providers"),
                                         spacing="2",
                                     ),
-                                    on_click=lambda: State.search_vendors_with_venue_type(State.selected_service),
+                                    on_click=lambda: EventDetailState.search_vendors_with_venue_type(EventDetailState.selected_service),
                                     style={
                                         "background": "#000000",
                                         "color": "#FFFFFF",
@@ -4802,7 +4814,7 @@ def service_detail():
                                         },
                                         "transition": "all 0.3s ease",
                                     },
-                                    disabled=State.is_searching,
+                                    disabled=EventDetailState.is_searching,
                                 ),
                                 align_items="center",
                                 spacing="4",
@@ -4819,13 +4831,13 @@ def service_detail():
                 
                 # Search results section - Center aligned
                 rx.cond(
-                    (~State.is_searching) & 
-                    (State.search_results.length() > 0) & 
-                    (State.service_details.get("status") != "completed"),
+                    (~EventDetailState.is_searching) & 
+                    (EventDetailState.search_results.length() > 0) & 
+                    (EventDetailState.service_details.get("status") != "completed"),
                     rx.center(
                         rx.vstack(
                             rx.heading(
-                                f"{State.selected_service} Options",
+                                f"{EventDetailState.selected_service} Options",
                                 size="4",
                                 margin_bottom="1rem",
                                 color="#000000",
@@ -4838,7 +4850,7 @@ def service_detail():
                             # Results grid
                             rx.box(
                                 rx.foreach(
-                                    State.search_results.to(list[dict]),
+                                    EventDetailState.search_results.to(list[dict]),
                                     vendor_card,
                                 ),
                                 style={
@@ -4958,7 +4970,7 @@ def create_invitation_button():
         right="2rem",
         z_index="100",
         # Use navigation method instead of direct URL construction
-        on_click=State.navigate_to_invitation,
+        on_click=EventDetailState.navigate_to_invitation,
     )
 
 def notifications():
@@ -5101,7 +5113,7 @@ def vendor_card(vendor):
             rx.button(
                 "Select This Provider",
                 # Pass the vendor dict directly
-                on_click=lambda: State.select_vendor(vendor),
+                on_click=lambda: EventDetailState.select_vendor(vendor),
                 background="#000000",
                 color="#FFFFFF",
                 padding="0.75rem",
@@ -5168,7 +5180,7 @@ def event_detail_page():
         # Main content
         rx.box(
             rx.cond(
-                State.is_loading_event,
+                EventDetailState.is_loading_event,
                 # Loading view
                 rx.center(
                     loading_animation(),
@@ -5236,7 +5248,7 @@ def event_detail_page():
         
         
         # Set event ID on page load
-        on_mount=State.load_event_details,
+        on_mount=EventDetailState.load_event_details,
         
         # Page background
         background="#FFFDE7",
@@ -5258,7 +5270,7 @@ def invitation_navbar():
             rx.button(
                 "Back to Event",
                 style=styles["btn_login"],
-                on_click=State.navigate_back_to_event,
+                on_click=EventDetailState.navigate_back_to_event,
             ),
             width="100%",
             justify="between",
@@ -5276,7 +5288,7 @@ def invitation_page():
         # Main content
         rx.box(
             rx.cond(
-                State.is_loading_event,
+                EventDetailState.is_loading_event,
                 # Loading view
                 rx.center(
                     loading_animation(),
@@ -5310,12 +5322,12 @@ def invitation_page():
                     rx.box(
                         rx.vstack(
                             rx.heading(
-                                f"Create Invitation for {State.current_event.get('event_name', '')}",
+                                f"Create Invitation for {EventDetailState.current_event.get('event_name', '')}",
                                 size="3",
                                 color="#000000",
                             ),
                             rx.text(
-                                f"Type: {State.event_category_display} | Date: {State.current_event.get('event_date', '')} | Location: {State.current_event.get('location', '')}",
+                                f"Type: {EventDetailState.event_category_display} | Date: {EventDetailState.current_event.get('event_date', '')} | Location: {EventDetailState.current_event.get('location', '')}",
                                 color="#666666",
                             ),
                             align_items="center",
@@ -5332,7 +5344,7 @@ def invitation_page():
                     
                     # Step 1: Basic invitation info form
                     rx.cond(
-                        State.invitation_text == "",  # Show only when invitation not yet generated
+                        InvitationState.invitation_text == "",  # Show only when invitation not yet generated
                         rx.box(
                             rx.vstack(
                                 rx.heading(
@@ -5347,14 +5359,14 @@ def invitation_page():
                                     rx.text("Venue Information", style=styles["create_form_label"]),
                                     rx.input(
                                         placeholder="Venue name",
-                                        value=State.invitation_venue_name,
-                                        on_change=State.set_invitation_venue_name,
+                                        value=InvitationState.invitation_venue_name,
+                                        on_change=InvitationState.set_invitation_venue_name,
                                         style=styles["create_form_input"],
                                     ),
                                     rx.input(
                                         placeholder="Venue address",
-                                        value=State.invitation_venue_address,
-                                        on_change=State.set_invitation_venue_address,
+                                        value=InvitationState.invitation_venue_address,
+                                        on_change=InvitationState.set_invitation_venue_address,
                                         style=styles["create_form_input"],
                                     ),
                                     width="100%",
@@ -5367,8 +5379,8 @@ def invitation_page():
                                         rx.text("Event Time", style=styles["create_form_label"]),
                                         rx.input(
                                             placeholder="e.g., 7:00 PM",
-                                            value=State.invitation_time,
-                                            on_change=State.set_invitation_time,
+                                            value=InvitationState.invitation_time,
+                                            on_change=InvitationState.set_invitation_time,
                                             style=styles["create_form_input"],
                                         ),
                                     ),
@@ -5378,8 +5390,8 @@ def invitation_page():
                                         rx.text("Host Name", style=styles["create_form_label"]),
                                         rx.input(
                                             placeholder="e.g., John & Sarah Smith",
-                                            value=State.host_name,
-                                            on_change=State.set_host_name,
+                                            value=InvitationState.host_name,
+                                            on_change=InvitationState.set_host_name,
                                             style=styles["create_form_input"],
                                         ),
                                     ),
@@ -5389,8 +5401,8 @@ def invitation_page():
                                         rx.text("RSVP Contact", style=styles["create_form_label"]),
                                         rx.input(
                                             placeholder="e.g., 555-123-4567 or john@example.com",
-                                            value=State.rsvp_contact,
-                                            on_change=State.set_rsvp_contact,
+                                            value=InvitationState.rsvp_contact,
+                                            on_change=InvitationState.set_rsvp_contact,
                                             style=styles["create_form_input"],
                                         ),
                                     ),
@@ -5401,8 +5413,8 @@ def invitation_page():
                                         rx.select(
                                             ["Elegant", "Casual", "Formal", "Playful", "Modern", "Vintage"],
                                             placeholder="Select a style",
-                                            value=State.style_preference,
-                                            on_change=State.set_style_preference,
+                                            value=InvitationState.style_preference,
+                                            on_change=InvitationState.set_style_preference,
                                             style=styles["create_form_input"],
                                         ),
                                     ),
@@ -5412,8 +5424,8 @@ def invitation_page():
                                         rx.text("Special Instructions (Optional)", style=styles["create_form_label"]),
                                         rx.text_area(
                                             placeholder="Any special instructions for guests...",
-                                            value=State.special_instructions,
-                                            on_change=State.set_special_instructions,
+                                            value=InvitationState.special_instructions,
+                                            on_change=InvitationState.set_special_instructions,
                                             height="100px",
                                             style=styles["create_form_input"],
                                         ),
@@ -5428,18 +5440,18 @@ def invitation_page():
                                 # Generate invitation button
                                 rx.button(
                                     rx.cond(
-                                        State.is_generating_invitation,
+                                        InvitationState.is_generating_invitation,
                                         "Generating Your Invitation...",
                                         "Generate Invitation Text"
                                     ),
-                                    on_click=State.generate_invitation,
+                                    on_click=InvitationState.stream_invitation if STREAM_INVITATIONS else InvitationState.generate_invitation,
                                     style=styles["create_submit_button"],
-                                    disabled=State.is_generating_invitation,
+                                    disabled=InvitationState.is_generating_invitation,
                                 ),
                                 
                                 # Loading animation
                                 rx.cond(
-                                    State.is_generating_invitation,
+                                    InvitationState.is_generating_invitation,
                                     rx.center(
                                         loading_animation(),
                                         margin_top="1.5rem",
@@ -5463,7 +5475,7 @@ def invitation_page():
                     
                     # Step 2: Invitation Preview and Style Selection
                     rx.cond(
-                        State.invitation_text != "",  # Only show when invitation text is generated
+                        InvitationState.invitation_text != "",  # Only show when invitation text is generated
                         rx.box(
                             rx.vstack(
                                 rx.heading(
@@ -5484,7 +5496,7 @@ def invitation_page():
                                         ),
                                         rx.box(
                                             rx.text(
-                                                State.invitation_text,
+                                                InvitationState.invitation_text,
                                                 style={
                                                     "white_space": "pre-wrap",
                                                     "text_align": "center",
@@ -5495,7 +5507,7 @@ def invitation_page():
                                                     "padding": "1.5rem",
                                                 },
                                             ),
-                                            background=State.invitation_background,
+                                            background=InvitationState.invitation_background,
                                             border_radius="0.5rem",
                                             border="1px solid #E0E0E0",
                                             box_shadow="0 2px 10px rgba(0, 0, 0, 0.05)",
@@ -5524,7 +5536,7 @@ def invitation_page():
                                     rx.hstack(
                                         rx.button(
                                             "Generate New Text",
-                                            on_click=State.regenerate_invitation_text,
+                                            on_click=InvitationState.stream_invitation_variation if STREAM_INVITATIONS else InvitationState.regenerate_invitation_text,
                                             style={
                                                 "background": "#FFFFFF",
                                                 "color": "#000000",
@@ -5540,7 +5552,7 @@ def invitation_page():
                                         ),
                                         rx.button(
                                             "Proceed with Styling",
-                                            on_click=State.set_highlight_styling,
+                                            on_click=InvitationState.set_highlight_styling,
                                             style={
                                                 "background": "#000000",
                                                 "color": "white",
@@ -5580,7 +5592,7 @@ def invitation_page():
                                     ),
                                     rx.flex(  # Using flex instead of wrap
                                         rx.foreach(
-                                            State.color_options.to(list[dict]),  # Type conversion
+                                            InvitationState.color_options.to(list[dict]),  # Type conversion
                                             lambda color, i: rx.box(
                                                 rx.vstack(
                                                     rx.box(
@@ -5613,12 +5625,12 @@ def invitation_page():
                                                 padding="0.5rem",
                                                 border_radius="0.5rem",
                                                 border=rx.cond(
-                                                    State.selected_color_scheme == color["id"],
+                                                    InvitationState.selected_color_scheme == color["id"],
                                                     "2px solid #fda8e9",
                                                     "2px solid transparent",
                                                 ),
                                                 background=rx.cond(
-                                                    State.selected_color_scheme == color["id"],
+                                                    InvitationState.selected_color_scheme == color["id"],
                                                     "rgba(253, 168, 233, 0.1)",
                                                     "transparent",
                                                 ),
@@ -5627,7 +5639,7 @@ def invitation_page():
                                                     "transform": "translateY(-3px)",
                                                     "box_shadow": "0 4px 12px rgba(0, 0, 0, 0.1)",
                                                 },
-                                                on_click=lambda c=color: State.set_selected_color_scheme(c["id"]),
+                                                on_click=lambda c=color: InvitationState.set_selected_color_scheme(c["id"]),
                                             )
                                         ),
                                         spacing="3",
@@ -5648,7 +5660,7 @@ def invitation_page():
                                     ),
                                     rx.flex(  # Using flex instead of wrap
                                         rx.foreach(
-                                            State.font_options.to(list[dict]),  # Type conversion
+                                            InvitationState.font_options.to(list[dict]),  # Type conversion
                                             lambda font, i: rx.box(
                                                 rx.text(
                                                     font["name"],
@@ -5661,12 +5673,12 @@ def invitation_page():
                                                 padding="0.75rem 1.5rem",
                                                 border_radius="0.5rem",
                                                 border=rx.cond(
-                                                    State.selected_font_style == font["id"],
+                                                    InvitationState.selected_font_style == font["id"],
                                                     "2px solid #fda8e9",
                                                     "1px solid #E0E0E0",
                                                 ),
                                                 background=rx.cond(
-                                                    State.selected_font_style == font["id"],
+                                                    InvitationState.selected_font_style == font["id"],
                                                     "rgba(253, 168, 233, 0.1)",
                                                     "#FFFFFF",
                                                 ),
@@ -5675,7 +5687,7 @@ def invitation_page():
                                                     "transform": "translateY(-2px)",
                                                     "box_shadow": "0 4px 12px rgba(0, 0, 0, 0.1)",
                                                 },
-                                                on_click=lambda f=font: State.set_selected_font_style(f["id"]),
+                                                on_click=lambda f=font: InvitationState.set_selected_font_style(f["id"]),
                                             )
                                         ),
                                         spacing="3",
@@ -5696,7 +5708,7 @@ def invitation_page():
                                     ),
                                     rx.flex(  # Using flex instead of wrap
                                         rx.foreach(
-                                            State.border_options.to(list[dict]),  # Type conversion
+                                            InvitationState.border_options.to(list[dict]),  # Type conversion
                                             lambda border, i: rx.box(
                                                 rx.text(
                                                     border["name"],
@@ -5708,12 +5720,12 @@ def invitation_page():
                                                 padding="0.75rem 1.5rem",
                                                 border_radius="0.5rem",
                                                 border=rx.cond(
-                                                    State.selected_border_style == border["id"],
+                                                    InvitationState.selected_border_style == border["id"],
                                                     "2px solid #fda8e9",
                                                     "1px solid #E0E0E0",
                                                 ),
                                                 background=rx.cond(
-                                                    State.selected_border_style == border["id"],
+                                                    InvitationState.selected_border_style == border["id"],
                                                     "rgba(253, 168, 233, 0.1)",
                                                     "#FFFFFF",
                                                 ),
@@ -5722,7 +5734,7 @@ def invitation_page():
                                                     "transform": "translateY(-2px)",
                                                     "box_shadow": "0 4px 12px rgba(0, 0, 0, 0.1)",
                                                 },
-                                                on_click=lambda b=border: State.set_selected_border_style(b["id"]),
+                                                on_click=lambda b=border: InvitationState.set_selected_border_style(b["id"]),
                                             )
                                         ),
                                         spacing="3",
@@ -5743,7 +5755,7 @@ def invitation_page():
                                     ),
                                     rx.flex(  # Using flex instead of wrap
                                         rx.foreach(
-                                            State.background_options.to(list[dict]),  # Type conversion
+                                            InvitationState.background_options.to(list[dict]),  # Type conversion
                                             lambda bg, i: rx.box(
                                                 rx.vstack(
                                                     rx.box(
@@ -5765,12 +5777,12 @@ def invitation_page():
                                                 padding="0.5rem",
                                                 border_radius="0.5rem",
                                                 border=rx.cond(
-                                                    State.selected_background == bg["id"],
+                                                    InvitationState.selected_background == bg["id"],
                                                     "2px solid #fda8e9",
                                                     "2px solid transparent",
                                                 ),
                                                 background=rx.cond(
-                                                    State.selected_background == bg["id"],
+                                                    InvitationState.selected_background == bg["id"],
                                                     "rgba(253, 168, 233, 0.1)",
                                                     "transparent",
                                                 ),
@@ -5779,7 +5791,7 @@ def invitation_page():
                                                     "transform": "translateY(-3px)",
                                                     "box_shadow": "0 4px 12px rgba(0, 0, 0, 0.1)",
                                                 },
-                                                on_click=lambda b=bg: State.set_selected_background(b["id"]),
+                                                on_click=lambda b=bg: InvitationState.set_selected_background(b["id"]),
                                             )
                                         ),
                                         spacing="3",
@@ -5790,21 +5802,77 @@ def invitation_page():
                                     ),
                                 ),
                                 
+                                # Preview every color scheme and border at once
+                                rx.box(
+                                    rx.button(
+                                        rx.cond(
+                                            StylePreviewState.is_rendering_previews,
+                                            "Rendering Previews...",
+                                            "Preview All Styles"
+                                        ),
+                                        on_click=StylePreviewState.generate_style_previews,
+                                        disabled=StylePreviewState.is_rendering_previews,
+                                        variant="outline",
+                                        width="100%",
+                                    ),
+                                    rx.cond(
+                                        StylePreviewState.style_previews.length() > 0,
+                                        rx.grid(
+                                            rx.foreach(
+                                                StylePreviewState.style_previews.to(list[dict]),
+                                                lambda preview: rx.box(
+                                                    rx.image(
+                                                        src=preview["image"],
+                                                        width="100%",
+                                                        border_radius="0.25rem",
+                                                    ),
+                                                    rx.text(
+                                                        preview["label"],
+                                                        font_size="0.7rem",
+                                                        color="#666666",
+                                                        margin_top="0.25rem",
+                                                        text_align="center",
+                                                    ),
+                                                    cursor="pointer",
+                                                    padding="0.25rem",
+                                                    border_radius="0.5rem",
+                                                    border=rx.cond(
+                                                        (InvitationState.selected_color_scheme == preview["color"])
+                                                        & (InvitationState.selected_border_style == preview["border"]),
+                                                        "2px solid #fda8e9",
+                                                        "2px solid transparent",
+                                                    ),
+                                                    _hover={
+                                                        "box_shadow": "0 4px 12px rgba(0, 0, 0, 0.1)",
+                                                    },
+                                                    on_click=StylePreviewState.apply_style_preview(preview),
+                                                ),
+                                            ),
+                                            columns="6",
+                                            spacing="2",
+                                            width="100%",
+                                            margin_top="1rem",
+                                        ),
+                                    ),
+                                    width="100%",
+                                    margin_bottom="1.5rem",
+                                ),
+                                
                                 # Generate PDF button
                                 rx.button(
                                     rx.cond(
-                                        State.is_generating_pdf,
+                                        InvitationState.is_generating_pdf,
                                         "Generating PDF...",
                                         "Generate PDF Invitation"
                                     ),
-                                    on_click=State.generate_invitation_pdf,
+                                    on_click=InvitationState.generate_invitation_pdf,
                                     style=styles["create_submit_button"],
-                                    disabled=State.is_generating_pdf,
+                                    disabled=InvitationState.is_generating_pdf,
                                 ),
                                 
                                 # Loading animation for PDF generation
                                 rx.cond(
-                                    State.is_generating_pdf,
+                                    InvitationState.is_generating_pdf,
                                     rx.center(
                                         loading_animation(),
                                         margin_top="1.5rem",
@@ -5817,13 +5885,13 @@ def invitation_page():
                             ),
                             padding="2rem",
                             background=rx.cond(
-                                State.highlight_styling,
+                                InvitationState.highlight_styling,
                                 "#FFFCE6",  # Highlighted background
                                 "#FFFFFF",  # Regular background
                             ),
                             border_radius="1rem",
                             border=rx.cond(
-                                State.highlight_styling,
+                                InvitationState.highlight_styling,
                                 "2px solid #fda8e9",  # Highlighted border
                                 "2px solid #E0E0E0",  # Regular border
                             ),
@@ -5836,7 +5904,7 @@ def invitation_page():
                     
                     # Step 3: PDF Generated and Email Options
                     rx.cond(
-                        State.pdf_path != "",  # Only show when PDF is generated
+                        InvitationState.pdf_path != "",  # Only show when PDF is generated
                         rx.box(
                             rx.vstack(
                                 rx.heading(
@@ -5866,7 +5934,7 @@ def invitation_page():
                                         # Use a link instead of window_open
                                         rx.link(
                                             "Download PDF",
-                                            href=State.download_url,
+                                            href=InvitationState.download_url,
                                             is_external=True,
                                             style={
                                                 "background": "#00A854",
@@ -5909,9 +5977,9 @@ def invitation_page():
                                     rx.box(
                                         rx.text("Email Subject", style=styles["create_form_label"]),
                                         rx.input(
-                                            placeholder=f"Invitation to {State.current_event.get('event_name', 'our event')}",
-                                            value=State.email_subject,
-                                            on_change=State.set_email_subject,
+                                            placeholder=f"Invitation to {EventDetailState.current_event.get('event_name', 'our event')}",
+                                            value=InvitationState.email_subject,
+                                            on_change=InvitationState.set_email_subject,
                                             style=styles["create_form_input"],
                                         ),
                                         width="100%",
@@ -5922,13 +5990,70 @@ def invitation_page():
                                         rx.text("Recipient Email Addresses (comma-separated)", style=styles["create_form_label"]),
                                         rx.input(
                                             placeholder="guest1@example.com, guest2@example.com",
-                                            value=State.email_addresses,
-                                            on_change=State.set_email_addresses,
+                                            value=InvitationState.email_addresses,
+                                            on_change=InvitationState.set_email_addresses,
                                             style=styles["create_form_input"],
                                         ),
                                         width="100%",
                                     ),
                                     
+                                    # Guest list import
+                                    rx.box(
+                                        rx.text("Guest List (CSV or Excel: Name, Email, Table, Plus-ones)",
+                                                style=styles["create_form_label"]),
+                                        rx.upload(
+                                            rx.text(
+                                                rx.cond(
+                                                    InvitationState.is_importing_guests,
+                                                    "Importing guest list...",
+                                                    "Drop a guest list here or click to choose a file"
+                                                ),
+                                                color="#555555",
+                                            ),
+                                            id="guest_list_upload",
+                                            accept={
+                                                "text/csv": [".csv"],
+                                                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": [".xlsx"],
+                                            },
+                                            max_files=1,
+                                            on_drop=InvitationState.handle_guest_list_upload(
+                                                rx.upload_files(upload_id="guest_list_upload")
+                                            ),
+                                            border="1px dashed #000000",
+                                            padding="1rem",
+                                            border_radius="0.5rem",
+                                            width="100%",
+                                        ),
+                                        rx.cond(
+                                            InvitationState.guest_list_message != "",
+                                            rx.vstack(
+                                                rx.text(InvitationState.guest_list_message, font_weight="600"),
+                                                rx.foreach(
+                                                    InvitationState.guest_list_problems,
+                                                    lambda problem: rx.text(problem, size="1", color="#B26A00"),
+                                                ),
+                                                rx.hstack(
+                                                    rx.checkbox(
+                                                        "Email each guest their own PDF instead of the addresses above",
+                                                        checked=InvitationState.use_guest_list,
+                                                        on_change=InvitationState.set_use_guest_list,
+                                                    ),
+                                                    rx.spacer(),
+                                                    rx.link(
+                                                        "Download all guest PDFs (.zip)",
+                                                        on_click=InvitationState.download_guest_pdfs,
+                                                        cursor="pointer",
+                                                    ),
+                                                    width="100%",
+                                                ),
+                                                spacing="1",
+                                                margin_top="0.75rem",
+                                                width="100%",
+                                            ),
+                                        ),
+                                        width="100%",
+                                    ),
+                                    
                                     # Two column layout for CC and sender
                                     rx.grid(
                                         # CC addresses
@@ -5936,8 +6061,8 @@ def invitation_page():
                                             rx.text("CC Addresses (optional)", style=styles["create_form_label"]),
                                             rx.input(
                                                 placeholder="cc1@example.com, cc2@example.com",
-                                                value=State.cc_addresses,
-                                                on_change=State.set_cc_addresses,
+                                                value=InvitationState.cc_addresses,
+                                                on_change=InvitationState.set_cc_addresses,
                                                 style=styles["create_form_input"],
                                             ),
                                         ),
@@ -5947,8 +6072,8 @@ def invitation_page():
                                             rx.text("Sender Name", style=styles["create_form_label"]),
                                             rx.input(
                                                 placeholder="Your Name",
-                                                value=State.sender_name,
-                                                on_change=State.set_sender_name,
+                                                value=InvitationState.sender_name,
+                                                on_change=InvitationState.set_sender_name,
                                                 style=styles["create_form_input"],
                                             ),
                                         ),
@@ -5963,8 +6088,8 @@ def invitation_page():
                                         rx.text("Additional Message (optional)", style=styles["create_form_label"]),
                                         rx.text_area(
                                             placeholder="Any additional message to include in the email...",
-                                            value=State.additional_message,
-                                            on_change=State.set_additional_message,
+                                            value=InvitationState.additional_message,
+                                            on_change=InvitationState.set_additional_message,
                                             height="100px",
                                             style=styles["create_form_input"],
                                         ),
@@ -5974,18 +6099,18 @@ def invitation_page():
                                     # Send email button
                                     rx.button(
                                         rx.cond(
-                                            State.is_sending_email,
-                                            "Sending Emails...",
+                                            InvitationState.is_sending_email,
+                                            "Queueing Emails...",
                                             "Send Invitation Emails"
                                         ),
-                                        on_click=State.send_invitation_emails,
+                                        on_click=InvitationState.send_invitation_emails,
                                         style=styles["create_submit_button"],
-                                        disabled=State.is_sending_email,
+                                        disabled=InvitationState.is_sending_email,
                                     ),
                                     
                                     # Loading animation for email sending
                                     rx.cond(
-                                        State.is_sending_email,
+                                        InvitationState.is_sending_email,
                                         rx.center(
                                             loading_animation(),
                                             margin_top="1.5rem",
@@ -5994,7 +6119,7 @@ def invitation_page():
                                     
                                     # Email success message
                                     rx.cond(
-                                        State.email_success,
+                                        InvitationState.email_success,
                                         rx.box(
                                             rx.hstack(
                                                 rx.icon(
@@ -6003,11 +6128,19 @@ def invitation_page():
                                                     font_size="1.5rem",
                                                 ),
                                                 rx.text(
-                                                    "Invitation emails sent successfully!",
+                                                    InvitationState.email_status_message,
                                                     color="#00A854",
                                                     font_weight="600",
                                                 ),
+                                                rx.spacer(),
+                                                rx.button(
+                                                    "Refresh status",
+                                                    on_click=InvitationState.refresh_email_status,
+                                                    size="1",
+                                                    variant="outline",
+                                                ),
                                                 spacing="2",
+                                                width="100%",
                                             ),
                                             padding="1rem",
                                             background="#E6F6EE",
@@ -6020,7 +6153,7 @@ def invitation_page():
                                     
                                     # Email error message
                                     rx.cond(
-                                        State.email_error != "",
+                                        InvitationState.email_error != "",
                                         rx.box(
                                             rx.hstack(
                                                 rx.icon(
@@ -6029,7 +6162,7 @@ def invitation_page():
                                                     font_size="1.5rem",
                                                 ),
                                                 rx.text(
-                                                    State.email_error,
+                                                    InvitationState.email_error,
                                                     color="#FF5252",
                                                     font_weight="600",
                                                 ),
@@ -6052,7 +6185,7 @@ def invitation_page():
                                 # Return to event button - use a dedicated method
                                 rx.button(
                                     "Return to Event Details",
-                                    on_click=State.navigate_back_to_event,
+                                    on_click=EventDetailState.navigate_back_to_event,
                                     style={
                                         "background": "#FFFFFF",
                                         "color": "#000000",
@@ -6074,13 +6207,13 @@ def invitation_page():
                             ),
                             padding="2rem",
                             background=rx.cond(
-                                State.highlight_email,
+                                InvitationState.highlight_email,
                                 "#FFFCE6",  # Highlighted background
                                 "#FFFFFF",  # Regular background
                             ),
                             border_radius="1rem",
                             border=rx.cond(
-                                State.highlight_email,
+                                InvitationState.highlight_email,
                                 "2px solid #fda8e9",  # Highlighted border
                                 "2px solid #E0E0E0",  # Regular border
                             ),
@@ -6139,7 +6272,7 @@ def invitation_page():
         """),
         
         # Only run initialization methods - no scrolling functions
-       on_mount=[State.load_event_details, State.initialize_invitation_form],
+       on_mount=[EventDetailState.load_event_details, InvitationState.initialize_invitation_form],
         
         # Page background
         background="#FFFDE7",
@@ -6150,14 +6283,55 @@ def invitation_page():
 
 # Add this page to your app
 
+# Operator endpoints served by the Reflex backend
+ops_api = FastAPI()
+
+@ops_api.get("/ops/breakers")
+def ops_breakers():
+    """Circuit breaker state for every listing domain and API provider"""
+    return {"breakers": breaker_states(), "open": open_breakers()}
+
+@ops_api.get("/metrics")
+def ops_metrics():
+    """Runtime metrics in the Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+@ops_api.get("/invitations/{invitation_id}/guests.zip")
+def guest_pdfs_zip(invitation_id: str, event_id: str, uid: str, expires: int, signature: str):
+    """Every guest's personalized PDF, zipped while they render, for the event's owner only"""
+    from tools import InvitationCreatorTool
+    from guest_pdfs import iter_guest_zip
+    from pdf_cache import slugify
+    expected = download_signature(uid, event_id, invitation_id, expires)
+    if expires < time.time() or not hmac.compare_digest(signature, expected):
+        raise HTTPException(status_code=403, detail="This download link is invalid or has expired")
+    event_manager = get_event_manager()
+    event = event_manager.get_event_page_data(event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if event.get("uid") != uid:
+        raise HTTPException(status_code=403, detail="This event belongs to another account")
+    invitation = InvitationCreatorTool.get_invitation(invitation_id)
+    if not invitation or invitation.get("event_id") != event_id or not invitation.get("color_scheme"):
+        raise HTTPException(status_code=404, detail="Styled invitation not found")
+    guests = event_manager.get_guest_list(event_id)
+    if not guests:
+        raise HTTPException(status_code=404, detail="This event has no guest list")
+    filename = f"{slugify(invitation.get('event_name'))}-guests.zip"
+    return StreamingResponse(iter_guest_zip(invitation, guests), media_type="application/zip",
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
 # App configuration
 # App configuration
 app = rx.App(
     stylesheets=[
         "https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap",
         "https://fonts.googleapis.com/css2?family=Playfair+Display:ital,wght@0,400;0,500;0,600;0,700;1,400;1,500;1,600;1,700&display=swap",
-    ]
+    ],
+    api_transformer=ops_api,
 )
+# Resume any invitation emails left in the outbox by a previous run
+app.register_lifespan_task(start_outbox_workers_async)
 app.add_page(landing_page, route="/")
 app.add_page(dashboard, route="/dashboard")
 app.add_page(create_event_page, route="/event/create")
@@ -0,0 +1,82 @@
+"""
+CPU and memory benchmark for building personalized invitation emails.
+
+Builds one message per recipient the old way (open the PDF, wrap it in a new
+MIMEApplication and serialize the whole message through the email generator)
+and with the prepared-attachment cache (encode once, splice the pre-encoded
+part into each message). Messages are discarded after building, as they are
+once handed to SMTP.
+
+    python benchmarks/bench_attachment_cache.py --recipients 1000 --pdf-kb 300
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from email_delivery import (  # noqa: E402
+    build_attachment, build_message, get_prepared_attachment, render_template, DEFAULT_BODY_TEMPLATE
+)
+
+VALUES = {"event_name": "Benchmark Gala", "additional_message": "", "sender_name": "Host"}
+
+
+def build_uncached(recipient, pdf_path):
+    fields = dict(VALUES, **recipient)
+    msg = MIMEMultipart()
+    msg['From'] = "Host <host@example.com>"
+    msg['To'] = recipient["email"]
+    msg['Subject'] = render_template("You're invited, {name}", fields)
+    msg.attach(MIMEText(render_template(DEFAULT_BODY_TEMPLATE, fields), 'plain'))
+    msg.attach(build_attachment(pdf_path))
+    return msg.as_string()
+
+
+def build_cached(recipient, pdf_path):
+    return build_message(recipient, "Host <host@example.com>", "You're invited, {name}",
+                         DEFAULT_BODY_TEMPLATE, get_prepared_attachment(pdf_path), VALUES)
+
+
+def measure(label, build, recipients, pdf_path):
+    tracemalloc.start()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    total_bytes = 0
+    for recipient in recipients:
+        total_bytes += len(build(recipient, pdf_path))
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} cpu={cpu:6.2f}s  wall={wall:6.2f}s  {len(recipients) / wall:7.0f} msg/s  "
+          f"peak={peak / 1024 / 1024:6.1f} MB  output={total_bytes / 1024 / 1024:7.1f} MB")
+    return cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipients", type=int, default=1000)
+    parser.add_argument("--pdf-kb", type=int, default=300)
+    args = parser.parse_args()
+
+    handle, pdf_path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(handle, "wb") as f:
+        f.write(b"%PDF-1.4\n" + os.urandom(args.pdf_kb * 1024))
+    recipients = [{"email": f"guest{i}@example.com", "name": f"Guest {i}"} for i in range(args.recipients)]
+
+    try:
+        print(f"{args.recipients} recipients, {args.pdf_kb} KB PDF")
+        uncached = measure("re-encode per guest", build_uncached, recipients, pdf_path)
+        cached = measure("prepared attachment", build_cached, recipients, pdf_path)
+        print(f"CPU reduction: {uncached / max(cached, 1e-6):.1f}x")
+    finally:
+        os.remove(pdf_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Throughput benchmark for bulk invitation delivery against a local aiosmtpd relay.
+
+Compares the old pattern (connect, login and send per guest so each guest gets a
+personal message) with email_delivery.BulkInvitationSender, which reuses a pool
+of connections. The stand-in relay adds a small per-command delay to mimic a real
+relay's round trips and can reject a fraction of recipients to exercise retries.
+
+    pip install aiosmtpd
+    python benchmarks/bench_bulk_email.py --recipients 500 --pool-size 4
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import socket
+import smtplib
+import tempfile
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from aiosmtpd.controller import Controller
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from email_delivery import (  # noqa: E402
+    BulkInvitationSender, DeliveryLedger, SMTPSettings, build_attachment
+)
+
+
+class RelayConfig:
+    command_delay = 0.005
+    transient_fraction = 0.0
+    connect_delay = 0.05
+
+
+class SinkHandler:
+    """Accepts everything, after a delay, optionally answering 451 to some recipients"""
+
+    def __init__(self):
+        self.delivered = 0
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await asyncio.sleep(RelayConfig.command_delay)
+        if random.random() < RelayConfig.transient_fraction:
+            return "451 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(RelayConfig.command_delay)
+        self.delivered += 1
+        return "250 Message accepted"
+
+
+class SlowConnectController(Controller):
+    """Controller whose sessions pay a connection-setup cost, like TLS + AUTH on a real relay"""
+
+    def factory(self):
+        server = super().factory()
+        original = server._handle_client
+
+        async def delayed():
+            await asyncio.sleep(RelayConfig.connect_delay)
+            await original()
+
+        server._handle_client = delayed
+        return server
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_pdf(size_kb: int) -> str:
+    handle, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(handle, "wb") as f:
+        f.write(b"%PDF-1.4\n" + os.urandom(size_kb * 1024))
+    return path
+
+
+def send_per_guest(settings, recipients, pdf_path):
+    """Old behaviour extended to personalization: one fresh session per guest"""
+    attachment = build_attachment(pdf_path)
+    for recipient in recipients:
+        msg = MIMEMultipart()
+        msg['From'] = f"Host <{settings.user}>"
+        msg['To'] = recipient["email"]
+        msg['Subject'] = "You're invited"
+        msg.attach(MIMEText(f"Dear {recipient['name']}, you are invited!", 'plain'))
+        msg.attach(attachment)
+        with smtplib.SMTP(settings.host, settings.port) as server:
+            server.sendmail(settings.user, [recipient["email"]], msg.as_string())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipients", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--per-connection", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=0, help="messages/second throttle, 0 = unthrottled")
+    parser.add_argument("--transient-fraction", type=float, default=0.02)
+    parser.add_argument("--pdf-kb", type=int, default=200)
+    args = parser.parse_args()
+
+    handler = SinkHandler()
+    port = free_port()
+    controller = SlowConnectController(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    settings = SMTPSettings(host="127.0.0.1", port=port, user="host@example.com",
+                            password="", use_tls=False)
+    pdf_path = make_pdf(args.pdf_kb)
+    recipients = [{"email": f"guest{i}@example.com", "name": f"Guest {i}"} for i in range(args.recipients)]
+
+    try:
+        RelayConfig.transient_fraction = 0.0
+        start = time.perf_counter()
+        send_per_guest(settings, recipients, pdf_path)
+        elapsed = time.perf_counter() - start
+        print(f"{'session per guest':<26} {elapsed:6.2f}s  {len(recipients) / elapsed:7.1f} msg/s  "
+              f"connections={len(recipients)}")
+
+        RelayConfig.transient_fraction = args.transient_fraction
+        ledger = DeliveryLedger("bench")
+        sender = BulkInvitationSender(settings, pool_size=args.pool_size,
+                                      max_messages_per_connection=args.per_connection,
+                                      rate_per_second=args.rate, retry_backoff=0.05)
+        result = sender.send(recipients, "You're invited, {name}", "Host", pdf_path=pdf_path,
+                             template_values={"event_name": "Benchmark Gala", "additional_message": ""},
+                             ledger=ledger)
+        print(f"{'pooled bulk sender':<26} {result['elapsed']:6.2f}s  "
+              f"{result['total'] / result['elapsed']:7.1f} msg/s  connections={result['connections_opened']}  "
+              f"ledger={ledger.summary()}")
+        retried = sum(1 for r in ledger.records.values() if r["attempts"] > 1)
+        print(f"recipients retried after 451: {retried}")
+    finally:
+        controller.stop()
+        os.remove(pdf_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Load test: how many concurrent planners one Reflex worker can serve.
+
+Simulates N users walking the whole flow on one event loop, as one Reflex
+backend worker would: register, log out and back in, open the dashboard,
+create an event (which generates its services), search every service, pick a
+vendor for each, then generate the invitation text and PDF and queue the
+emails. Every step goes through reflex.app.process, the same path a websocket
+event takes (state locking, the handler, delta computation), so handlers that
+block the loop (bcrypt, crew kickoffs, Mongo calls) hold up every other user
+exactly as they would in production.
+
+Backends:
+  * LLM and search: the requirement, budget, venue and vendor crews and the
+    Mistral invitation call are replaced by stubs that sleep the given latency
+    (blocking, like the real calls) and return canned results;
+  * SMTP: a local aiosmtpd relay that accepts everything;
+  * Mongo: the server at MONGO_URI (default mongodb://localhost:27017). The
+    users and events created by the run are deleted afterwards unless --keep.
+
+Reports throughput, per-handler latency percentiles and event-loop lag (how
+late a 10 ms timer fires while the users run).
+
+    pip install aiosmtpd
+    python benchmarks/bench_concurrent_planners.py --users 20 --ramp 10
+    python benchmarks/bench_concurrent_planners.py --users 50 --llm-latency 4 --search-latency 6
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import asyncio
+import argparse
+from collections import defaultdict
+from types import SimpleNamespace
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Reflex reads rxconfig.py from the working directory
+os.chdir(ROOT)
+
+PASSWORD = "Planner#2026"
+
+SERVICES = ["Venue", "Catering", "Decoration", "Photography", "Entertainment"]
+BUDGET_SPLIT = {"Venue": 200000, "Catering": 150000, "Decoration": 60000, "Photography": 50000,
+                "Entertainment": 40000}
+
+INVITATION_TEXT = ("A Celebration of Love\n\nTogether with their families, Aria and Kabir invite you to an "
+                   "evening of music, laughter and dinner under the stars.\n\nKindly RSVP by May 30.")
+
+
+class Latency:
+    llm = 2.0
+    search = 3.0
+    invitation = 1.5
+
+
+class StubCrew:
+    """Stands in for a CrewAI crew: blocks for the model's latency and returns a canned answer"""
+
+    def __init__(self, latency_attr, answer):
+        self.latency_attr = latency_attr
+        self.answer = answer
+
+    def kickoff(self, inputs=None):
+        time.sleep(getattr(Latency, self.latency_attr))
+        usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=300, successful_requests=2)
+        return SimpleNamespace(raw_output=self.answer(inputs or {}), token_usage=usage)
+
+
+def vendor_results(inputs):
+    service = inputs.get("service_type", "Venue")
+    return json.dumps([
+        {"name": f"{service} Co. {index}", "address": f"{index} Lake Road, {inputs.get('location', '')}",
+         "contact": f"+91 98000 0000{index}", "price": f"₹{40000 + index * 5000:,}", "rating": "4.5",
+         "description": f"Trusted {service.lower()} partner"}
+        for index in range(1, 6)
+    ])
+
+
+def install_stubs():
+    import agents
+    import tools
+    agents.create_requirements_crew = lambda: StubCrew("llm", lambda inputs: json.dumps(SERVICES))
+    agents.create_budget_crew = lambda: StubCrew("llm", lambda inputs: json.dumps(BUDGET_SPLIT))
+    agents.create_venue_search_crew = lambda: StubCrew("search", vendor_results)
+    agents.create_vendor_search_crew = lambda: StubCrew("search", vendor_results)
+
+    def complete_invitation(api, event_details):
+        time.sleep(Latency.invitation)
+        return INVITATION_TEXT
+
+    tools.MistralAPI.complete_invitation = complete_invitation
+    # MistralAPI only calls the model when it has a key; the stub above answers instead
+    os.environ.setdefault("MISTRAL_API_KEY", "load-test")
+
+
+class SinkHandler:
+    def __init__(self):
+        self.delivered = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered += 1
+        return "250 Message accepted"
+
+
+def start_smtp_sink():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = SinkHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port, auth_require_tls=False,
+                            authenticator=lambda *args: AuthResult(success=True))
+    controller.start()
+    os.environ.update({"EMAIL_SERVER": "127.0.0.1", "EMAIL_PORT": str(port), "EMAIL_USER": "host@example.com",
+                       "EMAIL_PASSWORD": "load-test", "EMAIL_USE_TLS": "0"})
+    return controller, handler
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Worker:
+    """One Reflex backend worker: the app, its state manager and the timings of every event"""
+
+    def __init__(self, planner):
+        from reflex.app import process
+        from reflex.event import Event
+        from reflex.state import _substate_key
+        self.planner = planner
+        self.app = planner.app
+        # Normally done while the app compiles its pages
+        self.app._enable_state()
+        self._process = process
+        self._event = Event
+        self._substate_key = _substate_key
+        self.timings = defaultdict(list)
+        self.failures = defaultdict(int)
+
+    async def send(self, user, state_cls, handler, path="/", query=None, **payload):
+        """Process one event the way the websocket handler does and wait for its last update"""
+        router_data = {"pathname": path, "asPath": path, "query": query or {}, "token": user.token,
+                       "sid": user.sid, "headers": {}, "ip": "127.0.0.1"}
+        event = self._event(token=user.token, name=f"{state_cls.get_full_name()}.{handler}",
+                            router_data=router_data, payload=payload)
+        start = time.perf_counter()
+        async for _ in self._process(self.app, event, user.sid, {}, "127.0.0.1"):
+            pass
+        self.timings[handler].append(time.perf_counter() - start)
+
+    async def read(self, user, state_cls, *names):
+        root = await self.app.state_manager.get_state(self._substate_key(user.token, state_cls))
+        state = await root.get_state(state_cls)
+        return [getattr(state, name) for name in names]
+
+    async def fail(self, user, state_cls, step):
+        [message] = await self.read(user, state_cls, "error_message")
+        self.failures[step] += 1
+        raise RuntimeError(f"{user.email}: {step} failed: {message}")
+
+
+class User:
+    def __init__(self, run_id, index):
+        self.token = str(uuid.uuid4())
+        self.sid = uuid.uuid4().hex
+        self.email = f"load-{run_id}-{index}@example.com"
+        self.name = f"Planner {index}"
+
+
+async def walk_flow(worker, user):
+    planner = worker.planner
+    auth, dashboard = planner.AuthState, planner.DashboardState
+    create, detail, invite = planner.CreateEventState, planner.EventDetailState, planner.InvitationState
+    send = worker.send
+
+    for field, value in (("name", user.name), ("email", user.email), ("password", PASSWORD),
+                         ("confirm_password", PASSWORD)):
+        await send(user, auth, f"set_{field}", value=value)
+    await send(user, auth, "handle_register", form_data={})
+    if not (await worker.read(user, auth, "is_authenticated"))[0]:
+        await worker.fail(user, auth, "handle_register")
+    await send(user, planner.State, "logout")
+    await send(user, auth, "set_email", value=user.email)
+    await send(user, auth, "set_password", value=PASSWORD)
+    await send(user, auth, "handle_login", form_data={})
+    if not (await worker.read(user, auth, "is_authenticated"))[0]:
+        await worker.fail(user, auth, "handle_login")
+    await send(user, dashboard, "fetch_user_events", path="/dashboard")
+
+    path = "/event/create"
+    for field, value in (("event_name", f"{user.name}'s Wedding"), ("event_type", "Wedding"),
+                         ("event_date", "2026-12-12"), ("num_guests", "150"), ("budget", "500000"),
+                         ("location", "Udaipur")):
+        await send(user, create, f"set_{field}", path=path, value=value)
+    await send(user, create, "create_event", path=path, form_data={})
+    event_id, services = await worker.read(user, create, "created_event_id", "generated_services")
+    if not services:
+        await worker.fail(user, create, "create_event")
+
+    path, query = f"/event/{event_id}", {"event_id": event_id}
+    await send(user, detail, "load_event_details", path=path, query=query)
+    for service in services:
+        name = service["service"]
+        await send(user, detail, "select_service_for_vendor", path=path, query=query, service_name=name)
+        await send(user, detail, "start_vendor_search", path=path, query=query, service_type=name)
+        [results] = await worker.read(user, detail, "vendor_search_results")
+        if not results:
+            await worker.fail(user, detail, "start_vendor_search")
+        await send(user, detail, "select_vendor", path=path, query=query, vendor=results[0].dict())
+
+    path = f"/event/{event_id}/invitation"
+    for field, value in (("invitation_venue_name", "Lake Palace"), ("invitation_venue_address", "Pichola, Udaipur"),
+                         ("invitation_time", "7:00 PM"), ("host_name", user.name),
+                         ("email_addresses", ", ".join(f"guest{i}@example.com" for i in range(3)))):
+        await send(user, invite, f"set_{field}", path=path, query=query, value=value)
+    await send(user, invite, "generate_invitation", path=path, query=query)
+    await send(user, invite, "generate_invitation_pdf", path=path, query=query)
+    if not (await worker.read(user, invite, "pdf_path"))[0]:
+        await worker.fail(user, invite, "generate_invitation_pdf")
+    await send(user, invite, "send_invitation_emails", path=path, query=query)
+    if not (await worker.read(user, invite, "email_success"))[0]:
+        await worker.fail(user, invite, "send_invitation_emails")
+
+
+async def monitor_lag(samples, stop, interval=0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+
+async def run(worker, users, ramp):
+    lag, stop = [], asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lag, stop))
+
+    async def start_user(index, user):
+        await asyncio.sleep(ramp * index / max(1, len(users)))
+        start = time.perf_counter()
+        await walk_flow(worker, user)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(start_user(i, user) for i, user in enumerate(users)), return_exceptions=True)
+    wall = time.perf_counter() - start
+    stop.set()
+    await monitor
+    return outcomes, wall, lag
+
+
+def cleanup(run_id, users):
+    from database import UserManager, EventManager
+    emails = [user.email for user in users]
+    user_manager = UserManager()
+    uids = [doc["uid"] for doc in user_manager.user_collection.find({"email": {"$in": emails}}, {"uid": 1})]
+    events = EventManager().event_collection.delete_many({"uid": {"$in": uids}}).deleted_count
+    accounts = user_manager.user_collection.delete_many({"email": {"$in": emails}}).deleted_count
+    print(f"Removed {accounts} users and {events} events of run {run_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which users start")
+    parser.add_argument("--llm-latency", type=float, default=Latency.llm, help="seconds per crew kickoff")
+    parser.add_argument("--search-latency", type=float, default=Latency.search,
+                        help="seconds per venue/vendor search")
+    parser.add_argument("--invitation-latency", type=float, default=Latency.invitation,
+                        help="seconds per invitation text")
+    parser.add_argument("--drain-timeout", type=float, default=60.0,
+                        help="seconds to wait for the outbox to deliver the queued emails")
+    parser.add_argument("--keep", action="store_true", help="keep the users and events the run created")
+    args = parser.parse_args()
+    Latency.llm, Latency.search, Latency.invitation = args.llm_latency, args.search_latency, args.invitation_latency
+
+    controller, sink = start_smtp_sink()
+    from AI_Event_Planner import AI_Event_Planner as planner
+    from email_outbox import start_outbox_workers, stop_outbox_workers
+    install_stubs()
+    start_outbox_workers()
+
+    run_id = uuid.uuid4().hex[:8]
+    users = [User(run_id, index) for index in range(args.users)]
+    worker = Worker(planner)
+    try:
+        outcomes, wall, lag = asyncio.run(run(worker, users, args.ramp))
+
+        flows = [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        events = sum(len(times) for times in worker.timings.values())
+        print(f"users={args.users} completed={len(flows)} failed={len(errors)} wall={wall:.1f}s  "
+              f"throughput={len(flows) / wall * 60:.1f} flows/min, {events / wall:.1f} events/s")
+        if flows:
+            print(f"flow duration: p50 {percentile(flows, 0.5):.1f}s  p95 {percentile(flows, 0.95):.1f}s  "
+                  f"max {max(flows):.1f}s")
+        for error in errors[:5]:
+            print(f"  {type(error).__name__}: {error}")
+
+        print(f"\n{'handler':<28} {'count':>6} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'max s':>8} {'failed':>6}")
+        ranked = sorted(worker.timings.items(), key=lambda item: -percentile(item[1], 0.95))
+        for handler, times in ranked:
+            print(f"{handler:<28} {len(times):>6} {percentile(times, 0.5):8.3f} {percentile(times, 0.95):8.3f} "
+                  f"{percentile(times, 0.99):8.3f} {max(times):8.3f} {worker.failures.get(handler, 0):>6}")
+
+        if lag:
+            print(f"\nevent-loop lag: p50 {percentile(lag, 0.5) * 1000:.1f} ms  p95 {percentile(lag, 0.95) * 1000:.1f} ms"
+                  f"  p99 {percentile(lag, 0.99) * 1000:.1f} ms  max {max(lag) * 1000:.1f} ms  "
+                  f"({len(lag)} samples)")
+
+        expected = 3 * len(flows)
+        deadline = time.monotonic() + args.drain_timeout
+        while sink.delivered < expected and time.monotonic() < deadline:
+            time.sleep(0.2)
+        print(f"emails delivered {sink.delivered}/{expected}")
+    finally:
+        stop_outbox_workers()
+        controller.stop()
+        if not args.keep:
+            cleanup(run_id, users)
+
+
+if __name__ == "__main__":
+    main()
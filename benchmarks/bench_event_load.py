@@ -0,0 +1,116 @@
+"""
+Event page load cost against a real MongoDB (MONGO_URI, default localhost).
+
+Seeds --events events into a scratch database, each carrying a --guests guest
+list and a delivery ledger, then replays --visits sessions. Each session opens
+an event's detail page and then its invitation page; --miss-rate of the
+sessions ask for an event id that doesn't exist.
+
+  * "before": each page load builds a new EventManager (and MongoClient) and
+    fetches the whole document. A miss also scans the collection for debug output.
+  * "after": one shared EventManager and the projected page query, with the
+    invitation page reusing the session's copy within the TTL.
+
+    python benchmarks/bench_event_load.py --events 500 --guests 500 --visits 200
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+import bson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import EventManager, EVENT_PAGE_FIELDS, get_mongo_client  # noqa: E402
+
+BENCH_DB = "EventWiseBench"
+
+
+def bench_manager():
+    manager = EventManager()
+    manager.event_collection = manager.client[BENCH_DB].eventdetails
+    return manager
+
+
+def seed(count, guests):
+    collection = get_mongo_client()[BENCH_DB].eventdetails
+    collection.drop()
+    collection.create_index("event_id")
+    docs = []
+    for i in range(count):
+        guest_list = [{"name": f"Guest {g}", "email": f"guest{g}@example.com", "table": str(g // 10),
+                       "plus_ones": g % 3} for g in range(guests)]
+        docs.append({
+            "event_id": f"evt_bench{i:06d}", "uid": "bench", "event_name": f"Bench Event {i}",
+            "event_category": "wedding", "event_date": "2026-06-13", "num_guests": guests, "budget": 500000,
+            "location": "Udaipur", "current_status": "services_planned",
+            "services": [{"service": f"Service {s}", "budget": 20000, "status": "pending", "selected_provider": None}
+                         for s in range(8)],
+            "guest_list": guest_list, "guest_list_source": "guests.csv",
+            "invitation_delivery": {f"k{g}": {"email": guest["email"], "status": "sent"}
+                                    for g, guest in enumerate(guest_list)},
+        })
+    collection.insert_many(docs)
+
+
+def sessions(count, events, miss_rate):
+    rng = random.Random(7)
+    return [f"evt_missing{i:06d}" if rng.random() < miss_rate else f"evt_bench{rng.randrange(events):06d}"
+            for i in range(count)]
+
+
+def before(visits):
+    received = 0
+    for event_id in visits:
+        for _page in ("detail", "invitation"):
+            manager = bench_manager()
+            event = manager.event_collection.find_one({"event_id": event_id})
+            if event:
+                received += len(bson.encode(event))
+            else:
+                received += sum(len(bson.encode(e)) for e in
+                                manager.event_collection.find({}, {"event_id": 1, "event_name": 1}))
+            manager.client.close()
+    return received
+
+
+def after(visits, ttl):
+    manager = bench_manager()
+    received = 0
+    for event_id in visits:
+        cached, loaded_at = None, 0.0
+        for _page in ("detail", "invitation"):
+            if cached and time.time() - loaded_at < ttl:
+                continue
+            event = manager.event_collection.find_one({"event_id": event_id}, EVENT_PAGE_FIELDS)
+            if event:
+                received += len(bson.encode(event))
+                cached, loaded_at = event, time.time()
+    return received
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--guests", type=int, default=500)
+    parser.add_argument("--visits", type=int, default=200)
+    parser.add_argument("--miss-rate", type=float, default=0.05)
+    parser.add_argument("--ttl", type=float, default=30)
+    args = parser.parse_args()
+
+    seed(args.events, args.guests)
+    visits = sessions(args.visits, args.events, args.miss_rate)
+    try:
+        for label, run in (("before", lambda: before(visits)), ("after", lambda: after(visits, args.ttl))):
+            start = time.perf_counter()
+            received = run()
+            elapsed = time.perf_counter() - start
+            print(f"{label:<7} {elapsed / args.visits * 1000:8.2f} ms per session  "
+                  f"{received / args.visits / 1024:9.1f} KB read per session")
+    finally:
+        get_mongo_client().drop_database(BENCH_DB)
+
+
+if __name__ == "__main__":
+    main()
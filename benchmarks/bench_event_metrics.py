@@ -0,0 +1,116 @@
+"""
+State-update latency of the event page's derived metrics.
+
+Replays --updates state updates (2,000 by default) against events with 10 to
+1,000 services. Most updates are unrelated to the services, such as a
+keystroke in a form field. Every --change-every-th update selects a provider,
+which changes the services.
+
+  * "per-var": the computed vars as they were. All thirteen (progress, budget,
+    completed and pending lists, the provider card fields, ...) are
+    re-evaluated on every update, each one rescanning the services.
+  * "cached": the vars are cached with explicit deps. The aggregates are
+    recomputed in one event_metrics pass only when the services or the
+    selected service change.
+
+    python benchmarks/bench_event_metrics.py --updates 2000 --change-every 50
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from event_metrics import service_metrics, days_until, provider_fields  # noqa: E402
+
+
+class Service:
+    """Stand-in for the EventService model"""
+    __slots__ = ("service", "budget", "status")
+
+    def __init__(self, service, budget, status):
+        self.service, self.budget, self.status = service, budget, status
+
+
+PROVIDER = {"name": "Royal Caterers", "address": "12 Lakeside Road", "contact": "+91 98765 43210",
+            "price": "45,000", "rating": "4.5", "source": "https://example.com/royal", "map_link": ""}
+
+
+def make_event(count):
+    services = [{"service": f"Service {i}", "budget": 1000 + i, "status": "completed" if i % 3 == 0 else "pending",
+                 "selected_provider": dict(PROVIDER) if i % 3 == 0 else None} for i in range(count)]
+    event = {"event_id": "evt-1", "event_date": "2026-06-13", "budget": 1000 * count * 2, "services": services}
+    return event, [Service(s["service"], s["budget"], s["status"]) for s in services]
+
+
+def per_var(event, event_services, service_details):
+    """Each computed var on its own, as the event page used to evaluate them"""
+    services = event.get("services", [])
+    values = {}
+    values["event_progress"] = (sum(1 for s in services if s.get("status") == "completed") / len(services)) * 100
+    try:
+        values["days_until_event"] = (datetime.strptime(event["event_date"], "%Y-%m-%d") - datetime.now()).days
+    except ValueError:
+        values["days_until_event"] = 0
+    values["overall_progress"] = (f"{sum(1 for s in event_services if s.status == 'completed')}/"
+                                  f"{len(event_services)} services completed")
+    used = 0
+    for s in services:
+        if s.get("status") == "completed" and s.get("selected_provider"):
+            used += s.get("budget", 0)
+    values["budget_used"] = used / event["budget"] * 100
+    values["completed_services"] = [s for s in services if s.get("status") == "completed"]
+    values["pending_services"] = [s for s in services if s.get("status") != "completed"]
+    completed = sum(1 for s in event_services if s.status == "completed")
+    values["progress_percentage"] = f"{completed / len(event_services) * 100}%"
+    provider = service_details.get("selected_provider") or {}
+    for key in ("name", "contact", "price", "address", "rating", "source", "map_link"):
+        values[key] = provider.get(key) or provider.get(key.capitalize()) or "N/A"
+    return values
+
+
+def cached(event, event_services, service_details, services_changed):
+    """Recompute only what the update invalidated"""
+    if services_changed:
+        cached.metrics = service_metrics(event, event_services)
+        cached.days = days_until(event.get("event_date"))
+        cached.provider = provider_fields(service_details)
+    return cached.metrics
+
+
+def replay(count, updates, change_every, compute):
+    event, event_services = make_event(count)
+    service_details = event["services"][0]
+    cached(event, event_services, service_details, True)
+    start = time.perf_counter()
+    for update in range(updates):
+        changed = update % change_every == 0
+        if changed:
+            index = update % count
+            event["services"][index]["status"] = "completed"
+            event["services"][index]["selected_provider"] = dict(PROVIDER)
+            event_services[index].status = "completed"
+            service_details = event["services"][index]
+        if compute is per_var:
+            per_var(event, event_services, service_details)
+        else:
+            cached(event, event_services, service_details, changed)
+    return (time.perf_counter() - start) / updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--change-every", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'services':>8} {'per-var us/update':>18} {'cached us/update':>17} {'speedup':>8}")
+    for count in (10, 100, 1000):
+        before = replay(count, args.updates, args.change_every, per_var)
+        after = replay(count, args.updates, args.change_every, cached)
+        print(f"{count:>8} {before * 1e6:18.1f} {after * 1e6:17.2f} {before / after:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Throughput and parity benchmark for the HTML extraction backends.
+
+Runs extraction.extract_page_text over a corpus of saved listing pages
+(benchmarks/corpus/<site>/*.html, e.g. venuelook, sulekha, weddingwire) with
+every backend, both through the full trafilatura chain and selector-only, and
+compares each backend's output with the bs4 reference.
+
+    python benchmarks/bench_extraction_backends.py --save https://www.venuelook.com/...
+    python benchmarks/bench_extraction_backends.py --rounds 5
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from extraction import (  # noqa: E402
+    extract_page_text, get_extraction_backend,
+    VENUE_CONTENT_SELECTORS, VENDOR_CONTENT_SELECTORS
+)
+from http_client import fetch_page, get_domain  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+BACKENDS = ["bs4", "lxml", "selectolax"]
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+}
+
+
+def save_pages(urls):
+    """Download pages into the corpus, grouped by site"""
+    for url in urls:
+        html = fetch_page(url, HEADERS, default_timeout=20, stop_markers=None)
+        if not html:
+            print(f"Could not fetch {url}")
+            continue
+        site = get_domain(url).split(".")[0]
+        os.makedirs(os.path.join(CORPUS_DIR, site), exist_ok=True)
+        name = f"{abs(hash(url)) & 0xffffffff:08x}.html"
+        with open(os.path.join(CORPUS_DIR, site, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"Saved {url} -> {site}/{name}")
+
+
+def load_corpus():
+    pages = []
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*", "*.html"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            site = os.path.basename(os.path.dirname(path))
+            selectors = VENUE_CONTENT_SELECTORS if site == "venuelook" else VENDOR_CONTENT_SELECTORS
+            pages.append((site, path, f.read(), selectors))
+    return pages
+
+
+def synthetic_corpus():
+    """Stand-in pages shaped like the listing sites, used when no corpus is saved"""
+    card = "<div class='card'><h3>Vendor {i}</h3><p>Rated 4.{r} by 120 customers, packages from Rs {p}</p></div>"
+    pages = []
+    for site, container in [("venuelook", "venue-details"), ("sulekha", "provider-info"), ("weddingwire", "vendor-info")]:
+        cards = "".join(card.format(i=i, r=i % 10, p=1000 + i * 50) for i in range(400))
+        html = (f"<html><head><script>var tracking = {{}};</script><style>.x{{}}</style></head><body>"
+                f"<nav>{'<a href=#>link</a>' * 200}</nav><main><div class='{container}'>{cards}</div></main>"
+                f"<footer><p>Copyright</p></footer></body></html>")
+        selectors = VENUE_CONTENT_SELECTORS if site == "venuelook" else VENDOR_CONTENT_SELECTORS
+        pages.append((site, f"synthetic:{site}", html, selectors))
+    return pages
+
+
+def run_backend(pages, backend, use_trafilatura, rounds):
+    outputs = {}
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for site, path, html, selectors in pages:
+            outputs[path] = extract_page_text(html, selectors, use_trafilatura=use_trafilatura, backend=backend)
+    elapsed = time.perf_counter() - start
+    return outputs, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", nargs="*", help="URLs to download into the corpus before benchmarking")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save)
+
+    pages = load_corpus()
+    if not pages:
+        print("No saved pages in benchmarks/corpus, using synthetic listing pages")
+        pages = synthetic_corpus()
+    total_mb = sum(len(html) for _, _, html, _ in pages) / 1024 / 1024
+    print(f"Corpus: {len(pages)} pages, {total_mb:.1f}MB\n")
+
+    for use_trafilatura in (True, False):
+        chain = "trafilatura + selectors" if use_trafilatura else "selectors only"
+        print(f"== {chain} ==")
+        reference, _ = run_backend(pages, "bs4", use_trafilatura, 1)
+        for name in BACKENDS:
+            backend = get_extraction_backend(name)
+            if backend.name != name:
+                print(f"{name:<11} not installed, skipped")
+                continue
+            outputs, elapsed = run_backend(pages, name, use_trafilatura, args.rounds)
+            throughput = len(pages) * args.rounds / elapsed
+            ratios = [
+                SequenceMatcher(None, reference[path] or "", outputs[path] or "").ratio()
+                for _, path, _, _ in pages
+            ]
+            exact = sum(1 for _, path, _, _ in pages if reference[path] == outputs[path])
+            print(f"{name:<11} {throughput:8.1f} pages/s  {total_mb * args.rounds / elapsed:6.1f}MB/s  "
+                  f"parity={sum(ratios) / len(ratios):.3f}  exact={exact}/{len(pages)}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
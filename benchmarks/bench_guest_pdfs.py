@@ -0,0 +1,111 @@
+"""
+Throughput benchmark for personalized guest PDFs.
+
+Renders one invitation per guest (name, table, plus-ones) for --guests guests
+(1,000 by default):
+
+  * into a zip, inline and through the process pool, reporting guests/s and
+    how soon the first bytes of the archive are ready to stream;
+  * straight into BulkInvitationSender against the local aiosmtpd relay from
+    bench_bulk_email.py, comparing "render everything, then send" with
+    handing each PDF to the sender as soon as it is rendered.
+
+    pip install aiosmtpd
+    python benchmarks/bench_guest_pdfs.py --guests 1000 --workers 4
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import guest_pdfs  # noqa: E402
+from guest_pdfs import iter_guest_zip, guest_recipients, shutdown_guest_pdf_pool  # noqa: E402
+from email_delivery import BulkInvitationSender, SMTPSettings  # noqa: E402
+from bench_bulk_email import RelayConfig, SinkHandler, SlowConnectController, free_port  # noqa: E402
+
+INVITATION = {
+    "event_name": "Aria & Kabir's Wedding",
+    "event_date": "Saturday, June 13, 2026",
+    "event_time": "6:30 PM",
+    "venue_name": "The Grand Palace Hall",
+    "venue_address": "12 Lakeside Road, Udaipur",
+    "host_name": "The Mehta Family",
+    "special_instructions": "Black tie optional",
+    "rsvp_contact": "rsvp@example.com",
+    "text": "Together With Their Families\n\n"
+            "Aria and Kabir request the honour of your presence as they begin their journey together.\n\n"
+            "Join us for an evening of music, laughter and celebration under the stars.",
+    "color_scheme": {"id": "elegant", "primary": "#4A4A4A", "secondary": "#E5E5E5", "accent": "#D4AF37"},
+    "font_style": {"id": "times", "heading": "Times-Bold", "body": "Times-Roman"},
+    "border_style": {"id": "floral"},
+    "background_color": {"id": "cream", "color": "#FFF8E1"},
+}
+
+
+def make_guests(count):
+    return [{"name": f"Guest Number {i}", "email": f"guest{i}@example.com",
+             "table": str(1 + i // 10), "plus_ones": i % 3} for i in range(count)]
+
+
+def measure_zip(label, guests, workers):
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in iter_guest_zip(INVITATION, guests, workers=workers):
+        if first is None and chunk:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:6.2f}s  {len(guests) / elapsed:7.1f} guests/s  "
+          f"first bytes after {first:.2f}s  zip {size / 1024 / 1024:.1f} MB")
+
+
+def measure_email(label, guests, workers, settings, streamed):
+    sender = BulkInvitationSender(settings, pool_size=4, rate_per_second=0, retry_backoff=0.05)
+    start = time.perf_counter()
+    recipients = guest_recipients(INVITATION, guests, workers=workers)
+    if not streamed:
+        recipients = list(recipients)
+    result = sender.send(recipients, "You're invited, {name}", "The Mehta Family",
+                         template_values={"event_name": INVITATION["event_name"], "additional_message": ""})
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:6.2f}s  {result['sent'] / elapsed:7.1f} guests/s  "
+          f"sent={result['sent']} failed={len(result['failed'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guests", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=max(1, guest_pdfs.GUEST_PDF_WORKERS))
+    parser.add_argument("--skip-email", action="store_true")
+    args = parser.parse_args()
+
+    guests = make_guests(args.guests)
+    try:
+        measure_zip("zip, inline", guests, 0)
+        # Start and warm the pool so its spawn cost is reported separately
+        start = time.perf_counter()
+        list(iter_guest_zip(INVITATION, guests[:guest_pdfs.GUEST_PDF_CHUNK * 2], workers=args.workers))
+        print(f"{'pool start + warm-up':<34} {time.perf_counter() - start:6.2f}s")
+        measure_zip(f"zip, pool ({args.workers} workers)", guests, args.workers)
+
+        if args.skip_email:
+            return
+        handler = SinkHandler()
+        port = free_port()
+        controller = SlowConnectController(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        RelayConfig.transient_fraction = 0.0
+        settings = SMTPSettings(host="127.0.0.1", port=port, user="host@example.com", password="", use_tls=False)
+        try:
+            measure_email("email, render all then send", guests, args.workers, settings, streamed=False)
+            measure_email("email, streamed into sender", guests, args.workers, settings, streamed=True)
+        finally:
+            controller.stop()
+    finally:
+        shutdown_guest_pdf_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Cold-start import cost of the planner modules, measured with `python -X importtime`.
+
+Imports each module in a fresh interpreter and reports the cumulative import
+time, the heaviest modules it pulled in, and whether any module that should
+load lazily (CrewAI, Mistral, ReportLab, Playwright, the HTML parsers) was
+imported anyway. Exits non-zero when a module loads a forbidden dependency or
+takes longer than --max-ms, so it can run as a regression check:
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --modules agents utils --max-ms 400 --runs 5
+
+A module whose own dependencies aren't installed is reported and skipped.
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module -> top-level packages it must not import
+FORBIDDEN = {
+    "agents": ("crewai", "crewai_tools", "mistralai", "reportlab", "playwright", "trafilatura", "bs4", "tools"),
+    "utils": ("crewai", "crewai_tools", "mistralai", "reportlab", "playwright", "trafilatura", "bs4", "tools"),
+    "tools": ("crewai_tools", "mistralai", "reportlab", "playwright", "trafilatura", "bs4", "pymongo", "bcrypt"),
+}
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def import_profile(module):
+    """[(name, self us, cumulative us, depth)] for one cold import of module, or the error"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            rows.append((name, int(own), int(cumulative), len(indent) // 2))
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    # -X importtime prints a module after everything it imported, so the
+    # module's subtree is the run of nested rows just above its own row
+    end = max(i for i, row in enumerate(rows) if row[0] == module and row[3] == 0)
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    return rows[start:end + 1], None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=list(FORBIDDEN))
+    parser.add_argument("--runs", type=int, default=3, help="cold imports per module, the fastest is reported")
+    parser.add_argument("--top", type=int, default=8, help="heaviest dependencies to list")
+    parser.add_argument("--max-ms", type=float, default=0, help="fail when a module takes longer (0: no budget)")
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        best = None
+        for _ in range(args.runs):
+            rows, error = import_profile(module)
+            if rows is None:
+                break
+            total = rows[-1][2]
+            if best is None or total < best[0]:
+                best = (total, rows)
+        if best is None:
+            print(f"{module:<8} skipped: {error}\n")
+            continue
+
+        total, rows = best
+        loaded = {name.split(".")[0] for name, _, _, _ in rows}
+        print(f"{module:<8} {total / 1000:8.1f} ms cumulative, {len(rows)} modules imported")
+        # Direct dependencies of the module, heaviest first
+        for name, _, cumulative, _ in sorted((row for row in rows if row[3] == 1), key=lambda row: -row[2])[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+        unexpected = sorted(loaded & set(FORBIDDEN.get(module, ())))
+        if unexpected:
+            failures.append(f"{module} imports {', '.join(unexpected)} at import time")
+        if args.max_ms and total / 1000 > args.max_ms:
+            failures.append(f"{module} took {total / 1000:.1f} ms, over the {args.max_ms:.0f} ms budget")
+        print()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Time-to-first-token benchmark for streamed invitation text.
+
+Starts a local mock of the chat completions endpoint that "generates" an
+invitation token by token (a fixed queueing delay, then one token every few
+milliseconds). With stream=false it answers with the complete JSON body once
+every token is done; with stream=true it sends server-sent events over chunked
+transfer encoding, like the real API.
+
+    python benchmarks/bench_invitation_stream.py --runs 10 --tokens 180 --token-ms 25
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_client import request_with_policy, stream_chat_completion  # noqa: E402
+
+INVITATION = ("You're Invited to a Night of Celebration! Join us as we gather under the stars "
+              "for an evening of music, laughter and unforgettable memories. ")
+
+
+class MockConfig:
+    queue_delay = 0.3
+    token_delay = 0.025
+    tokens = 180
+
+
+def tokens():
+    words = (INVITATION * 20).split(" ")
+    return [word + " " for word in words[:MockConfig.tokens]]
+
+
+class ChatCompletionsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(MockConfig.queue_delay)
+        if payload.get("stream"):
+            self._stream()
+        else:
+            self._complete()
+
+    def _complete(self):
+        time.sleep(MockConfig.token_delay * MockConfig.tokens)
+        body = json.dumps({"choices": [{"message": {"role": "assistant", "content": "".join(tokens())}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in tokens():
+            time.sleep(MockConfig.token_delay)
+            event = {"choices": [{"index": 0, "delta": {"content": token}}]}
+            self._chunk(f"data: {json.dumps(event)}\n\n".encode())
+        self._chunk(b"data: [DONE]\n\n")
+        self._chunk(b"")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--tokens", type=int, default=180)
+    parser.add_argument("--token-ms", type=float, default=25)
+    parser.add_argument("--queue-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    MockConfig.tokens = args.tokens
+    MockConfig.token_delay = args.token_ms / 1000
+    MockConfig.queue_delay = args.queue_ms / 1000
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChatCompletionsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    headers = {"Content-Type": "application/json", "Authorization": "Bearer test"}
+    payload = {"model": "mock", "messages": [{"role": "user", "content": "invite"}]}
+
+    blocking, streamed_first, streamed_total = [], [], []
+    try:
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            response = request_with_policy("POST", url, default_timeout=60, headers=headers, json=payload)
+            text = response.json()["choices"][0]["message"]["content"]
+            blocking.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            first = None
+            parts = []
+            for delta in stream_chat_completion(url, headers, payload, default_timeout=30):
+                if first is None:
+                    first = time.perf_counter() - start
+                parts.append(delta)
+            streamed_total.append(time.perf_counter() - start)
+            streamed_first.append(first)
+            assert "".join(parts) == text
+    finally:
+        server.shutdown()
+
+    print(f"{args.tokens} tokens at {args.token_ms:.0f} ms/token after {args.queue_ms:.0f} ms queueing, {args.runs} runs")
+    print(f"{'blocking: first text shown':<30} p50={percentile(blocking, 50):.3f}s  p95={percentile(blocking, 95):.3f}s")
+    print(f"{'streamed: first token':<30} p50={percentile(streamed_first, 50):.3f}s  p95={percentile(streamed_first, 95):.3f}s")
+    print(f"{'streamed: complete text':<30} p50={percentile(streamed_total, 50):.3f}s  p95={percentile(streamed_total, 95):.3f}s")
+    print(f"TTFT improvement: {percentile(blocking, 50) / percentile(streamed_first, 50):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Login throughput under concurrency, and what bcrypt does to the event loop.
+
+Runs --logins password checks, --concurrency at a time, on one event loop as a
+Reflex backend worker would, in three modes:
+
+  * inline: bcrypt.checkpw called from the async handler (the old behaviour);
+  * to_thread: the default executor, unbounded by anything but its size;
+  * pool: passwords.PasswordPool, the dedicated bounded pool the app uses.
+
+Reports logins/s, login latency percentiles, event-loop lag (how late a 10 ms
+timer fires meanwhile) and logins turned away because the pool was full.
+Hashes are made at --seed-rounds; when that differs from --rounds, pool mode
+also rehashes every password after it checks, as a login does when
+EVENTWISE_BCRYPT_ROUNDS changes.
+
+With --mongo, logins go through UserManager.login_user_async and the app's own
+password pool (sized by EVENTWISE_PASSWORD_WORKERS, EVENTWISE_BCRYPT_ROUNDS and
+EVENTWISE_PASSWORD_MAX_PENDING) against the server at MONGO_URI, with users
+created for the run and deleted afterwards.
+
+    python benchmarks/bench_login_throughput.py
+    python benchmarks/bench_login_throughput.py --logins 200 --concurrency 50 --rounds 12 --seed-rounds 10
+    EVENTWISE_BCRYPT_ROUNDS=12 python benchmarks/bench_login_throughput.py --mongo --seed-rounds 10
+"""
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+
+import bcrypt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from passwords import (  # noqa: E402
+    BCRYPT_ROUNDS, PASSWORD_MAX_PENDING, PASSWORD_WORKERS, PasswordPool, PasswordPoolBusy, get_password_pool,
+    hash_password
+)
+
+PASSWORD = "Sangeet#2026"
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def monitor_lag(samples, stop, interval=0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+
+def make_login(mode, pool, hashed, rehashed):
+    async def inline():
+        return bcrypt.checkpw(PASSWORD.encode(), hashed)
+
+    async def to_thread():
+        return await asyncio.to_thread(bcrypt.checkpw, PASSWORD.encode(), hashed)
+
+    async def pooled():
+        ok = await pool.check_async(PASSWORD, hashed)
+        if ok and pool.needs_rehash(hashed):
+            pool.submit(hash_password, PASSWORD, pool.rounds).add_done_callback(lambda _: rehashed.append(1))
+        return ok
+
+    return {"inline": inline, "to_thread": to_thread, "pool": pooled}[mode]
+
+
+async def run(login, logins, concurrency):
+    latencies, rejected, lag = [], [], []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lag, stop))
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            start = time.perf_counter()
+            try:
+                if not await login():
+                    raise RuntimeError("password check failed")
+            except PasswordPoolBusy:
+                rejected.append(1)
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    wall = time.perf_counter() - start
+    stop.set()
+    await monitor
+    return latencies, len(rejected), wall, lag
+
+
+def report(name, latencies, rejected, wall, lag, rehashed=0):
+    if not latencies:
+        print(f"{name:<10} every login was rejected")
+        return
+    print(f"{name:<10} {len(latencies) / wall:9.1f} {percentile(latencies, 0.5) * 1000:8.0f} "
+          f"{percentile(latencies, 0.95) * 1000:8.0f} {percentile(lag, 0.95) * 1000:10.1f} "
+          f"{max(lag) * 1000:9.1f} {rejected:>8} {rehashed:>8}")
+
+
+def mongo_login(users):
+    from database import get_user_manager
+    manager = get_user_manager()
+    remaining = list(users)
+
+    async def login():
+        email = remaining.pop() if remaining else users[0]
+        result = await manager.login_user_async(email, PASSWORD)
+        return result["success"]
+
+    return manager, login
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=25, help="logins in flight at once")
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS, help="bcrypt cost the app is configured with")
+    parser.add_argument("--seed-rounds", type=int, help="cost of the stored hashes (default: --rounds)")
+    parser.add_argument("--workers", type=int, default=PASSWORD_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=PASSWORD_MAX_PENDING)
+    parser.add_argument("--mongo", action="store_true", help="log in through UserManager against MONGO_URI")
+    args = parser.parse_args()
+    seed_rounds = args.seed_rounds or args.rounds
+
+    hashed = hash_password(PASSWORD, seed_rounds)
+    start = time.perf_counter()
+    bcrypt.checkpw(PASSWORD.encode(), hashed)
+    print(f"bcrypt cost {seed_rounds}: {(time.perf_counter() - start) * 1000:.0f} ms per check, "
+          f"{args.logins} logins, {args.concurrency} concurrent, pool of {args.workers} threads\n")
+    print(f"{'mode':<10} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'lag p95 ms':>10} {'lag max':>9} "
+          f"{'rejected':>8} {'rehashed':>8}")
+
+    def new_pool():
+        return PasswordPool(args.workers, args.max_pending, args.rounds)
+
+    if args.mongo:
+        run_id = uuid.uuid4().hex[:8]
+        emails = [f"login-bench-{run_id}-{i}@example.com" for i in range(args.logins)]
+        pool = get_password_pool()
+        manager, login = mongo_login(emails)
+        manager.user_collection.insert_many([{"uid": f"usr_{run_id}{i:04d}", "email": email, "password": hashed,
+                                              "name": f"Bench {i}"} for i, email in enumerate(emails)])
+        try:
+            latencies, rejected, wall, lag = asyncio.run(run(login, args.logins, args.concurrency))
+            pool._executor.shutdown(wait=True)  # let the rehashes land
+            rehashed = manager.user_collection.count_documents(
+                {"email": {"$in": emails}, "password": {"$ne": hashed}})
+            report("mongo", latencies, rejected, wall, lag, rehashed)
+        finally:
+            deleted = manager.user_collection.delete_many({"email": {"$in": emails}}).deleted_count
+            print(f"\nRemoved {deleted} users of run {run_id}")
+        return
+
+    for mode in ("inline", "to_thread", "pool"):
+        pool, rehashed = new_pool(), []
+        login = make_login(mode, pool, hashed, rehashed)
+        latencies, rejected, wall, lag = asyncio.run(run(login, args.logins, args.concurrency))
+        pool._executor.shutdown(wait=True)
+        report(mode, latencies, rejected, wall, lag, len(rehashed))
+
+
+if __name__ == "__main__":
+    main()
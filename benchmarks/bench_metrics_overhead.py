@@ -0,0 +1,168 @@
+"""
+Cost of the runtime metrics behind GET /metrics.
+
+Three measurements, each with metrics enabled and disabled (metrics.set_enabled,
+the same switch as EVENTWISE_METRICS=0):
+
+  * per update: Counter.inc, Histogram.observe, Histogram.time, the
+    in-flight gauge and an @observed call, in nanoseconds;
+  * page pipeline: a search's per-page work (fetch a listing page from a
+    local server through http_client, extract its text, count a cache lookup)
+    inside an @observed tool run. The two modes alternate page by page and
+    their medians are compared;
+  * scrape: rendering /metrics with every metric populated at production
+    label counts.
+
+Exits with status 1 if the pipeline overhead is above --max-overhead percent.
+
+    python benchmarks/bench_metrics_overhead.py
+    python benchmarks/bench_metrics_overhead.py --pages 200 --rounds 20 --max-overhead 2
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics  # noqa: E402
+from metrics import (  # noqa: E402
+    CACHE_REQUESTS, CREW_KICKOFF_SECONDS, HTTP_REQUEST_SECONDS, MONGO_OPERATION_SECONDS, SEARCHES_IN_FLIGHT,
+    TOOL_RUN_SECONDS, observed
+)
+from http_client import fetch_page_bytes  # noqa: E402
+from extraction import extract_page_text, VENUE_CONTENT_SELECTORS  # noqa: E402
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (bench)", "Accept": "text/html"}
+
+
+def listing_page(cards: int = 40) -> bytes:
+    card = ("<div class='venue-card'><h2>The Grand Palace Hall {i}</h2><p>A heritage banquet hall by the lake "
+            "with seating for 400 guests, in-house catering, valet parking and a lawn for the sangeet. "
+            "Packages from Rs {price} per plate, decor on request.</p><span class='rating'>4.{r}</span></div>")
+    body = "".join(card.format(i=i, price=900 + i * 25, r=i % 10) for i in range(cards))
+    return (f"<html><head><title>Venues in Udaipur</title></head><body><nav>Home | Venues</nav>"
+            f"<main class='listing'>{body}</main><footer>Contact us</footer></body></html>").encode("utf-8")
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    page = listing_page()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(self.page)))
+        self.end_headers()
+        self.wfile.write(self.page)
+
+    def log_message(self, *args):
+        pass
+
+
+def per_update_costs(iterations: int):
+    @observed(TOOL_RUN_SECONDS, tool="bench")
+    def tool_run():
+        pass
+
+    def time_gauge():
+        with SEARCHES_IN_FLIGHT.track_inprogress(kind="venue"):
+            pass
+
+    def time_block():
+        with CREW_KICKOFF_SECONDS.time(stage="bench"):
+            pass
+
+    updates = {
+        "Counter.inc": lambda: CACHE_REQUESTS.inc(cache="pdf_render", result="hit"),
+        "Histogram.observe": lambda: HTTP_REQUEST_SECONDS.observe(0.12, provider="pages", outcome="ok"),
+        "Histogram.time": time_block,
+        "Gauge.track_inprogress": time_gauge,
+        "@observed call": tool_run,
+    }
+    print(f"{'update':<24} {'enabled ns':>11} {'disabled ns':>12}")
+    for name, update in updates.items():
+        costs = []
+        for enabled in (True, False):
+            metrics.set_enabled(enabled)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                update()
+            costs.append((time.perf_counter() - start) / iterations * 1e9)
+        print(f"{name:<24} {costs[0]:11.0f} {costs[1]:12.0f}")
+    metrics.set_enabled(True)
+
+
+@observed(TOOL_RUN_SECONDS, tool="venue_search")
+def process_page(url: str):
+    body, encoding = fetch_page_bytes(url, HEADERS, default_timeout=5, stop_markers=None)
+    CACHE_REQUESTS.inc(cache="pdf_render", result="miss")
+    return extract_page_text(body.decode(encoding), VENUE_CONTENT_SELECTORS)
+
+
+def pipeline_overhead(url: str, pages: int, rounds: int) -> float:
+    for _ in range(10):
+        process_page(url)  # warm up connections, parsers and the latency tracker
+    timings = {True: [], False: []}
+    for round_index in range(rounds * pages):
+        # Alternate page by page so drift (GC, CPU frequency) hits both modes alike
+        enabled = round_index % 2 == 0
+        metrics.set_enabled(enabled)
+        start = time.perf_counter()
+        process_page(url)
+        timings[enabled].append(time.perf_counter() - start)
+    metrics.set_enabled(True)
+
+    on, off = statistics.median(timings[True]), statistics.median(timings[False])
+    overhead = (on - off) / off * 100
+    print(f"\npage pipeline ({rounds * pages} pages): enabled {on * 1000:.3f} ms/page, "
+          f"disabled {off * 1000:.3f} ms/page (medians), overhead {overhead:+.2f}%")
+    return overhead
+
+
+def scrape_cost(repeats: int):
+    for stage in ("requirements", "budget", "revision", "venue_search", "vendor_search"):
+        CREW_KICKOFF_SECONDS.observe(12.0, stage=stage, outcome="ok")
+    for tool in ("venue_search", "vendor_search", "budget_parser", "service_request_analyzer",
+                 "invitation_creator", "invitation_styler", "email_queue", "email_invitation"):
+        TOOL_RUN_SECONDS.observe(3.0, tool=tool, outcome="ok")
+    for command in ("find", "insert", "update", "aggregate", "delete", "findAndModify", "getMore", "count"):
+        MONGO_OPERATION_SECONDS.observe(0.004, command=command, outcome="ok")
+    for provider in ("serper", "mistral", "pages"):
+        for outcome in ("ok", "error"):
+            HTTP_REQUEST_SECONDS.observe(0.4, provider=provider, outcome=outcome)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        text = metrics.render_metrics()
+    elapsed = (time.perf_counter() - start) / repeats
+    series = sum(1 for line in text.splitlines() if line and not line.startswith("#"))
+    print(f"\nscrape: {series} series, {len(text) / 1024:.1f} KiB, {elapsed * 1000:.2f} ms per render")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200_000, help="updates per micro measurement")
+    parser.add_argument("--pages", type=int, default=100, help="pages per round")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--max-overhead", type=float, default=3.0, help="percent")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/venues/udaipur"
+    try:
+        per_update_costs(args.iterations)
+        overhead = pipeline_overhead(url, args.pages, args.rounds)
+        scrape_cost(20)
+    finally:
+        server.shutdown()
+
+    if overhead > args.max_overhead:
+        print(f"FAIL: overhead {overhead:.2f}% is above {args.max_overhead}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
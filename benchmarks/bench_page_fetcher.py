@@ -0,0 +1,108 @@
+"""
+Memory and latency benchmark for the streaming page fetcher.
+
+Serves large synthetic listing pages (and a binary response) from a local
+server and compares the old requests.get(...).text path with
+http_client.fetch_page, reporting wall time and peak traced memory.
+
+    python benchmarks/bench_page_fetcher.py --page-mb 20 --runs 5
+"""
+import os
+import sys
+import gzip
+import time
+import argparse
+import threading
+import tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_client import fetch_page  # noqa: E402
+
+HEADERS = {"User-Agent": "EventWise-bench", "Accept": "text/html,application/xhtml+xml"}
+
+
+def build_page(size_mb: float) -> bytes:
+    """A listing page whose useful content sits in <main>, followed by megabytes of cards and scripts"""
+    head = b"<html><head><title>Venues</title></head><body><main>"
+    main = b"<div class='venue-details'><p>Grand Banquet Hall, capacity 300, price per plate 900</p></div>" * 40
+    filler_card = b"<article class='card'><p>Other venue listing with reviews and photos</p></article>\n"
+    filler = filler_card * int(size_mb * 1024 * 1024 / len(filler_card))
+    return head + main + b"</main>" + filler + b"<script>var x = 1;</script></body></html>"
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    page = b""
+    page_gz = b""
+
+    def do_GET(self):
+        if self.path.startswith("/binary"):
+            body = os.urandom(5 * 1024 * 1024)
+            content_type = "application/octet-stream"
+            encoding = None
+        elif "gzip" in self.headers.get("Accept-Encoding", ""):
+            body, content_type, encoding = self.page_gz, "text/html; charset=utf-8", "gzip"
+        else:
+            body, content_type, encoding = self.page, "text/html; charset=utf-8", None
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The streaming fetcher hangs up early on purpose
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def measure(label, fn, runs):
+    times, peaks = [], []
+    for _ in range(runs):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    size = len(result) if result else 0
+    print(f"{label:<34} mean={sum(times) / runs * 1000:8.1f}ms  peak_mem={max(peaks) / 1024 / 1024:7.1f}MB  text_chars={size}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-mb", type=float, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    PageHandler.page = build_page(args.page_mb)
+    PageHandler.page_gz = gzip.compress(PageHandler.page)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"Synthetic page: {len(PageHandler.page) / 1024 / 1024:.1f}MB "
+          f"({len(PageHandler.page_gz) / 1024 / 1024:.1f}MB gzipped)")
+    try:
+        measure("requests.get().text (html)",
+                lambda: requests.get(f"{base}/page", headers=HEADERS, timeout=30).text, args.runs)
+        measure("fetch_page (html)",
+                lambda: fetch_page(f"{base}/page", HEADERS, default_timeout=30), args.runs)
+        measure("fetch_page (html, no stop marker)",
+                lambda: fetch_page(f"{base}/page", HEADERS, default_timeout=30, stop_markers=None), args.runs)
+        measure("requests.get().text (binary)",
+                lambda: requests.get(f"{base}/binary", headers=HEADERS, timeout=30).text, args.runs)
+        measure("fetch_page (binary)",
+                lambda: fetch_page(f"{base}/binary", HEADERS, default_timeout=30), args.runs)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Throughput benchmark for the process-pool parsing service.
+
+Simulates N concurrent searches (threads, like the search tools) that each parse
+a batch of listing pages, once inline on the calling thread and once through
+extraction.ParsingPool. While the searches run, a ticker thread measures how
+late it wakes up, which shows how much the parsing starves the rest of the
+process (the Reflex event loop in the app).
+
+    python benchmarks/bench_parsing_pool.py --searches 8 --pages 10 --workers 4
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from extraction import (  # noqa: E402
+    ParsingPool, VENDOR_CONTENT_SELECTORS, _extract_in_worker
+)
+
+
+def synthetic_page(seed: int, cards: int = 300) -> bytes:
+    """A listing page with many vendor cards, roughly the size of a real directory page"""
+    rng = random.Random(seed)
+    parts = ["<html><head><title>Vendors</title><script>var x = 1;</script></head><body>",
+             "<nav>" + "<a href='#'>link</a>" * 80 + "</nav><main>"]
+    for i in range(cards):
+        words = " ".join(rng.choice(["catering", "decor", "buffet", "wedding", "premium",
+                                     "budget", "guests", "menu", "service", "Mumbai"])
+                         for _ in range(30))
+        parts.append(f"<article class='vendor-card'><h3>Vendor {seed}-{i}</h3>"
+                     f"<p>{words}</p><span class='price'>Rs {rng.randint(500, 5000)}</span></article>")
+    parts.append("</main><footer>footer</footer></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+class LagProbe(threading.Thread):
+    """Sleeps in short ticks and records how late each wake-up is"""
+
+    def __init__(self, interval: float = 0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.lags = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            time.sleep(self.interval)
+            self.lags.append(time.perf_counter() - start - self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_searches(parse, pages, searches, pages_per_search):
+    def search(index):
+        for offset in range(pages_per_search):
+            parse(pages[(index + offset) % len(pages)])
+
+    probe = LagProbe()
+    probe.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=searches) as executor:
+        list(executor.map(search, range(searches)))
+    elapsed = time.perf_counter() - start
+    probe.stop()
+    return elapsed, probe.lags
+
+
+def report(label, elapsed, lags, total_pages):
+    lags = sorted(lags) or [0.0]
+    p99 = lags[min(len(lags) - 1, int(0.99 * (len(lags) - 1)))]
+    print(f"{label:<22} {elapsed:6.2f}s  {total_pages / elapsed:7.1f} pages/s  "
+          f"tick lag p99={p99 * 1000:6.1f}ms  max={lags[-1] * 1000:6.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=8, help="concurrent searches")
+    parser.add_argument("--pages", type=int, default=10, help="pages parsed per search")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    args = parser.parse_args()
+
+    pages = [synthetic_page(seed) for seed in range(16)]
+    total = args.searches * args.pages
+    print(f"{args.searches} searches x {args.pages} pages, "
+          f"{sum(len(p) for p in pages) // len(pages) // 1024} KB/page, {args.workers} workers")
+
+    def inline(body):
+        return _extract_in_worker(body, "utf-8", VENDOR_CONTENT_SELECTORS, 200, 200)
+
+    elapsed, lags = run_searches(inline, pages, args.searches, args.pages)
+    report("inline (no pool)", elapsed, lags, total)
+
+    pool = ParsingPool(workers=args.workers, max_pending=args.searches * 2)
+    started = time.perf_counter()
+    pool.start()
+    print(f"{'pool warm-up':<22} {time.perf_counter() - started:6.2f}s")
+    try:
+        elapsed, lags = run_searches(
+            lambda body: pool.extract(body, "utf-8", VENDOR_CONTENT_SELECTORS),
+            pages, args.searches, args.pages
+        )
+        report("process pool", elapsed, lags, total)
+        print(f"pool stats: {pool.stats()}")
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
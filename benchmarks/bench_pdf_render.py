@@ -0,0 +1,100 @@
+"""
+Per-render CPU benchmark for invitation PDFs.
+
+Renders --renders invitations (1,000 by default) into memory, cycling through
+the color schemes, fonts and borders. The "rebuilt per render" pass reproduces
+what each call used to pay: the style registry and the compiled decoration
+paths are cleared before every render, the sample stylesheet the old renderer
+started from is built, and streams are ASCII85 encoded. The "shared registry"
+pass renders the same invitations the way the app now does.
+
+    python benchmarks/bench_pdf_render.py --renders 1000
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import itertools
+
+from reportlab.lib.styles import getSampleStyleSheet
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import invitation_pdf  # noqa: E402
+from invitation_pdf import render_invitation_pdf  # noqa: E402
+
+COLORS = [
+    {"id": "elegant", "primary": "#4A4A4A", "secondary": "#E5E5E5", "accent": "#D4AF37"},
+    {"id": "birthday", "primary": "#FF5252", "secondary": "#FFECB3", "accent": "#FF8A80"},
+    {"id": "nature", "primary": "#2E7D32", "secondary": "#F1F8E9", "accent": "#AED581"},
+    {"id": "ocean", "primary": "#1565C0", "secondary": "#E3F2FD", "accent": "#81D4FA"},
+]
+FONTS = [
+    {"id": "times", "heading": "Times-Bold", "body": "Times-Roman"},
+    {"id": "helvetica", "heading": "Helvetica-Bold", "body": "Helvetica"},
+    {"id": "courier", "heading": "Courier-Bold", "body": "Courier"},
+]
+BORDERS = [None] + [{"id": b} for b in ("simple", "double", "dashed", "ornate", "floral")]
+BACKGROUND = {"id": "cream", "color": "#FFF8E1"}
+
+INVITATION = {
+    "event_name": "Aria & Kabir's Wedding",
+    "event_date": "Saturday, June 13, 2026",
+    "event_time": "6:30 PM",
+    "venue_name": "The Grand Palace Hall",
+    "venue_address": "12 Lakeside Road, Udaipur",
+    "host_name": "The Mehta Family",
+    "special_instructions": "Black tie optional",
+    "rsvp_contact": "rsvp@example.com",
+    "text": "Together With Their Families\n\n"
+            "Aria and Kabir request the honour of your presence as they begin their journey together.\n\n"
+            "Join us for an evening of music, laughter and celebration under the stars. "
+            "Dinner and dancing to follow.",
+}
+
+
+def invitations(count):
+    styles = itertools.cycle(itertools.product(COLORS, FONTS, BORDERS))
+    for _, (color, font, border) in zip(range(count), styles):
+        yield dict(INVITATION, color_scheme=color, font_style=font, border_style=border, background_color=BACKGROUND)
+
+
+def clear_registry():
+    invitation_pdf._build_styles.cache_clear()
+    invitation_pdf.decoration_steps.cache_clear()
+    invitation_pdf.hex_to_color.cache_clear()
+    invitation_pdf.BORDER_STEPS = {name: invitation_pdf.compile_ops(ops)
+                                   for name, ops in invitation_pdf._build_border_ops().items()}
+    getSampleStyleSheet()
+
+
+def measure(label, count, cold):
+    total_bytes = 0
+    wall, cpu = time.perf_counter(), time.process_time()
+    for invitation in invitations(count):
+        if cold:
+            clear_registry()
+        buffer = io.BytesIO()
+        render_invitation_pdf(invitation, buffer, ascii85=cold)
+        total_bytes += buffer.tell()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"{label:<24} {count} renders  cpu {cpu:6.2f}s  {cpu / count * 1000:6.2f} ms/render  "
+          f"wall {wall:6.2f}s  {total_bytes / count / 1024:5.1f} KB/pdf")
+    return cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Font metrics and imports load once per process either way
+    render_invitation_pdf(next(invitations(1)), io.BytesIO())
+
+    cold = measure("rebuilt per render", args.renders, cold=True)
+    warm = measure("shared registry", args.renders, cold=False)
+    print(f"CPU per render reduced {(1 - warm / cold) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
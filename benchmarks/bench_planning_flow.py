@@ -0,0 +1,171 @@
+"""
+Offline benchmark of the full planning flow, replayed from a recorded cassette.
+
+Record once against the live services (needs MISTRAL_API_KEY, SERPER_API_KEY
+and network access); every HTTP interaction, Serper and Mistral included, is
+written to the cassette with its latency:
+
+    python benchmarks/bench_planning_flow.py --record
+
+Then replay as often as needed. No network is used: responses come from the
+cassette after their recorded time to first byte, and bodies arrive over the
+recorded transfer time (scaled by --latency-scale, 0 for CPU cost only):
+
+    python benchmarks/bench_planning_flow.py --runs 5
+    python benchmarks/bench_planning_flow.py --stages venue_search vendor_search:Catering --latency-scale 0
+
+Stages: generate_services (requirements and budget crews), venue_search,
+vendor_search:<type> (one per vendor tool), invitation_text and
+invitation_pdf. Reports p50/p95 latency per stage and the calls made per run
+to Serper, Mistral and listing pages. Stages whose dependencies aren't
+installed are skipped.
+"""
+import os
+import io
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import cassettes  # noqa: E402
+from bench_guest_pdfs import INVITATION  # noqa: E402
+
+DEFAULT_CASSETTE = os.path.join(ROOT, "benchmarks", "cassettes", "planning_flow.jsonl")
+
+EVENT = {
+    "event_name": "Aria & Kabir's Wedding",
+    "event_category": "wedding",
+    "event_date": "2026-06-13",
+    "num_guests": 200,
+    "budget": 500000,
+    "location": "Udaipur",
+}
+
+# One service type per vendor tool (Transportation goes to the generic one)
+VENDOR_TYPES = ("Catering", "Decoration", "Photography", "Cake", "Entertainment", "Transportation")
+
+INVITATION_DETAILS = {
+    "event_name": EVENT["event_name"], "event_type": EVENT["event_category"], "event_date": EVENT["event_date"],
+    "formatted_date": "Saturday, June 13, 2026", "event_time": "6:30 PM", "venue_name": "The Grand Palace Hall",
+    "venue_address": "12 Lakeside Road, Udaipur", "host_name": "The Mehta Family", "guest_count": 200,
+    "special_instructions": "Black tie optional", "rsvp_contact": "rsvp@example.com", "style_preference": "elegant",
+}
+
+
+def generate_services():
+    """What CreateEventState.generate_services runs: requirements, then the budget split"""
+    import json
+    from agents import create_requirements_crew, create_budget_crew
+    from utils import parse_services_and_budget, extract_text_from_crew_output
+    details = dict(EVENT)
+    requirements = extract_text_from_crew_output(create_requirements_crew().kickoff(inputs=details))
+    try:
+        details["services"] = json.dumps(json.loads(requirements))
+    except ValueError:
+        details["services"] = json.dumps(["Venue", "Catering", "Decoration", "Photography", "Music"])
+    budget = extract_text_from_crew_output(create_budget_crew().kickoff(inputs=details))
+    return parse_services_and_budget(requirements, budget)
+
+
+def venue_search():
+    from tools import UniversalVenueServiceTool
+    return UniversalVenueServiceTool()._run(EVENT["location"], EVENT["event_category"], "banquet hall",
+                                            EVENT["num_guests"], 200000)
+
+
+def vendor_search(service_type):
+    from tools import VendorToolsManager
+    return VendorToolsManager()._run(service_type, EVENT["location"], EVENT["event_category"], 50000)
+
+
+def invitation_text():
+    from tools import MistralAPI
+    return MistralAPI().complete_invitation(INVITATION_DETAILS)
+
+
+def invitation_pdf():
+    from invitation_pdf import render_invitation_pdf
+    output = io.BytesIO()
+    render_invitation_pdf(INVITATION, output)
+    return output.getvalue()
+
+
+def all_stages():
+    stages = {"generate_services": generate_services, "venue_search": venue_search}
+    for service_type in VENDOR_TYPES:
+        stages[f"vendor_search:{service_type}"] = lambda service_type=service_type: vendor_search(service_type)
+    stages["invitation_text"] = invitation_text
+    stages["invitation_pdf"] = invitation_pdf
+    return stages
+
+
+def reset_http_state():
+    """Start every run with cold latency stats and closed breakers, as a fresh process would"""
+    import http_client
+    http_client.latency_tracker.reset()
+    with http_client._breakers_lock:
+        http_client._breakers.clear()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--record", action="store_true", help="run each stage once live and record it")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--stages", nargs="+", help="subset of stages to run (default: all)")
+    args = parser.parse_args()
+
+    stages = all_stages()
+    selected = args.stages or list(stages)
+    unknown = [name for name in selected if name not in stages]
+    if unknown:
+        parser.error(f"unknown stages {unknown}; choose from {list(stages)}")
+
+    if args.record:
+        if os.path.exists(args.cassette):
+            os.remove(args.cassette)
+        cassettes.install_recorder(args.cassette)
+        runs = 1
+    else:
+        if not os.path.exists(args.cassette):
+            parser.error(f"{args.cassette} not found; record it first with --record")
+        replayer = cassettes.install_replayer(args.cassette, args.latency_scale)
+        # The tools refuse to run without keys; the replayer never sends them anywhere
+        os.environ.setdefault("MISTRAL_API_KEY", "replay")
+        os.environ.setdefault("SERPER_API_KEY", "replay")
+        runs = args.runs
+
+    print(f"{'stage':<28} {'runs':>4} {'p50 s':>8} {'p95 s':>8} {'serper':>7} {'mistral':>8} {'pages':>6} "
+          f"{'misses':>6}")
+    for name in selected:
+        timings = []
+        before = {} if args.record else replayer.stats()
+        try:
+            for _ in range(runs):
+                reset_http_state()
+                start = time.perf_counter()
+                stages[name]()
+                timings.append(time.perf_counter() - start)
+        except ImportError as e:
+            print(f"{name:<28} skipped: {e}")
+            continue
+        if args.record:
+            print(f"{name:<28} {runs:>4} {timings[0]:8.3f} {timings[0]:8.3f}  recorded")
+            continue
+        after = replayer.stats()
+        calls = {provider: (after["calls"].get(provider, 0) - before["calls"].get(provider, 0)) / runs
+                 for provider in ("serper", "mistral", "pages")}
+        print(f"{name:<28} {runs:>4} {percentile(timings, 0.5):8.3f} {percentile(timings, 0.95):8.3f} "
+              f"{calls['serper']:7.1f} {calls['mistral']:8.1f} {calls['pages']:6.1f} "
+              f"{after['misses'] - before['misses']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Per-page state cost of the Reflex app, one monolithic State versus substates.
+
+Reflex stores every state class as its own record. An event loads and saves
+the record of its state and of each state above it, and a page hydrates with
+the vars of the states it renders. This script reads the state classes out of
+AI_Event_Planner.py with `ast` (reflex does not need to be installed), fills
+the heavy vars with data the size of a real session (an event with a 200 guest
+list, vendor results, the 48 style preview thumbnails, ...) and compares:
+
+  * "monolith": every var in one State, as before the split;
+  * "substates": State plus the substates of the page.
+
+For each page it reports the hydrate payload (JSON sent to the browser), the
+bytes pickled per event and the time spent loading and saving state per event.
+Computed vars are left out of both sides.
+
+    python benchmarks/bench_state_payload.py --events 2000
+"""
+import os
+import ast
+import sys
+import json
+import time
+import pickle
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+APP = os.path.join(ROOT, "AI_Event_Planner", "AI_Event_Planner.py")
+
+# Page -> the most specific state its components and handlers use
+PAGES = {
+    "landing": "AuthState",
+    "dashboard": "DashboardState",
+    "create event": "CreateEventState",
+    "event detail": "EventDetailState",
+    "invitation": "InvitationState",
+    "style previews": "StylePreviewState",
+}
+
+INVITATION_TEXT = ("Together With Their Families\n\nAria and Kabir request the honour of your presence as they "
+                   "begin their journey together.\n\nJoin us for an evening of music, laughter and celebration "
+                   "under the stars. Dinner and dancing to follow.\n\n") * 3
+
+
+def read_states(path):
+    """{class name: (base name, {var: default}, {method: literal return})} for the rx.State classes"""
+    tree = ast.parse(open(path, encoding="utf-8").read())
+    states = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef) or not node.bases:
+            continue
+        base = ast.unparse(node.bases[0])
+        if base != "rx.State" and base not in states:
+            continue
+        variables, literals = {}, {}
+        for item in node.body:
+            if isinstance(item, ast.AnnAssign) and item.value is not None:
+                try:
+                    variables[item.target.id] = ast.literal_eval(item.value)
+                except ValueError:
+                    variables[item.target.id] = None
+            elif isinstance(item, ast.FunctionDef) and isinstance(item.body[-1], ast.Return):
+                try:
+                    literals[item.name] = ast.literal_eval(item.body[-1].value)
+                except (ValueError, TypeError):
+                    pass
+        states[node.name] = (base, variables, literals)
+    return states
+
+
+def chain(states, name):
+    names = []
+    while name in states:
+        names.insert(0, name)
+        name = states[name][0]
+    return names
+
+
+def guests(count):
+    return [{"name": f"Guest Number {i}", "email": f"guest{i}@example.com", "table": str(1 + i // 10),
+             "plus_ones": i % 3} for i in range(count)]
+
+
+def vendors(count):
+    return [{"name": f"Vendor {i}", "address": f"{i} Market Street, Udaipur", "contact": "+91 98765 43210",
+             "price": "45,000 - 60,000", "rating": "4.5", "description": "Full service caterer with live counters "
+             "and a tasting session included.", "source": f"https://example.com/vendors/{i}",
+             "map_link": f"https://maps.example.com/?q=vendor+{i}"} for i in range(count)]
+
+
+def event(index, guest_count=0):
+    services = [{"service": name, "budget": 20000 + 5000 * i, "status": "completed" if i % 2 else "pending",
+                 "selected_provider": vendors(1)[0] if i % 2 else None}
+                for i, name in enumerate(["Venue", "Catering", "Decoration", "Photography", "Music",
+                                          "Wedding Attire", "Invitations", "Transportation"])]
+    data = {"event_id": f"evt-{index:04d}", "event_name": f"Aria & Kabir's Wedding {index}",
+            "event_category": "wedding", "event_date": "2026-06-13", "location": "Udaipur", "num_guests": 200,
+            "budget": 500000, "services": services}
+    if guest_count:
+        data["guest_list"] = guests(guest_count)
+    return data
+
+
+def style_previews(literals):
+    """The real preview grid, rendered once with the app's option lists"""
+    from invitation_previews import render_previews
+    colors = literals["_get_color_options"]
+    font = literals["_get_font_options"][0]
+    background = literals["_get_background_options"][1]
+    combos = [{"color": color, "font": font, "border": border, "background": background}
+              for color in colors for border in literals["_get_border_options"]]
+    invitation = {"text": INVITATION_TEXT, "event_name": "Aria & Kabir's Wedding", "venue_name": "Grand Palace"}
+    return render_previews(invitation, combos, workers=0)
+
+
+def session_values(literals):
+    """What the heavy vars hold once a user has walked through every page"""
+    current = event(0, guest_count=200)
+    return {
+        "user_events": [event(i) for i in range(12)],
+        "generated_services": [{"service": s["service"], "budget": s["budget"]} for s in current["services"]],
+        "current_event": current,
+        "event_services": current["services"],
+        "service_details": current["services"][1],
+        "search_results": vendors(10),
+        "vendor_search_results": vendors(10),
+        "invitation_text": INVITATION_TEXT,
+        "color_options": literals["_get_color_options"],
+        "font_options": literals["_get_font_options"],
+        "border_options": literals["_get_border_options"],
+        "background_options": literals["_get_background_options"],
+        "style_previews": style_previews(literals),
+        "_guest_list": current["guest_list"],
+        "guest_list_problems": [f"Row {i}: no name or email, skipped" for i in range(5)],
+    }
+
+
+def filled(variables, values):
+    return {name: values.get(name, default) for name, default in variables.items()}
+
+
+def measure(records, events):
+    """Load and save every record once per event, as the Redis state manager does"""
+    pickled = [pickle.dumps(record) for record in records]
+    start = time.perf_counter()
+    for _ in range(events):
+        pickled = [pickle.dumps(pickle.loads(data)) for data in pickled]
+    return sum(len(data) for data in pickled), (time.perf_counter() - start) / events
+
+
+def hydrate_size(records):
+    sent = {name: value for record in records for name, value in record.items() if not name.startswith("_")}
+    return len(json.dumps(sent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+
+    states = read_states(APP)
+    literals = {}
+    for _, _, methods in states.values():
+        literals.update(methods)
+    values = session_values(literals)
+
+    monolith = {}
+    for _, variables, _ in states.values():
+        monolith.update(filled(variables, values))
+    mono_bytes, mono_time = measure([monolith], args.events)
+    mono_hydrate = hydrate_size([monolith])
+    print(f"{len(monolith)} vars in {len(states)} state classes, {args.events} events per page\n")
+    print(f"{'page':<14} {'layout':<10} {'hydrate KB':>10} {'pickled KB':>10} {'load+save us':>13}")
+
+    for page, leaf in PAGES.items():
+        records = [filled(states[name][1], values) for name in chain(states, leaf)]
+        size, elapsed = measure(records, args.events)
+        print(f"{page:<14} {'monolith':<10} {mono_hydrate / 1024:10.1f} {mono_bytes / 1024:10.1f} "
+              f"{mono_time * 1e6:13.0f}")
+        print(f"{'':<14} {'substates':<10} {hydrate_size(records) / 1024:10.1f} {size / 1024:10.1f} "
+              f"{elapsed * 1e6:13.0f}")
+
+
+if __name__ == "__main__":
+    main()
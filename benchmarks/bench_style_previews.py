@@ -0,0 +1,86 @@
+"""
+Renders-per-second benchmark for invitation style previews.
+
+Renders the preview grid (every color scheme x border for one font and
+background, 48 thumbnails) and the full style space (1536 combinations)
+inline and through the process pool.
+
+    python benchmarks/bench_style_previews.py --workers 4
+"""
+import os
+import sys
+import time
+import argparse
+import itertools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import invitation_previews  # noqa: E402
+from invitation_previews import render_previews, shutdown_preview_pool  # noqa: E402
+
+COLORS = [
+    {"id": "elegant", "name": "Elegant Gold", "primary": "#4A4A4A", "secondary": "#E5E5E5", "accent": "#D4AF37"},
+    {"id": "birthday", "name": "Birthday Pink", "primary": "#FF5252", "secondary": "#FFECB3", "accent": "#FF8A80"},
+    {"id": "nature", "name": "Nature Green", "primary": "#2E7D32", "secondary": "#F1F8E9", "accent": "#AED581"},
+    {"id": "ocean", "name": "Ocean Blue", "primary": "#1565C0", "secondary": "#E3F2FD", "accent": "#81D4FA"},
+    {"id": "vintage", "name": "Vintage Brown", "primary": "#5D4037", "secondary": "#EFEBE9", "accent": "#A1887F"},
+    {"id": "pastel", "name": "Pastel Purple", "primary": "#9575CD", "secondary": "#EDE7F6", "accent": "#B39DDB"},
+    {"id": "wedding", "name": "Wedding Silver", "primary": "#455A64", "secondary": "#ECEFF1", "accent": "#B0BEC5"},
+    {"id": "formal", "name": "Formal Black", "primary": "#212121", "secondary": "#F5F5F5", "accent": "#9E9E9E"},
+]
+FONTS = [
+    {"id": "times", "name": "Times (Classic)", "heading": "Times-Bold", "body": "Times-Roman"},
+    {"id": "helvetica", "name": "Helvetica (Modern)", "heading": "Helvetica-Bold", "body": "Helvetica"},
+    {"id": "courier", "name": "Courier (Typewriter)", "heading": "Courier-Bold", "body": "Courier"},
+    {"id": "zapfdingbats", "name": "Zapf Dingbats (Decorative)", "heading": "ZapfDingbats", "body": "Helvetica"},
+]
+BORDERS = [{"id": b, "name": b.title()} for b in ("none", "simple", "double", "dashed", "ornate", "floral")]
+BACKGROUNDS = [{"id": f"bg{i}", "name": f"Background {i}", "color": c} for i, c in enumerate(
+    ("#FFFFFF", "#FFF8E1", "#FFEEF8", "#E3F2FD", "#F1F8E9", "#F3E5F5", "#F5F5DC", "#F5F5F5"))]
+
+INVITATION = {
+    "event_name": "Aria & Kabir's Wedding",
+    "venue_name": "The Grand Palace Hall",
+    "text": "Together With Their Families\n\n"
+            "Aria and Kabir request the honour of your presence as they begin their journey together. "
+            "Join us for an evening of music, laughter and celebration under the stars.\n\n"
+            "Dinner and dancing to follow. Your presence is the greatest gift of all.",
+}
+
+
+def combos(colors, fonts, borders, backgrounds):
+    return [{"color": c, "font": f, "border": b, "background": bg}
+            for c, f, b, bg in itertools.product(colors, fonts, borders, backgrounds)]
+
+
+def measure(label, grid, workers):
+    start = time.perf_counter()
+    previews = render_previews(INVITATION, grid, workers=workers)
+    elapsed = time.perf_counter() - start
+    assert len(previews) == len(grid)
+    print(f"{label:<34} {len(grid):5d} thumbnails  {elapsed:6.2f}s  {len(grid) / elapsed:7.1f} renders/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=invitation_previews.PREVIEW_WORKERS)
+    args = parser.parse_args()
+
+    page_grid = combos(COLORS, FONTS[:1], BORDERS, BACKGROUNDS[1:2])
+    full_grid = combos(COLORS, FONTS, BORDERS, BACKGROUNDS)
+
+    measure("page grid, inline (cold caches)", page_grid, 0)
+    measure("page grid, inline (warm caches)", page_grid, 0)
+    measure("full space, inline", full_grid, 0)
+
+    start = time.perf_counter()
+    render_previews(INVITATION, page_grid[:2], workers=args.workers)
+    print(f"{'pool start + warm-up':<34} {time.perf_counter() - start:18.2f}s")
+    try:
+        measure(f"page grid, pool ({args.workers} workers)", page_grid, args.workers)
+        measure(f"full space, pool ({args.workers} workers)", full_grid, args.workers)
+    finally:
+        shutdown_preview_pool()
+
+
+if __name__ == "__main__":
+    main()
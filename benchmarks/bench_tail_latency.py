@@ -0,0 +1,117 @@
+"""
+Tail-latency benchmark for adaptive timeouts and hedged page fetches.
+
+Starts a local stub server whose response time is drawn from a heavy-tailed
+distribution, then fetches from it with the old fixed-timeout requests.get and
+with http_client.request_with_policy (adaptive timeout + hedging).
+
+    python benchmarks/bench_tail_latency.py --requests 300 --slow-fraction 0.05
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_client import request_with_policy, latency_tracker  # noqa: E402
+
+
+class LatencyConfig:
+    fast_mean = 0.08
+    slow_fraction = 0.05
+    slow_latency = 3.0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves a small HTML page after an injected delay"""
+
+    def do_GET(self):
+        if random.random() < LatencyConfig.slow_fraction:
+            delay = LatencyConfig.slow_latency * random.uniform(0.8, 1.5)
+        else:
+            delay = random.expovariate(1 / LatencyConfig.fast_mean)
+        time.sleep(delay)
+        body = b"<html><body><main>" + b"<p>venue details</p>" * 50 + b"</main></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def run(fetch, url, count, concurrency):
+    latencies = []
+    failures = 0
+
+    def one(_):
+        start = time.monotonic()
+        try:
+            fetch(url)
+            return time.monotonic() - start, True
+        except Exception:
+            return time.monotonic() - start, False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for elapsed, ok in executor.map(one, range(count)):
+            latencies.append(elapsed)
+            failures += 0 if ok else 1
+    return latencies, failures
+
+
+def report(label, latencies, failures):
+    print(f"{label:<28} p50={percentile(latencies, 50):.3f}s  p95={percentile(latencies, 95):.3f}s  "
+          f"p99={percentile(latencies, 99):.3f}s  max={max(latencies):.3f}s  failures={failures}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=3.0)
+    args = parser.parse_args()
+
+    LatencyConfig.slow_fraction = args.slow_fraction
+    LatencyConfig.slow_latency = args.slow_latency
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/venue"
+
+    try:
+        baseline, baseline_failures = run(
+            lambda u: requests.get(u, timeout=8), url, args.requests, args.concurrency
+        )
+        report("fixed timeout (8s)", baseline, baseline_failures)
+
+        latency_tracker.reset()
+        # Warm the histogram so the adaptive policy has a p95/p99 to work with
+        run(lambda u: request_with_policy("GET", u, default_timeout=8), url, 40, args.concurrency)
+        adaptive, adaptive_failures = run(
+            lambda u: request_with_policy("GET", u, default_timeout=8, hedge=True),
+            url, args.requests, args.concurrency
+        )
+        report("adaptive timeout + hedging", adaptive, adaptive_failures)
+
+        improvement = percentile(baseline, 99) / max(percentile(adaptive, 99), 1e-6)
+        print(f"p99 improvement: {improvement:.1f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
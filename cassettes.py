@@ -0,0 +1,266 @@
+import os
+import io
+import json
+import time
+import base64
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Record every outbound HTTP interaction of this process into a cassette, or
+# serve them from one instead of the network (benchmarks, offline runs)
+RECORD_CASSETTE = os.environ.get("EVENTWISE_RECORD_CASSETTE")
+REPLAY_CASSETTE = os.environ.get("EVENTWISE_REPLAY_CASSETTE")
+# Recorded latencies are multiplied by this on replay (0 replays instantly)
+REPLAY_LATENCY_SCALE = float(os.environ.get("EVENTWISE_REPLAY_LATENCY_SCALE", 1.0))
+
+REPLAY_CHUNK_BYTES = 16 * 1024
+
+# Headers that describe the wire encoding; cassettes store the decoded body
+WIRE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def provider_for(url: str) -> str:
+    host = urlparse(url).netloc
+    if host.endswith("serper.dev"):
+        return "serper"
+    if host.endswith("mistral.ai"):
+        return "mistral"
+    return "pages"
+
+
+def _body_bytes(body: Any) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    return b""  # generators and files are not matched on
+
+
+def request_key(method: str, url: str, body: Any) -> str:
+    return f"{method.upper()} {url} {hashlib.sha1(_body_bytes(body)).hexdigest()[:16]}"
+
+
+class Cassette:
+    """Recorded interactions, one JSON object per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, interaction: Dict[str, Any]):
+        line = json.dumps(interaction) + "\n"
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def load(self) -> List[Dict[str, Any]]:
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+def interaction(method: str, url: str, request_body: Any, status: int, headers: Dict[str, str],
+                body: bytes, ttfb: float, total: float) -> Dict[str, Any]:
+    return {
+        "key": request_key(method, url, request_body),
+        "method": method.upper(),
+        "url": url,
+        "provider": provider_for(url),
+        "status": status,
+        "headers": {k: v for k, v in headers.items() if k.lower() not in WIRE_HEADERS},
+        "body": base64.b64encode(body).decode("ascii"),
+        "ttfb": round(ttfb, 4),
+        "total": round(total, 4),
+        "recorded_at": time.time(),
+    }
+
+
+class _ReplayBody(io.RawIOBase):
+    """Response body that arrives over the recorded transfer time"""
+
+    def __init__(self, body: bytes, seconds: float):
+        self._body = io.BytesIO(body)
+        self._size = max(1, len(body))
+        self._seconds = seconds
+
+    def readable(self):
+        return True
+
+    def read(self, amt: int = -1) -> bytes:
+        data = self._body.read(amt if amt and amt > 0 else -1)
+        if data and self._seconds > 0:
+            time.sleep(self._seconds * len(data) / self._size)
+        return data
+
+    def release_conn(self):
+        pass
+
+
+class Replayer:
+    """Serves recorded interactions: exact request first, then the same method and URL"""
+
+    def __init__(self, interactions: List[Dict[str, Any]], latency_scale: float = REPLAY_LATENCY_SCALE):
+        self.latency_scale = latency_scale
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._by_url: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for item in interactions:
+            self._by_key[item["key"]].append(item)
+            self._by_url[(item["method"], item["url"])].append(item)
+        self._served: Dict[str, int] = defaultdict(int)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.misses: List[str] = []
+        self._lock = threading.Lock()
+
+    def match(self, method: str, url: str, body: Any) -> Optional[Dict[str, Any]]:
+        key = request_key(method, url, body)
+        with self._lock:
+            for lookup, candidates in ((key, self._by_key.get(key)),
+                                       (f"{method.upper()} {url}", self._by_url.get((method.upper(), url)))):
+                if candidates:
+                    # Repeated requests get the recorded responses in order, then start over
+                    item = candidates[self._served[lookup] % len(candidates)]
+                    self._served[lookup] += 1
+                    self.calls[item["provider"]] += 1
+                    return item
+            self.misses.append(key)
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"calls": dict(self.calls), "misses": len(self.misses)}
+
+    def respond(self, item: Dict[str, Any], request: requests.PreparedRequest, stream: bool) -> requests.Response:
+        if self.latency_scale:
+            time.sleep(item["ttfb"] * self.latency_scale)
+        body = base64.b64decode(item["body"])
+        response = requests.Response()
+        response.status_code = item["status"]
+        response.headers = CaseInsensitiveDict(item["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = item["url"]
+        response.request = request
+        response.reason = "Replayed"
+        response.raw = _ReplayBody(body, max(0.0, item["total"] - item["ttfb"]) * self.latency_scale)
+        if not stream:
+            response.content  # noqa: B018 - read the body now, as requests does without stream=True
+        return response
+
+
+_original_send = HTTPAdapter.send
+_original_httpx_send = None
+_installed: Optional[str] = None
+_replayer: Optional[Replayer] = None
+
+
+def _record_requests(cassette: Cassette):
+    def send(adapter, request, stream=False, **kwargs):
+        start = time.perf_counter()
+        response = _original_send(adapter, request, stream=stream, **kwargs)
+        ttfb = time.perf_counter() - start
+        # Buffer the body so it can be recorded; the caller still iterates it as usual
+        body = response.content
+        cassette.append(interaction(request.method, request.url, request.body, response.status_code,
+                                    dict(response.headers), body, ttfb, time.perf_counter() - start))
+        return response
+    HTTPAdapter.send = send
+
+
+def _replay_requests(replayer: Replayer):
+    def send(adapter, request, stream=False, **kwargs):
+        item = replayer.match(request.method, request.url, request.body)
+        if item is None:
+            raise requests.exceptions.ConnectionError(f"No recorded response for {request.method} {request.url}")
+        return replayer.respond(item, request, stream)
+    HTTPAdapter.send = send
+
+
+def _patch_httpx(cassette: Optional[Cassette], replayer: Optional[Replayer]):
+    """The Mistral SDK and LiteLLM (CrewAI) talk through httpx, when it is installed"""
+    global _original_httpx_send
+    try:
+        import httpx
+    except ImportError:
+        return
+    _original_httpx_send = httpx.HTTPTransport.handle_request
+
+    def record(transport, request):
+        start = time.perf_counter()
+        response = _original_httpx_send(transport, request)
+        ttfb = time.perf_counter() - start
+        body = response.read()
+        cassette.append(interaction(request.method, str(request.url), request.read(), response.status_code,
+                                    dict(response.headers), body, ttfb, time.perf_counter() - start))
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in WIRE_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    def replay(transport, request):
+        item = replayer.match(request.method, str(request.url), request.read())
+        if item is None:
+            raise httpx.ConnectError(f"No recorded response for {request.method} {request.url}", request=request)
+        if replayer.latency_scale:
+            time.sleep(item["total"] * replayer.latency_scale)
+        return httpx.Response(item["status"], headers=item["headers"], content=base64.b64decode(item["body"]),
+                              request=request)
+
+    httpx.HTTPTransport.handle_request = record if cassette else replay
+
+
+def install_recorder(path: str):
+    """Append every HTTP interaction of this process to the cassette at path"""
+    global _installed
+    uninstall()
+    cassette = Cassette(path)
+    _record_requests(cassette)
+    _patch_httpx(cassette, None)
+    _installed = "record"
+    logger.info(f"Recording HTTP interactions to {path}")
+
+
+def install_replayer(path: str, latency_scale: float = REPLAY_LATENCY_SCALE) -> Replayer:
+    """Serve HTTP from the cassette at path; requests it doesn't hold fail like a dropped connection"""
+    global _installed, _replayer
+    uninstall()
+    _replayer = Replayer(Cassette(path).load(), latency_scale)
+    _replay_requests(_replayer)
+    _patch_httpx(None, _replayer)
+    _installed = "replay"
+    logger.info(f"Replaying HTTP interactions from {path} (latency x{latency_scale})")
+    return _replayer
+
+
+def uninstall():
+    global _installed, _replayer, _original_httpx_send
+    HTTPAdapter.send = _original_send
+    if _original_httpx_send is not None:
+        import httpx
+        httpx.HTTPTransport.handle_request = _original_httpx_send
+        _original_httpx_send = None
+    _installed = None
+    _replayer = None
+
+
+def install_from_env():
+    """Honour EVENTWISE_RECORD_CASSETTE / EVENTWISE_REPLAY_CASSETTE once per process"""
+    if _installed:
+        return
+    if REPLAY_CASSETTE:
+        install_replayer(REPLAY_CASSETTE)
+    elif RECORD_CASSETTE:
+        install_recorder(RECORD_CASSETTE)
@@ -3,14 +3,18 @@ import uuid
 import json
 import logging
 import re
+import threading
 from datetime import datetime
-import bcrypt
+import asyncio
 import pymongo
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from bson.binary import UuidRepresentation
 from typing import Dict, Any, List, Optional, Union
 from dotenv import load_dotenv
 
+from metrics import MONGO_OPERATION_SECONDS
+from passwords import PasswordPoolBusy, get_password_pool, hash_password
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -18,10 +22,26 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-def get_mongo_client():
+class CommandTimer(monitoring.CommandListener):
+    """Feeds eventwise_mongo_operation_seconds from pymongo's command monitoring"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_OPERATION_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        MONGO_OPERATION_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome="error")
+
+
+_command_timer = CommandTimer()
+
+
+def get_mongo_client(**options):
     """Create and return a MongoDB client with proper UUID representation"""
     mongo_uri = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
-    client = MongoClient(mongo_uri, uuidRepresentation="standard")
+    client = MongoClient(mongo_uri, uuidRepresentation="standard", event_listeners=[_command_timer], **options)
     return client
 
 class UserManager:
@@ -39,11 +59,20 @@ class UserManager:
         if self.user_collection.find_one({"email": email}):
             return {"success": False, "message": "Email already registered"}
         
-        # Hash the password
-        password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password_bytes, salt)
+        # Hash the password on the password pool
+        hashed_password = get_password_pool().hash(password)
+        return self._insert_user(email, hashed_password, name)
+    
+    async def register_user_async(self, email, password, name):
+        """register_user for async handlers: MongoDB on the default executor, bcrypt on the password pool"""
+        loop = asyncio.get_running_loop()
+        if await loop.run_in_executor(None, self.user_collection.find_one, {"email": email}):
+            return {"success": False, "message": "Email already registered"}
         
+        hashed_password = await get_password_pool().hash_async(password)
+        return await loop.run_in_executor(None, self._insert_user, email, hashed_password, name)
+    
+    def _insert_user(self, email, hashed_password, name):
         # Generate a unique user ID
         uid = f"usr_{uuid.uuid4().hex[:12]}"
         
@@ -72,19 +101,47 @@ class UserManager:
             return {"success": False, "message": "Email not found"}
         
         # Verify password
-        password_bytes = password.encode('utf-8')
-        stored_password = user["password"]
+        if get_password_pool().check(password, user["password"]):
+            return self._login_succeeded(user, password)
+        else:
+            return {"success": False, "message": "Incorrect password"}
+    
+    async def login_user_async(self, email, password):
+        """login_user for async handlers: MongoDB on the default executor, bcrypt on the password pool"""
+        loop = asyncio.get_running_loop()
+        user = await loop.run_in_executor(None, self.user_collection.find_one, {"email": email})
+        if not user:
+            return {"success": False, "message": "Email not found"}
         
-        if bcrypt.checkpw(password_bytes, stored_password):
-            return {
-                "success": True, 
-                "uid": user["uid"], 
-                "name": user["name"],
-                "message": "Login successful"
-            }
+        if await get_password_pool().check_async(password, user["password"]):
+            return self._login_succeeded(user, password)
         else:
             return {"success": False, "message": "Incorrect password"}
     
+    def _login_succeeded(self, user, password):
+        pool = get_password_pool()
+        if pool.needs_rehash(user["password"]):
+            # Upgrade the stored hash to the configured cost without delaying this login
+            try:
+                pool.submit(self._rehash_password, user["uid"], user["password"], password)
+            except PasswordPoolBusy:
+                pass  # it will be upgraded at a later login
+        return {
+            "success": True, 
+            "uid": user["uid"], 
+            "name": user["name"],
+            "message": "Login successful"
+        }
+    
+    def _rehash_password(self, uid, old_hash, password):
+        # Runs on a password pool thread already, so hash here rather than queue behind ourselves
+        rounds = get_password_pool().rounds
+        new_hash = hash_password(password, rounds)
+        # Only replace the hash the user logged in with, never a password changed meanwhile
+        result = self.user_collection.update_one({"uid": uid, "password": old_hash}, {"$set": {"password": new_hash}})
+        if result.modified_count:
+            logger.info(f"Rehashed password of {uid} at bcrypt cost {rounds}")
+    
     def get_user_by_uid(self, uid):
         """Get user details by UID"""
         user = self.user_collection.find_one({"uid": uid})
@@ -95,6 +152,12 @@ class UserManager:
             return user
         return None
 
+# Event fields rendered by the event detail and invitation pages
+EVENT_PAGE_FIELDS = {
+    "_id": 0, "event_id": 1, "uid": 1, "event_name": 1, "event_category": 1, "event_date": 1, "num_guests": 1,
+    "budget": 1, "location": 1, "current_status": 1, "services": 1, "guest_list_source": 1,
+}
+
 class EventManager:
     """Class to handle event management operations"""
     
@@ -156,6 +219,15 @@ class EventManager:
     def get_event_by_id(self, event_id):
         """Get event details by event ID"""
         return self.event_collection.find_one({"event_id": event_id})
+
+    def get_event_page_data(self, event_id):
+        """The fields the event and invitation pages show, without guest lists or delivery ledgers"""
+        return self.event_collection.find_one({"event_id": event_id}, EVENT_PAGE_FIELDS)
+
+    def get_guest_list(self, event_id):
+        """The event's imported guest list, or [] when it has none"""
+        event = self.event_collection.find_one({"event_id": event_id}, {"_id": 0, "guest_list": 1})
+        return (event or {}).get("guest_list") or []
     
     def update_services(self, event_id, services):
         """Update the services for an event"""
@@ -236,13 +308,121 @@ class EventManager:
             logger.error(f"Error updating invitation: {e}")
             return {"success": False, "message": f"Invitation update failed: {str(e)}"}
 
+    def invitation_pdf_paths(self):
+        """PDF files that saved events' invitations point at"""
+        return [path for path in self.event_collection.distinct("invitation.pdf_path") if path]
+
+    def update_delivery_status(self, event_id, invitation_id, records):
+        """Merge per-recipient delivery records into the event's invitation ledger"""
+        try:
+            updates = {f"invitation_delivery.{key}": dict(record, invitation_id=invitation_id)
+                       for key, record in records.items()}
+            if not updates:
+                return {"success": True, "message": "Nothing to update"}
+            self.event_collection.update_one({"event_id": event_id}, {"$set": updates})
+            return {"success": True, "message": f"Delivery status updated for {len(updates)} recipients"}
+        except Exception as e:
+            logger.error(f"Error updating delivery status: {e}")
+            return {"success": False, "message": f"Delivery status update failed: {str(e)}"}
+
+    def update_guest_list(self, event_id, guests, source_name=None):
+        """Replace the event's guest list"""
+        try:
+            self.event_collection.update_one(
+                {"event_id": event_id},
+                {"$set": {
+                    "guest_list": guests,
+                    "guest_list_source": source_name,
+                    "guest_list_updated_at": datetime.now()
+                }}
+            )
+            return {"success": True, "message": f"Saved {len(guests)} guests"}
+        except Exception as e:
+            logger.error(f"Error updating guest list: {e}")
+            return {"success": False, "message": f"Guest list update failed: {str(e)}"}
+
+    def add_usage(self, event_id, stage, usage):
+        """Add one stage's calls, tokens and cost ({provider: {field: amount}}) to the event's totals"""
+        try:
+            increments = {}
+            for provider, counts in usage.items():
+                for field, amount in counts.items():
+                    if not amount:
+                        continue
+                    increments[f"usage.stages.{stage}.{provider}.{field}"] = amount
+                    total_key = f"usage.total.{field}"
+                    increments[total_key] = increments.get(total_key, 0) + amount
+            if not increments:
+                return {"success": True, "message": "Nothing to record"}
+            self.event_collection.update_one(
+                {"event_id": event_id},
+                {"$inc": increments, "$set": {"usage.updated_at": datetime.now()}}
+            )
+            return {"success": True, "message": "Usage recorded"}
+        except Exception as e:
+            logger.error(f"Error recording usage: {e}")
+            return {"success": False, "message": f"Usage update failed: {str(e)}"}
+
+    def usage_by_category(self):
+        """Usage summed per event category and stage: [{category, stage, events, calls, tokens_in, ...}]"""
+        pipeline = [
+            {"$match": {"usage.stages": {"$exists": True}}},
+            {"$project": {"event_category": 1, "stages": {"$objectToArray": "$usage.stages"}}},
+            {"$unwind": "$stages"},
+            {"$project": {"event_category": 1, "stage": "$stages.k",
+                          "providers": {"$objectToArray": "$stages.v"}}},
+            {"$unwind": "$providers"},
+            {"$group": {
+                "_id": {"category": "$event_category", "stage": "$stage"},
+                "events": {"$addToSet": "$_id"},
+                "calls": {"$sum": "$providers.v.calls"},
+                "tokens_in": {"$sum": "$providers.v.tokens_in"},
+                "tokens_out": {"$sum": "$providers.v.tokens_out"},
+                "cost_usd": {"$sum": "$providers.v.cost_usd"},
+            }},
+            {"$project": {"_id": 0, "category": "$_id.category", "stage": "$_id.stage", "events": {"$size": "$events"},
+                          "calls": 1, "tokens_in": 1, "tokens_out": 1, "cost_usd": 1}},
+            {"$sort": {"category": 1, "cost_usd": -1}},
+        ]
+        return list(self.event_collection.aggregate(pipeline))
+
+    def usage_event_counts(self):
+        """{category: number of events with recorded usage}"""
+        pipeline = [
+            {"$match": {"usage.total": {"$exists": True}}},
+            {"$group": {"_id": "$event_category", "events": {"$sum": 1}}},
+        ]
+        return {row["_id"] or "unknown": row["events"] for row in self.event_collection.aggregate(pipeline)}
+
+_user_manager: Optional[UserManager] = None
+_user_manager_lock = threading.Lock()
+
+def get_user_manager() -> UserManager:
+    """Process-wide UserManager, so sign-ins don't open a MongoDB client each"""
+    global _user_manager
+    with _user_manager_lock:
+        if _user_manager is None:
+            _user_manager = UserManager()
+        return _user_manager
+
+_event_manager: Optional[EventManager] = None
+_event_manager_lock = threading.Lock()
+
+def get_event_manager() -> EventManager:
+    """Process-wide EventManager, so page loads share one MongoDB connection pool"""
+    global _event_manager
+    with _event_manager_lock:
+        if _event_manager is None:
+            _event_manager = EventManager()
+        return _event_manager
+
 # The following functions are helpers for integration with the main code
 def authenticate_user():
     """Authenticate a user with login or registration"""
     print("\n=== Event Planner Authentication ===")
     choice = input("Would you like to login or register? (login/register): ").lower()
     
-    user_manager = UserManager()
+    user_manager = get_user_manager()
     
     if choice == "register":
         print("\n=== User Registration ===")
@@ -317,7 +497,7 @@ def authenticate_user():
 
 def show_user_events(uid):
     """Show events created by the user and allow selection"""
-    event_manager = EventManager()
+    event_manager = get_event_manager()
     events = event_manager.get_user_events(uid)
     
     if not events:
@@ -345,7 +525,7 @@ def show_user_events(uid):
 
 def store_event_details(uid, details):
     """Store initial event details in MongoDB"""
-    event_manager = EventManager()
+    event_manager = get_event_manager()
     result = event_manager.create_event(uid, details)
     
     if result["success"]:
@@ -357,7 +537,7 @@ def store_event_details(uid, details):
 
 def store_services(event_id, service_budget_list):
     """Store the services and budget allocations for an event"""
-    event_manager = EventManager()
+    event_manager = get_event_manager()
     
     # Convert to the format we want to store
     services = []
@@ -380,7 +560,7 @@ def store_services(event_id, service_budget_list):
 
 def store_service_provider(event_id, service_name, provider_details):
     """Store the selected service provider for a service"""
-    event_manager = EventManager()
+    event_manager = get_event_manager()
     result = event_manager.update_service_provider(event_id, service_name, provider_details)
     
     if result["success"]:
@@ -392,7 +572,7 @@ def store_service_provider(event_id, service_name, provider_details):
 
 def store_invitation(event_id, invitation_data):
     """Store the invitation details for an event"""
-    event_manager = EventManager()
+    event_manager = get_event_manager()
     result = event_manager.update_invitation(event_id, invitation_data)
     
     if result["success"]:
@@ -402,9 +582,25 @@ def store_invitation(event_id, invitation_data):
         print(f"\nFailed to store invitation: {result['message']}")
         return False
 
+def store_delivery_status(event_id, invitation_id, records):
+    """Store per-recipient delivery records for an event's invitation"""
+    event_manager = get_event_manager()
+    result = event_manager.update_delivery_status(event_id, invitation_id, records)
+    if not result["success"]:
+        logger.error(f"Failed to store delivery status: {result['message']}")
+    return result["success"]
+
+def store_guest_list(event_id, guests, source_name=None):
+    """Store an imported guest list on an event"""
+    event_manager = get_event_manager()
+    result = event_manager.update_guest_list(event_id, guests, source_name)
+    if not result["success"]:
+        logger.error(f"Failed to store guest list: {result['message']}")
+    return result["success"]
+
 def get_event_venue(event_id):
     """Get the venue details for an event if available"""
-    event_manager = EventManager()
+    event_manager = get_event_manager()
     event = event_manager.get_event_by_id(event_id)
     
     if not event:
@@ -0,0 +1,463 @@
+import os
+import time
+import queue
+import random
+import hashlib
+import logging
+import smtplib
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.mime.application import MIMEApplication
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from metrics import CACHE_REQUESTS, EMAILS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Connection pool and throttle settings for bulk invitation delivery
+SMTP_POOL_SIZE = int(os.environ.get("EVENTWISE_SMTP_POOL_SIZE", 4))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get("EVENTWISE_SMTP_MESSAGES_PER_CONNECTION", 50))
+SMTP_RATE_PER_SECOND = float(os.environ.get("EVENTWISE_SMTP_RATE", 5))
+SMTP_MAX_ATTEMPTS = int(os.environ.get("EVENTWISE_SMTP_MAX_ATTEMPTS", 3))
+SMTP_TIMEOUT = float(os.environ.get("EVENTWISE_SMTP_TIMEOUT", 30))
+
+# Number of encoded invitation PDFs kept ready for attaching
+ATTACHMENT_CACHE_ENTRIES = int(os.environ.get("EVENTWISE_ATTACHMENT_CACHE", 8))
+
+DEFAULT_BODY_TEMPLATE = """
+Dear {name},
+
+You are cordially invited to {event_name}!
+
+Please find the attached invitation with all the details.
+
+{additional_message}
+Best regards,
+{sender_name}
+"""
+
+# Delivery statuses recorded in the ledger
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+
+class _TemplateValues(dict):
+    """Leaves unknown placeholders visible instead of raising KeyError"""
+
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def render_template(template: str, values: Dict[str, Any]) -> str:
+    """Fill {placeholders} in a subject or body template from a recipient's fields"""
+    return template.format_map(_TemplateValues({k: "" if v is None else v for k, v in values.items()}))
+
+
+def recipient_key(email: str) -> str:
+    """Stable ledger key for an address (Mongo field names cannot contain dots)"""
+    return hashlib.sha1(email.strip().lower().encode("utf-8")).hexdigest()[:16]
+
+
+class SMTPSettings:
+    """Relay address and credentials, read from the same variables the email tool uses"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 user: Optional[str] = None, password: Optional[str] = None,
+                 use_tls: Optional[bool] = None, timeout: float = SMTP_TIMEOUT):
+        self.host = host or os.environ.get("EMAIL_SERVER", "smtp.gmail.com")
+        self.port = int(port or os.environ.get("EMAIL_PORT", 587))
+        self.user = user if user is not None else os.environ.get("EMAIL_USER")
+        self.password = password if password is not None else os.environ.get("EMAIL_PASSWORD")
+        if use_tls is None:
+            use_tls = os.environ.get("EMAIL_USE_TLS", "1") != "0"
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    @property
+    def relay(self) -> str:
+        return f"{self.host}:{self.port}"
+
+
+class PooledSMTPConnection:
+    """An authenticated SMTP session that is recycled after a fixed number of messages"""
+
+    def __init__(self, settings: SMTPSettings, max_messages: int):
+        self.settings = settings
+        self.max_messages = max_messages
+        self.sent = 0
+        self.server = smtplib.SMTP(settings.host, settings.port, timeout=settings.timeout)
+        if settings.use_tls:
+            self.server.starttls()
+        if settings.user and settings.password:
+            self.server.login(settings.user, settings.password)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.sent >= self.max_messages
+
+    def send(self, from_addr: str, to_addrs: List[str], message: str):
+        self.server.sendmail(from_addr, to_addrs, message)
+        self.sent += 1
+
+    def close(self):
+        try:
+            self.server.quit()
+        except Exception:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` logged-in SMTP connections for reuse. A connection goes back
+    to the pool after each message and is closed once it hits its message cap or
+    its connection fails, so relays that limit messages per session are respected.
+    """
+
+    def __init__(self, settings: SMTPSettings, size: int = SMTP_POOL_SIZE,
+                 max_messages_per_connection: int = SMTP_MAX_MESSAGES_PER_CONNECTION):
+        self.settings = settings
+        self.size = size
+        self.max_messages = max_messages_per_connection
+        self._idle: "queue.LifoQueue[PooledSMTPConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> PooledSMTPConnection:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            connection = PooledSMTPConnection(self.settings, self.max_messages)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return connection
+
+    def release(self, connection: PooledSMTPConnection, broken: bool = False):
+        if broken or connection.exhausted:
+            connection.close()
+        else:
+            self._idle.put(connection)
+        self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class RateLimiter:
+    """Token bucket shared by all sender threads; rate <= 0 disables throttling"""
+
+    def __init__(self, rate_per_second: float, burst: Optional[int] = None):
+        self.rate = rate_per_second
+        self.capacity = burst or max(1, int(rate_per_second))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class DeliveryLedger:
+    """
+    Per-recipient delivery status for one invitation. Records are handed to
+    `persist` in batches so a 500-guest send does not do 500 separate writes.
+    """
+
+    def __init__(self, invitation_id: str, persist: Optional[Callable[[Dict[str, Dict]], None]] = None,
+                 flush_every: int = 25):
+        self.invitation_id = invitation_id
+        self.persist = persist
+        self.flush_every = flush_every
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, email: str, status: str, attempts: int = 0, error: Optional[str] = None):
+        record = {
+            "email": email,
+            "status": status,
+            "attempts": attempts,
+            "error": error,
+            "updated_at": datetime.now().isoformat(),
+        }
+        key = recipient_key(email)
+        with self._lock:
+            self.records[key] = record
+            self._dirty[key] = record
+            should_flush = len(self._dirty) >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._dirty = self._dirty, {}
+        if batch and self.persist:
+            try:
+                self.persist(batch)
+            except Exception as e:
+                logger.error(f"Could not persist delivery ledger for {self.invitation_id}: {e}")
+                with self._lock:
+                    for key, record in batch.items():
+                        self._dirty.setdefault(key, record)
+
+    def summary(self) -> Dict[str, int]:
+        counts = {STATUS_PENDING: 0, STATUS_SENT: 0, STATUS_FAILED: 0}
+        with self._lock:
+            for record in self.records.values():
+                counts[record["status"]] = counts.get(record["status"], 0) + 1
+        return counts
+
+
+def is_transient_smtp_error(error: Exception) -> bool:
+    """4xx replies and dropped connections are worth retrying; 5xx rejections are not"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+
+def _pdf_part(data: bytes, filename: str) -> MIMEApplication:
+    attachment = MIMEApplication(data, _subtype="pdf")
+    attachment.add_header('Content-Disposition', 'attachment', filename=filename)
+    return attachment
+
+
+def build_attachment(pdf_path: str) -> MIMEApplication:
+    """Read the invitation PDF and wrap it as a MIME attachment"""
+    with open(pdf_path, "rb") as f:
+        return _pdf_part(f.read(), os.path.basename(pdf_path))
+
+
+class PreparedAttachment:
+    """
+    An invitation PDF already base64-encoded and serialized as a MIME part.
+    Messages splice `part_text` in verbatim instead of re-reading and
+    re-encoding the file for every guest.
+    """
+
+    def __init__(self, pdf_path: str):
+        self.path = pdf_path
+        self.filename = os.path.basename(pdf_path)
+        self.part_text = build_attachment(pdf_path).as_string()
+        self.size = len(self.part_text)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, filename: str) -> "PreparedAttachment":
+        """A PDF rendered in memory, such as one guest's personalized copy"""
+        prepared = cls.__new__(cls)
+        prepared.path = None
+        prepared.filename = filename
+        prepared.part_text = _pdf_part(data, filename).as_string()
+        prepared.size = len(prepared.part_text)
+        return prepared
+
+
+_attachment_cache: "OrderedDict[tuple, PreparedAttachment]" = OrderedDict()
+_attachment_cache_lock = threading.Lock()
+
+
+def get_prepared_attachment(pdf_path: str) -> PreparedAttachment:
+    """
+    Encode each invitation version once. The key includes mtime and size, so a
+    re-rendered PDF at the same path gets a fresh entry.
+    """
+    stat = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
+    with _attachment_cache_lock:
+        prepared = _attachment_cache.get(key)
+        if prepared is not None:
+            _attachment_cache.move_to_end(key)
+            CACHE_REQUESTS.inc(cache="email_attachment", result="hit")
+            return prepared
+
+    CACHE_REQUESTS.inc(cache="email_attachment", result="miss")
+    prepared = PreparedAttachment(pdf_path)
+    with _attachment_cache_lock:
+        _attachment_cache[key] = prepared
+        while len(_attachment_cache) > ATTACHMENT_CACHE_ENTRIES:
+            _attachment_cache.popitem(last=False)
+    return prepared
+
+
+def build_message(recipient: Dict[str, Any], from_header: str, subject_template: str,
+                  body_template: str, attachment: Optional[PreparedAttachment],
+                  values: Dict[str, Any], message_id: Optional[str] = None) -> str:
+    """Render one guest's personalized message around the shared, pre-encoded attachment"""
+    fields = dict(values)
+    fields.update(recipient)
+    if not fields.get("name"):
+        fields["name"] = "Guest"
+
+    boundary = f"===============eventwise{uuid.uuid4().hex}=="
+    msg = MIMEMultipart(boundary=boundary)
+    msg['From'] = from_header
+    msg['To'] = recipient["email"]
+    msg['Subject'] = render_template(subject_template, fields)
+    if message_id:
+        msg['Message-ID'] = message_id
+    msg.attach(MIMEText(render_template(body_template, fields), 'plain'))
+    text = msg.as_string()
+    if attachment is None:
+        return text
+
+    # Only the headers and the short text part go through the email generator;
+    # the attachment part is inserted before the closing delimiter as-is
+    closing = f"\n--{boundary}--"
+    head, _, tail = text.rpartition(closing)
+    return f"{head}\n--{boundary}\n{attachment.part_text}{closing}{tail}"
+
+
+class BulkInvitationSender:
+    """
+    Sends one personalized message per recipient over a pool of SMTP connections.
+    Each recipient is retried independently, so one bad address never fails the
+    batch, and every outcome lands in the DeliveryLedger.
+    """
+
+    def __init__(self, settings: Optional[SMTPSettings] = None, pool_size: int = SMTP_POOL_SIZE,
+                 max_messages_per_connection: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
+                 rate_per_second: float = SMTP_RATE_PER_SECOND, max_attempts: int = SMTP_MAX_ATTEMPTS,
+                 retry_backoff: float = 1.0):
+        self.settings = settings or SMTPSettings()
+        self.pool_size = pool_size
+        self.max_messages_per_connection = max_messages_per_connection
+        self.rate_per_second = rate_per_second
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    def _send_one(self, pool: SMTPConnectionPool, limiter: RateLimiter, ledger: DeliveryLedger,
+                  recipient: Dict[str, Any], message: str) -> bool:
+        email = recipient["email"]
+        last_error = None
+        for attempt in range(1, self.max_attempts + 1):
+            limiter.acquire()
+            connection = None
+            try:
+                connection = pool.acquire()
+                connection.send(self.settings.user or "", [email], message)
+                pool.release(connection)
+                ledger.update(email, STATUS_SENT, attempts=attempt)
+                EMAILS.inc(outcome="sent")
+                return True
+            except Exception as e:
+                last_error = e
+                if connection is not None:
+                    # smtplib resets the session after a rejection reply, so only
+                    # connection-level failures make the session unusable
+                    rejected = isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException))
+                    pool.release(connection, broken=not rejected)
+                if not is_transient_smtp_error(e) or attempt == self.max_attempts:
+                    break
+                delay = self.retry_backoff * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+                EMAILS.inc(outcome="retry")
+                logger.warning(f"Retrying {email} in {delay:.1f}s after: {e}")
+                time.sleep(delay)
+
+        logger.error(f"Giving up on {email}: {last_error}")
+        ledger.update(email, STATUS_FAILED, attempts=attempt, error=str(last_error))
+        EMAILS.inc(outcome="failed")
+        return False
+
+    def send(self, recipients: Iterable[Dict[str, Any]], subject_template: str, sender_name: str,
+             body_template: str = DEFAULT_BODY_TEMPLATE, pdf_path: Optional[str] = None,
+             template_values: Optional[Dict[str, Any]] = None,
+             ledger: Optional[DeliveryLedger] = None) -> Dict[str, Any]:
+        """
+        Send to every recipient ({"email": ..., "name": ..., any other template
+        fields}). Returns counts plus the addresses that failed. `recipients` may
+        be a generator: it is read as sending progresses, at most two recipients
+        per connection ahead, and a recipient's own "attachment" (a
+        PreparedAttachment) replaces the shared PDF.
+        """
+        ledger = ledger or DeliveryLedger(invitation_id="adhoc")
+        values = dict(template_values or {})
+        values.setdefault("sender_name", sender_name)
+        from_header = f"{sender_name} <{self.settings.user}>" if self.settings.user else sender_name
+        shared_attachment = get_prepared_attachment(pdf_path) if pdf_path else None
+
+        accepted = []
+
+        def unique_recipients():
+            # De-duplicate so a guest listed twice gets one invitation
+            seen = set()
+            for recipient in recipients:
+                email = (recipient.get("email") or "").strip()
+                if not email or email.lower() in seen:
+                    continue
+                seen.add(email.lower())
+                recipient = dict(recipient, email=email)
+                ledger.update(email, STATUS_PENDING)
+                accepted.append(email)
+                yield recipient
+
+        pool = SMTPConnectionPool(self.settings, self.pool_size, self.max_messages_per_connection)
+        limiter = RateLimiter(self.rate_per_second)
+        started = time.monotonic()
+
+        def deliver(recipient):
+            attachment = recipient.pop("attachment", None) or shared_attachment
+            message = build_message(recipient, from_header, subject_template,
+                                    body_template, attachment, values)
+            return self._send_one(pool, limiter, ledger, recipient, message)
+
+        results = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+                in_flight = {}
+                for recipient in unique_recipients():
+                    if len(in_flight) >= self.pool_size * 2:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            results[in_flight.pop(future)] = future.result()
+                    in_flight[executor.submit(deliver, recipient)] = recipient["email"]
+                for future, email in in_flight.items():
+                    results[email] = future.result()
+        finally:
+            pool.close()
+            ledger.flush()
+
+        failed = [email for email in accepted if not results.get(email)]
+        elapsed = time.monotonic() - started
+        logger.info(f"Bulk send finished: {len(accepted) - len(failed)} sent, {len(failed)} failed "
+                    f"in {elapsed:.1f}s over {pool.connections_opened} connections")
+        return {
+            "total": len(accepted),
+            "sent": len(accepted) - len(failed),
+            "failed": failed,
+            "elapsed": elapsed,
+            "connections_opened": pool.connections_opened,
+        }
@@ -0,0 +1,358 @@
+import os
+import time
+import asyncio
+import random
+import hashlib
+import logging
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+from database import get_mongo_client, store_delivery_status
+from email_delivery import (
+    SMTPSettings, SMTPConnectionPool, RateLimiter, PreparedAttachment, get_prepared_attachment, build_message,
+    is_transient_smtp_error, recipient_key, DEFAULT_BODY_TEMPLATE,
+    SMTP_POOL_SIZE, SMTP_MAX_MESSAGES_PER_CONNECTION, SMTP_RATE_PER_SECOND,
+    STATUS_SENT, STATUS_FAILED
+)
+from metrics import EMAILS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Background sender settings
+OUTBOX_WORKERS = int(os.environ.get("EVENTWISE_OUTBOX_WORKERS", 2))
+OUTBOX_POLL_SECONDS = float(os.environ.get("EVENTWISE_OUTBOX_POLL", 2))
+OUTBOX_LEASE_SECONDS = int(os.environ.get("EVENTWISE_OUTBOX_LEASE", 120))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EVENTWISE_OUTBOX_MAX_ATTEMPTS", 6))
+OUTBOX_BACKOFF_SECONDS = float(os.environ.get("EVENTWISE_OUTBOX_BACKOFF", 30))
+
+# Outbox message states; "sending" carries a lease so a crashed worker's claim expires
+OUTBOX_QUEUED = "queued"
+OUTBOX_SENDING = "sending"
+
+
+def idempotency_key(invitation_id: str, email: str) -> str:
+    """One outbox message per guest per invitation, however often the user clicks send"""
+    return hashlib.sha1(f"{invitation_id}|{email.strip().lower()}".encode("utf-8")).hexdigest()
+
+
+class EmailOutbox:
+    """
+    Persistent queue of invitation emails in the email_outbox collection. Each
+    guest is its own document keyed by an idempotency key, and is acknowledged
+    individually, so a restarted sender resumes with the guests not yet sent.
+    """
+
+    def __init__(self, collection=None):
+        if collection is None:
+            collection = get_mongo_client().EventWise.email_outbox
+        self.collection = collection
+        self.collection.create_index([("status", ASCENDING), ("next_attempt_at", ASCENDING)])
+        self.collection.create_index([("job_id", ASCENDING)])
+        self.collection.create_index([("invitation_id", ASCENDING)])
+
+    def enqueue(self, event_id: str, invitation_id: str, recipients: List[Dict[str, Any]],
+                subject_template: str, sender_name: str, pdf_path: str,
+                template_values: Optional[Dict[str, Any]] = None,
+                body_template: str = DEFAULT_BODY_TEMPLATE,
+                personalize: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Queue one message per recipient. Guests whose message for this invitation
+        is already queued, sending or sent are skipped; guests whose message
+        failed are queued again from scratch. With `personalize` (the invitation's
+        render inputs) each guest is sent their own copy, rendered by the worker
+        just before delivery, instead of the shared PDF.
+        """
+        job_id = f"job_{hashlib.sha1(f'{invitation_id}{time.time()}'.encode()).hexdigest()[:12]}"
+        now = datetime.now()
+        by_key = {}
+        for recipient in recipients:
+            email = (recipient.get("email") or "").strip()
+            if email:
+                by_key.setdefault(idempotency_key(invitation_id, email), dict(recipient, email=email))
+        existing = {doc["_id"]: doc["status"]
+                    for doc in self.collection.find({"_id": {"$in": list(by_key)}}, {"status": 1})}
+
+        operations, queued, skipped = [], [], []
+        for key, recipient in by_key.items():
+            status = existing.get(key)
+            if status in (OUTBOX_QUEUED, OUTBOX_SENDING, STATUS_SENT):
+                skipped.append(recipient["email"])
+                continue
+            message = {
+                "job_id": job_id,
+                "event_id": event_id,
+                "invitation_id": invitation_id,
+                "recipient": recipient,
+                "subject_template": subject_template,
+                "body_template": body_template,
+                "template_values": dict(template_values or {}, sender_name=sender_name),
+                "sender_name": sender_name,
+                "pdf_path": pdf_path,
+                "personalize": personalize,
+                "status": OUTBOX_QUEUED,
+                "attempts": 0,
+                "next_attempt_at": now,
+            }
+            if status == STATUS_FAILED:
+                # Only a message that is still failed is reset, never one another enqueue just revived
+                operations.append(UpdateOne(
+                    {"_id": key, "status": STATUS_FAILED},
+                    {"$set": dict(message, requeued_at=now),
+                     "$unset": {"error": "", "failed_at": "", "lease_until": "", "worker": ""}}
+                ))
+            else:
+                operations.append(UpdateOne({"_id": key}, {"$setOnInsert": dict(message, _id=key, created_at=now)},
+                                            upsert=True))
+            queued.append(recipient["email"])
+
+        requeued = 0
+        if operations:
+            result = self.collection.bulk_write(operations, ordered=False)
+            requeued = result.modified_count
+            raced = len(operations) - result.upserted_count - requeued
+            if raced:
+                # Another enqueue got to these guests between the lookup and the write
+                logger.info(f"{raced} guests of {invitation_id} were queued concurrently")
+        logger.info(f"Queued {len(queued)} invitation emails for {invitation_id} ({requeued} after failing), "
+                    f"skipped {len(skipped)} already queued or sent")
+        return {"job_id": job_id, "queued": len(queued), "requeued": requeued, "skipped": len(skipped),
+                "queued_recipients": queued, "skipped_recipients": skipped}
+
+    def claim(self, worker_name: str) -> Optional[Dict[str, Any]]:
+        """Lease the next due message, including ones whose previous lease expired"""
+        now = datetime.now()
+        return self.collection.find_one_and_update(
+            {"$or": [
+                {"status": OUTBOX_QUEUED, "next_attempt_at": {"$lte": now}},
+                {"status": OUTBOX_SENDING, "lease_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": OUTBOX_SENDING,
+                    "lease_until": now + timedelta(seconds=OUTBOX_LEASE_SECONDS),
+                    "worker": worker_name,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def acknowledge(self, message: Dict[str, Any]):
+        self.collection.update_one(
+            {"_id": message["_id"], "status": OUTBOX_SENDING},
+            {"$set": {"status": STATUS_SENT, "sent_at": datetime.now(), "error": None},
+             "$unset": {"lease_until": ""}}
+        )
+
+    def retry_later(self, message: Dict[str, Any], error: str):
+        delay = OUTBOX_BACKOFF_SECONDS * (2 ** (message["attempts"] - 1)) * random.uniform(0.8, 1.2)
+        self.collection.update_one(
+            {"_id": message["_id"]},
+            {"$set": {"status": OUTBOX_QUEUED, "error": error,
+                      "next_attempt_at": datetime.now() + timedelta(seconds=delay)},
+             "$unset": {"lease_until": ""}}
+        )
+        return delay
+
+    def fail(self, message: Dict[str, Any], error: str):
+        self.collection.update_one(
+            {"_id": message["_id"]},
+            {"$set": {"status": STATUS_FAILED, "error": error, "failed_at": datetime.now()},
+             "$unset": {"lease_until": ""}}
+        )
+
+    def pending_pdf_paths(self) -> List[str]:
+        """Attachments that messages still waiting to be delivered will read"""
+        pending = {"status": {"$in": [OUTBOX_QUEUED, OUTBOX_SENDING]}}
+        return [path for path in self.collection.distinct("pdf_path", pending) if path]
+
+    def status_counts(self, invitation_id: Optional[str] = None, job_id: Optional[str] = None) -> Dict[str, int]:
+        """Number of messages per status for an invitation or a single enqueue call"""
+        match = {}
+        if invitation_id:
+            match["invitation_id"] = invitation_id
+        if job_id:
+            match["job_id"] = job_id
+        counts = {OUTBOX_QUEUED: 0, OUTBOX_SENDING: 0, STATUS_SENT: 0, STATUS_FAILED: 0}
+        for row in self.collection.aggregate([{"$match": match},
+                                              {"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+
+class OutboxWorker(threading.Thread):
+    """
+    Drains the outbox in the background through the relay configured when each
+    message is delivered (credentials never go into the queue). Connections and
+    rate caps are per SMTP relay and shared by all workers in the process.
+    """
+
+    _pools: Dict[str, SMTPConnectionPool] = {}
+    _limiters: Dict[str, RateLimiter] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, outbox: EmailOutbox, name: str):
+        super().__init__(name=name, daemon=True)
+        self.outbox = outbox
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    @classmethod
+    def _relay_resources(cls, settings: SMTPSettings):
+        with cls._shared_lock:
+            pool = cls._pools.get(settings.relay)
+            if pool is None:
+                pool = SMTPConnectionPool(settings, SMTP_POOL_SIZE, SMTP_MAX_MESSAGES_PER_CONNECTION)
+                cls._pools[settings.relay] = pool
+                cls._limiters[settings.relay] = RateLimiter(SMTP_RATE_PER_SECOND)
+            return pool, cls._limiters[settings.relay]
+
+    @classmethod
+    def _close_idle_connections(cls):
+        with cls._shared_lock:
+            for pool in cls._pools.values():
+                pool.close()
+
+    def run(self):
+        logger.info(f"Outbox worker {self.name} started")
+        while not self._stop_event.is_set():
+            try:
+                message = self.outbox.claim(self.name)
+            except Exception as e:
+                logger.error(f"Outbox claim failed: {e}")
+                message = None
+            if message is None:
+                # Nothing due: don't keep relay sessions open while idle
+                self._close_idle_connections()
+                self._stop_event.wait(OUTBOX_POLL_SECONDS)
+                continue
+            try:
+                self._deliver(message)
+            except Exception as e:
+                # Keep draining; an unsettled message is claimed again once its lease expires
+                logger.exception(f"Outbox worker {self.name} failed on {message.get('_id')}: {e}")
+
+    def _deliver(self, message: Dict[str, Any]):
+        settings = SMTPSettings()
+        pool, limiter = self._relay_resources(settings)
+        recipient = message["recipient"]
+        email = recipient["email"]
+        limiter.acquire()
+
+        connection = None
+        try:
+            attachment = self._attachment(message)
+            from_header = f"{message['sender_name']} <{settings.user}>" if settings.user else message["sender_name"]
+            body = build_message(recipient, from_header, message["subject_template"], message["body_template"],
+                                 attachment, message.get("template_values", {}),
+                                 message_id=f"<{message['_id']}@eventwise>")
+            connection = pool.acquire()
+            connection.send(settings.user or "", [email], body)
+            pool.release(connection)
+            connection = None
+        except Exception as e:
+            if connection is not None:
+                rejected = isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException))
+                pool.release(connection, broken=not rejected)
+            if is_transient_smtp_error(e) and message["attempts"] < OUTBOX_MAX_ATTEMPTS:
+                delay = self.outbox.retry_later(message, str(e))
+                EMAILS.inc(outcome="retry")
+                logger.warning(f"Outbox retry for {email} in {delay:.0f}s: {e}")
+            else:
+                self.outbox.fail(message, str(e))
+                self._record(message, STATUS_FAILED, error=str(e))
+                EMAILS.inc(outcome="failed")
+                logger.error(f"Outbox gave up on {email}: {e}")
+            return
+
+        # The guest has the mail now; a bookkeeping error past this point must not lead to a resend
+        EMAILS.inc(outcome="sent")
+        self._acknowledge(message)
+        self._record(message, STATUS_SENT)
+
+    def _acknowledge(self, message: Dict[str, Any], attempts: int = 3):
+        """Mark a sent message done; until that lands, its lease expiring would send it again"""
+        for attempt in range(1, attempts + 1):
+            try:
+                self.outbox.acknowledge(message)
+                return
+            except Exception as e:
+                if attempt == attempts:
+                    logger.error(f"Could not acknowledge {message['_id']}, it may be sent again: {e}")
+                    return
+                self._stop_event.wait(attempt)
+
+    @staticmethod
+    def _attachment(message: Dict[str, Any]) -> Optional[PreparedAttachment]:
+        """The guest's own copy when the message is personalized, otherwise the shared PDF"""
+        if message.get("personalize"):
+            from guest_pdfs import guest_pdf_path
+            # Used once, so it stays out of the shared attachment cache
+            return PreparedAttachment(guest_pdf_path(message["personalize"], message["recipient"]))
+        return get_prepared_attachment(message["pdf_path"]) if message.get("pdf_path") else None
+
+    def _record(self, message: Dict[str, Any], status: str, error: Optional[str] = None):
+        """Mirror the outcome into the event's delivery ledger"""
+        if not message.get("event_id"):
+            return
+        email = message["recipient"]["email"]
+        store_delivery_status(message["event_id"], message["invitation_id"], {
+            recipient_key(email): {
+                "email": email,
+                "status": status,
+                "attempts": message["attempts"],
+                "error": error,
+                "updated_at": datetime.now().isoformat(),
+            }
+        })
+
+
+_outbox: Optional[EmailOutbox] = None
+_workers: List[OutboxWorker] = []
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> EmailOutbox:
+    """Process-wide outbox, created on first use"""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = EmailOutbox()
+        return _outbox
+
+
+def start_outbox_workers(count: int = OUTBOX_WORKERS):
+    """Start the background senders once per process; unsent mail from before a restart is picked up"""
+    try:
+        outbox = get_outbox()
+    except Exception as e:
+        logger.error(f"Outbox unavailable, background email sending not started: {e}")
+        return
+    with _outbox_lock:
+        if _workers:
+            return
+        for index in range(count):
+            worker = OutboxWorker(outbox, name=f"outbox-{os.getpid()}-{index}")
+            worker.start()
+            _workers.append(worker)
+
+
+async def start_outbox_workers_async(count: int = OUTBOX_WORKERS):
+    """Lifespan task: the outbox connects to MongoDB on a thread, so a slow server doesn't hold up startup"""
+    await asyncio.to_thread(start_outbox_workers, count)
+
+
+def stop_outbox_workers():
+    with _outbox_lock:
+        for worker in _workers:
+            worker.stop()
+        _workers.clear()
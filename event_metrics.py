@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+def service_metrics(event: Optional[Dict[str, Any]], event_services: List[Any]) -> Dict[str, Any]:
+    """
+    Every aggregate the event page shows, from one pass over the event's
+    stored services and one over the typed EventService list
+    """
+    event = event or {}
+    services = event.get("services", []) or []
+    completed, pending = [], []
+    used_budget = 0
+    for service in services:
+        if service.get("status") == "completed":
+            completed.append(service)
+            if service.get("selected_provider"):
+                used_budget += service.get("budget", 0)
+        else:
+            pending.append(service)
+
+    typed_total = len(event_services)
+    typed_completed = sum(1 for service in event_services if service.status == "completed")
+    total_budget = event.get("budget", 0)
+
+    return {
+        "completed_services": completed,
+        "pending_services": pending,
+        "event_progress": (len(completed) / len(services)) * 100 if services else 0,
+        "budget_used": (used_budget / total_budget) * 100 if total_budget else 0,
+        "overall_progress": f"{typed_completed}/{typed_total} services completed",
+        "progress_percentage": f"{(typed_completed / typed_total) * 100}%" if typed_total else "0%",
+    }
+
+
+def days_until(event_date: Optional[str]) -> int:
+    """Days from now until a "%Y-%m-%d" date, 0 when missing or unparseable"""
+    try:
+        return (datetime.strptime(event_date, "%Y-%m-%d") - datetime.now()).days
+    except (TypeError, ValueError):
+        return 0
+
+
+def _provider_value(provider: Dict[str, Any], *keys: str, skip_empty: bool = False) -> Any:
+    for key in keys:
+        if key in provider and not (skip_empty and provider[key] in (None, "")):
+            return provider[key]
+    return None
+
+
+def provider_fields(service_details: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Display fields of the provider selected for a service, with the page's placeholders"""
+    provider = (service_details or {}).get("selected_provider")
+    if not isinstance(provider, dict):
+        provider = {}
+    rating = _provider_value(provider, "rating", "Rating", skip_empty=True)
+    fields = {
+        "name": _provider_value(provider, "name", "Name"),
+        "contact": _provider_value(provider, "contact", "Contact"),
+        "price": _provider_value(provider, "price", "Price"),
+        "address": _provider_value(provider, "address", "Address"),
+        "rating": None if rating is None else str(rating),
+        "source": _provider_value(provider, "source", skip_empty=True),
+        "map_link": _provider_value(provider, "map_link", skip_empty=True),
+    }
+    return {key: ("Unknown" if key == "name" else "N/A") if value is None else value
+            for key, value in fields.items()}
@@ -0,0 +1,358 @@
+import os
+import logging
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import trafilatura
+from bs4 import BeautifulSoup
+
+from metrics import POOL_QUEUE_DEPTH
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Which parser the selector fallback uses: bs4 (reference), lxml or selectolax
+EXTRACTION_BACKEND = os.environ.get("EVENTWISE_EXTRACTION_BACKEND", "lxml")
+
+# Content containers tried in priority order after trafilatura
+VENUE_CONTENT_SELECTORS = ['.venue-details', '.venue-info', 'main', 'article', '.content']
+VENDOR_CONTENT_SELECTORS = [
+    '.vendor-details', '.vendor-info', '.service-details',
+    '.service-description', '.product-details', '.provider-info',
+    '.about-vendor', '.professional-details', '.service-provider',
+    'main', 'article', '.content', '#content', '.main-content'
+]
+
+# Process pool that keeps HTML parsing off the GIL; 0 workers parses inline
+PARSE_WORKERS = int(os.environ.get("EVENTWISE_PARSE_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+PARSE_MAX_PENDING = int(os.environ.get("EVENTWISE_PARSE_MAX_PENDING", PARSE_WORKERS * 4))
+PARSE_TIMEOUT = float(os.environ.get("EVENTWISE_PARSE_TIMEOUT", 20))
+
+# Tags whose text never counts as page content
+SKIPPED_TAGS = {"script", "style", "template"}
+
+
+def _parse_selector(selector: str) -> Tuple[str, str]:
+    """Split a simple selector into (kind, value) where kind is tag, class or id"""
+    if selector.startswith("."):
+        return "class", selector[1:]
+    if selector.startswith("#"):
+        return "id", selector[1:]
+    return "tag", selector.lower()
+
+
+def _matching_selectors(parsed, tag: str, classes: List[str], element_id: Optional[str]) -> List[str]:
+    """Return every selector that matches an element in a single check"""
+    matched = []
+    for selector, (kind, value) in parsed:
+        if kind == "tag" and tag == value:
+            matched.append(selector)
+        elif kind == "class" and value in classes:
+            matched.append(selector)
+        elif kind == "id" and element_id == value:
+            matched.append(selector)
+    return matched
+
+
+class ExtractionBackend(ABC):
+    """Parses HTML once and collects text for every content selector and every <p>"""
+    name: str = "base"
+
+    @abstractmethod
+    def collect(self, html: str, selectors: List[str]) -> Tuple[Dict[str, List[str]], List[str]]:
+        """Return ({selector: [element text, ...]}, [paragraph text, ...])"""
+        pass
+
+
+class BeautifulSoupBackend(ExtractionBackend):
+    """Reference backend: html.parser with one soup.select pass per selector"""
+    name: str = "bs4"
+
+    def collect(self, html, selectors):
+        soup = BeautifulSoup(html, 'html.parser')
+        matches = {}
+        for selector in selectors:
+            try:
+                elements = soup.select(selector)
+            except Exception:
+                continue
+            if elements:
+                matches[selector] = [e.get_text(separator='\n', strip=True) for e in elements]
+        paragraphs = [p.get_text(strip=True) for p in soup.find_all('p')]
+        return matches, [p for p in paragraphs if p]
+
+
+class LxmlBackend(ExtractionBackend):
+    """libxml2 parser with a single tree walk that buckets elements by selector"""
+    name: str = "lxml"
+
+    TEXT_XPATH = ".//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]"
+
+    def __init__(self):
+        import lxml.html
+        self._html = lxml.html
+
+    def _strings(self, element) -> List[str]:
+        return [t.strip() for t in element.xpath(self.TEXT_XPATH) if t.strip()]
+
+    def collect(self, html, selectors):
+        try:
+            root = self._html.fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            root = self._html.fromstring(html.encode("utf-8"))
+        parsed = [(s, _parse_selector(s)) for s in selectors]
+        matches = {}
+        paragraphs = []
+
+        for element in root.iter():
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue  # comments and processing instructions
+            tag = tag.lower()
+            if tag == "p":
+                text = "".join(self._strings(element))
+                if text:
+                    paragraphs.append(text)
+            classes = (element.get("class") or "").split()
+            for selector in _matching_selectors(parsed, tag, classes, element.get("id")):
+                matches.setdefault(selector, []).append("\n".join(self._strings(element)))
+
+        return matches, paragraphs
+
+
+class SelectolaxBackend(ExtractionBackend):
+    """Lexbor parser (selectolax) with a single traversal that buckets elements by selector"""
+    name: str = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    @staticmethod
+    def _strings(node) -> List[str]:
+        text = node.text(deep=True, separator="\n", strip=True)
+        return [line.strip() for line in text.split("\n") if line.strip()]
+
+    def collect(self, html, selectors):
+        tree = self._parser(html)
+        tree.strip_tags(list(SKIPPED_TAGS))
+        parsed = [(s, _parse_selector(s)) for s in selectors]
+        matches = {}
+        paragraphs = []
+
+        root = tree.root
+        if root is None:
+            return matches, paragraphs
+
+        for node in root.traverse(include_text=False):
+            tag = (node.tag or "").lower()
+            if tag == "p":
+                text = "".join(self._strings(node))
+                if text:
+                    paragraphs.append(text)
+            attributes = node.attributes
+            classes = (attributes.get("class") or "").split()
+            for selector in _matching_selectors(parsed, tag, classes, attributes.get("id")):
+                matches.setdefault(selector, []).append("\n".join(self._strings(node)))
+
+        return matches, paragraphs
+
+
+_BACKENDS = {
+    "bs4": BeautifulSoupBackend,
+    "lxml": LxmlBackend,
+    "selectolax": SelectolaxBackend,
+}
+_backend_instances: Dict[str, ExtractionBackend] = {}
+
+
+def get_extraction_backend(name: Optional[str] = None) -> ExtractionBackend:
+    """Return the named backend, falling back to bs4 when its parser is not installed"""
+    name = (name or EXTRACTION_BACKEND).lower()
+    backend = _backend_instances.get(name)
+    if backend is not None:
+        return backend
+
+    backend_class = _BACKENDS.get(name)
+    if backend_class is None:
+        logger.warning(f"Unknown extraction backend '{name}', using bs4")
+        backend_class = BeautifulSoupBackend
+    try:
+        backend = backend_class()
+    except ImportError as e:
+        logger.warning(f"Extraction backend '{name}' unavailable ({e}), using bs4")
+        backend = BeautifulSoupBackend()
+
+    _backend_instances[name] = backend
+    return backend
+
+
+def extract_page_text(html: str, selectors: List[str], min_length: int = 200,
+                      paragraph_min_length: int = 200, use_trafilatura: bool = True,
+                      backend: Optional[str] = None) -> Optional[str]:
+    """
+    Extract the main text of a listing page: trafilatura first, then the first
+    content selector with enough text, then all paragraphs as a last resort.
+    """
+    if use_trafilatura:
+        extracted_text = trafilatura.extract(html)
+        if extracted_text and len(extracted_text) >= min_length:
+            return extracted_text
+
+    matches, paragraphs = get_extraction_backend(backend).collect(html, selectors)
+
+    for selector in selectors:
+        texts = matches.get(selector)
+        if texts:
+            text = '\n'.join(texts)
+            if len(text) >= min_length:
+                return text
+
+    if paragraphs:
+        text = '\n'.join(paragraphs)
+        if len(text) >= paragraph_min_length:
+            return text
+
+    return None
+
+
+def _warm_worker():
+    """Import the parsers once per worker so the first real page is not slowed down"""
+    get_extraction_backend()
+    extract_page_text("<html><body><main><p>warm up</p></main></body></html>", ["main"])
+
+
+def _extract_in_worker(body: bytes, encoding: str, selectors: List[str],
+                       min_length: int, paragraph_min_length: int) -> Optional[str]:
+    """Worker entry point: decode the page bytes and run the normal extraction chain"""
+    html = body.decode(encoding, errors="replace")
+    return extract_page_text(html, selectors, min_length=min_length,
+                             paragraph_min_length=paragraph_min_length)
+
+
+class ParsingPool:
+    """
+    Parses fetched pages in worker processes. Callers block for the result but the
+    parse itself no longer holds this process's GIL. When the pool is disabled,
+    saturated or broken, pages are parsed inline so a search never fails because
+    of the pool.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS, max_pending: int = PARSE_MAX_PENDING,
+                 timeout: float = PARSE_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.inline_fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def start(self):
+        """Start the worker processes and wait until each has imported the parsers"""
+        with self._lock:
+            if self._executor is not None or not self.enabled:
+                return
+            # spawn, not fork: the app process runs threads (Reflex, search pools)
+            context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context, initializer=_warm_worker
+            )
+            warmups = [self._executor.submit(int) for _ in range(self.workers)]
+        for future in warmups:
+            future.result()
+        logger.info(f"Parsing pool started with {self.workers} workers")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _parse_inline(self, body, encoding, selectors, min_length, paragraph_min_length):
+        self.inline_fallbacks += 1
+        return _extract_in_worker(body, encoding, selectors, min_length, paragraph_min_length)
+
+    def extract(self, body: bytes, encoding: str, selectors: List[str],
+                min_length: int = 200, paragraph_min_length: int = 200) -> Optional[str]:
+        """Extract page text in a worker, or inline if the pool cannot take the job"""
+        if not self.enabled:
+            return _extract_in_worker(body, encoding, selectors, min_length, paragraph_min_length)
+
+        if self._executor is None:
+            try:
+                self.start()
+            except Exception as e:
+                logger.error(f"Could not start parsing pool, parsing inline: {e}")
+                self.workers = 0
+                return self._parse_inline(body, encoding, selectors, min_length, paragraph_min_length)
+
+        # Bounded queue: when every slot is taken, parse here instead of piling up work
+        if not self._slots.acquire(blocking=False):
+            return self._parse_inline(body, encoding, selectors, min_length, paragraph_min_length)
+
+        try:
+            future = self._executor.submit(
+                _extract_in_worker, body, encoding, selectors, min_length, paragraph_min_length
+            )
+        except BrokenProcessPool:
+            self._slots.release()
+            logger.error("Parsing pool broke, restarting it and parsing inline")
+            self.shutdown()
+            return self._parse_inline(body, encoding, selectors, min_length, paragraph_min_length)
+        # The slot is held until the worker is really done: a timed-out parse keeps running
+        with self._lock:
+            self._in_flight += 1
+        future.add_done_callback(self._release_slot)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            logger.warning(f"Parsing took longer than {self.timeout}s, dropping page")
+            future.cancel()
+            return None
+        except BrokenProcessPool:
+            logger.error("Parsing pool broke, restarting it and parsing inline")
+            self.shutdown()
+            return self._parse_inline(body, encoding, selectors, min_length, paragraph_min_length)
+
+    def _release_slot(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and fallback counters for operators"""
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "in_flight": in_flight,
+            "max_pending": self.max_pending,
+            "inline_fallbacks": self.inline_fallbacks,
+        }
+
+
+_parsing_pool: Optional[ParsingPool] = None
+_parsing_pool_lock = threading.Lock()
+
+
+def get_parsing_pool() -> ParsingPool:
+    """Process-wide parsing pool, created on first use"""
+    global _parsing_pool
+    with _parsing_pool_lock:
+        if _parsing_pool is None:
+            _parsing_pool = ParsingPool()
+            POOL_QUEUE_DEPTH.set_function(lambda: _parsing_pool.stats()["in_flight"], pool="parse")
+        return _parsing_pool
@@ -0,0 +1,142 @@
+import io
+import os
+import csv
+import logging
+from email.utils import parseaddr
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Upper bound on rows accepted from one upload
+GUEST_LIST_MAX_ROWS = int(os.environ.get("EVENTWISE_GUEST_LIST_MAX_ROWS", 5000))
+
+# Accepted spellings for each column, compared after lower-casing and dropping punctuation
+COLUMN_ALIASES = {
+    "name": ("name", "guest", "guestname", "fullname", "guestfullname"),
+    "email": ("email", "emailaddress", "mail"),
+    "table": ("table", "tablenumber", "tableno", "tablenum", "seat", "seating"),
+    "plus_ones": ("plusones", "plusone", "+1", "+1s", "additionalguests", "extraguests", "companions"),
+}
+
+
+def _header_key(header: Any) -> str:
+    text = str(header or "").strip().lower()
+    return "".join(c for c in text if c.isalnum() or c == "+")
+
+
+def _column_map(headers: List[Any]) -> Dict[str, int]:
+    """Map our field names to column positions; unknown columns are ignored"""
+    columns = {}
+    for position, header in enumerate(headers):
+        key = _header_key(header)
+        for field, aliases in COLUMN_ALIASES.items():
+            if key in aliases and field not in columns:
+                columns[field] = position
+    return columns
+
+
+def _cell(row: List[Any], columns: Dict[str, int], field: str) -> str:
+    position = columns.get(field)
+    if position is None or position >= len(row) or row[position] is None:
+        return ""
+    value = row[position]
+    # Spreadsheets hand back 4.0 for a table typed as 4
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _rows_from_csv(data: bytes) -> Iterable[List[Any]]:
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = data.decode("latin-1")
+    # Excel exports use ";" in many locales; the header row tells which one this is
+    header = text.split("\n", 1)[0]
+    delimiter = max(",;\t", key=header.count)
+    return csv.reader(io.StringIO(text), delimiter=delimiter)
+
+
+def _rows_from_xlsx(data: bytes) -> Iterable[List[Any]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Excel guest lists need the openpyxl package; upload a CSV instead")
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    return (list(row) for row in workbook.worksheets[0].iter_rows(values_only=True))
+
+
+def parse_guest_list(data: bytes, filename: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Read a CSV or XLSX guest list. Returns (guests, problems): each guest is
+    {"name", "email", "table", "plus_ones"}, and problems are human-readable
+    notes about rows that were skipped or corrected.
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        rows = _rows_from_xlsx(data)
+    elif extension in (".csv", ".txt", ""):
+        rows = _rows_from_csv(data)
+    else:
+        raise ValueError(f"Unsupported guest list format '{extension}'; use CSV or XLSX")
+
+    rows = iter(rows)
+    headers = next(rows, None)
+    if not headers:
+        raise ValueError("The guest list is empty")
+    columns = _column_map(headers)
+    if "name" not in columns and "email" not in columns:
+        raise ValueError("The guest list needs a 'Name' or 'Email' column")
+
+    guests: List[Dict[str, Any]] = []
+    problems: List[str] = []
+    seen = set()
+    for line, row in enumerate(rows, start=2):
+        if not row or not any(str(cell or "").strip() for cell in row):
+            continue
+        if len(guests) >= GUEST_LIST_MAX_ROWS:
+            problems.append(f"Only the first {GUEST_LIST_MAX_ROWS} guests were imported")
+            break
+
+        name = _cell(row, columns, "name")
+        _, email = parseaddr(_cell(row, columns, "email"))
+        if email and "@" not in email:
+            problems.append(f"Row {line}: '{email}' is not an email address")
+            email = ""
+        if not name and not email:
+            problems.append(f"Row {line}: no name or email, skipped")
+            continue
+        if email and email.lower() in seen:
+            problems.append(f"Row {line}: {email} is listed twice, skipped")
+            continue
+
+        plus_ones_text = _cell(row, columns, "plus_ones")
+        try:
+            plus_ones = max(0, int(float(plus_ones_text))) if plus_ones_text else 0
+        except ValueError:
+            problems.append(f"Row {line}: plus-ones '{plus_ones_text}' is not a number, using 0")
+            plus_ones = 0
+
+        if email:
+            seen.add(email.lower())
+        guests.append({
+            "name": name or email.split("@")[0],
+            "email": email,
+            "table": _cell(row, columns, "table"),
+            "plus_ones": plus_ones,
+        })
+
+    logger.info(f"Parsed {len(guests)} guests from {filename} ({len(problems)} notes)")
+    return guests, problems
+
+
+def guest_list_summary(guests: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Head counts for display next to the guest list"""
+    return {
+        "guests": len(guests),
+        "with_email": sum(1 for guest in guests if guest.get("email")),
+        "attendees": sum(1 + int(guest.get("plus_ones") or 0) for guest in guests),
+    }
+
@@ -0,0 +1,201 @@
+import io
+import os
+import logging
+import zipfile
+import threading
+import multiprocessing
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from invitation_pdf import render_invitation_pdf
+from pdf_cache import get_guest_pdf_cache, slugify
+from metrics import POOL_QUEUE_DEPTH, executor_queue_depth
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Processes rendering personalized PDFs (0 renders inline) and guests per task
+GUEST_PDF_WORKERS = int(os.environ.get("EVENTWISE_GUEST_PDF_WORKERS", (os.cpu_count() or 1) // 2))
+GUEST_PDF_CHUNK = int(os.environ.get("EVENTWISE_GUEST_PDF_CHUNK", 25))
+
+# Invitation fields the renderer reads; only these are shipped to the workers
+RENDER_INPUTS = ("text", "event_name", "event_date", "event_time", "venue_name", "venue_address", "host_name",
+                 "special_instructions", "rsvp_contact", "color_scheme", "font_style", "border_style",
+                 "background_color")
+# Guest fields printed on a personalized copy
+GUEST_INPUTS = ("name", "table", "plus_ones")
+
+
+def guest_pdf_filename(invitation: Dict[str, Any], guest: Dict[str, Any], index: int) -> str:
+    return f"{slugify(invitation.get('event_name'))}-{index + 1:04d}-{slugify(guest.get('name'))}.pdf"
+
+
+def _render_chunk(invitation: Dict[str, Any], guests: List[Dict[str, Any]]) -> List[bytes]:
+    """Worker entry point: one PDF per guest, returned as bytes"""
+    pdfs = []
+    for guest in guests:
+        buffer = io.BytesIO()
+        render_invitation_pdf(invitation, buffer, guest=guest)
+        pdfs.append(buffer.getvalue())
+    return pdfs
+
+
+def _warm_worker():
+    """Import ReportLab and load font metrics before the first real chunk"""
+    _render_chunk({
+        "text": "Warm up", "event_name": "Warm up", "event_date": "", "event_time": "", "venue_name": "",
+        "venue_address": "", "host_name": "", "color_scheme": {"primary": "#000000", "accent": "#000000"},
+        "font_style": {"heading": "Times-Bold", "body": "Times-Roman"}, "border_style": None,
+        "background_color": {"color": "#FFFFFF"},
+    }, [{"name": "Warm up"}])
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+POOL_QUEUE_DEPTH.set_function(lambda: executor_queue_depth(_executor), pool="guest_pdfs")
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_warm_worker)
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def render_guest_pdfs(invitation: Dict[str, Any], guests: List[Dict[str, Any]], workers: int = GUEST_PDF_WORKERS,
+                      chunk_size: int = GUEST_PDF_CHUNK) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+    """
+    Yield (guest, pdf bytes) in list order as the process pool finishes each
+    chunk. Only a couple of chunks per worker are in flight, so memory stays
+    flat however long the list is. With no workers, or if the pool breaks,
+    the remaining guests are rendered inline.
+    """
+    invitation = render_inputs(invitation)
+    chunks = [guests[i:i + chunk_size] for i in range(0, len(guests), max(1, chunk_size))]
+    done = 0
+    if workers > 0 and len(chunks) > 1:
+        pending = deque()
+        try:
+            executor = _get_executor(workers)
+            upcoming = iter(chunks)
+            for chunk in upcoming:
+                pending.append((chunk, executor.submit(_render_chunk, invitation, chunk)))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                chunk, future = pending.popleft()
+                pdfs = future.result()
+                next_chunk = next(upcoming, None)
+                if next_chunk is not None:
+                    pending.append((next_chunk, executor.submit(_render_chunk, invitation, next_chunk)))
+                yield from zip(chunk, pdfs)
+                done += 1
+        except BrokenProcessPool:
+            logger.error("Guest PDF pool broke, rendering the rest inline")
+            _reset_executor()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    for chunk in chunks[done:]:
+        yield from zip(chunk, _render_chunk(invitation, chunk))
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only sink that hands the archive out in pieces as it is built"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_guest_zip(invitation: Dict[str, Any], guests: List[Dict[str, Any]],
+                   workers: int = GUEST_PDF_WORKERS) -> Iterator[bytes]:
+    """
+    Yield a zip of every guest's PDF piece by piece, one member at a time, so a
+    download can start before the last guest is rendered
+    """
+    stream = _ZipStream()
+    # PDF streams are already compressed, so the archive just stores them
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED) as archive:
+        for index, (guest, pdf) in enumerate(render_guest_pdfs(invitation, guests, workers)):
+            archive.writestr(guest_pdf_filename(invitation, guest, index), pdf)
+            yield stream.drain()
+    yield stream.drain()
+
+
+def write_guest_zip(invitation: Dict[str, Any], guests: List[Dict[str, Any]], output: Union[str, BinaryIO],
+                    workers: int = GUEST_PDF_WORKERS) -> int:
+    """Write the guest zip to `output` (a path or a writable file) and return its size"""
+    size = 0
+    with (open(output, "wb") if isinstance(output, str) else nullcontext(output)) as f:
+        for chunk in iter_guest_zip(invitation, guests, workers):
+            f.write(chunk)
+            size += len(chunk)
+    return size
+
+
+def render_inputs(invitation: Dict[str, Any]) -> Dict[str, Any]:
+    """The invitation fields a guest copy is rendered from, small enough to store with each outbox message"""
+    return {field: invitation.get(field) for field in RENDER_INPUTS}
+
+
+def guest_pdf_path(invitation: Dict[str, Any], guest: Dict[str, Any]) -> str:
+    """
+    Path of the guest's personalized PDF, rendered on this thread on first use
+    and served from the guest PDF cache after that (e.g. on a retried send)
+    """
+    invitation = render_inputs(invitation)
+    guest = {field: guest.get(field) for field in GUEST_INPUTS}
+    return get_guest_pdf_cache().get_or_render(
+        dict(invitation, guest=guest),
+        f"{invitation.get('event_name')} {guest.get('name')}",
+        lambda output_path: render_invitation_pdf(invitation, output_path, guest=guest)
+    )
+
+
+def guest_recipients(invitation: Dict[str, Any], guests: List[Dict[str, Any]],
+                     workers: int = GUEST_PDF_WORKERS) -> Iterator[Dict[str, Any]]:
+    """
+    Yield guests with an email address, each carrying its personalized PDF as
+    an "attachment", for BulkInvitationSender.send to consume as they render
+    """
+    from email_delivery import PreparedAttachment
+    emailed = [guest for guest in guests if guest.get("email")]
+    for index, (guest, pdf) in enumerate(render_guest_pdfs(invitation, emailed, workers)):
+        filename = guest_pdf_filename(invitation, guest, index)
+        yield dict(guest, attachment=PreparedAttachment.from_bytes(pdf, filename))
+
+
+def shutdown_guest_pdf_pool():
+    _reset_executor()
@@ -0,0 +1,528 @@
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from tracing import add_to_span
+from metering import current_scope, record_usage
+from cassettes import install_from_env, provider_for
+from metrics import HTTP_REQUEST_SECONDS, watch_pool
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SERPER_URL = "https://google.serper.dev/search"
+
+# EVENTWISE_RECORD_CASSETTE / EVENTWISE_REPLAY_CASSETTE record or replay all outbound HTTP (cassettes.py)
+install_from_env()
+
+# Hedging is opt-in for Serper because every duplicate query is billed
+HEDGE_PAGE_FETCHES = os.environ.get("EVENTWISE_HEDGE_FETCHES", "1") == "1"
+HEDGE_SERPER = os.environ.get("EVENTWISE_HEDGE_SERPER", "0") == "1"
+
+# Circuit breaker tuning shared by every domain and provider
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("EVENTWISE_BREAKER_FAILURES", 5))
+BREAKER_RECOVERY_SECONDS = float(os.environ.get("EVENTWISE_BREAKER_RECOVERY", 60))
+
+# Responses that mean the remote side is refusing or failing, not that the page is missing
+BREAKER_FAILURE_STATUSES = {403, 429}
+
+# Listing pages above this many decoded bytes are truncated while streaming
+MAX_PAGE_BYTES = int(os.environ.get("EVENTWISE_MAX_PAGE_BYTES", 2_000_000))
+FETCH_CHUNK_BYTES = 64 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# Once this has streamed in, the content the extractors need is already here.
+# </article> is deliberately not used: listing pages repeat it for every card.
+DEFAULT_STOP_MARKERS = (b"</main>",)
+
+
+def get_domain(url: str) -> str:
+    """Return the host part of a URL without the www. prefix"""
+    domain = urlparse(url).netloc.lower()
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return domain
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because its circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one domain or API provider"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 recovery_timeout: float = BREAKER_RECOVERY_SECONDS, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._total_failures = 0
+        self._total_rejections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the recovery timeout has passed"""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+            logger.info(f"Circuit {self.name} half-open, allowing a probe request")
+
+    def is_open(self) -> bool:
+        """True while calls should be skipped outright (does not consume a probe slot)"""
+        return self.state == self.OPEN
+
+    def allow_request(self) -> bool:
+        """Check whether a call may proceed; in half-open only a limited number of probes pass"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self._total_rejections += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit {self.name} closed after a successful probe")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._half_open_calls = 0
+
+    def release(self):
+        """Give back a probe slot taken by allow_request() when the call's error says nothing about the target"""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            self._total_failures += 1
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit {self.name} opened after {self._consecutive_failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "total_failures": self._total_failures,
+                "rejected_calls": self._total_rejections,
+                "retry_in_seconds": retry_in,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a domain or provider, creating it on first use"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _breakers[name] = breaker
+        return breaker
+
+
+def is_domain_tripped(url_or_domain: str) -> bool:
+    """True if the breaker for this URL's domain is open"""
+    domain = get_domain(url_or_domain) if "://" in url_or_domain else url_or_domain.lower()
+    with _breakers_lock:
+        breaker = _breakers.get(domain)
+    return breaker is not None and breaker.is_open()
+
+
+def open_breakers() -> List[str]:
+    """Names of all breakers that are currently open"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b.name for b in breakers if b.is_open()]
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """State of every breaker, for the operator endpoint and logs"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
+
+
+class DomainLatencyTracker:
+    """Keeps a sliding window of request latencies per domain and derives timeouts from it"""
+
+    # Upper bounds (seconds) of the buckets reported by histogram()
+    BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+
+    def __init__(self, window: int = 200, min_samples: int = 20,
+                 timeout_multiplier: float = 2.0, min_timeout: float = 2.0):
+        self.window = window
+        self.min_samples = min_samples
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, domain: str, seconds: float):
+        """Record how long a request to the domain took"""
+        with self._lock:
+            samples = self._samples.get(domain)
+            if samples is None:
+                samples = deque(maxlen=self.window)
+                self._samples[domain] = samples
+            samples.append(seconds)
+
+    def percentile(self, domain: str, q: float) -> Optional[float]:
+        """Return the q-th percentile (0-100) latency, or None until enough samples exist"""
+        with self._lock:
+            samples = self._samples.get(domain)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def timeout_for(self, domain: str, default: float) -> float:
+        """Adaptive timeout: a multiple of the domain's p99, never above the old fixed default"""
+        p99 = self.percentile(domain, 99)
+        if p99 is None:
+            return default
+        return max(self.min_timeout, min(default, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self, domain: str) -> Optional[float]:
+        """How long to wait before sending a duplicate request (the domain's p95)"""
+        return self.percentile(domain, 95)
+
+    def histogram(self, domain: str) -> Dict[str, int]:
+        """Bucketed latency counts for a domain"""
+        with self._lock:
+            samples = list(self._samples.get(domain, []))
+        counts = {f"le_{bound}": 0 for bound in self.BUCKETS}
+        counts["le_inf"] = 0
+        for value in samples:
+            for bound in self.BUCKETS:
+                if value <= bound:
+                    counts[f"le_{bound}"] += 1
+                    break
+            else:
+                counts["le_inf"] += 1
+        return counts
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-domain latency summary for operators"""
+        with self._lock:
+            domains = list(self._samples.keys())
+        return {
+            domain: {
+                "samples": len(self._samples.get(domain, [])),
+                "p50": self.percentile(domain, 50),
+                "p95": self.percentile(domain, 95),
+                "p99": self.percentile(domain, 99),
+                "histogram": self.histogram(domain),
+            }
+            for domain in domains
+        }
+
+    def reset(self):
+        """Forget all recorded latencies"""
+        with self._lock:
+            self._samples.clear()
+
+
+# Shared by every tool instance in the process
+latency_tracker = DomainLatencyTracker()
+
+# Workers that run hedged duplicates (each primary gets a thread of its own);
+# sized for the search thread pools in tools.py
+HEDGE_WORKERS = 16
+_hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+watch_pool("hedge", _hedge_executor)
+_hedges_running = 0
+_hedges_lock = threading.Lock()
+
+
+def _discard(future):
+    """Close a losing hedged response so its connection goes back to the pool"""
+    try:
+        result = future.result()
+        if isinstance(result, tuple):
+            result = result[0]
+        if hasattr(result, "close"):
+            result.close()
+    except Exception:
+        pass
+
+
+def _hedge_finished(_):
+    global _hedges_running
+    with _hedges_lock:
+        _hedges_running -= 1
+
+
+def _start_hedge(attempt: Callable[[], Any]) -> Optional[Future]:
+    """Run attempt on a free hedge worker, or return None rather than queue behind busy ones"""
+    global _hedges_running
+    with _hedges_lock:
+        if _hedges_running >= HEDGE_WORKERS:
+            return None
+        _hedges_running += 1
+    future = _hedge_executor.submit(attempt)
+    future.add_done_callback(_hedge_finished)
+    return future
+
+
+def _run_on_own_thread(attempt: Callable[[], Any]) -> Future:
+    """Run attempt on a short-lived thread, in the caller's context, and return its future"""
+    future: Future = Future()
+    context = contextvars.copy_context()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(context.run(attempt))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="hedge-primary", daemon=True).start()
+    return future
+
+
+def hedged_call(domain: str, attempt: Callable[[], Any]) -> Any:
+    """
+    Run attempt(); if it has not finished by the domain's p95 latency, start one
+    duplicate on a free hedge worker (none when all are busy) and return
+    whichever succeeds first. The loser is left to finish and its response is
+    closed. The primary runs on a thread of its own so the caller can walk away
+    from it. Only use for idempotent calls.
+    """
+    delay = latency_tracker.hedge_delay(domain)
+    if delay is None:
+        return attempt()
+
+    primary = _run_on_own_thread(attempt)
+    if wait([primary], timeout=delay).done:
+        return primary.result()
+
+    backup = _start_hedge(attempt)
+    if backup is None:
+        add_to_span("hedges_skipped")
+        return primary.result()
+    logger.info(f"Hedging request to {domain} after {delay:.2f}s")
+    add_to_span("hedges")
+
+    attempts = [primary, backup]
+    pending = set(attempts)
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for other in attempts:
+                    if other is not future:
+                        other.add_done_callback(_discard)
+                return future.result()
+            error = future.exception()
+    # Both attempts failed
+    raise error
+
+
+def request_with_policy(method: str, url: str, default_timeout: float,
+                        hedge: bool = False, **kwargs) -> requests.Response:
+    """
+    Send an HTTP request with a timeout derived from the domain's recent latencies.
+    Latency (including timeouts) is recorded so later calls adapt. When hedge is
+    True a duplicate request is started once the call runs past the domain's p95.
+    The breaker, latency tracker and metrics see one outcome per call, however
+    many attempts it took. Raises CircuitOpenError without touching the network
+    if the domain is tripped.
+    """
+    domain = get_domain(url)
+    breaker = get_breaker(domain)
+    if not breaker.allow_request():
+        raise CircuitOpenError(f"Circuit open for {domain}")
+    timeout = latency_tracker.timeout_for(domain, default_timeout)
+    # Serper bills every query, hedged duplicates included; attempts may run on hedge threads
+    meter_scope = current_scope() if url == SERPER_URL else None
+    provider = provider_for(url)
+
+    def attempt():
+        if url == SERPER_URL:
+            record_usage("serper", scope=meter_scope)
+        start = time.monotonic()
+        response = requests.request(method, url, timeout=timeout, **kwargs)
+        return response, time.monotonic() - start
+
+    start = time.monotonic()
+    try:
+        response, elapsed = hedged_call(domain, attempt) if hedge else attempt()
+    except requests.exceptions.RequestException:
+        elapsed = time.monotonic() - start
+        latency_tracker.observe(domain, elapsed)
+        HTTP_REQUEST_SECONDS.observe(elapsed, provider=provider, outcome="error")
+        breaker.record_failure()
+        raise
+    except Exception:
+        breaker.release()
+        raise
+    # The winning attempt's own latency, so a hedge that saved a slow call doesn't inflate the domain's timeouts
+    latency_tracker.observe(domain, elapsed)
+    HTTP_REQUEST_SECONDS.observe(elapsed, provider=provider,
+                                 outcome="error" if response.status_code >= 400 else "ok")
+    if response.status_code in BREAKER_FAILURE_STATUSES or response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def fetch_page_bytes(url: str, headers: Dict[str, str], default_timeout: float,
+                     max_bytes: int = MAX_PAGE_BYTES, stop_markers=DEFAULT_STOP_MARKERS,
+                     hedge: bool = False) -> Optional[Tuple[bytes, str]]:
+    """
+    Stream an HTML page and return (body bytes, encoding), or None for non-200
+    and non-HTML responses. The body is read in chunks up to max_bytes and the
+    download stops as soon as any of stop_markers has arrived, so huge listing
+    pages and stray binaries never get fully buffered.
+    """
+    request_headers = dict(headers)
+    # Let urllib3 advertise every compression it can decode (gzip, deflate and br/zstd when installed)
+    request_headers.setdefault("Accept-Encoding", requests.utils.DEFAULT_ACCEPT_ENCODING)
+
+    response = request_with_policy("GET", url, default_timeout=default_timeout, hedge=hedge,
+                                   headers=request_headers, stream=True)
+    try:
+        if response.status_code != 200:
+            return None
+
+        content_type = response.headers.get("Content-Type", "").lower()
+        if content_type and not any(t in content_type for t in HTML_CONTENT_TYPES):
+            logger.info(f"Skipping {url}: unsupported content type {content_type}")
+            return None
+
+        chunks = []
+        size = 0
+        markers = [m.lower() for m in stop_markers or ()]
+        longest_marker = max((len(m) for m in markers), default=0)
+        tail = b""
+
+        for chunk in response.iter_content(chunk_size=FETCH_CHUNK_BYTES):
+            if not chunk:
+                continue
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                logger.info(f"Truncating {url} at {max_bytes} bytes")
+                break
+            if markers:
+                # Keep a few bytes of the previous chunk so markers split across chunks still match
+                window = (tail + chunk).lower()
+                if any(m in window for m in markers):
+                    break
+                tail = chunk[-longest_marker:]
+
+        body = b"".join(chunks)[:max_bytes]
+        # requests assumes ISO-8859-1 for text/* without a charset; listing sites are UTF-8
+        encoding = response.encoding if "charset" in content_type else "utf-8"
+        return body, encoding or "utf-8"
+    finally:
+        response.close()
+
+
+def fetch_page(url: str, headers: Dict[str, str], default_timeout: float,
+               max_bytes: int = MAX_PAGE_BYTES, stop_markers=DEFAULT_STOP_MARKERS,
+               hedge: bool = False) -> Optional[str]:
+    """Same as fetch_page_bytes but returns the decoded page text"""
+    page = fetch_page_bytes(url, headers, default_timeout, max_bytes=max_bytes,
+                            stop_markers=stop_markers, hedge=hedge)
+    if page is None:
+        return None
+    body, encoding = page
+    return body.decode(encoding, errors="replace")
+
+
+def iter_sse_data(response: requests.Response) -> Iterator[str]:
+    """Yield the data payload of each server-sent event as soon as it arrives"""
+    if response.encoding is None:
+        response.encoding = "utf-8"
+    data_lines = []
+    # chunk_size=None hands lines over as each chunk arrives instead of filling a buffer first
+    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+        if not line:
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue  # keep-alive comment
+        if line.startswith("data:"):
+            value = line[5:]
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+def stream_chat_completion(url: str, headers: Dict[str, str], payload: Dict[str, Any],
+                           default_timeout: float,
+                           on_usage: Optional[Callable[[Dict[str, Any]], None]] = None) -> Iterator[str]:
+    """
+    Run a chat completion with stream=True and yield the content deltas.
+    The timeout applies per read, so a long answer is fine as long as tokens keep coming.
+    `on_usage(usage)` is called once the stream ends, with the token usage the
+    last chunk reported ({} if none arrived).
+    """
+    response = request_with_policy("POST", url, default_timeout=default_timeout, headers=headers,
+                                   json=dict(payload, stream=True), stream=True)
+    usage = {}
+    try:
+        response.raise_for_status()
+        for data in iter_sse_data(response):
+            if data.strip() == "[DONE]":
+                break
+            chunk = json.loads(data)
+            usage = chunk.get("usage") or usage
+            choices = chunk.get("choices") or []
+            if not choices:
+                continue
+            delta = (choices[0].get("delta") or {}).get("content")
+            if delta:
+                yield delta
+    finally:
+        response.close()
+        if on_usage:
+            on_usage(usage)
@@ -0,0 +1,156 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from tracing import submit_with_context
+from metrics import CACHE_REQUESTS, watch_pool
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Spare texts kept ready for "regenerate" once it has been used for a set of inputs (0 disables prefetching)
+INVITATION_VARIANTS = int(os.environ.get("EVENTWISE_INVITATION_VARIANTS", 2))
+INVITATION_MEMO_KEYS = int(os.environ.get("EVENTWISE_INVITATION_MEMO_KEYS", 128))
+INVITATION_REFILL_WORKERS = int(os.environ.get("EVENTWISE_INVITATION_REFILL_WORKERS", 1))
+
+# Inputs that shape the prompt; anything else (guest count, background) does not change the text
+KEY_FIELDS = ("event_type", "event_name", "host_name", "formatted_date", "event_time", "venue_name",
+              "venue_address", "style_preference", "special_instructions", "rsvp_contact")
+
+# Older regenerate code appended this to the style preference to force a new text
+VARIATION_SUFFIX = re.compile(r"\s*-\s*please create a new variation\s*$", re.IGNORECASE)
+
+
+def _normalize(value: Any) -> str:
+    return " ".join(str(value or "").split()).casefold()
+
+
+def memo_key(event_details: Dict[str, Any]) -> str:
+    """Hash of the normalized invitation inputs"""
+    values = dict(event_details)
+    values.setdefault("formatted_date", values.get("event_date"))
+    values["style_preference"] = VARIATION_SUFFIX.sub("", str(values.get("style_preference") or ""))
+    payload = "\x1f".join(_normalize(values.get(field)) for field in KEY_FIELDS)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class _MemoEntry:
+    def __init__(self, details: Dict[str, Any]):
+        self.details = details
+        self.current: Optional[str] = None
+        self.variants: deque = deque()
+        self.refilling = False
+        # Set by the first "regenerate"; until then no model calls are spent on variants
+        self.regenerated = False
+
+
+class InvitationTextMemo:
+    """
+    Remembers generated invitation text per set of inputs. Revisiting the page
+    returns the text last shown; "regenerate" takes the next prefetched variant
+    without waiting on the model. Variants are only prefetched for inputs the
+    user has regenerated once, so a plain invitation costs a single call. The
+    queue is topped up on a background thread by calling `generate(details)`,
+    which must raise on failure so that fallback templates never end up in the
+    memo.
+    """
+
+    def __init__(self, generate: Callable[[Dict[str, Any]], str], variants: int = INVITATION_VARIANTS,
+                 max_keys: int = INVITATION_MEMO_KEYS, workers: int = INVITATION_REFILL_WORKERS):
+        self.generate = generate
+        self.variants = variants
+        self.max_keys = max_keys
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, _MemoEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="invitation-refill")
+        watch_pool("invitation_refill", self._executor)
+
+    def _entry(self, key: str, details: Dict[str, Any]) -> _MemoEntry:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _MemoEntry(dict(details))
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(key)
+        return entry
+
+    def lookup(self, event_details: Dict[str, Any], variation: bool = False) -> Optional[str]:
+        """
+        The remembered text for these inputs, or with `variation` the next unseen
+        variant (which becomes the remembered text). None means generate one and
+        pass it to record().
+        """
+        key = memo_key(event_details)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                CACHE_REQUESTS.inc(cache="invitation_text", result="miss")
+                return None
+            self._entries.move_to_end(key)
+            if variation:
+                entry.regenerated = True
+                text = entry.variants.popleft() if entry.variants else None
+                if text is not None:
+                    entry.current = text
+            else:
+                text = entry.current
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            CACHE_REQUESTS.inc(cache="invitation_text", result="miss" if text is None else "hit")
+        self._schedule_refill(key)
+        return text
+
+    def record(self, event_details: Dict[str, Any], text: str, variation: bool = False):
+        """Remember a freshly generated text as the one shown for these inputs"""
+        key = memo_key(event_details)
+        with self._lock:
+            entry = self._entry(key, event_details)
+            entry.current = text
+            entry.regenerated = entry.regenerated or variation
+        self._schedule_refill(key)
+
+    def _schedule_refill(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is None or not entry.regenerated or entry.refilling
+                    or len(entry.variants) >= self.variants):
+                return
+            entry.refilling = True
+        # Prefetches are metered and traced against the request that triggered them
+        submit_with_context(self._executor, self._refill, key, entry)
+
+    def _refill(self, key: str, entry: _MemoEntry):
+        try:
+            # Bounded so a model that keeps repeating itself cannot loop forever
+            for _ in range(self.variants * 2):
+                if len(entry.variants) >= self.variants or key not in self._entries:
+                    break
+                text = self.generate(entry.details)
+                with self._lock:
+                    if text != entry.current and text not in entry.variants:
+                        entry.variants.append(text)
+        except Exception as e:
+            logger.warning(f"Could not prefetch invitation variants: {e}")
+        finally:
+            with self._lock:
+                entry.refilling = False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "keys": len(self._entries),
+                "variants": sum(len(entry.variants) for entry in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
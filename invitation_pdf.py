@@ -0,0 +1,373 @@
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from reportlab import rl_config
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A5
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfgen.pathobject import PDFPathObject
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Flowable
+from reportlab.platypus.doctemplate import PageTemplate
+from reportlab.platypus.frames import Frame
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PAGE_MARGIN = 50
+
+# Streams are already zlib-compressed; ASCII85 on top only costs CPU (pure Python
+# without the optional accelerator) and makes the files a quarter larger
+ASCII85_STREAMS = False
+
+# rl_config.useA85 is process-wide and read while streams are written, so it is
+# switched only for the duration of renders and restored after the last one
+_a85_condition = threading.Condition()
+_a85_renders = 0
+_a85_saved = None
+
+
+@contextmanager
+def stream_encoding(ascii85: bool):
+    """Hold rl_config.useA85 at `ascii85` while the block renders"""
+    global _a85_renders, _a85_saved
+    with _a85_condition:
+        while _a85_renders and rl_config.useA85 != int(ascii85):
+            _a85_condition.wait()
+        if not _a85_renders:
+            _a85_saved = rl_config.useA85
+            rl_config.useA85 = int(ascii85)
+        _a85_renders += 1
+    try:
+        yield
+    finally:
+        with _a85_condition:
+            _a85_renders -= 1
+            if not _a85_renders:
+                rl_config.useA85 = _a85_saved
+                _a85_condition.notify_all()
+
+# Drawing operations: ("width", w), ("dash", on, off), ("alpha", a),
+# ("line", x1, y1, x2, y2), ("rect", x, y, w, h), ("circle", x, y, r).
+# They are compiled once into path objects whose PDF operators are already
+# formatted, and replayed into a form XObject once per document.
+Ops = Tuple[tuple, ...]
+
+
+@lru_cache(maxsize=64)
+def hex_to_color(hex_color: str, alpha: float = 1.0) -> colors.Color:
+    h = hex_color.lstrip('#')
+    red, green, blue = (int(h[i:i+2], 16) / 255 for i in (0, 2, 4))
+    return colors.Color(red, green, blue, alpha=alpha)
+
+
+def _frame_ops(margin: float) -> tuple:
+    width, height = A5
+    return ("rect", margin, margin, width - 2 * margin, height - 2 * margin)
+
+
+def _build_border_ops() -> Dict[str, Ops]:
+    width, height = A5
+    borders = {
+        "none": (),
+        "simple": (("width", 1.5), _frame_ops(20)),
+        "double": (("width", 1), _frame_ops(20), _frame_ops(30)),
+        "dashed": (("dash", 6, 3), ("width", 1), _frame_ops(20)),
+    }
+
+    margin, corner = 20, 40
+    ornate = [("width", 1)]
+    for x, y, dx, dy in [(margin, height - margin, 1, -1), (width - margin, height - margin, -1, -1),
+                         (margin, margin, 1, 1), (width - margin, margin, -1, 1)]:
+        ornate.append(("line", x, y, x + dx * corner, y))
+        ornate.append(("line", x, y, x, y + dy * corner))
+    for x, y in [(margin, height - margin), (width - margin, height - margin), (margin, margin), (width - margin, margin)]:
+        ornate.append(("circle", x, y, 3))
+    borders["ornate"] = tuple(ornate)
+
+    margin, radius = 30, 15
+    floral = [("width", 1), _frame_ops(margin), ("alpha", 0.5)]
+    for x, y in [(margin, height - margin), (width - margin, height - margin), (margin, margin), (width - margin, margin)]:
+        for angle in range(0, 360, 45):
+            x1 = x + radius * 0.8 * (1 if angle < 180 else -1)
+            y1 = y + radius * 0.8 * (1 if 45 <= angle <= 225 else -1)
+            floral.append(("circle", x1, y1, radius / 2))
+    borders["floral"] = tuple(floral)
+    return borders
+
+
+def compile_ops(ops: Ops) -> Ops:
+    """
+    Turn drawing operations into state changes and ("path", path, stroke, fill)
+    steps. Consecutive lines and frames share one stroked path; circles keep
+    their own so overlapping translucent fills look as they did when drawn one
+    by one.
+    """
+    steps = []
+    outline = None
+    for op in ops:
+        kind = op[0]
+        if kind in ("line", "rect"):
+            if outline is None:
+                outline = PDFPathObject()
+            if kind == "line":
+                outline.moveTo(op[1], op[2])
+                outline.lineTo(op[3], op[4])
+            else:
+                outline.rect(*op[1:])
+            continue
+        if outline is not None:
+            steps.append(("path", outline, 1, 0))
+            outline = None
+        if kind == "circle":
+            path = PDFPathObject()
+            path.circle(*op[1:])
+            steps.append(("path", path, 1, 1))
+        else:
+            steps.append(op)
+    if outline is not None:
+        steps.append(("path", outline, 1, 0))
+    return tuple(steps)
+
+
+# Page borders only depend on the page size, so they are laid out once at import
+BORDER_STEPS: Dict[str, Ops] = {name: compile_ops(ops) for name, ops in _build_border_ops().items()}
+
+
+@lru_cache(maxsize=32)
+def decoration_steps(decoration_type: str, width: float, height: float) -> Ops:
+    """Compiled geometry of a divider or corner decoration of the given size"""
+    return compile_ops(_decoration_ops(decoration_type, width, height))
+
+
+def _decoration_ops(decoration_type: str, width: float, height: float) -> Ops:
+    if decoration_type == "divider":
+        mid_y = height / 2
+        return (("width", 0.5),
+                ("line", 0, mid_y, width * 0.4, mid_y),
+                ("circle", width * 0.5, mid_y, min(height * 0.4, 5)),
+                ("line", width * 0.6, mid_y, width, mid_y))
+    if decoration_type == "corner":
+        size = min(width, height) * 0.3
+        return (("width", 1.5),
+                ("line", 0, height, size, height), ("line", 0, height, 0, height - size),
+                ("line", width - size, height, width, height), ("line", width, height, width, height - size),
+                ("line", 0, 0, size, 0), ("line", 0, 0, 0, size),
+                ("line", width - size, 0, width, 0), ("line", width, 0, width, size))
+    return ()
+
+
+def draw_form(canvas, name: str, steps: Ops, color: colors.Color):
+    """Draw compiled `steps` through a form XObject, defining it the first time the document uses it"""
+    if not steps:
+        return
+    if not canvas.hasForm(name):
+        canvas.beginForm(name)
+        canvas.saveState()
+        canvas.setStrokeColor(color)
+        canvas.setFillColor(color)
+        for op in steps:
+            kind = op[0]
+            if kind == "path":
+                canvas.drawPath(op[1], stroke=op[2], fill=op[3])
+            elif kind == "width":
+                canvas.setLineWidth(op[1])
+            elif kind == "dash":
+                canvas.setDash(op[1], op[2])
+            elif kind == "alpha":
+                canvas.setFillColor(colors.Color(color.red, color.green, color.blue, alpha=op[1]))
+        canvas.restoreState()
+        canvas.endForm()
+    canvas.doForm(name)
+
+
+def _color_name(color: colors.Color) -> str:
+    return color.hexval()[2:]
+
+
+class DecorationFlowable(Flowable):
+    """A custom flowable to add decorative elements to the invitation"""
+    def __init__(self, width, height, decoration_type, color):
+        Flowable.__init__(self)
+        self.width = width
+        self.height = height
+        self.decoration_type = decoration_type
+        self.color = color
+
+    def draw(self):
+        """Draw the decoration"""
+        name = f"Deco{self.decoration_type}{self.width:g}x{self.height:g}{_color_name(self.color)}"
+        draw_form(self.canv, name.replace(".", "_"), decoration_steps(self.decoration_type, self.width, self.height),
+                  self.color)
+
+
+class PageDecorations:
+    """onPage callback that paints the background and the page border"""
+    def __init__(self, background: colors.Color, accent: colors.Color, border_id: str):
+        self.background = background
+        self.accent = accent
+        self.border_id = border_id
+
+    def __call__(self, canvas, doc):
+        canvas.saveState()
+        width, height = A5
+        canvas.setFillColor(self.background)
+        canvas.rect(0, 0, width, height, fill=1, stroke=0)
+        draw_form(canvas, f"Border{self.border_id}{_color_name(self.accent)}",
+                  BORDER_STEPS.get(self.border_id, ()), self.accent)
+        canvas.restoreState()
+
+
+@dataclass(frozen=True)
+class InvitationStyles:
+    title: ParagraphStyle
+    heading: ParagraphStyle
+    normal: ParagraphStyle
+    details: ParagraphStyle
+    venue: ParagraphStyle
+    footer: ParagraphStyle
+    accent: colors.Color
+
+
+@lru_cache(maxsize=128)
+def _build_styles(heading_font: str, body_font: str, primary_hex: str, accent_hex: str) -> InvitationStyles:
+    primary = hex_to_color(primary_hex)
+    accent = hex_to_color(accent_hex)
+    return InvitationStyles(
+        title=ParagraphStyle(name='InviteTitle', fontName=heading_font, fontSize=22, alignment=TA_CENTER,
+                             textColor=primary, spaceAfter=16),
+        heading=ParagraphStyle(name='InviteHeading', fontName=heading_font, fontSize=16, alignment=TA_CENTER,
+                               textColor=primary, spaceAfter=10),
+        normal=ParagraphStyle(name='InviteNormal', fontName=body_font, fontSize=12, alignment=TA_CENTER,
+                              textColor=primary, spaceAfter=6, leading=16),
+        details=ParagraphStyle(name='InviteDetails', fontName=body_font, fontSize=11, alignment=TA_CENTER,
+                               textColor=primary, spaceAfter=4),
+        venue=ParagraphStyle(name='InviteVenue', fontName=heading_font, fontSize=14, alignment=TA_CENTER,
+                             textColor=accent, spaceAfter=6),
+        footer=ParagraphStyle(name='InviteFooter', fontName=body_font, fontSize=10, alignment=TA_CENTER,
+                              textColor=accent, spaceAfter=6, italic=True),
+        accent=accent,
+    )
+
+
+def get_invitation_styles(font_style: Dict[str, str], color_scheme: Dict[str, str]) -> InvitationStyles:
+    """Shared paragraph styles for a (font, color scheme) pair, built on first use"""
+    return _build_styles(font_style["heading"], font_style["body"], color_scheme["primary"], color_scheme["accent"])
+
+
+def guest_line(guest: Dict[str, Any]) -> str:
+    """The personal line on a guest's copy, e.g. Reserved for Ann Lee · Table 4 · Admits 2"""
+    parts = [f"Reserved for {guest.get('name') or 'our guest'}"]
+    if guest.get("table"):
+        parts.append(f"Table {guest['table']}")
+    plus_ones = int(guest.get("plus_ones") or 0)
+    if plus_ones:
+        parts.append(f"Admits {1 + plus_ones}")
+    return " · ".join(parts)
+
+
+def _story(invitation_data: Dict[str, Any], styles: InvitationStyles,
+           guest: Optional[Dict[str, Any]] = None) -> list:
+    story = []
+
+    # Add title - first extract a good title from invitation text
+    lines = invitation_data["text"].split('\n')
+    title = invitation_data["event_name"]
+
+    # Try to find a good title from the invitation text
+    for line in lines[:3]:  # Check first few lines for a title
+        if line.strip() and len(line.strip()) < 50:  # Find short enough line
+            title = line.strip()
+            break
+
+    # Start with decorative element
+    story.append(DecorationFlowable(400, 20, "corner", styles.accent))
+    story.append(Spacer(1, 0.2*inch))
+    story.append(Paragraph(title, styles.title))
+
+    # Add decorative divider
+    story.append(DecorationFlowable(400, 10, "divider", styles.accent))
+    story.append(Spacer(1, 0.3*inch))
+
+    # Process invitation text (split by paragraphs)
+    paragraphs = invitation_data["text"].split('\n\n')
+
+    # Skip the first paragraph if it's the title we already used
+    start_idx = 1 if paragraphs and paragraphs[0].strip() == title else 0
+
+    for paragraph in paragraphs[start_idx:]:
+        if paragraph.strip():
+            story.append(Paragraph(paragraph.strip(), styles.normal))
+            story.append(Spacer(1, 0.15*inch))
+
+    # Add venue information prominently
+    story.append(Spacer(1, 0.1*inch))
+    story.append(Paragraph("VENUE", styles.heading))
+    story.append(Paragraph(invitation_data["venue_name"], styles.venue))
+    story.append(Paragraph(invitation_data["venue_address"], styles.details))
+
+    # Add decorative divider
+    story.append(Spacer(1, 0.2*inch))
+    story.append(DecorationFlowable(400, 10, "divider", styles.accent))
+    story.append(Spacer(1, 0.2*inch))
+
+    # Add event details
+    details_text = f"Date: {invitation_data['event_date']}"
+    if invitation_data["event_time"]:
+        details_text += f" at {invitation_data['event_time']}"
+    story.append(Paragraph(details_text, styles.details))
+
+    if invitation_data.get("special_instructions"):
+        story.append(Spacer(1, 0.1*inch))
+        story.append(Paragraph(f"Note: {invitation_data['special_instructions']}", styles.details))
+
+    # Add RSVP if available
+    if invitation_data.get("rsvp_contact"):
+        story.append(Spacer(1, 0.15*inch))
+        story.append(Paragraph(f"RSVP: {invitation_data['rsvp_contact']}", styles.footer))
+
+    # Personal line for a guest's own copy
+    if guest:
+        story.append(Spacer(1, 0.15*inch))
+        story.append(Paragraph(escape(guest_line(guest)), styles.venue))
+
+    # Add host
+    story.append(Spacer(1, 0.15*inch))
+    story.append(Paragraph(f"Hosted by {invitation_data['host_name']}", styles.footer))
+
+    # Add final decorative element
+    story.append(Spacer(1, 0.2*inch))
+    story.append(DecorationFlowable(400, 20, "corner", styles.accent))
+    return story
+
+
+def render_invitation_pdf(invitation_data: Dict[str, Any], output_path, guest: Optional[Dict[str, Any]] = None,
+                          ascii85: bool = ASCII85_STREAMS):
+    """
+    Render a styled invitation to `output_path` (a path or a file-like object),
+    personalized for `guest` ({"name", "table", "plus_ones"}) when given
+    """
+    color_scheme = invitation_data["color_scheme"]
+    styles = get_invitation_styles(invitation_data["font_style"], color_scheme)
+    border_id = (invitation_data["border_style"] or {"id": "none"})["id"]
+    painter = PageDecorations(hex_to_color(invitation_data["background_color"]["color"]), styles.accent, border_id)
+
+    doc = SimpleDocTemplate(
+        output_path,
+        pagesize=A5,
+        rightMargin=PAGE_MARGIN,
+        leftMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN
+    )
+    frame = Frame(doc.leftMargin, doc.bottomMargin, A5[0] - 2*doc.leftMargin, A5[1] - 2*doc.topMargin, id='normal')
+    doc.addPageTemplates([PageTemplate(id='invitation_template', frames=frame, onPage=painter)])
+    with stream_encoding(ascii85):
+        doc.build(_story(invitation_data, styles, guest), onFirstPage=painter, onLaterPages=painter)
@@ -0,0 +1,209 @@
+import os
+import base64
+import logging
+import threading
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A5
+from reportlab.lib.utils import simpleSplit
+from reportlab.graphics.shapes import Drawing, Group, Rect, Line, Circle, String
+from reportlab.graphics import renderSVG
+
+from metrics import POOL_QUEUE_DEPTH, executor_queue_depth
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Thumbnail size in points (A5 proportions) and the pool that renders them
+PREVIEW_WIDTH = int(os.environ.get("EVENTWISE_PREVIEW_WIDTH", 150))
+# (single-core hosts default to 0 workers, which renders inline)
+PREVIEW_WORKERS = int(os.environ.get("EVENTWISE_PREVIEW_WORKERS", (os.cpu_count() or 1) // 2))
+
+PREVIEW_HEIGHT = round(PREVIEW_WIDTH * A5[1] / A5[0])
+SCALE = PREVIEW_WIDTH / A5[0]
+
+
+@lru_cache(maxsize=64)
+def _color(hex_color: str, alpha: float = 1.0) -> colors.Color:
+    color = colors.HexColor(hex_color)
+    return colors.Color(color.red, color.green, color.blue, alpha=alpha)
+
+
+def _frame(margin: float, accent: colors.Color, width: float = 1, dash=None) -> Rect:
+    m = margin * SCALE
+    return Rect(m, m, PREVIEW_WIDTH - 2 * m, PREVIEW_HEIGHT - 2 * m, fillColor=None,
+                strokeColor=accent, strokeWidth=width * SCALE, strokeDashArray=dash)
+
+
+@lru_cache(maxsize=128)
+def _border(border_id: str, accent_hex: str) -> Group:
+    """Scaled copy of the PDF page border, built once per (border, accent) and shared by thumbnails"""
+    accent = _color(accent_hex)
+    group = Group()
+    w, h = PREVIEW_WIDTH, PREVIEW_HEIGHT
+
+    if border_id == "simple":
+        group.add(_frame(20, accent, 1.5))
+    elif border_id == "double":
+        group.add(_frame(20, accent))
+        group.add(_frame(30, accent))
+    elif border_id == "dashed":
+        group.add(_frame(20, accent, dash=[6 * SCALE, 3 * SCALE]))
+    elif border_id == "ornate":
+        m, c = 20 * SCALE, 40 * SCALE
+        for x, y, dx, dy in [(m, h - m, 1, -1), (w - m, h - m, -1, -1), (m, m, 1, 1), (w - m, m, -1, 1)]:
+            group.add(Line(x, y, x + dx * c, y, strokeColor=accent, strokeWidth=SCALE))
+            group.add(Line(x, y, x, y + dy * c, strokeColor=accent, strokeWidth=SCALE))
+            group.add(Circle(x, y, 3 * SCALE, fillColor=accent, strokeColor=None))
+    elif border_id == "floral":
+        m = 30 * SCALE
+        group.add(_frame(30, accent))
+        petal = _color(accent_hex, 0.5)
+        radius = 15 * SCALE
+        for x, y in [(m, h - m), (w - m, h - m), (m, m), (w - m, m)]:
+            for angle in range(0, 360, 45):
+                x1 = x + radius * 0.8 * (1 if angle < 180 else -1)
+                y1 = y + radius * 0.8 * (1 if 45 <= angle <= 225 else -1)
+                group.add(Circle(x1, y1, radius / 2, fillColor=petal, strokeColor=None))
+    return group
+
+
+@lru_cache(maxsize=64)
+def _divider(accent_hex: str) -> Group:
+    """The centred rule-and-dot divider from the PDF, drawn at thumbnail scale"""
+    accent = _color(accent_hex)
+    width = 400 * SCALE * 0.6
+    left = (PREVIEW_WIDTH - width) / 2
+    group = Group()
+    group.add(Line(left, 0, left + width * 0.4, 0, strokeColor=accent, strokeWidth=0.5 * SCALE))
+    group.add(Circle(left + width * 0.5, 0, 4 * SCALE, fillColor=accent, strokeColor=None))
+    group.add(Line(left + width * 0.6, 0, left + width, 0, strokeColor=accent, strokeWidth=0.5 * SCALE))
+    return group
+
+
+def _place(group: Group, y: float) -> Group:
+    placed = Group(group)
+    placed.translate(0, y)
+    return placed
+
+
+def render_thumbnail(invitation: Dict[str, Any], color: Dict, font: Dict, border: Optional[Dict],
+                     background: Dict) -> str:
+    """Low-resolution SVG of the invitation page for one style combination, as a data URI"""
+    primary = _color(color["primary"])
+    drawing = Drawing(PREVIEW_WIDTH, PREVIEW_HEIGHT)
+    drawing.add(Rect(0, 0, PREVIEW_WIDTH, PREVIEW_HEIGHT, fillColor=_color(background["color"]), strokeColor=None))
+    drawing.add(_border((border or {"id": "none"})["id"], color["accent"]))
+
+    text = invitation.get("text") or ""
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    title = next((line for line in lines[:3] if len(line) < 50), invitation.get("event_name", ""))
+
+    center = PREVIEW_WIDTH / 2
+    usable = PREVIEW_WIDTH - 2 * 50 * SCALE
+    y = PREVIEW_HEIGHT - 70 * SCALE
+    for line in simpleSplit(title, font["heading"], 22 * SCALE, usable)[:2]:
+        drawing.add(String(center, y, line, fontName=font["heading"], fontSize=22 * SCALE,
+                           fillColor=primary, textAnchor="middle"))
+        y -= 26 * SCALE
+    drawing.add(_place(_divider(color["accent"]), y))
+    y -= 24 * SCALE
+
+    body = " ".join(line for line in lines if line != title)
+    for line in simpleSplit(body, font["body"], 12 * SCALE, usable)[:12]:
+        if y < 90 * SCALE:
+            break
+        drawing.add(String(center, y, line, fontName=font["body"], fontSize=12 * SCALE,
+                           fillColor=primary, textAnchor="middle"))
+        y -= 16 * SCALE
+
+    if invitation.get("venue_name"):
+        drawing.add(String(center, 70 * SCALE, invitation["venue_name"][:40], fontName=font["heading"],
+                           fontSize=14 * SCALE, fillColor=_color(color["accent"]), textAnchor="middle"))
+
+    svg = renderSVG.drawToString(drawing)
+    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode("utf-8")).decode("ascii")
+
+
+def _render_batch(invitation: Dict[str, Any], combos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Worker entry point: render a slice of the grid"""
+    previews = []
+    for combo in combos:
+        border = combo.get("border") or {"id": "none", "name": "None"}
+        previews.append({
+            "color": combo["color"]["id"],
+            "font": combo["font"]["id"],
+            "border": border["id"],
+            "background": combo["background"]["id"],
+            "label": f"{combo['color']['name']} / {border['name']}",
+            "image": render_thumbnail(invitation, combo["color"], combo["font"], border, combo["background"]),
+        })
+    return previews
+
+
+def _warm_worker():
+    """Import ReportLab and fill the font metric caches before the first real batch"""
+    render_thumbnail({"text": "Warm up", "event_name": "Warm up"},
+                     {"primary": "#000000", "accent": "#000000"},
+                     {"heading": "Times-Bold", "body": "Times-Roman"},
+                     {"id": "simple"}, {"color": "#FFFFFF"})
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+POOL_QUEUE_DEPTH.set_function(lambda: executor_queue_depth(_executor), pool="style_previews")
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_warm_worker)
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def render_previews(invitation: Dict[str, Any], combos: List[Dict[str, Any]],
+                    workers: int = PREVIEW_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Render thumbnails for a grid of style combinations, in order. Each combo is
+    {"color", "font", "border", "background"} holding the option dicts the
+    styler uses. Work is split across the process pool; with no workers, or if
+    the pool breaks, the grid is rendered inline.
+    """
+    if not combos:
+        return []
+    invitation = {k: invitation.get(k) for k in ("text", "event_name", "venue_name")}
+    if workers <= 0 or len(combos) == 1:
+        return _render_batch(invitation, combos)
+
+    # A few slices per worker keeps the pool balanced without per-thumbnail IPC
+    slices = max(1, min(len(combos), workers * 3))
+    size = -(-len(combos) // slices)
+    batches = [combos[i:i + size] for i in range(0, len(combos), size)]
+    try:
+        executor = _get_executor(workers)
+        futures = [executor.submit(_render_batch, invitation, batch) for batch in batches]
+        return [preview for future in futures for preview in future.result()]
+    except BrokenProcessPool:
+        logger.error("Preview pool broke, rendering previews inline")
+        _reset_executor()
+        return _render_batch(invitation, combos)
+
+
+def shutdown_preview_pool():
+    _reset_executor()
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Where generated invitations persist: mongo, disk or memory (process-local only)
+INVITATION_STORE_BACKEND = os.environ.get("EVENTWISE_INVITATION_STORE", "mongo").lower()
+INVITATION_STORE_DIR = os.environ.get("EVENTWISE_INVITATION_STORE_DIR",
+                                      os.path.join(os.getcwd(), "invitations", "store"))
+# How long the mongo store waits for a server, at startup and per operation, before giving up
+INVITATION_STORE_TIMEOUT_MS = int(os.environ.get("EVENTWISE_INVITATION_STORE_TIMEOUT_MS", 2000))
+INVITATION_CACHE_SIZE = int(os.environ.get("EVENTWISE_INVITATION_CACHE", 256))
+# Cached entries older than this are re-read so edits from other app workers show up
+INVITATION_CACHE_TTL = float(os.environ.get("EVENTWISE_INVITATION_CACHE_TTL", 30))
+
+
+class InvitationBackend(ABC):
+    """Durable home for invitation documents, shared by every app worker"""
+    name: str = "base"
+
+    @abstractmethod
+    def get(self, invitation_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def put(self, invitation_id: str, data: Dict[str, Any]):
+        pass
+
+
+class MongoInvitationBackend(InvitationBackend):
+    """
+    Invitations in the EventWise.invitations collection, keyed by invitation ID.
+    MongoClient connects lazily, so the constructor pings the server and raises
+    if it can't be reached; the store then falls back to disk.
+    """
+    name: str = "mongo"
+
+    def __init__(self, timeout_ms: int = INVITATION_STORE_TIMEOUT_MS):
+        from database import get_mongo_client
+        client = get_mongo_client(serverSelectionTimeoutMS=timeout_ms)
+        client.admin.command("ping")
+        self.collection = client.EventWise.invitations
+
+    def get(self, invitation_id):
+        document = self.collection.find_one({"_id": invitation_id})
+        if document is None:
+            return None
+        document.pop("_id", None)
+        return document
+
+    def put(self, invitation_id, data):
+        self.collection.replace_one({"_id": invitation_id}, dict(data, _id=invitation_id), upsert=True)
+
+
+class DiskInvitationBackend(InvitationBackend):
+    """One JSON file per invitation, written atomically"""
+    name: str = "disk"
+
+    def __init__(self, directory: str = INVITATION_STORE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, invitation_id: str) -> str:
+        # IDs are UUIDs; anything else is reduced to a safe file name
+        safe_id = "".join(c for c in invitation_id if c.isalnum() or c in "-_")
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+    def get(self, invitation_id):
+        try:
+            with open(self._path(invitation_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, invitation_id, data):
+        path = self._path(invitation_id)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+        os.replace(temp_path, path)
+
+
+class InvitationStore:
+    """
+    Bounded in-process LRU in front of a durable backend. Writes go through to
+    the backend immediately; reads are served from the LRU while fresh and
+    otherwise reloaded, so another worker's changes are seen within the TTL.
+    Backend errors are logged and the LRU keeps serving this process.
+    """
+
+    def __init__(self, backend: Optional[InvitationBackend], capacity: int = INVITATION_CACHE_SIZE,
+                 ttl: float = INVITATION_CACHE_TTL):
+        self.backend = backend
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, invitation_id: str, data: Dict[str, Any]):
+        with self._lock:
+            self._entries[invitation_id] = (data, time.monotonic())
+            self._entries.move_to_end(invitation_id)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def get(self, invitation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(invitation_id)
+            if entry is not None:
+                self._entries.move_to_end(invitation_id)
+        if entry is not None and (self.backend is None or time.monotonic() - entry[1] < self.ttl):
+            return entry[0]
+
+        if self.backend is None:
+            return None
+        try:
+            data = self.backend.get(invitation_id)
+        except Exception as e:
+            logger.error(f"Could not load invitation {invitation_id} from {self.backend.name}: {e}")
+            return entry[0] if entry is not None else None
+        if data is None:
+            return entry[0] if entry is not None else None
+        self._remember(invitation_id, data)
+        return data
+
+    def put(self, invitation_id: str, data: Dict[str, Any]):
+        self._remember(invitation_id, data)
+        if self.backend is None:
+            return
+        try:
+            self.backend.put(invitation_id, data)
+        except Exception as e:
+            logger.error(f"Could not persist invitation {invitation_id} to {self.backend.name}: {e}")
+
+    def cached(self) -> List[Dict[str, Any]]:
+        """Invitations currently held in this process"""
+        with self._lock:
+            return [data for data, _ in self._entries.values()]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _create_backend(name: str) -> Optional[InvitationBackend]:
+    if name == "memory":
+        return None
+    if name == "mongo":
+        try:
+            return MongoInvitationBackend()
+        except Exception as e:
+            logger.warning(f"Mongo invitation store unavailable ({e}), using disk")
+    elif name != "disk":
+        logger.warning(f"Unknown invitation store '{name}', using disk")
+    return DiskInvitationBackend()
+
+
+_store: Optional[InvitationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_invitation_store() -> InvitationStore:
+    """Process-wide invitation store, created on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = InvitationStore(_create_backend(INVITATION_STORE_BACKEND))
+        return _store
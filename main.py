@@ -16,7 +16,7 @@ from utils import (
 from agents import (
     create_requirements_crew, create_budget_crew, create_service_revision_crew
 )
-from tools import BudgetParserTool
+from metering import metering_scope, record_crew_usage
 from database import EventManager, store_event_details, store_services, store_invitation, get_event_venue, authenticate_user, show_user_events
 
 # Configure logging
@@ -115,7 +115,9 @@ def main():
                     
                     print("\nRevising services based on your feedback...")
                     revision_crew = create_service_revision_crew()
-                    revision_output = revision_crew.kickoff(inputs=revision_inputs)
+                    with metering_scope(event_id, "revision"):
+                        revision_output = revision_crew.kickoff(inputs=revision_inputs)
+                        record_crew_usage(revision_output)
                     revision_results = extract_text_from_crew_output(revision_output)
                     
                     # Update the service_budget_list based on revisions
@@ -175,7 +177,9 @@ def main():
                 # Need to generate services since none exist yet
                 print("\nAnalyzing requirements for your event...")
                 requirements_crew = create_requirements_crew()
-                requirement_output = requirements_crew.kickoff(inputs=details)
+                with metering_scope(event_id, "requirements"):
+                    requirement_output = requirements_crew.kickoff(inputs=details)
+                    record_crew_usage(requirement_output)
                 requirement_results = extract_text_from_crew_output(requirement_output)
                 
                 # Process requirement results
@@ -220,7 +224,9 @@ def main():
                 # Step 2: Allocate budget
                 print("\nAllocating budget for your services...")
                 budget_crew = create_budget_crew()
-                budget_output = budget_crew.kickoff(inputs=details)
+                with metering_scope(event_id, "budget"):
+                    budget_output = budget_crew.kickoff(inputs=details)
+                    record_crew_usage(budget_output)
                 budget_results = extract_text_from_crew_output(budget_output)
                 
                 # Step 3: Parse the services and budget into a structured format
@@ -253,7 +259,9 @@ def main():
                         
                         print("\nRevising services based on your feedback...")
                         revision_crew = create_service_revision_crew()
-                        revision_output = revision_crew.kickoff(inputs=revision_inputs)
+                        with metering_scope(event_id, "revision"):
+                            revision_output = revision_crew.kickoff(inputs=revision_inputs)
+                            record_crew_usage(revision_output)
                         revision_results = extract_text_from_crew_output(revision_output)
                         
                         # Update the service_budget_list based on revisions
@@ -311,7 +319,9 @@ def main():
             # Step 1: Generate initial services list
             print("\nAnalyzing requirements for your event...")
             requirements_crew = create_requirements_crew()
-            requirement_output = requirements_crew.kickoff(inputs=details)
+            with metering_scope(event_id, "requirements"):
+                requirement_output = requirements_crew.kickoff(inputs=details)
+                record_crew_usage(requirement_output)
             requirement_results = extract_text_from_crew_output(requirement_output)
             
             # Process requirement results
@@ -356,7 +366,9 @@ def main():
             # Step 2: Allocate budget
             print("\nAllocating budget for your services...")
             budget_crew = create_budget_crew()
-            budget_output = budget_crew.kickoff(inputs=details)
+            with metering_scope(event_id, "budget"):
+                budget_output = budget_crew.kickoff(inputs=details)
+                record_crew_usage(budget_output)
             budget_results = extract_text_from_crew_output(budget_output)
             
             # Step 3: Parse the services and budget into a structured format
@@ -389,7 +401,9 @@ def main():
                     
                     print("\nRevising services based on your feedback...")
                     revision_crew = create_service_revision_crew()
-                    revision_output = revision_crew.kickoff(inputs=revision_inputs)
+                    with metering_scope(event_id, "revision"):
+                        revision_output = revision_crew.kickoff(inputs=revision_inputs)
+                        record_crew_usage(revision_output)
                     revision_results = extract_text_from_crew_output(revision_output)
                     
                     # Update the service_budget_list based on revisions
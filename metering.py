@@ -0,0 +1,207 @@
+import os
+import logging
+import argparse
+import threading
+import contextvars
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from tracing import add_to_span, record_llm_usage
+from metrics import PROVIDER_CALLS, LLM_TOKENS, watch_pool
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# List prices in USD: Mistral per million tokens (mistral-large-latest), Serper per query
+MISTRAL_INPUT_PRICE = float(os.environ.get("EVENTWISE_MISTRAL_INPUT_PRICE", 2.0))
+MISTRAL_OUTPUT_PRICE = float(os.environ.get("EVENTWISE_MISTRAL_OUTPUT_PRICE", 6.0))
+SERPER_QUERY_PRICE = float(os.environ.get("EVENTWISE_SERPER_QUERY_PRICE", 0.001))
+
+USAGE_FIELDS = ("calls", "tokens_in", "tokens_out", "cost_usd")
+
+
+def usage_cost(provider: str, calls: int = 0, tokens_in: int = 0, tokens_out: int = 0) -> float:
+    if provider == "serper":
+        return calls * SERPER_QUERY_PRICE
+    if provider == "mistral":
+        return (tokens_in * MISTRAL_INPUT_PRICE + tokens_out * MISTRAL_OUTPUT_PRICE) / 1_000_000
+    return 0.0
+
+
+class MeterScope:
+    """Usage recorded while one stage of one event ran, by provider"""
+
+    def __init__(self, event_id: Optional[str], stage: str):
+        self.event_id = event_id
+        self.stage = stage
+        self.usage: Dict[str, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(USAGE_FIELDS, 0))
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add(self, provider: str, counts: Dict[str, float]) -> bool:
+        """Add counts unless the scope has already been persisted"""
+        with self._lock:
+            if self.closed:
+                return False
+            totals = self.usage[provider]
+            for field, amount in counts.items():
+                totals[field] += amount
+            return True
+
+    def close(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            self.closed = True
+            return {provider: dict(counts) for provider, counts in self.usage.items()}
+
+
+_current_scope: contextvars.ContextVar[Optional[MeterScope]] = contextvars.ContextVar("eventwise_meter", default=None)
+
+# Process-wide totals by (stage, provider), including usage outside any event
+_totals: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: dict.fromkeys(USAGE_FIELDS, 0))
+_totals_lock = threading.Lock()
+
+# Event totals are written off the calling thread so metering never holds up a request
+_persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="usage-persist")
+watch_pool("usage_persist", _persist_executor)
+
+
+def _persist(event_id: str, stage: str, usage: Dict[str, Dict[str, float]]):
+    try:
+        from database import get_event_manager
+        result = get_event_manager().add_usage(event_id, stage, usage)
+    except Exception as e:
+        result = {"success": False, "message": str(e)}
+    if not result["success"]:
+        logger.warning(f"Could not record {stage} usage for {event_id}: {result['message']}")
+
+
+def _schedule_persist(event_id: Optional[str], stage: str, usage: Dict[str, Dict[str, float]]):
+    if event_id and any(any(counts.values()) for counts in usage.values()):
+        _persist_executor.submit(_persist, event_id, stage, usage)
+
+
+@contextmanager
+def metering_scope(event_id: Optional[str], stage: str) -> Iterator[MeterScope]:
+    """
+    Attribute the Mistral and Serper usage recorded inside the block (and in
+    threads started with the block's context) to event_id and stage. The
+    totals are added to the event document when the block exits.
+    """
+    scope = MeterScope(event_id, stage)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        _schedule_persist(event_id, stage, scope.close())
+
+
+def current_scope() -> Optional[MeterScope]:
+    return _current_scope.get()
+
+
+def record_usage(provider: str, calls: int = 1, tokens_in: int = 0, tokens_out: int = 0,
+                 scope: Optional[MeterScope] = None):
+    """
+    Record usage against the current metering scope, or the given one for work
+    running on a thread that doesn't carry the caller's context
+    """
+    cost = usage_cost(provider, calls, tokens_in, tokens_out)
+    counts = {"calls": calls, "tokens_in": tokens_in, "tokens_out": tokens_out, "cost_usd": cost}
+    scope = scope or _current_scope.get()
+    stage = scope.stage if scope else "unattributed"
+
+    with _totals_lock:
+        totals = _totals[(stage, provider)]
+        for field, amount in counts.items():
+            totals[field] += amount
+    if cost:
+        add_to_span("cost_usd", cost)
+    PROVIDER_CALLS.inc(calls, provider=provider)
+    if tokens_in or tokens_out:
+        LLM_TOKENS.inc(tokens_in, direction="in")
+        LLM_TOKENS.inc(tokens_out, direction="out")
+
+    # Late usage (a prefetch outliving its request) is written on its own
+    if scope and not scope.add(provider, counts):
+        _schedule_persist(scope.event_id, stage, {provider: counts})
+
+
+def _token_counts(usage: Any) -> Tuple[int, int]:
+    if isinstance(usage, dict):
+        return usage.get("prompt_tokens") or 0, usage.get("completion_tokens") or 0
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+
+
+def record_chat_usage(response: Any, provider: str = "mistral"):
+    """
+    Meter one chat completion: an SDK response, a JSON response dict, or the
+    bare usage dict from the last chunk of a stream. Also recorded on the
+    current trace span.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None and isinstance(response, dict):
+        usage = response.get("usage", response if "prompt_tokens" in response else None)
+    tokens_in, tokens_out = _token_counts(usage) if usage is not None else (0, 0)
+    record_llm_usage({"usage": {"prompt_tokens": tokens_in, "completion_tokens": tokens_out}})
+    record_usage(provider, calls=1, tokens_in=tokens_in, tokens_out=tokens_out)
+
+
+def record_crew_usage(crew_output: Any, provider: str = "mistral"):
+    """Meter the LLM calls a CrewAI kickoff made (its token_usage metrics)"""
+    usage = getattr(crew_output, "token_usage", None)
+    if usage is None:
+        return
+    tokens_in, tokens_out = _token_counts(usage)
+    calls = getattr(usage, "successful_requests", 0) or 0
+    if calls or tokens_in or tokens_out:
+        record_usage(provider, calls=calls, tokens_in=tokens_in, tokens_out=tokens_out)
+
+
+def usage_totals() -> Dict[Tuple[str, str], Dict[str, float]]:
+    """Usage this process has recorded since it started, by (stage, provider)"""
+    with _totals_lock:
+        return {key: dict(counts) for key, counts in _totals.items()}
+
+
+# ---------------------- Report CLI ----------------------
+def category_report(rows, event_counts) -> str:
+    by_category = defaultdict(list)
+    for row in rows:
+        by_category[row["category"] or "unknown"].append(row)
+
+    lines = [f"{'category':<20} {'events':>6} {'cost $':>10} {'$ / event':>10}  top stages by cost"]
+    ranked = sorted(by_category.items(), key=lambda item: -sum(r["cost_usd"] for r in item[1]))
+    for category, stages in ranked:
+        cost = sum(r["cost_usd"] for r in stages)
+        events = event_counts.get(category, 0) or max(r["events"] for r in stages)
+        top = ", ".join(f"{r['stage']} ${r['cost_usd']:.3f}" for r in stages[:3])
+        lines.append(f"{category:<20} {events:>6} {cost:10.3f} {cost / events:10.4f}  {top}")
+
+    lines += ["", f"{'category':<20} {'stage':<16} {'events':>6} {'calls':>7} {'tokens in':>10} "
+                  f"{'tokens out':>10} {'cost $':>9} {'$ / event':>10}"]
+    for category, stages in ranked:
+        for r in stages:
+            lines.append(f"{category:<20} {r['stage']:<16} {r['events']:>6} {r['calls']:>7.0f} "
+                         f"{r['tokens_in']:>10.0f} {r['tokens_out']:>10.0f} {r['cost_usd']:9.3f} "
+                         f"{r['cost_usd'] / r['events']:10.4f}")
+    return "\n".join(lines)
+
+
+def main():
+    argparse.ArgumentParser(description="Mistral and Serper cost per event category and stage, "
+                                        "from the usage totals stored on events").parse_args()
+    from database import get_event_manager
+    manager = get_event_manager()
+    rows = manager.usage_by_category()
+    if not rows:
+        print("No usage recorded yet")
+        return
+    print(category_report(rows, manager.usage_event_counts()))
+
+
+if __name__ == "__main__":
+    main()
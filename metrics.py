@@ -0,0 +1,308 @@
+import os
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Set to 0 to make every metric update a no-op (GET /metrics still answers)
+METRICS_ENABLED = os.environ.get("EVENTWISE_METRICS", "1") == "1"
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds; external calls and crew kickoffs run from tens of milliseconds to minutes
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+LabelKey = Tuple[str, ...]
+
+
+def set_enabled(enabled: bool):
+    global METRICS_ENABLED
+    METRICS_ENABLED = enabled
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """A named metric with a fixed set of label names, registered on creation"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, LabelKey, str, float]]:
+        """(metric name, label values, extra label, value) for the exposition"""
+        return iter(())
+
+    def reset(self):
+        pass
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, key, extra, value in self.samples():
+            lines.append(f"{name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, key, "", value
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Metric):
+    """A value that goes up and down, or is read from a callback at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._functions: Dict[LabelKey, Callable[[], float]] = {}
+
+    def inc(self, amount: float = 1, **labels: Any):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float], **labels: Any):
+        """Report function() for these labels whenever the metrics are scraped"""
+        with self._lock:
+            self._functions[self._key(labels)] = function
+
+    @contextmanager
+    def track_inprogress(self, **labels: Any) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+            functions = list(self._functions.items())
+        for key, function in functions:
+            try:
+                values[key] = function()
+            except Exception as e:
+                logger.debug(f"Gauge {self.name}{key} callback failed: {e}")
+        for key, value in sorted(values.items()):
+            yield self.name, key, "", value
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(Metric):
+    """
+    Observations counted into cumulative buckets, with their sum and count. If
+    the label names include "outcome", time() fills it in as "ok" or "error".
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf), sum]
+        self._values: Dict[LabelKey, List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            if "outcome" in self.labelnames:
+                labels.setdefault("outcome", outcome)
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state[0]) if state else 0
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, list(state[0]), state[1]) for key, state in self._values.items())
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", key, f'le="{_format_value(bound)}"', cumulative
+            yield f"{self.name}_sum", key, "", total
+            yield f"{self.name}_count", key, "", cumulative
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+def observed(histogram: Histogram, **labels: Any):
+    """Decorator: time every call of the function into histogram"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+REGISTRY = Registry()
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+def executor_queue_depth(executor) -> int:
+    """Tasks submitted to a thread or process pool that no worker has finished yet"""
+    if executor is None:
+        return 0
+    if hasattr(executor, "_work_queue"):
+        return executor._work_queue.qsize()
+    return len(getattr(executor, "_pending_work_items", ()))
+
+
+def watch_pool(name: str, executor):
+    """Report an executor's queue depth as eventwise_pool_queue_depth{pool=name}"""
+    POOL_QUEUE_DEPTH.set_function(lambda: executor_queue_depth(executor), pool=name)
+
+
+# ---------------------- EventWise metrics ----------------------
+CREW_KICKOFF_SECONDS = Histogram(
+    "eventwise_crew_kickoff_seconds", "CrewAI kickoffs by stage", ["stage", "outcome"])
+TOOL_RUN_SECONDS = Histogram(
+    "eventwise_tool_run_seconds", "Tool runs (searches, invitation text, PDF styling, email)", ["tool", "outcome"])
+HTTP_REQUEST_SECONDS = Histogram(
+    "eventwise_http_request_seconds", "Outbound requests: Serper queries, Mistral calls and listing page fetches",
+    ["provider", "outcome"])
+PROVIDER_CALLS = Counter(
+    "eventwise_provider_calls_total", "Billed Serper queries and Mistral calls (crew calls included)", ["provider"])
+LLM_TOKENS = Counter(
+    "eventwise_llm_tokens_total", "Mistral tokens by direction", ["direction"])
+CACHE_REQUESTS = Counter(
+    "eventwise_cache_requests_total", "Cache lookups by cache and result", ["cache", "result"])
+MONGO_OPERATION_SECONDS = Histogram(
+    "eventwise_mongo_operation_seconds", "MongoDB commands by name", ["command", "outcome"], buckets=FAST_BUCKETS)
+PDF_RENDER_SECONDS = Histogram(
+    "eventwise_pdf_render_seconds", "Invitation PDF renders", ["kind", "outcome"], buckets=FAST_BUCKETS)
+EMAILS = Counter(
+    "eventwise_emails_total", "Outbox deliveries by outcome (sent, retry, failed)", ["outcome"])
+SEARCHES_IN_FLIGHT = Gauge(
+    "eventwise_searches_in_flight", "Venue and vendor searches running now", ["kind"])
+POOL_QUEUE_DEPTH = Gauge(
+    "eventwise_pool_queue_depth", "Tasks waiting in (or running on) a worker pool", ["pool"])
@@ -0,0 +1,134 @@
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Union
+
+import bcrypt
+
+from metrics import POOL_QUEUE_DEPTH
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# bcrypt work factor for new hashes; stored hashes with another cost are rehashed at the next login
+BCRYPT_ROUNDS = int(os.environ.get("EVENTWISE_BCRYPT_ROUNDS", 12))
+# Threads hashing and checking passwords (bcrypt releases the GIL), and how many
+# operations may wait for one before sign-ins are turned away
+PASSWORD_WORKERS = int(os.environ.get("EVENTWISE_PASSWORD_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+PASSWORD_MAX_PENDING = int(os.environ.get("EVENTWISE_PASSWORD_MAX_PENDING", PASSWORD_WORKERS * 32))
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Every password slot is taken; the caller should ask the user to retry shortly"""
+
+
+def _as_bytes(value: Union[str, bytes]) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else bytes(value)
+
+
+def hash_cost(hashed: Union[str, bytes]) -> Optional[int]:
+    """Work factor of a stored hash ("$2b$12$..." -> 12), None if it isn't a bcrypt hash"""
+    try:
+        return int(_as_bytes(hashed).split(b"$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed: Union[str, bytes], rounds: int = BCRYPT_ROUNDS) -> bool:
+    return hash_cost(hashed) != rounds
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> bytes:
+    """bcrypt on the calling thread; app code goes through the password pool"""
+    return bcrypt.hashpw(_as_bytes(password), bcrypt.gensalt(rounds))
+
+
+def check_password(password: str, hashed: Union[str, bytes]) -> bool:
+    return bcrypt.checkpw(_as_bytes(password), _as_bytes(hashed))
+
+
+class PasswordPool:
+    """
+    Runs bcrypt on a few dedicated threads so a burst of sign-ins neither blocks
+    the event loop nor takes over the default executor. At most max_pending
+    operations are queued or running; past that, calls raise PasswordPoolBusy
+    instead of making every user wait longer.
+    """
+
+    def __init__(self, workers: int = PASSWORD_WORKERS, max_pending: int = PASSWORD_MAX_PENDING,
+                 rounds: int = BCRYPT_ROUNDS):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="passwords")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordPoolBusy("Too many password operations in progress")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_flight += 1
+        future.add_done_callback(self._release_slot)
+        return future
+
+    def _release_slot(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def hash(self, password: str) -> bytes:
+        return self.submit(hash_password, password, self.rounds).result()
+
+    def check(self, password: str, hashed: Union[str, bytes]) -> bool:
+        return self.submit(check_password, password, hashed).result()
+
+    async def hash_async(self, password: str) -> bytes:
+        return await asyncio.wrap_future(self.submit(hash_password, password, self.rounds))
+
+    async def check_async(self, password: str, hashed: Union[str, bytes]) -> bool:
+        return await asyncio.wrap_future(self.submit(check_password, password, hashed))
+
+    def needs_rehash(self, hashed: Union[str, bytes]) -> bool:
+        return needs_rehash(hashed, self.rounds)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "max_pending": self.max_pending,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_password_pool: Optional[PasswordPool] = None
+_password_pool_lock = threading.Lock()
+POOL_QUEUE_DEPTH.set_function(lambda: _password_pool.stats()["in_flight"] if _password_pool else 0,
+                              pool="passwords")
+
+
+def get_password_pool() -> PasswordPool:
+    """Process-wide password pool, created on first use"""
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is None:
+            _password_pool = PasswordPool()
+            logger.info(f"Password pool started with {_password_pool.workers} workers "
+                        f"(bcrypt cost {_password_pool.rounds})")
+        return _password_pool
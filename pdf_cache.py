@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Pattern, Set, Tuple
+
+from tracing import add_to_span
+from metrics import CACHE_REQUESTS, PDF_RENDER_SECONDS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Rendered invitation PDFs live here, named <slug>-<content hash>.pdf
+INVITATIONS_DIR = os.environ.get("EVENTWISE_INVITATIONS_DIR", os.path.join(os.getcwd(), "invitations"))
+PDF_CACHE_MAX_BYTES = int(float(os.environ.get("EVENTWISE_PDF_CACHE_MB", 200)) * 1024 * 1024)
+# Personalized guest copies, rendered as the outbox sends them, under their own budget;
+# they are collected every GUEST_PDF_COLLECT_EVERY renders rather than after each one
+GUEST_PDFS_DIR = os.path.join(INVITATIONS_DIR, "guests")
+GUEST_PDF_CACHE_MAX_BYTES = int(float(os.environ.get("EVENTWISE_GUEST_PDF_CACHE_MB", 500)) * 1024 * 1024)
+GUEST_PDF_COLLECT_EVERY = 50
+# Files younger than this are never evicted or collected (they may be queued for email)
+PDF_CACHE_GRACE_SECONDS = int(os.environ.get("EVENTWISE_PDF_CACHE_GRACE", 3600))
+
+# Bump when the PDF layout changes so old renders stop matching
+RENDER_VERSION = 1
+
+KEY_LENGTH = 16
+CACHED_NAME = re.compile(rf"^.+-([0-9a-f]{{{KEY_LENGTH}}})\.pdf$")
+# Everything under GUEST_PDFS_DIR is a rendered guest copy
+GUEST_PDF_NAME = re.compile(r"^.+\.pdf$")
+# Suffix of a render still being written (or left behind by a crash)
+TEMP_SUFFIX = re.compile(r"\.\d+\.\d+\.tmp$|\.tmp$")
+
+
+def render_key(fields: Dict[str, Any]) -> str:
+    """Content hash of everything that ends up on the page"""
+    payload = json.dumps({"version": RENDER_VERSION, **fields}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:KEY_LENGTH]
+
+
+def slugify(name: str) -> str:
+    slug = re.sub(r'[^\w\s-]', '', name or "").strip().lower()
+    return re.sub(r'[-\s]+', '-', slug) or "invitation"
+
+
+def referenced_pdf_paths() -> Optional[Set[str]]:
+    """
+    PDFs that queued or sending outbox messages and saved events still point at,
+    or None when they can't be read (then nothing should be deleted)
+    """
+    try:
+        from database import get_event_manager
+        from email_outbox import get_outbox
+        paths = set(get_outbox().pending_pdf_paths())
+        paths.update(get_event_manager().invitation_pdf_paths())
+        return paths
+    except Exception as e:
+        logger.warning(f"Could not read which PDFs are still referenced, skipping cleanup: {e}")
+        return None
+
+
+class PDFRenderCache:
+    """
+    Content-addressed store of rendered invitation PDFs. The file name carries the
+    hash of the render inputs, so a repeat style click returns the existing file.
+    The directory is kept under a size budget by evicting the least recently used
+    renders, and temp files left by interrupted renders are garbage collected.
+    Only files matching `pattern` are ever removed, never ones that outbox
+    messages or saved events still point at, and never anything under
+    `exclude` (directories with a budget of their own). With `collect_every`,
+    only every nth miss runs the collection, which reads the outbox and events.
+    """
+
+    def __init__(self, directory: str = INVITATIONS_DIR, max_bytes: int = PDF_CACHE_MAX_BYTES,
+                 grace_seconds: int = PDF_CACHE_GRACE_SECONDS, pattern: Pattern = CACHED_NAME,
+                 exclude: Iterable[str] = (), collect_every: int = 1):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+        self.pattern = pattern
+        self.exclude = {os.path.abspath(path) for path in exclude}
+        self.collect_every = max(1, collect_every)
+        self.hits = 0
+        self.misses = 0
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._gc_lock = threading.Lock()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def path_for(self, key: str, name: str) -> str:
+        return os.path.join(self.directory, f"{slugify(name)}-{key}.pdf")
+
+    def get_or_render(self, fields: Dict[str, Any], name: str, render: Callable[[str], None],
+                      pinned: Iterable[str] = ()) -> str:
+        """
+        Return the PDF for these render inputs, calling render(path) only on a miss.
+        `pinned` paths are spared by the eviction that follows a miss.
+        """
+        key = render_key(fields)
+        path = self.path_for(key, name)
+
+        with self._lock_for(key):
+            if os.path.exists(path):
+                self.hits += 1
+                add_to_span("cache_hits")
+                CACHE_REQUESTS.inc(cache="pdf_render", result="hit")
+                # mtime doubles as the LRU clock
+                os.utime(path)
+                return path
+
+            self.misses += 1
+            add_to_span("cache_misses")
+            CACHE_REQUESTS.inc(cache="pdf_render", result="miss")
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with PDF_RENDER_SECONDS.time(kind="invitation"):
+                    render(temp_path)
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        if self.misses % self.collect_every == 0:
+            self.collect(pinned=set(pinned) | {path})
+        return path
+
+    def _files(self) -> Iterator[Tuple[str, str]]:
+        """(name, path) of every file under the directory, skipping excluded subdirectories"""
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) not in self.exclude]
+            for name in files:
+                yield name, os.path.abspath(os.path.join(root, name))
+
+    def collect(self, pinned: Iterable[str] = ()) -> Dict[str, int]:
+        """Remove interrupted renders, then evict old renders until the directory fits the budget"""
+        if not os.path.isdir(self.directory):
+            return {"orphans": 0, "evicted": 0, "bytes": 0}
+        if not self._gc_lock.acquire(blocking=False):
+            return {"orphans": 0, "evicted": 0, "bytes": 0}
+
+        try:
+            referenced = referenced_pdf_paths()
+            if referenced is None:
+                return {"orphans": 0, "evicted": 0, "bytes": 0}
+            pinned = {os.path.abspath(p) for p in list(pinned) + list(referenced) if p}
+            cutoff = time.time() - self.grace_seconds
+            entries = []
+            orphans = 0
+            for name, path in self._files():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if self.pattern.match(name):
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    continue
+                # Leftovers of this cache's own interrupted renders; other files are not ours to delete
+                stripped = TEMP_SUFFIX.sub("", name)
+                if stripped != name and self.pattern.match(stripped) and stat.st_mtime <= cutoff:
+                    self._remove(path)
+                    orphans += 1
+
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for mtime, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path in pinned or mtime > cutoff:
+                    continue
+                if self._remove(path):
+                    total -= size
+                    evicted += 1
+
+            if orphans or evicted:
+                logger.info(f"PDF cache GC removed {orphans} orphaned and {evicted} evicted files, "
+                            f"{total / 1024 / 1024:.1f} MB in use")
+            return {"orphans": orphans, "evicted": evicted, "bytes": total}
+        finally:
+            self._gc_lock.release()
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_render_cache: Optional[PDFRenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> PDFRenderCache:
+    """Process-wide render cache, created on first use"""
+    global _render_cache
+    with _render_cache_lock:
+        if _render_cache is None:
+            _render_cache = PDFRenderCache(exclude=[GUEST_PDFS_DIR])
+        return _render_cache
+
+
+_guest_pdf_cache: Optional[PDFRenderCache] = None
+
+
+def get_guest_pdf_cache() -> PDFRenderCache:
+    """Process-wide store of personalized guest PDFs, with its own size budget"""
+    global _guest_pdf_cache
+    with _render_cache_lock:
+        if _guest_pdf_cache is None:
+            _guest_pdf_cache = PDFRenderCache(GUEST_PDFS_DIR, GUEST_PDF_CACHE_MAX_BYTES, pattern=GUEST_PDF_NAME,
+                                              collect_every=GUEST_PDF_COLLECT_EVERY)
+        return _guest_pdf_cache
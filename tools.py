@@ -3,49 +3,36 @@ warnings.filterwarnings('ignore')
 import os
 import time
 import logging
-from crewai import Agent, Task, Crew, Process, LLM
+from functools import lru_cache
 from crewai.tools import BaseTool
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 import json
 import re
 import requests
 from typing import List, Dict, Any, Optional, Type
-from crewai_tools import ScrapeWebsiteTool, ScrapeElementFromWebsiteTool
-from crewai_tools import SeleniumScrapingTool
-from reportlab.lib.pagesizes import A5
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, Flowable
-from reportlab.lib.units import inch, cm
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus.frames import Frame
-from reportlab.platypus.doctemplate import PageTemplate
-from mistralai import Mistral
-from mistralai.client import MistralClient
-from urllib.parse import urlparse, parse_qs
-import trafilatura
-import time
-from typing import Literal
-from pydantic import Field
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse
 import random
 import threading
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
+from email.utils import parseaddr
 import uuid
 from datetime import datetime
-import bcrypt
-import pymongo
-from pymongo import MongoClient
-from bson.binary import UuidRepresentation
+from http_client import (
+    request_with_policy, stream_chat_completion, fetch_page_bytes, SERPER_URL, HEDGE_PAGE_FETCHES, HEDGE_SERPER,
+    CircuitOpenError, get_breaker, get_domain, is_domain_tripped
+)
+from pdf_cache import get_render_cache
+from invitation_store import get_invitation_store
+from invitation_memo import InvitationTextMemo
+from email_delivery import BulkInvitationSender, DeliveryLedger, SMTPSettings, DEFAULT_BODY_TEMPLATE
+from tracing import traced, add_to_span, submit_with_context, current_trace_id
+from metering import record_chat_usage
+from metrics import TOOL_RUN_SECONDS, HTTP_REQUEST_SECONDS, observed
+# The LLM and Mistral clients, the HTML parsers (extraction) and ReportLab
+# (invitation_pdf) are imported by the features that use them, so building a
+# single tool doesn't pay for all of them
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -56,10 +43,30 @@ load_dotenv()
 MISTRAL_API_KEY = os.environ.get("MISTRAL_API_KEY")
 SERPER_API_KEY = os.environ.get("SERPER_API_KEY")
 
-llm = LLM(
-    model="mistral/mistral-large-latest",
-    temperature=0.3
-)
+@lru_cache(maxsize=None)
+def get_llm():
+    """The LLM shared by the agents and BudgetParserTool, built on first use"""
+    from crewai import LLM
+    return LLM(
+        model="mistral/mistral-large-latest",
+        temperature=0.3
+    )
+
+
+def mistral_client(api_key):
+    from mistralai import Mistral
+    client = Mistral(api_key=api_key)
+    # SDK chat calls bypass http_client, so time them here
+    client.chat.complete = observed(HTTP_REQUEST_SECONDS, provider="mistral")(client.chat.complete)
+    return client
+
+
+def __getattr__(name):
+    # tools.llm predates get_llm()
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 class VenueDetails(BaseModel):
     name: str
     address: str
@@ -81,6 +88,8 @@ class UniversalVenueServiceTool(BaseTool):
     description: str = "Discovers venues for events using targeted search and extraction"
     args_schema: Type[BaseModel] = JustDialVenueSearchInput
     
+    @traced("venue_search")
+    @observed(TOOL_RUN_SECONDS, tool="venue_search")
     def _run(self, location: str, event_type: str, venue_type: str, guest_count: int, budget: int) -> List[Dict[str, Any]]:
         """
         Find venues matching the specified criteria through directed web search and content extraction
@@ -92,6 +101,7 @@ class UniversalVenueServiceTool(BaseTool):
         if not serper_api_key or not mistral_api_key:
             logger.error("Missing required API keys")
             return [{"error": "Missing API keys"}]
+        logger.info(f"Venue search trace {current_trace_id()}")
         
         # Step 1: Build targeted search query focusing ONLY on venuelook.com
         search_query = f"Best {venue_type} in {location} under {budget} for {guest_count} guests site:venuelook.com"
@@ -195,16 +205,21 @@ class UniversalVenueServiceTool(BaseTool):
             
         return verified_venues
     
+    @traced("venue.extract")
     def _extract_venue_data(self, content: str, url: str, mistral_api_key: str,
                            event_type: str, venue_type: str, guest_count: int, 
                            budget: int, location: str) -> Optional[Dict[str, Any]]:
         """Extract structured venue data using Mistral LLM with retry logic"""
         max_retries = 3
+        mistral_breaker = get_breaker("mistral")
         
         for attempt in range(max_retries):
+            if not mistral_breaker.allow_request():
+                logger.warning("Mistral circuit open, skipping venue extraction")
+                return None
             try:
                 # Initialize Mistral client
-                client = Mistral(api_key=mistral_api_key)
+                client = mistral_client(mistral_api_key)
                 
                 # Create concise system prompt for venue extraction
                 system_prompt = f"""
@@ -232,6 +247,7 @@ class UniversalVenueServiceTool(BaseTool):
                     temperature=0.1,
                     response_format={"type": "json_object"}
                 )
+                record_chat_usage(chat_response)
                 
                 # Handle different response formats
                 if hasattr(chat_response, 'choices'):
@@ -252,6 +268,8 @@ class UniversalVenueServiceTool(BaseTool):
                     logger.error(f"Failed to decode JSON response: {result_text}")
                     raise ValueError("Failed to decode JSON response")
                 
+                mistral_breaker.record_success()
+                
                 # Add source URL and other fields
                 result_data["source"] = url
                 result_data["url"] = url
@@ -261,9 +279,11 @@ class UniversalVenueServiceTool(BaseTool):
                     
             except Exception as e:
                 if "429" in str(e) or "rate limit" in str(e).lower():
+                    mistral_breaker.record_failure()
                     # Rate limit hit - backoff exponentially
                     retry_delay = (1 * (2 ** attempt)) + (random.random() * 0.5)
                     logger.warning(f"Rate limit hit, retrying in {retry_delay:.1f}s")
+                    add_to_span("retries")
                     time.sleep(retry_delay)
                     
                     # Last attempt, return None if it fails
@@ -271,10 +291,12 @@ class UniversalVenueServiceTool(BaseTool):
                         logger.error(f"All retries failed for extracting venue data: {e}")
                         return None
                 else:
-                    # Other error, log and continue
+                    # Other error, log and continue; it doesn't count against Mistral
+                    mistral_breaker.release()
                     logger.error(f"Error extracting venue data: {e}")
                     return None
     
+    @traced("venue.enrich")
     def _extract_contact_from_map(self, venue, serper_api_key, mistral_api_key):
         """Extract contact information with retries and simplified approach"""
         name = venue.get("name", "")
@@ -331,7 +353,7 @@ class UniversalVenueServiceTool(BaseTool):
         for attempt in range(max_retries):
             try:
                 # Initialize Mistral client
-                client = Mistral(api_key=mistral_api_key)
+                client = mistral_client(mistral_api_key)
                 
                 # Create simplified prompt
                 system_prompt = "Extract the phone number for the venue from text. Return only the number."
@@ -347,6 +369,7 @@ class UniversalVenueServiceTool(BaseTool):
                     messages=messages,
                     temperature=0.1
                 )
+                record_chat_usage(chat_response)
                 
                 if hasattr(chat_response, 'choices') and isinstance(chat_response.choices, list) and chat_response.choices:
                     extracted_contact = chat_response.choices[0].message.content.strip()
@@ -379,6 +402,7 @@ class UniversalVenueServiceTool(BaseTool):
         
         return venue
     
+    @traced("venue.search")
     def _execute_search(self, query: str, serper_api_key: str) -> List[Dict[str, Any]]:
         """Execute search with error handling and retries"""
         max_retries = 2
@@ -395,11 +419,13 @@ class UniversalVenueServiceTool(BaseTool):
                     "num": 10
                 }
                 
-                response = requests.post(
-                    "https://google.serper.dev/search", 
-                    headers=headers, 
-                    json=search_payload,
-                    timeout=15
+                response = request_with_policy(
+                    "POST",
+                    SERPER_URL,
+                    default_timeout=15,
+                    hedge=HEDGE_SERPER,
+                    headers=headers,
+                    json=search_payload
                 )
                 
                 response.raise_for_status()
@@ -410,6 +436,9 @@ class UniversalVenueServiceTool(BaseTool):
                     
                 return results
                 
+            except CircuitOpenError as e:
+                logger.warning(f"Skipping search: {e}")
+                return []
             except Exception as e:
                 logger.warning(f"Search attempt {attempt+1} failed: {e}")
                 time.sleep(1)
@@ -417,6 +446,7 @@ class UniversalVenueServiceTool(BaseTool):
         logger.error("All search attempts failed")
         return []
     
+    @traced("venue.fetch")
     def _extract_content(self, url: str) -> Optional[str]:
         """Extract content from URL"""
         try:
@@ -425,34 +455,22 @@ class UniversalVenueServiceTool(BaseTool):
                 "Accept": "text/html,application/xhtml+xml",
             }
             
-            response = requests.get(url, headers=headers, timeout=8)
-            
-            if response.status_code == 200:
-                # Try Trafilatura first
-                extracted_text = trafilatura.extract(response.text)
-                if extracted_text and len(extracted_text) >= 200:
-                    return f"Source URL: {url}\n\n{extracted_text}"
-                
-                # BeautifulSoup fallback
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Look for main content
-                for selector in ['.venue-details', '.venue-info', 'main', 'article', '.content']:
-                    elements = soup.select(selector)
-                    if elements:
-                        text = '\n'.join([e.get_text(separator='\n', strip=True) for e in elements])
-                        if text and len(text) >= 200:
-                            return f"Source URL: {url}\n\n{text}"
-                
-                # Get paragraphs as last resort
-                paragraphs = soup.find_all('p')
-                if paragraphs:
-                    text = '\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
-                    if text and len(text) >= 150:
-                        return f"Source URL: {url}\n\n{text}"
+            page = fetch_page_bytes(url, headers, default_timeout=8, hedge=HEDGE_PAGE_FETCHES)
+            
+            if page:
+                # Parse in the worker pool: trafilatura first, then a single-pass selector fallback
+                from extraction import get_parsing_pool, VENUE_CONTENT_SELECTORS
+                body, encoding = page
+                add_to_span("bytes", len(body))
+                text = get_parsing_pool().extract(body, encoding, VENUE_CONTENT_SELECTORS, paragraph_min_length=150)
+                if text:
+                    return f"Source URL: {url}\n\n{text}"
                         
             return None
             
+        except CircuitOpenError as e:
+            logger.info(f"Skipping {url}: {e}")
+            return None
         except Exception as e:
             logger.error(f"Error extracting content from {url}: {e}")
             return None
@@ -507,6 +525,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
         # Initialize lock in __init__ instead of at class level to avoid pickling issues
         self._request_lock = threading.Lock()
     
+    @traced("vendor.tool")
     def _run(self, service_type: str, location: str, event_type: str, budget: int) -> List[Dict[str, Any]]:
         """
         Run the vendor search with the implementation provided by the subclass
@@ -531,7 +550,9 @@ class BaseVendorSearchTool(BaseTool, ABC):
         
         # Get search sites and queries from the specialized implementation
         search_sites = self._get_search_sites(service_type)
-        search_queries = self._generate_search_queries(service_type, event_type, location, budget, search_sites)
+        search_queries = self._skip_tripped_sites(
+            self._generate_search_queries(service_type, event_type, location, budget, search_sites)
+        )
         
         # Execute searches and process results
         vendors_data = []
@@ -586,6 +607,18 @@ class BaseVendorSearchTool(BaseTool, ABC):
         """Generate search queries for the specified service and parameters"""
         pass
 
+    def _skip_tripped_sites(self, queries: List[str]) -> List[str]:
+        """Drop site-restricted queries whose domain circuit breaker is open"""
+        active_queries = []
+        for query in queries:
+            if "site:" in query:
+                site = query.split("site:")[1].strip()
+                if is_domain_tripped(site):
+                    logger.info(f"Skipping query for tripped site {site}: {query}")
+                    continue
+            active_queries.append(query)
+        return active_queries
+
     def _should_skip_url(self, url: str) -> bool:
         """Determine if a URL should be skipped"""
         skip_domains = [
@@ -607,7 +640,8 @@ class BaseVendorSearchTool(BaseTool, ABC):
         with ThreadPoolExecutor(max_workers=4) as executor:
             # Submit tasks to the executor
             future_to_url = {
-                executor.submit(self._process_search_result, result, seen_vendor_names, search_lock, search_context): 
+                submit_with_context(executor, self._process_search_result, result, seen_vendor_names, search_lock,
+                                    search_context): 
                 result.get("link") 
                 for result in search_results[:max_results]
             }
@@ -633,12 +667,18 @@ class BaseVendorSearchTool(BaseTool, ABC):
         
         return vendors_data
     
+    @traced("vendor.process_result")
     def _process_search_result(self, result, seen_vendor_names, search_lock, context):
         """Process a single search result to extract vendor data"""
         url = result.get("link")
         if not url or self._should_skip_url(url):
             return None
         
+        # Skip domains that are currently refusing or failing requests
+        if is_domain_tripped(url):
+            logger.info(f"Skipping {url}: circuit open for {get_domain(url)}")
+            return None
+        
         # Check if we've already processed this URL (thread-safe)
         with search_lock:
             if len(seen_vendor_names) >= 5:
@@ -671,6 +711,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
         
         return None
     
+    @traced("vendor.search")
     def _execute_search_with_rate_limit(self, query: str, serper_api_key: str) -> List[Dict[str, Any]]:
         """Execute search with error handling, retries and rate limiting"""
         max_retries = 3
@@ -690,11 +731,13 @@ class BaseVendorSearchTool(BaseTool, ABC):
                     "num": 20
                 }
                 
-                response = requests.post(
-                    "https://google.serper.dev/search", 
-                    headers=headers, 
-                    json=search_payload,
-                    timeout=20
+                response = request_with_policy(
+                    "POST",
+                    SERPER_URL,
+                    default_timeout=20,
+                    hedge=HEDGE_SERPER,
+                    headers=headers,
+                    json=search_payload
                 )
                 
                 response.raise_for_status()
@@ -707,11 +750,15 @@ class BaseVendorSearchTool(BaseTool, ABC):
                     
                 return results
                 
+            except CircuitOpenError as e:
+                logger.warning(f"Skipping search: {e}")
+                return []
             except requests.exceptions.HTTPError as e:
                 if e.response.status_code == 429:
                     # Rate limit hit - apply exponential backoff
                     retry_delay = (2 ** attempt) + (random.random() * 2)
                     logger.warning(f"Rate limit hit, retrying in {retry_delay:.1f}s")
+                    add_to_span("retries")
                     time.sleep(retry_delay)
                 else:
                     logger.error(f"HTTP error: {str(e)}")
@@ -723,6 +770,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
         logger.error("All search attempts failed")
         return []
     
+    @traced("vendor.fetch")
     def _extract_content_with_rate_limit(self, url: str) -> Optional[str]:
         """Extract content from URL using Trafilatura with rate limiting"""
         try:
@@ -736,71 +784,45 @@ class BaseVendorSearchTool(BaseTool, ABC):
                 "Referer": "https://www.google.com/"
             }
             
-            response = requests.get(url, headers=headers, timeout=15)
+            page = fetch_page_bytes(url, headers, default_timeout=15, hedge=HEDGE_PAGE_FETCHES)
             
-            if response.status_code == 200:
-                # Try Trafilatura first
-                extracted_text = trafilatura.extract(response.text)
-                if extracted_text and len(extracted_text) >= 200:
-                    return f"Source URL: {url}\n\n{extracted_text}"
-                
-                # BeautifulSoup fallback
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Try service-specific content containers
-                service_containers = [
-                    '.vendor-details', '.vendor-info', '.service-details',
-                    '.service-description', '.product-details', '.provider-info',
-                    '.about-vendor', '.professional-details', '.service-provider'
-                ]
-                
-                for selector in service_containers:
-                    try:
-                        elements = soup.select(selector)
-                        if elements:
-                            text = '\n'.join([e.get_text(separator='\n', strip=True) for e in elements])
-                            if text and len(text) >= 200:
-                                return f"Source URL: {url}\n\n{text}"
-                    except:
-                        continue
-                
-                # Try common content containers
-                for selector in ['main', 'article', '.content', '#content', '.main-content']:
-                    try:
-                        elements = soup.select(selector)
-                        if elements:
-                            text = '\n'.join([e.get_text(separator='\n', strip=True) for e in elements])
-                            if text and len(text) >= 200:
-                                return f"Source URL: {url}\n\n{text}"
-                    except:
-                        continue
-                
-                # Extract paragraphs as last resort
-                paragraphs = soup.find_all('p')
-                if paragraphs:
-                    text = '\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
-                    if text and len(text) >= 200:
-                        return f"Source URL: {url}\n\n{text}"
+            if page:
+                # Parse in the worker pool: trafilatura first, then a single-pass selector fallback
+                from extraction import get_parsing_pool, VENDOR_CONTENT_SELECTORS
+                body, encoding = page
+                add_to_span("bytes", len(body))
+                text = get_parsing_pool().extract(body, encoding, VENDOR_CONTENT_SELECTORS)
+                if text:
+                    return f"Source URL: {url}\n\n{text}"
                         
             return None
             
+        except CircuitOpenError as e:
+            logger.info(f"Skipping {url}: {e}")
+            return None
         except Exception as e:
             logger.error(f"Error extracting content from {url}: {e}")
             return None
     
+    @traced("vendor.extract")
     def _extract_vendor_data_with_rate_limit(self, content: str, url: str, mistral_api_key: str,
                              service_type: str, event_type: str, location: str, 
                              budget: int) -> Optional[Dict[str, Any]]:
         """Extract structured vendor data using Mistral LLM with rate limiting"""
         max_retries = 3
+        mistral_breaker = get_breaker("mistral")
         
         for attempt in range(max_retries):
+            # Skip immediately while Mistral keeps rate limiting us
+            if not mistral_breaker.allow_request():
+                logger.warning("Mistral circuit open, skipping vendor extraction")
+                return None
             try:
                 # Apply rate limiting for Mistral API
                 self._apply_rate_limit("mistral")
                 
                 # Initialize Mistral client
-                client = Mistral(api_key=mistral_api_key)
+                client = mistral_client(mistral_api_key)
                 
                 # Create targeted system prompt for vendor extraction
                 system_prompt = f"""
@@ -843,8 +865,10 @@ class BaseVendorSearchTool(BaseTool, ABC):
                     temperature=0.1,
                     response_format={"type": "json_object"}
                 )
+                record_chat_usage(chat_response)
                 
                 result_text = chat_response.choices[0].message.content
+                mistral_breaker.record_success()
                 result_data = json.loads(result_text)
                 
                 # Add source URL if not present
@@ -858,14 +882,21 @@ class BaseVendorSearchTool(BaseTool, ABC):
                     
             except requests.exceptions.HTTPError as e:
                 if hasattr(e, 'response') and e.response.status_code == 429:
+                    mistral_breaker.record_failure()
                     # Rate limit hit - exponential backoff with jitter
                     retry_delay = (2 ** attempt) + (random.random() * 2)
                     logger.warning(f"Mistral API rate limit hit, retrying in {retry_delay:.1f}s")
+                    add_to_span("retries")
                     time.sleep(retry_delay)
                 else:
+                    mistral_breaker.release()
                     logger.error(f"HTTP error in Mistral API: {str(e)}")
                     time.sleep(1)
             except Exception as e:
+                if "429" in str(e) or "rate limit" in str(e).lower():
+                    mistral_breaker.record_failure()
+                else:
+                    mistral_breaker.release()
                 logger.error(f"Error extracting vendor data (attempt {attempt+1}): {e}")
                 time.sleep(1)
                 
@@ -883,7 +914,8 @@ class BaseVendorSearchTool(BaseTool, ABC):
         with ThreadPoolExecutor(max_workers=3) as executor:
             # Submit enhancement tasks to the executor
             future_to_vendor = {
-                executor.submit(
+                submit_with_context(
+                    executor,
                     self._enhance_vendor_details, 
                     vendor, 
                     context["serper_api_key"], 
@@ -905,6 +937,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
         
         return enhanced_vendors
     
+    @traced("vendor.enrich")
     def _enhance_vendor_details(self, vendor: Dict[str, Any], serper_api_key: str, 
                                mistral_api_key: str, service_type: str, location: str) -> Dict[str, Any]:
         """
@@ -925,6 +958,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
             
         return vendor
         
+    @traced("vendor.enrich.contact")
     def _extract_contact_info(self, vendor: Dict[str, Any], serper_api_key: str, mistral_api_key: str) -> Dict[str, Any]:
         """Extract contact information from search results"""
         vendor_name = vendor.get("name", "")
@@ -983,7 +1017,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
                 self._apply_rate_limit("mistral")
                 
                 # Initialize Mistral client
-                client = Mistral(api_key=mistral_api_key)
+                client = mistral_client(mistral_api_key)
                 
                 # Create simpler system prompt for contact extraction
                 system_prompt = f"""
@@ -1003,6 +1037,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
                     messages=messages,
                     temperature=0.1
                 )
+                record_chat_usage(chat_response)
                 
                 extracted_contact = chat_response.choices[0].message.content.strip()
                 
@@ -1015,6 +1050,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
                 
         return vendor
         
+    @traced("vendor.enrich.price")
     def _extract_price_info(self, vendor: Dict[str, Any], serper_api_key: str, 
                            mistral_api_key: str, service_type: str, location: str) -> Dict[str, Any]:
         """Extract or estimate price information"""
@@ -1048,7 +1084,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
                 self._apply_rate_limit("mistral")
                 
                 # Initialize Mistral client
-                client = Mistral(api_key=mistral_api_key)
+                client = mistral_client(mistral_api_key)
                 
                 # Create system prompt for price extraction (simplified for speed)
                 system_prompt = f"""
@@ -1069,6 +1105,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
                     messages=messages,
                     temperature=0.1
                 )
+                record_chat_usage(chat_response)
                 
                 extracted_price = chat_response.choices[0].message.content.strip()
                 
@@ -1155,6 +1192,7 @@ class BaseVendorSearchTool(BaseTool, ABC):
             elapsed = current_time - self._last_request_time
             if elapsed < min_interval:
                 wait_time = min_interval - elapsed + (random.random() * 0.5)  # Add jitter
+                add_to_span("throttled_s", wait_time)
                 time.sleep(wait_time)
             
             # Update last request time
@@ -1313,11 +1351,13 @@ class DecorationVendorTool(BaseVendorSearchTool):
                     "num": 10
                 }
                 
-                response = requests.post(
-                    "https://google.serper.dev/search", 
-                    headers=headers, 
-                    json=search_payload,
-                    timeout=20
+                response = request_with_policy(
+                    "POST",
+                    SERPER_URL,
+                    default_timeout=20,
+                    hedge=HEDGE_SERPER,
+                    headers=headers,
+                    json=search_payload
                 )
                 
                 response.raise_for_status()
@@ -1586,6 +1626,8 @@ class VendorToolsManager(BaseTool):
         # Initialize the lock in the manager
         self._request_lock = threading.Lock()
     
+    @traced("vendor_search")
+    @observed(TOOL_RUN_SECONDS, tool="vendor_search")
     def _run(self, service_type: str, location: str, event_type: str, budget: int) -> List[Dict[str, Any]]:
         """
         Delegates to the appropriate specialized tool based on service type
@@ -1594,7 +1636,7 @@ class VendorToolsManager(BaseTool):
         vendor_tool = self._get_vendor_tool_for_service(service_type)
         
         # Log which specialized tool we're using
-        logger.info(f"Using {vendor_tool.name} for service type: {service_type}")
+        logger.info(f"Using {vendor_tool.name} for service type: {service_type} (trace {current_trace_id()})")
         
         # Execute the search using the specialized tool
         results = vendor_tool._run(service_type, location, event_type, budget)
@@ -1639,6 +1681,7 @@ class BudgetParserTool(BaseTool):
     description: str = "Converts budget formats to standardized amount"
     args_schema: Type[BaseModel] = BudgetInput
 
+    @observed(TOOL_RUN_SECONDS, tool="budget_parser")
     def _run(self, raw_budget: str) -> dict:
         # First try LLM parsing
         try:
@@ -1652,7 +1695,7 @@ class BudgetParserTool(BaseTool):
             Input: {raw_budget}
             Output JSON: {{"amount": number, "currency": "INR"}}
             """
-            response = llm.invoke(prompt)
+            response = get_llm().invoke(prompt)
             data = json.loads(response)
             if "amount" in data and "currency" in data:
                 return {"amount": data["amount"], "currency": data["currency"], "converted_INR": data["amount"]}
@@ -1690,6 +1733,7 @@ class ServiceRequestAnalyzerTool(BaseTool):
     description: str = "Analyzes user's request to modify services and budgets"
     args_schema: Type[BaseModel] = ServiceRequestInput
 
+    @observed(TOOL_RUN_SECONDS, tool="service_request_analyzer")
     def _run(self, user_request: str, current_services: str) -> str:
         # Get the Mistral API key from environment
         mistral_api_key = os.environ.get("MISTRAL_API_KEY")
@@ -1702,7 +1746,7 @@ class ServiceRequestAnalyzerTool(BaseTool):
             }
             
         # Initialize Mistral client
-        client = Mistral(api_key=mistral_api_key)
+        client = mistral_client(mistral_api_key)
         
         system_prompt = """
         You are a service analysis assistant that helps understand user requests to modify services and budgets.
@@ -1753,6 +1797,7 @@ class ServiceRequestAnalyzerTool(BaseTool):
                 temperature=0.1,
                 response_format={"type": "json_object"}
             )
+            record_chat_usage(chat_response)
             
             result_text = chat_response.choices[0].message.content
             return json.loads(result_text)
@@ -1766,60 +1811,6 @@ class ServiceRequestAnalyzerTool(BaseTool):
                 "analysis": "Could not process request: " + user_request
             }
 # Custom decorative flowable for invitation
-class DecorationFlowable(Flowable):
-    """A custom flowable to add decorative elements to the invitation"""
-    def __init__(self, width, height, decoration_type, color):
-        Flowable.__init__(self)
-        self.width = width
-        self.height = height
-        self.decoration_type = decoration_type
-        self.color = color
-        
-    def draw(self):
-        """Draw the decoration"""
-        canvas = self.canv
-        canvas.saveState()
-        canvas.setStrokeColor(self.color)
-        canvas.setFillColor(self.color)
-        
-        if self.decoration_type == "divider":
-            # Draw a fancy divider
-            canvas.setLineWidth(0.5)
-            mid_y = self.height / 2
-            canvas.line(0, mid_y, self.width * 0.4, mid_y)
-            
-            # Center ornament
-            x = self.width * 0.5
-            y = mid_y
-            radius = min(self.height * 0.4, 5)
-            canvas.circle(x, y, radius, fill=1)
-            
-            canvas.line(self.width * 0.6, mid_y, self.width, mid_y)
-            
-        elif self.decoration_type == "corner":
-            # Draw corner decorations
-            size = min(self.width, self.height) * 0.3
-            line_width = 1.5
-            canvas.setLineWidth(line_width)
-            
-            # Top left corner
-            canvas.line(0, self.height, size, self.height)
-            canvas.line(0, self.height, 0, self.height - size)
-            
-            # Top right corner
-            canvas.line(self.width - size, self.height, self.width, self.height)
-            canvas.line(self.width, self.height, self.width, self.height - size)
-            
-            # Bottom left corner
-            canvas.line(0, 0, size, 0)
-            canvas.line(0, 0, 0, size)
-            
-            # Bottom right corner
-            canvas.line(self.width - size, 0, self.width, 0)
-            canvas.line(self.width, 0, self.width, size)
-            
-        canvas.restoreState()
-
 # ---------------------- Mistral API Setup ----------------------
 class MistralAPI:
     def __init__(self):
@@ -1828,75 +1819,126 @@ class MistralAPI:
             logger.warning("MISTRAL_API_KEY not found in environment variables")
         self.api_url = "https://api.mistral.ai/v1/chat/completions"
     
-    def generate_invitation(self, event_details):
-        """Generate an invitation using Mistral API"""
+    def _build_request(self, event_details):
+        """Return (headers, payload) for an invitation chat completion"""
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+        
+        # Format the prompt for Mistral - with improved instructions
+        formatted_date = event_details.get("formatted_date", event_details.get("event_date", ""))
+        
+        # Format the prompt for Mistral - with improved, more exciting instructions
+        prompt = f"""
+        Create a beautiful, engaging invitation for a {event_details['event_type']} with these details:
+        - Event name: {event_details['event_name']}
+        - Host: {event_details['host_name']}
+        - Date: {formatted_date}
+        - Time: {event_details['event_time']}
+        - Venue: {event_details['venue_name']}
+        - Address: {event_details['venue_address']}
+        - Style preference: {event_details.get('style_preference', 'elegant')}
+
+        Special Instructions: {event_details.get('special_instructions', 'None')}
+        RSVP: {event_details.get('rsvp_contact', 'None')}
+
+        IMPORTANT FORMATTING INSTRUCTIONS:
+        1. DO NOT start with "Dear Guest" or any greeting - this is a formal invitation card, not a letter
+        2. DO NOT end with "Warm regards" or similar closings
+        3. DO NOT use markdown formatting like asterisks (*) or underscores (_)
+        4. Keep it concise but impactful (100-150 words maximum)
+        5. Begin with an exciting, catchy headline that grabs attention
+        6. Use vibrant, enthusiastic language that conveys celebration and joy
+        7. Include some playful or emotional phrases that make the recipient feel special
+        8. Make the invitation sound personal and meaningful, not generic
+        9. Use elegant and evocative language appropriate for a {event_details['event_type']}
+
+        Write ONLY the invitation text - no commentary, explanations, or formatting notes.
+        """
+        
+        payload = {
+            "model": "mistral-large-latest",
+            "messages": [
+                {"role": "system", "content": "You are an expert invitation writer who creates beautiful, formal invitations for special events."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 500
+        }
+        
+        return headers, payload
+    
+    @staticmethod
+    def clean_invitation_text(invitation_text):
+        """Strip markdown emphasis the model sometimes adds despite the instructions"""
+        invitation_text = invitation_text.strip()
+        invitation_text = re.sub(r'\*{1,2}(.*?)\*{1,2}', r'\1', invitation_text)
+        invitation_text = re.sub(r'_{1,2}(.*?)_{1,2}', r'\1', invitation_text)
+        return invitation_text
+    
+    def complete_invitation(self, event_details):
+        """Invitation text from the model; raises instead of falling back to the template"""
+        if not self.api_key:
+            raise RuntimeError("MISTRAL_API_KEY is not set")
+        
+        headers, payload = self._build_request(event_details)
+        
+        # Invitation text is not idempotent (temperature 0.7), so no hedging here
+        response = request_with_policy("POST", self.api_url, default_timeout=60, headers=headers, json=payload)
+        response.raise_for_status()
+        
+        result = response.json()
+        record_chat_usage(result)
+        return self.clean_invitation_text(result['choices'][0]['message']['content'])
+    
+    def generate_invitation(self, event_details, on_complete=None):
+        """
+        Generate an invitation using Mistral API. `on_complete(text)` is called
+        only for text the model actually wrote, never for the fallback template.
+        """
         if not self.api_key:
             # Fallback to a template if API key is not available
             return self._generate_template_invitation(event_details)
         
         try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-            
-            # Format the prompt for Mistral - with improved instructions
-            formatted_date = event_details.get("formatted_date", event_details.get("event_date", ""))
-            
-            # Format the prompt for Mistral - with improved, more exciting instructions
-            prompt = f"""
-            Create a beautiful, engaging invitation for a {event_details['event_type']} with these details:
-            - Event name: {event_details['event_name']}
-            - Host: {event_details['host_name']}
-            - Date: {formatted_date}
-            - Time: {event_details['event_time']}
-            - Venue: {event_details['venue_name']}
-            - Address: {event_details['venue_address']}
-            - Style preference: {event_details.get('style_preference', 'elegant')}
-
-            Special Instructions: {event_details.get('special_instructions', 'None')}
-            RSVP: {event_details.get('rsvp_contact', 'None')}
-
-            IMPORTANT FORMATTING INSTRUCTIONS:
-            1. DO NOT start with "Dear Guest" or any greeting - this is a formal invitation card, not a letter
-            2. DO NOT end with "Warm regards" or similar closings
-            3. DO NOT use markdown formatting like asterisks (*) or underscores (_)
-            4. Keep it concise but impactful (100-150 words maximum)
-            5. Begin with an exciting, catchy headline that grabs attention
-            6. Use vibrant, enthusiastic language that conveys celebration and joy
-            7. Include some playful or emotional phrases that make the recipient feel special
-            8. Make the invitation sound personal and meaningful, not generic
-            9. Use elegant and evocative language appropriate for a {event_details['event_type']}
-
-            Write ONLY the invitation text - no commentary, explanations, or formatting notes.
-            """
-            
-            payload = {
-                "model": "mistral-large-latest",
-                "messages": [
-                    {"role": "system", "content": "You are an expert invitation writer who creates beautiful, formal invitations for special events."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 500
-            }
-            
-            response = requests.post(self.api_url, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            invitation_text = result['choices'][0]['message']['content'].strip()
-            
-            # Clean up any markdown formatting that might still be present
-            invitation_text = re.sub(r'\*{1,2}(.*?)\*{1,2}', r'\1', invitation_text)
-            invitation_text = re.sub(r'_{1,2}(.*?)_{1,2}', r'\1', invitation_text)
-            
-            return invitation_text
-            
+            invitation_text = self.complete_invitation(event_details)
         except Exception as e:
             logger.error(f"Error generating invitation with Mistral API: {e}")
             # Fallback to template if API call fails
             return self._generate_template_invitation(event_details)
+        
+        if on_complete:
+            on_complete(invitation_text)
+        return invitation_text
+    
+    def stream_invitation(self, event_details, on_complete=None):
+        """
+        Yield invitation text as the model produces it. Falls back to the template
+        when the API is unavailable; if the stream breaks after some text has
+        arrived, the partial text is kept. `on_complete(text)` receives the
+        cleaned text once a stream finishes normally.
+        """
+        if not self.api_key:
+            yield self._generate_template_invitation(event_details)
+            return
+        
+        parts = []
+        try:
+            headers, payload = self._build_request(event_details)
+            # Per-read timeout: tokens keep the connection alive, so this only trips on a stall
+            for delta in stream_chat_completion(self.api_url, headers, payload, default_timeout=30,
+                                                on_usage=record_chat_usage):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            logger.error(f"Error streaming invitation from Mistral API: {e}")
+            if not parts:
+                yield self._generate_template_invitation(event_details)
+            return
+        
+        if on_complete and parts:
+            on_complete(self.clean_invitation_text("".join(parts)))
     
     def _generate_template_invitation(self, event_details):
         """Generate a template invitation when API is unavailable"""
@@ -1977,26 +2019,100 @@ class EmailInvitationInput(BaseModel):
     additional_message: Optional[str] = Field(None, description="Additional message in the email")
     cc_addresses: Optional[List[str]] = Field(None, description="CC email addresses")
 
+_invitation_memo: Optional[InvitationTextMemo] = None
+_invitation_memo_lock = threading.Lock()
+
+
+def get_invitation_memo() -> InvitationTextMemo:
+    """Process-wide memo of generated invitation text, refilled through the Mistral API"""
+    global _invitation_memo
+    with _invitation_memo_lock:
+        if _invitation_memo is None:
+            _invitation_memo = InvitationTextMemo(MistralAPI().complete_invitation)
+        return _invitation_memo
+
+
 # ---------------------- Invitation Tools ----------------------
 class InvitationCreatorTool:
     name: str = "invitation_creator_tool"
     description: str = "Creates an invitation text based on event details"
     
-    # Store generated invitations
-    _invitations = {}
-    
     def __init__(self):
         self.mistral_api = MistralAPI()
     
+    @observed(TOOL_RUN_SECONDS, tool="invitation_creator")
     def _run(self, event_name: str, event_type: str, event_date: str, event_time: Optional[str], 
              venue_name: str, venue_address: str, host_name: str, guest_count: Optional[int] = None,
              special_instructions: Optional[str] = None, rsvp_contact: Optional[str] = None,
-             style_preference: Optional[str] = None, background_color: Optional[str] = None) -> Dict[str, Any]:
+             style_preference: Optional[str] = None, background_color: Optional[str] = None,
+             variation: bool = False, event_id: Optional[str] = None) -> Dict[str, Any]:
         """
-        Creates invitation text based on event details
+        Creates invitation text based on event details. Unchanged inputs reuse the
+        remembered text; `variation` asks for a different one. The invitation is
+        saved under `event_id`, the event it belongs to.
         """
         logger.info(f"Creating invitation for {event_name}")
         
+        try:
+            event_details = self._prepare_event_details(
+                event_name, event_type, event_date, event_time, venue_name, venue_address, host_name,
+                guest_count, special_instructions, rsvp_contact, style_preference, background_color
+            )
+            
+            # Reuse remembered text, otherwise generate it with the Mistral API
+            memo = get_invitation_memo()
+            invitation_text = memo.lookup(event_details, variation)
+            if invitation_text is None:
+                invitation_text = self.mistral_api.generate_invitation(
+                    event_details, on_complete=lambda text: memo.record(event_details, text, variation))
+            
+            return self._store_invitation(event_details, invitation_text, event_time, event_id)
+            
+        except Exception as e:
+            logger.error(f"Error creating invitation: {e}")
+            return {"error": f"Failed to create invitation: {str(e)}"}
+    
+    def stream(self, event_name: str, event_type: str, event_date: str, event_time: Optional[str], 
+               venue_name: str, venue_address: str, host_name: str, guest_count: Optional[int] = None,
+               special_instructions: Optional[str] = None, rsvp_contact: Optional[str] = None,
+               style_preference: Optional[str] = None, background_color: Optional[str] = None,
+               variation: bool = False, event_id: Optional[str] = None):
+        """
+        Streaming variant of _run. Yields {"delta": text} as the model writes and
+        finishes with {"result": ...} holding the same payload _run returns.
+        """
+        logger.info(f"Streaming invitation for {event_name}")
+        
+        with TOOL_RUN_SECONDS.time(tool="invitation_creator"):
+            try:
+                event_details = self._prepare_event_details(
+                    event_name, event_type, event_date, event_time, venue_name, venue_address, host_name,
+                    guest_count, special_instructions, rsvp_contact, style_preference, background_color
+                )
+                
+                # A remembered text or prefetched variant is shown at once
+                memo = get_invitation_memo()
+                invitation_text = memo.lookup(event_details, variation)
+                if invitation_text is not None:
+                    yield {"delta": invitation_text}
+                else:
+                    parts = []
+                    stream = self.mistral_api.stream_invitation(
+                        event_details, on_complete=lambda text: memo.record(event_details, text, variation))
+                    for delta in stream:
+                        parts.append(delta)
+                        yield {"delta": delta}
+                    invitation_text = MistralAPI.clean_invitation_text("".join(parts))
+                yield {"result": self._store_invitation(event_details, invitation_text, event_time, event_id)}
+                
+            except Exception as e:
+                logger.error(f"Error streaming invitation: {e}")
+                yield {"result": {"error": f"Failed to create invitation: {str(e)}"}}
+    
+    def _prepare_event_details(self, event_name, event_type, event_date, event_time, venue_name,
+                               venue_address, host_name, guest_count, special_instructions,
+                               rsvp_contact, style_preference, background_color) -> Dict[str, Any]:
+        """Normalize the form input into the details the prompt and the PDF use"""
         # Use a default guest count if not provided
         if guest_count is None:
             guest_count = 30
@@ -2022,74 +2138,64 @@ class InvitationCreatorTool:
             logger.warning(f"Error formatting date: {e}")
             formatted_date = event_date
         
-        try:
-            # Prepare event details for Mistral API
-            event_details = {
-                "event_name": event_name,
-                "event_type": event_type,
-                "event_date": event_date,
-                "formatted_date": formatted_date,
-                "event_time": event_time if event_time else "To be announced",
-                "venue_name": venue_name,
-                "venue_address": venue_address,
-                "host_name": host_name,
-                "guest_count": guest_count,
-                "special_instructions": special_instructions,
-                "rsvp_contact": rsvp_contact,
-                "style_preference": style_preference,
-                "background_color": background_color
-            }
-            
-            # Generate invitation text using Mistral API
-            invitation_text = self.mistral_api.generate_invitation(event_details)
-            
-            # Generate a unique ID for this invitation
-            invitation_id = str(uuid.uuid4())
-            
-            # Create invitation data object
-            invitation_data = {
-                "id": invitation_id,
-                "event_name": event_name,
-                "event_type": event_type,
-                "event_date": formatted_date,
-                "event_time": event_time,
-                "venue_name": venue_name,
-                "venue_address": venue_address,
-                "host_name": host_name,
-                "guest_count": guest_count,
-                "special_instructions": special_instructions,
-                "rsvp_contact": rsvp_contact,
-                "style_preference": style_preference,
-                "background_color": background_color,
-                "text": invitation_text,
-                "created_at": datetime.now().isoformat(),
-                "color_scheme": None,
-                "font_style": None,
-                "border_style": None,
-                "pdf_path": None
-            }
-            
-            # Store the invitation data
-            self._invitations[invitation_id] = invitation_data
-            
-            # Prepare response with invitation preview
-            color_options = self._get_color_options()
-            font_options = self._get_font_options()
-            border_options = self._get_border_options()
-            background_options = self._get_background_options()
-            
-            return {
-                "invitation_id": invitation_id,
-                "invitation_text": invitation_text,
-                "color_options": color_options,
-                "font_options": font_options,
-                "border_options": border_options,
-                "background_options": background_options
-            }
-            
-        except Exception as e:
-            logger.error(f"Error creating invitation: {e}")
-            return {"error": f"Failed to create invitation: {str(e)}"}
+        return {
+            "event_name": event_name,
+            "event_type": event_type,
+            "event_date": event_date,
+            "formatted_date": formatted_date,
+            "event_time": event_time if event_time else "To be announced",
+            "venue_name": venue_name,
+            "venue_address": venue_address,
+            "host_name": host_name,
+            "guest_count": guest_count,
+            "special_instructions": special_instructions,
+            "rsvp_contact": rsvp_contact,
+            "style_preference": style_preference,
+            "background_color": background_color
+        }
+    
+    def _store_invitation(self, event_details: Dict[str, Any], invitation_text: str,
+                          event_time: Optional[str], event_id: Optional[str] = None) -> Dict[str, Any]:
+        """Save the generated text under a new invitation ID and return it with the style options"""
+        # Generate a unique ID for this invitation
+        invitation_id = str(uuid.uuid4())
+        
+        # Create invitation data object
+        invitation_data = {
+            "id": invitation_id,
+            "event_id": event_id,
+            "event_name": event_details["event_name"],
+            "event_type": event_details["event_type"],
+            "event_date": event_details["formatted_date"],
+            "event_time": event_time,
+            "venue_name": event_details["venue_name"],
+            "venue_address": event_details["venue_address"],
+            "host_name": event_details["host_name"],
+            "guest_count": event_details["guest_count"],
+            "special_instructions": event_details["special_instructions"],
+            "rsvp_contact": event_details["rsvp_contact"],
+            "style_preference": event_details["style_preference"],
+            "background_color": event_details["background_color"],
+            "text": invitation_text,
+            "created_at": datetime.now().isoformat(),
+            "color_scheme": None,
+            "font_style": None,
+            "border_style": None,
+            "pdf_path": None
+        }
+        
+        # Store the invitation data
+        self.save_invitation(invitation_data)
+        
+        # Prepare response with invitation preview
+        return {
+            "invitation_id": invitation_id,
+            "invitation_text": invitation_text,
+            "color_options": self._get_color_options(),
+            "font_options": self._get_font_options(),
+            "border_options": self._get_border_options(),
+            "background_options": self._get_background_options()
+        }
     
     def _get_color_options(self):
         """Returns available color scheme options"""
@@ -2140,12 +2246,18 @@ class InvitationCreatorTool:
     @classmethod
     def get_invitation(cls, invitation_id):
         """Get invitation data by ID"""
-        return cls._invitations.get(invitation_id)
+        return get_invitation_store().get(invitation_id)
+    
+    @classmethod
+    def save_invitation(cls, invitation_data):
+        """Write invitation data through to the shared store"""
+        get_invitation_store().put(invitation_data["id"], invitation_data)
 
 class InvitationStylerTool:
     name: str = "invitation_styler_tool"
     description: str = "Applies style to an invitation and generates a PDF"
     
+    @observed(TOOL_RUN_SECONDS, tool="invitation_styler")
     def _run(self, invitation_id: str, color_scheme: str, font_style: str, 
              border_style: Optional[str] = None, background_color: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -2185,6 +2297,7 @@ class InvitationStylerTool:
             # Generate the PDF
             pdf_path = self._generate_pdf(invitation_data)
             invitation_data["pdf_path"] = pdf_path
+            InvitationCreatorTool.save_invitation(invitation_data)
             
             # Return the result
             return {
@@ -2199,307 +2312,122 @@ class InvitationStylerTool:
             logger.error(f"Error styling invitation: {e}")
             return {"error": f"Failed to style invitation: {str(e)}"}
     
+    # Invitation fields that appear on the rendered page
+    RENDERED_FIELDS = ("text", "event_name", "event_date", "event_time", "venue_name",
+                       "venue_address", "host_name", "special_instructions", "rsvp_contact")
+    
+    @traced("invitation.pdf")
     def _generate_pdf(self, invitation_data):
-        """Generate PDF from invitation data using ReportLab with enhanced visual appeal"""
-        # Get style information
-        color_scheme = invitation_data["color_scheme"]
-        font_style = invitation_data["font_style"]
-        border_style = invitation_data["border_style"]
-        background_color = invitation_data["background_color"]
-        
-        # Create output directory if it doesn't exist
-        output_dir = os.path.join(os.getcwd(), "invitations")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Define the output file path
-        event_name_slug = re.sub(r'[^\w\s-]', '', invitation_data["event_name"]).strip().lower()
-        event_name_slug = re.sub(r'[-\s]+', '-', event_name_slug)
-        filename = f"{event_name_slug}-{invitation_data['id'][:8]}.pdf"
-        output_path = os.path.join(output_dir, filename)
-        
-        # Convert hex colors to ReportLab colors
-        def hex_to_rgb(hex_color):
-            h = hex_color.lstrip('#')
-            return tuple(int(h[i:i+2], 16)/255 for i in (0, 2, 4))
-        
-        primary_color = hex_to_rgb(color_scheme["primary"])
-        secondary_color = hex_to_rgb(color_scheme["secondary"])
-        accent_color = hex_to_rgb(color_scheme["accent"])
-        background_rgb = hex_to_rgb(background_color["color"])
-        
-        class InvitationCanvas:
-            """Handles drawing the background and decorative elements on each page"""
-            def __init__(self, background_color, accent_color, border_style):
-                self.background_color = background_color
-                self.accent_color = accent_color
-                self.border_style = border_style
-                
-            def on_page(self, canvas, doc):
-                canvas.saveState()
-                width, height = A5
-                
-                # Draw background color
-                canvas.setFillColor(colors.Color(*self.background_color))
-                canvas.rect(0, 0, width, height, fill=1, stroke=0)
-                
-                # Draw decorative border based on style
-                canvas.setStrokeColor(colors.Color(*self.accent_color))
-                
-                if self.border_style["id"] == "simple":
-                    # Simple border
-                    canvas.setLineWidth(1.5)
-                    margin = 20
-                    canvas.rect(margin, margin, width-2*margin, height-2*margin)
-                
-                elif self.border_style["id"] == "double":
-                    # Double border
-                    canvas.setLineWidth(1)
-                    outer_margin = 20
-                    inner_margin = 30
-                    # Outer border
-                    canvas.rect(outer_margin, outer_margin, width-2*outer_margin, height-2*outer_margin)
-                    # Inner border
-                    canvas.rect(inner_margin, inner_margin, width-2*inner_margin, height-2*inner_margin)
-                
-                elif self.border_style["id"] == "dashed":
-                    # Dashed border
-                    canvas.setDash(6, 3)
-                    canvas.setLineWidth(1)
-                    margin = 20
-                    canvas.rect(margin, margin, width-2*margin, height-2*margin)
-                
-                elif self.border_style["id"] == "ornate":
-                    # Ornate corners
-                    canvas.setLineWidth(1)
-                    margin = 20
-                    corner_size = 40
-                    
-                    # Top left
-                    canvas.line(margin, height-margin, margin+corner_size, height-margin)
-                    canvas.line(margin, height-margin, margin, height-margin-corner_size)
-                    
-                    # Top right
-                    canvas.line(width-margin-corner_size, height-margin, width-margin, height-margin)
-                    canvas.line(width-margin, height-margin, width-margin, height-margin-corner_size)
-                    
-                    # Bottom left
-                    canvas.line(margin, margin, margin+corner_size, margin)
-                    canvas.line(margin, margin, margin, margin+corner_size)
-                    
-                    # Bottom right
-                    canvas.line(width-margin-corner_size, margin, width-margin, margin)
-                    canvas.line(width-margin, margin, width-margin, margin+corner_size)
-                    
-                    # Corner decorations
-                    for x, y in [(margin, height-margin), (width-margin, height-margin), 
-                                (margin, margin), (width-margin, margin)]:
-                        # Small decorative circle
-                        canvas.setFillColor(colors.Color(*self.accent_color))
-                        canvas.circle(x, y, 3, fill=1)
-                
-                elif self.border_style["id"] == "floral":
-                    # Floral border - simplified representation
-                    margin = 30
-                    canvas.setLineWidth(1)
-                    
-                    # Draw a frame
-                    canvas.rect(margin, margin, width-2*margin, height-2*margin)
-                    
-                    # Draw floral elements in corners
-                    for x, y in [(margin, height-margin), (width-margin, height-margin), 
-                               (margin, margin), (width-margin, margin)]:
-                        
-                        # Draw petal-like shapes
-                        canvas.setFillColor(colors.Color(*self.accent_color, alpha=0.5))
-                        radius = 15
-                        for angle in range(0, 360, 45):
-                            rad_angle = angle * 3.14159 / 180
-                            x1 = x + radius * 0.8 * (1 if angle < 180 else -1)
-                            y1 = y + radius * 0.8 * (1 if 45 <= angle <= 225 else -1)
-                            canvas.circle(x1, y1, radius/2, fill=1)
-                
-                canvas.restoreState()
-        
-        # Create PDF document with custom page setup
-        doc = SimpleDocTemplate(
-            output_path, 
-            pagesize=A5, 
-            rightMargin=50, 
-            leftMargin=50, 
-            topMargin=50, 
-            bottomMargin=50
+        """Return the PDF for this text and style, rendering it only if it is not cached"""
+        fields = {field: invitation_data.get(field) for field in self.RENDERED_FIELDS}
+        fields.update({
+            "color_scheme": invitation_data["color_scheme"]["id"],
+            "font_style": invitation_data["font_style"]["id"],
+            "border_style": (invitation_data["border_style"] or {"id": "none"})["id"],
+            "background_color": invitation_data["background_color"]["id"],
+        })
+        
+        # Keep PDFs that invitations in this process currently point at
+        pinned = [inv.get("pdf_path") for inv in get_invitation_store().cached()]
+        return get_render_cache().get_or_render(
+            fields,
+            invitation_data["event_name"],
+            lambda output_path: self._render_pdf(invitation_data, output_path),
+            pinned=pinned
         )
-        
-        # Create a canvas painter for background and decorations
-        canvas_painter = InvitationCanvas(background_rgb, accent_color, border_style or {"id": "none"})
-        
-        # Define styles
-        styles = getSampleStyleSheet()
-        
-        # Add custom styles with unique names to avoid conflicts
-        styles.add(ParagraphStyle(
-            name='InviteTitle',
-            fontName=font_style["heading"],
-            fontSize=22,
-            alignment=TA_CENTER,
-            textColor=colors.Color(*primary_color),
-            spaceAfter=16
-        ))
-        
-        styles.add(ParagraphStyle(
-            name='InviteHeading',
-            fontName=font_style["heading"],
-            fontSize=16,
-            alignment=TA_CENTER,
-            textColor=colors.Color(*primary_color),
-            spaceAfter=10
-        ))
-        
-        styles.add(ParagraphStyle(
-            name='InviteNormal',
-            fontName=font_style["body"],
-            fontSize=12,
-            alignment=TA_CENTER,
-            textColor=colors.Color(*primary_color),
-            spaceAfter=6,
-            leading=16
-        ))
-        
-        styles.add(ParagraphStyle(
-            name='InviteDetails',
-            fontName=font_style["body"],
-            fontSize=11,
-            alignment=TA_CENTER,
-            textColor=colors.Color(*primary_color),
-            spaceAfter=4
-        ))
-        
-        styles.add(ParagraphStyle(
-            name='InviteVenue',
-            fontName=font_style["heading"],
-            fontSize=14,
-            alignment=TA_CENTER,
-            textColor=colors.Color(*accent_color),
-            spaceAfter=6
-        ))
-        
-        styles.add(ParagraphStyle(
-            name='InviteFooter',
-            fontName=font_style["body"],
-            fontSize=10,
-            alignment=TA_CENTER,
-            textColor=colors.Color(*accent_color),
-            spaceAfter=6,
-            italic=True
-        ))
-        
-        # Create story (content)
-        story = []
-        
-        # Add title - first extract a good title from invitation text
-        lines = invitation_data["text"].split('\n')
-        title = invitation_data["event_name"]
-        
-        # Try to find a good title from the invitation text
-        for line in lines[:3]:  # Check first few lines for a title
-            if line.strip() and len(line.strip()) < 50:  # Find short enough line 
-                title = line.strip()
-                break
-        
-        # Start with decorative element
-        accent_color_obj = colors.Color(*accent_color)
-        story.append(DecorationFlowable(400, 20, "corner", accent_color_obj))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Add title
-        story.append(Paragraph(title, styles["InviteTitle"]))
-        
-        # Add decorative divider
-        story.append(DecorationFlowable(400, 10, "divider", accent_color_obj))
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Process invitation text (split by paragraphs)
-        paragraphs = invitation_data["text"].split('\n\n')
-        
-        # Skip the first paragraph if it's the title we already used
-        start_idx = 1 if paragraphs and paragraphs[0].strip() == title else 0
-        
-        for paragraph in paragraphs[start_idx:]:
-            if paragraph.strip():
-                story.append(Paragraph(paragraph.strip(), styles["InviteNormal"]))
-                story.append(Spacer(1, 0.15*inch))
-        
-        # Add venue information prominently
-        story.append(Spacer(1, 0.1*inch))
-        story.append(Paragraph("VENUE", styles["InviteHeading"]))
-        story.append(Paragraph(invitation_data["venue_name"], styles["InviteVenue"]))
-        story.append(Paragraph(invitation_data["venue_address"], styles["InviteDetails"]))
-        
-        # Add decorative divider
-        story.append(Spacer(1, 0.2*inch))
-        story.append(DecorationFlowable(400, 10, "divider", accent_color_obj))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Add event details
-        details_text = f"Date: {invitation_data['event_date']}"
-        if invitation_data["event_time"]:
-            details_text += f" at {invitation_data['event_time']}"
-        
-        story.append(Paragraph(details_text, styles["InviteDetails"]))
-        
-        if invitation_data.get("special_instructions"):
-            story.append(Spacer(1, 0.1*inch))
-            story.append(Paragraph(f"Note: {invitation_data['special_instructions']}", styles["InviteDetails"]))
-        
-        # Add RSVP if available
-        if invitation_data.get("rsvp_contact"):
-            story.append(Spacer(1, 0.15*inch))
-            story.append(Paragraph(f"RSVP: {invitation_data['rsvp_contact']}", styles["InviteFooter"]))
-        
-        # Add host
-        story.append(Spacer(1, 0.15*inch))
-        story.append(Paragraph(f"Hosted by {invitation_data['host_name']}", styles["InviteFooter"]))
-        
-        # Add final decorative element
-        story.append(Spacer(1, 0.2*inch))
-        story.append(DecorationFlowable(400, 20, "corner", accent_color_obj))
-        
-        # Create a custom frame
-        frame = Frame(
-            doc.leftMargin, 
-            doc.bottomMargin, 
-            A5[0] - 2*doc.leftMargin, 
-            A5[1] - 2*doc.topMargin,
-            id='normal'
-        )
-        
-        # Create page template with our canvas painter
-        template = PageTemplate(
-            id='invitation_template', 
-            frames=frame, 
-            onPage=canvas_painter.on_page
-        )
-
-        # Add template and ensure all pages use the same style
-        doc.addPageTemplates([template])
-
-        # Use a custom document builder to apply background to all pages
-        def _doNothing(canvas, doc):
-            pass
-
-        doc.build(story, onFirstPage=canvas_painter.on_page, onLaterPages=canvas_painter.on_page)
-        
-        return output_path
+    
+    def _render_pdf(self, invitation_data, output_path):
+        """Generate PDF from invitation data using ReportLab with enhanced visual appeal"""
+        from invitation_pdf import render_invitation_pdf
+        render_invitation_pdf(invitation_data, output_path)
 
 class EmailInvitationTool:
     name: str = "email_invitation_tool"
     description: str = "Sends invitation PDF via email"
     
+    @staticmethod
+    def _recipients_from_addresses(email_addresses: List[str],
+                                   cc_addresses: Optional[List[str]] = None) -> List[Dict[str, str]]:
+        """Turn "Name <email>" or bare addresses into recipient records"""
+        recipients = []
+        for address in list(email_addresses) + list(cc_addresses or []):
+            name, email = parseaddr(address)
+            if email:
+                recipients.append({"email": email, "name": name})
+        return recipients
+    
+    @observed(TOOL_RUN_SECONDS, tool="email_queue")
+    def _queue(self, invitation_id: str, event_id: str, email_subject: str, email_addresses: List[str],
+               sender_name: str, additional_message: Optional[str] = None,
+               cc_addresses: Optional[List[str]] = None,
+               guests: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Puts one message per guest in the durable outbox and returns immediately.
+        The background outbox workers do the SMTP work. With `guests` (an
+        imported guest list) each guest is sent their own personalized PDF,
+        which the worker renders when it delivers that guest's message.
+        """
+        invitation_data = InvitationCreatorTool.get_invitation(invitation_id)
+        if not invitation_data:
+            return {"error": f"Invitation with ID {invitation_id} not found"}
+        
+        if not invitation_data.get("pdf_path"):
+            return {"error": "Invitation PDF has not been generated yet"}
+        
+        settings = SMTPSettings()
+        if not settings.user or not settings.password:
+            return {"error": "Email credentials are not configured"}
+        
+        try:
+            personalize = None
+            if guests:
+                from guest_pdfs import render_inputs
+                recipients = [guest for guest in guests if guest.get("email")]
+                personalize = render_inputs(invitation_data)
+            else:
+                recipients = self._recipients_from_addresses(email_addresses, cc_addresses)
+            if not recipients:
+                return {"error": "No valid email addresses provided"}
+            
+            from email_outbox import get_outbox, start_outbox_workers
+            start_outbox_workers()
+            result = get_outbox().enqueue(
+                event_id=event_id,
+                invitation_id=invitation_id,
+                recipients=recipients,
+                subject_template=email_subject,
+                sender_name=sender_name,
+                pdf_path=invitation_data["pdf_path"],
+                template_values={
+                    "event_name": invitation_data['event_name'],
+                    "additional_message": additional_message + "\n" if additional_message else "",
+                },
+                personalize=personalize
+            )
+            return {
+                "success": True,
+                "message": f"Queued {result['queued']} invitations"
+                           + (f" ({result['skipped']} skipped, already queued or sent)" if result['skipped'] else ""),
+                "job_id": result["job_id"],
+                "recipients": result["queued_recipients"],
+                "skipped": result["skipped_recipients"]
+            }
+        except Exception as e:
+            logger.error(f"Error queueing invitation emails: {e}")
+            return {"error": f"Failed to queue invitation emails: {str(e)}"}
+    
+    @observed(TOOL_RUN_SECONDS, tool="email_invitation")
     def _run(self, invitation_id: str, email_subject: str, email_addresses: List[str], 
              sender_name: str, additional_message: Optional[str] = None, 
-             cc_addresses: Optional[List[str]] = None) -> Dict[str, Any]:
+             cc_addresses: Optional[List[str]] = None, event_id: Optional[str] = None,
+             recipients: Optional[List[Dict[str, Any]]] = None,
+             body_template: Optional[str] = None, personalized_pdfs: bool = False) -> Dict[str, Any]:
         """
-        Sends invitation PDF to specified email addresses
+        Sends a personalized copy of the invitation PDF to each address.
+        Addresses may be written as "Name <email>"; `recipients` can instead carry
+        per-guest template fields. CC addresses get their own copy. With
+        `personalized_pdfs`, each recipient's PDF is rendered for them (name,
+        table, plus-ones) and handed to the sender as soon as it is ready.
         """
         logger.info(f"Sending invitation {invitation_id} via email")
         
@@ -2512,59 +2440,53 @@ class EmailInvitationTool:
             return {"error": "Invitation PDF has not been generated yet"}
         
         try:
-            # Get email credentials from environment variables
-            email_user = os.environ.get("EMAIL_USER")
-            email_password = os.environ.get("EMAIL_PASSWORD")
-            email_server = os.environ.get("EMAIL_SERVER", "smtp.gmail.com")
-            email_port = int(os.environ.get("EMAIL_PORT", 587))
-            
-            if not email_user or not email_password:
+            settings = SMTPSettings()
+            if not settings.user or not settings.password:
                 return {"error": "Email credentials are not configured"}
             
-            # Create multipart message
-            msg = MIMEMultipart()
-            msg['From'] = f"{sender_name} <{email_user}>"
-            msg['To'] = ", ".join(email_addresses)
-            msg['Subject'] = email_subject
-            
-            if cc_addresses and len(cc_addresses) > 0:
-                msg['Cc'] = ", ".join(cc_addresses)
-            
-            # Create email body
-            body = f"""
-            Dear Guest,
-            
-            You are cordially invited to {invitation_data['event_name']}!
-            
-            Please find the attached invitation with all the details.
-            
-            {"" if not additional_message else additional_message + "\n\n"}
-            Best regards,
-            {sender_name}
-            """
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Attach PDF invitation
-            with open(invitation_data["pdf_path"], "rb") as f:
-                attachment = MIMEApplication(f.read(), _subtype="pdf")
-                attachment.add_header('Content-Disposition', 'attachment', 
-                                      filename=os.path.basename(invitation_data["pdf_path"]))
-                msg.attach(attachment)
+            # Build one recipient record per guest
+            if recipients is None:
+                recipients = self._recipients_from_addresses(email_addresses, cc_addresses)
+            if not recipients:
+                return {"error": "No valid email addresses provided"}
+            
+            # Ledger records go to the event document as they complete
+            persist = None
+            if event_id:
+                from database import store_delivery_status
+                persist = lambda records: store_delivery_status(event_id, invitation_id, records)
+            ledger = DeliveryLedger(invitation_id, persist=persist)
+            
+            outgoing = recipients
+            if personalized_pdfs:
+                from guest_pdfs import guest_recipients
+                outgoing = guest_recipients(invitation_data, recipients)
+            
+            result = BulkInvitationSender(settings).send(
+                outgoing,
+                subject_template=email_subject,
+                sender_name=sender_name,
+                body_template=body_template or DEFAULT_BODY_TEMPLATE,
+                pdf_path=invitation_data["pdf_path"],
+                template_values={
+                    "event_name": invitation_data['event_name'],
+                    "additional_message": additional_message + "\n" if additional_message else "",
+                },
+                ledger=ledger
+            )
             
-            # Connect to SMTP server and send email
-            with smtplib.SMTP(email_server, email_port) as server:
-                server.starttls()
-                server.login(email_user, email_password)
-                
-                all_recipients = email_addresses + (cc_addresses if cc_addresses else [])
-                server.sendmail(email_user, all_recipients, msg.as_string())
+            if result["sent"] == 0:
+                return {"error": f"Failed to send invitation email to any of {result['total']} recipients",
+                        "failed": result["failed"]}
             
             # Return success result
             return {
                 "success": True,
-                "message": f"Invitation sent successfully to {len(email_addresses)} recipients",
-                "recipients": email_addresses,
-                "cc": cc_addresses
+                "message": f"Invitation sent successfully to {result['sent']} of {result['total']} recipients",
+                "recipients": [r["email"] for r in recipients if r["email"] not in result["failed"]],
+                "failed": result["failed"],
+                "cc": cc_addresses,
+                "delivery": ledger.summary()
             }
             
         except Exception as e:
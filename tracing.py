@@ -0,0 +1,356 @@
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+import contextvars
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from metrics import watch_pool
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Where finished traces go: "none", "jsonl" (TRACE_FILE) or "otlp" (OTLP/HTTP JSON to OTLP_ENDPOINT)
+TRACE_EXPORTER = os.environ.get("EVENTWISE_TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.environ.get("EVENTWISE_TRACE_FILE", os.path.join("traces", "spans.jsonl"))
+OTLP_ENDPOINT = os.environ.get("EVENTWISE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+SERVICE_NAME = "eventwise"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("eventwise_span", default=None)
+
+# Counters on a span can be bumped from the worker threads of a search
+_attributes_lock = threading.Lock()
+
+
+class Span:
+    """One timed stage of a trace, with the counters recorded while it ran"""
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start_time", "_start",
+                 "duration", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any):
+        with _attributes_lock:
+            self.attributes.update(attributes)
+
+    def add(self, key: str, amount: float = 1):
+        with _attributes_lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.duration = time.perf_counter() - self._start
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start_time,
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter(ABC):
+    """Receives the finished spans of one trace at a time"""
+
+    @abstractmethod
+    def export(self, spans: List[Dict[str, Any]]):
+        pass
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends one JSON object per span to a local file"""
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Dict[str, Any]]):
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        directory = os.path.dirname(self.path)
+        with self._lock:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """Posts spans as OTLP/HTTP JSON, accepted by the OpenTelemetry Collector, Jaeger, Tempo, ..."""
+
+    def __init__(self, endpoint: str = OTLP_ENDPOINT, timeout: float = 5):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def _span(self, span: Dict[str, Any]) -> Dict[str, Any]:
+        start = int(span["start"] * 1e9)
+        otlp = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(start),
+            "endTimeUnixNano": str(start + int(span["duration_ms"] * 1e6)),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span["attributes"].items()],
+            "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1},
+        }
+        if span["parent_id"]:
+            otlp["parentSpanId"] = span["parent_id"]
+        return otlp
+
+    def export(self, spans: List[Dict[str, Any]]):
+        import requests
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [self._span(span) for span in spans]}],
+        }]}
+        response = requests.post(self.endpoint, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+_exporter: Optional[SpanExporter] = None
+_exporter_configured = False
+_exporter_lock = threading.Lock()
+
+# Exports run off the traced thread so a slow collector never delays a search
+_export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+watch_pool("trace_export", _export_executor)
+
+# Finished spans of traces whose root is still open, by trace id
+_pending: Dict[str, List[Dict[str, Any]]] = {}
+_pending_lock = threading.Lock()
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    """The exporter picked by EVENTWISE_TRACE_EXPORTER, or None when tracing isn't exported"""
+    global _exporter, _exporter_configured
+    if not _exporter_configured:
+        with _exporter_lock:
+            if not _exporter_configured:
+                if TRACE_EXPORTER == "jsonl":
+                    _exporter = JsonlSpanExporter()
+                elif TRACE_EXPORTER == "otlp":
+                    _exporter = OtlpHttpSpanExporter()
+                elif TRACE_EXPORTER not in ("", "none"):
+                    logger.warning(f"Unknown trace exporter {TRACE_EXPORTER!r}, spans won't be exported")
+                _exporter_configured = True
+    return _exporter
+
+
+def set_exporter(exporter: Optional[SpanExporter]):
+    """Replace the configured exporter, e.g. from a benchmark or a test harness"""
+    global _exporter, _exporter_configured
+    with _exporter_lock:
+        _exporter = exporter
+        _exporter_configured = True
+
+
+def _export(exporter: SpanExporter, spans: List[Dict[str, Any]]):
+    try:
+        exporter.export(spans)
+    except Exception as e:
+        logger.warning(f"Could not export {len(spans)} spans: {e}")
+
+
+def flush_traces(timeout: float = 10):
+    """Wait for the exports already handed to the export thread"""
+    _export_executor.submit(lambda: None).result(timeout=timeout)
+
+
+def _span_finished(span: Span):
+    exporter = get_exporter()
+    if exporter is None:
+        return
+    record = span.to_dict()
+    with _pending_lock:
+        if span.parent_id is None:
+            spans = _pending.pop(span.trace_id, [])
+            spans.append(record)
+        elif span.trace_id in _pending:
+            _pending[span.trace_id].append(record)
+            return
+        else:
+            # The root has already been exported (a straggler from a worker thread)
+            spans = [record]
+    _export_executor.submit(_export, exporter, spans)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Time a stage as a child of the current span, or as the root of a new trace
+    when there is none. The trace is exported once its root finishes.
+    """
+    parent = _current_span.get()
+    current = Span(name, parent, attributes)
+    if parent is None and get_exporter() is not None:
+        with _pending_lock:
+            _pending[current.trace_id] = []
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.finish(e)
+        raise
+    else:
+        current.finish()
+    finally:
+        _current_span.reset(token)
+        _span_finished(current)
+
+
+def traced(name: str, **attributes: Any) -> Callable:
+    """Decorator form of span() for a whole function or method"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace_id if current else None
+
+
+def add_to_span(key: str, amount: float = 1):
+    """Bump a counter (bytes, retries, cache_hits, ...) on the current span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.add(key, amount)
+
+
+def set_span_attributes(**attributes: Any):
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def record_llm_usage(response: Any):
+    """Add the prompt and completion tokens of a chat response to the current span"""
+    usage = getattr(response, "usage", None)
+    if usage is None and isinstance(response, dict):
+        usage = response.get("usage")
+    if usage is None:
+        return
+    if isinstance(usage, dict):
+        prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+    else:
+        prompt, completion = getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+    add_to_span("tokens_in", prompt or 0)
+    add_to_span("tokens_out", completion or 0)
+
+
+def submit_with_context(executor, func: Callable, *args: Any, **kwargs: Any):
+    """executor.submit() that runs func inside the caller's trace"""
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+# ---------------------- Summary CLI ----------------------
+COUNTERS = ("bytes", "tokens_in", "tokens_out", "retries", "hedges", "cache_hits", "throttled_s")
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(spans: List[Dict[str, Any]], top: int = 10) -> str:
+    stages = defaultdict(list)
+    for record in spans:
+        stages[record["name"]].append(record)
+
+    lines = [f"{len(spans)} spans in {len({s['trace_id'] for s in spans})} traces", "",
+             f"{'stage':<28} {'count':>6} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} "
+             f"{'errors':>6}  counters"]
+    ranked = sorted(stages.items(), key=lambda item: -sum(s["duration_ms"] for s in item[1]))
+    for name, records in ranked[:top]:
+        durations = [s["duration_ms"] for s in records]
+        totals = defaultdict(float)
+        for record in records:
+            for key in COUNTERS:
+                totals[key] += record["attributes"].get(key, 0) or 0
+        counters = " ".join(f"{key}={totals[key]:g}" for key in COUNTERS if totals[key])
+        lines.append(f"{name:<28} {len(records):>6} {sum(durations) / 1000:9.2f} "
+                     f"{_percentile(durations, 0.5):9.1f} {_percentile(durations, 0.95):9.1f} "
+                     f"{max(durations):9.1f} {sum(1 for s in records if s['error']):>6}  {counters}")
+
+    roots = sorted((s for s in spans if not s["parent_id"]), key=lambda s: -s["duration_ms"])[:top]
+    if roots:
+        lines += ["", "slowest traces"]
+        for root in roots:
+            lines.append(f"  {root['duration_ms'] / 1000:8.2f}s  {root['trace_id']}  {root['name']}")
+    return "\n".join(lines)
+
+
+def trace_tree(spans: List[Dict[str, Any]], trace_id: str) -> str:
+    children = defaultdict(list)
+    for record in spans:
+        if record["trace_id"] == trace_id:
+            children[record["parent_id"]].append(record)
+    lines = []
+
+    def walk(parent_id, depth):
+        for record in sorted(children.get(parent_id, []), key=lambda s: s["start"]):
+            attributes = " ".join(f"{k}={v}" for k, v in record["attributes"].items())
+            error = f"  ERROR {record['error']}" if record["error"] else ""
+            lines.append(f"{'  ' * depth}{record['name']}  {record['duration_ms']:.1f} ms  {attributes}{error}")
+            walk(record["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines) or f"No spans for trace {trace_id}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize traces written by the jsonl exporter")
+    parser.add_argument("path", nargs="?", default=TRACE_FILE)
+    parser.add_argument("--top", type=int, default=15, help="stages and traces to list")
+    parser.add_argument("--trace", help="print the span tree of one trace id instead")
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+    print(trace_tree(spans, args.trace) if args.trace else summarize(spans, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,26 +5,18 @@ import traceback
 import time
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
-from crewai import Crew, Process
 
-# Import from other files
+# Import from other files (the tools are imported by the functions that use them)
 from agents import (
-    requirement_analyzer, budget_allocator, service_reviser,
-    vendor_service_coordinator, venue_search_coordinator,
-    requirement_task, budget_task, service_revision_task,
-    venue_search_task, vendor_search_task,
     create_requirements_crew, create_budget_crew, create_service_revision_crew,
     create_venue_search_crew, create_vendor_search_crew
 )
-from tools import (
-    InvitationCreatorTool, InvitationStylerTool, EmailInvitationTool,
-    BudgetParserTool
-)
 from database import (
-    EventManager, UserManager, 
+    EventManager, UserManager, get_event_manager,
     store_event_details, store_services, store_service_provider,
     store_invitation, get_event_venue
 )
+from metering import metering_scope, record_crew_usage
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -261,7 +253,7 @@ def service_selection_and_search(approved_services, details, event_id=None):
     # If we don't have status info in approved_services, we need to check differently
     if not any("status" in service for service in approved_services) and event_id:
         # Fetch the event to get accurate status information
-        event_manager = EventManager()
+        event_manager = get_event_manager()
         event = event_manager.get_event_by_id(event_id)
         if event and event.get("services"):
             # Reset our tracking lists
@@ -324,7 +316,9 @@ def service_selection_and_search(approved_services, details, event_id=None):
                     
                     # Use venue search coordinator for venue searches
                     venue_crew = create_venue_search_crew()
-                    service_output = venue_crew.kickoff(inputs=venue_inputs)
+                    with metering_scope(event_id, "venue_search"):
+                        service_output = venue_crew.kickoff(inputs=venue_inputs)
+                        record_crew_usage(service_output)
                     logger.debug(f"Raw venue output: {service_output}")
                     service_results = extract_text_from_crew_output(service_output)
                     logger.debug(f"Extracted venue results: {service_results[:500]}...")
@@ -397,7 +391,9 @@ def service_selection_and_search(approved_services, details, event_id=None):
                     
                     # Use vendor service coordinator for vendor searches
                     vendor_crew = create_vendor_search_crew()
-                    service_output = vendor_crew.kickoff(inputs=vendor_inputs)
+                    with metering_scope(event_id, "vendor_search"):
+                        service_output = vendor_crew.kickoff(inputs=vendor_inputs)
+                        record_crew_usage(service_output)
                     logger.debug(f"Raw vendor output: {service_output}")
                     service_results = extract_text_from_crew_output(service_output)
                     logger.debug(f"Extracted vendor results: {service_results[:500]}...")
@@ -468,6 +464,8 @@ def create_invitation(event_details):
     """
     Create an invitation using predefined event details
     """
+    from tools import InvitationCreatorTool, InvitationStylerTool, EmailInvitationTool
+
     print("\n=== Invitation Creation ===")
     
     # Confirm venue details first
@@ -650,6 +648,7 @@ def get_event_details():
     }
     
     # Parse budget
+    from tools import BudgetParserTool
     budget_data = BudgetParserTool()._run(details["raw_budget"])
     details.update({
         "budget": budget_data["converted_INR"],